@@ -0,0 +1,146 @@
+# audio_pipeline.py
+# Whisper için bellekte çözümleme ve toplu (batched) konuşma tanıma.
+#
+# Eski /whisper/transcribe her yüklemeyi 'uploads/<istemcinin dosya adı>'
+# yoluna kaydediyor, whisper_pipe(dosya_yolu) ile tek tek işliyor ve dosyayı
+# siliyordu. Aynı adlı iki eşzamanlı yükleme birbirinin dosyasının üzerine
+# yazabiliyordu ve her istek modeli tek başına kullanıyordu. Bu modülde:
+#   - decode_audio: Yüklenen baytlar diske yazılmadan NumPy dizisine (16 kHz,
+#     mono, float32) çevrilir. WAV doğrudan okunur; diğer biçimler (mp3, ogg,
+#     webm...) ffmpeg'e boru (pipe) üzerinden verilir.
+#   - WhisperBatchTranscriber: Kuyrukta bekleyen istekler MicroBatcher ile
+#     toplanır ve ASR pipeline'ından tek çağrıda geçirilir. Uzun kayıtlar
+#     pipeline tarafından 30 saniyelik parçalara bölünür (chunk_length_s) ve
+#     parçalar diğer isteklerin parçalarıyla birlikte işlenir.
+#   - stream_transcription: Kaydı sessiz noktalardan parçalara böler ve her
+#     parçanın metnini hazır olur olmaz verir (kısmi transkript akışı).
+import io
+import math
+
+import numpy as np
+
+# Whisper'ın beklediği örnekleme hızı.
+SAMPLING_RATE = 16000
+# Pipeline'ın uzun kayıtları böldüğü parça uzunluğu (saniye).
+CHUNK_SECONDS = 30.0
+# Akış modunda parça sınırı, pencerenin son bu kadar saniyesindeki en sessiz
+# noktaya kaydırılır; böylece kelimeler ortadan bölünmez.
+SILENCE_SEARCH_SECONDS = 2.0
+
+
+def _to_float32(samples: np.ndarray) -> np.ndarray:
+    # Tamsayı PCM örneklerini [-1, 1] aralığına çevirir; çok kanallıysa ortalamasını alır.
+    if samples.dtype == np.uint8:
+        samples = (samples.astype(np.float32) - 128) / 128
+    elif np.issubdtype(samples.dtype, np.integer):
+        samples = samples.astype(np.float32) / float(np.iinfo(samples.dtype).max)
+    else:
+        samples = samples.astype(np.float32)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples
+
+
+def _resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    if source_rate == target_rate:
+        return audio
+    from scipy.signal import resample_poly
+
+    g = math.gcd(source_rate, target_rate)
+    return resample_poly(audio, target_rate // g, source_rate // g).astype(np.float32)
+
+
+def decode_audio(data: bytes, sampling_rate: int = SAMPLING_RATE) -> np.ndarray:
+    """
+    Ses dosyasının baytlarını mono float32 diziye çevirir. Dosya çözülemezse
+    ValueError fırlatır.
+    """
+    if not data:
+        raise ValueError("Ses dosyası boş.")
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        import scipy.io.wavfile
+
+        rate, samples = scipy.io.wavfile.read(io.BytesIO(data))
+        return _resample(_to_float32(samples), rate, sampling_rate)
+    # Diğer biçimler: transformers'ın da kullandığı ffmpeg boru hattı (diske yazmaz).
+    from transformers.pipelines.audio_utils import ffmpeg_read
+
+    return ffmpeg_read(data, sampling_rate)
+
+
+def split_on_silence(audio: np.ndarray, sampling_rate: int = SAMPLING_RATE, chunk_seconds: float = CHUNK_SECONDS,
+                     search_seconds: float = SILENCE_SEARCH_SECONDS, frame_ms: float = 20.0) -> list:
+    """
+    Kaydı en fazla 'chunk_seconds' uzunluğunda parçalara böler. Her sınır,
+    pencerenin son 'search_seconds' saniyesi içindeki en sessiz kareye konur.
+    (başlangıç, bitiş) örnek indekslerinin listesini döndürür.
+    """
+    chunk = int(chunk_seconds * sampling_rate)
+    search = min(int(search_seconds * sampling_rate), chunk // 2)
+    frame = max(1, int(frame_ms * sampling_rate / 1000))
+    spans, start = [], 0
+    while len(audio) - start > chunk:
+        window = audio[start + chunk - search:start + chunk]
+        frames = len(window) // frame
+        energy = np.square(window[:frames * frame]).reshape(frames, frame).mean(axis=1)
+        end = start + chunk - search + int(np.argmin(energy)) * frame + frame // 2
+        spans.append((start, end))
+        start = end
+    if start < len(audio) or not spans:
+        spans.append((start, len(audio)))
+    return spans
+
+
+class WhisperBatchTranscriber:
+    """
+    Ses dizilerinin listesini tek bir pipeline çağrısında metne çeviren işlemci.
+    MicroBatcher'a 'process_batch' olarak verilir.
+
+    Args:
+        get_pipe: ASR pipeline'ını veren bağlam yöneticisi fabrikası
+            (örn. 'lambda: registry.use("whisper")').
+        batch_size (int): Pipeline'ın modele aynı anda verdiği parça sayısı.
+        chunk_length_s (float): Uzun kayıtların bölündüğü parça uzunluğu.
+        generate_kwargs (dict): Modelin generate çağrısına iletilecek ayarlar.
+    """
+
+    def __init__(self, get_pipe, batch_size: int = 8, chunk_length_s: float = CHUNK_SECONDS, generate_kwargs: dict = None):
+        self.get_pipe = get_pipe
+        self.batch_size = batch_size
+        self.chunk_length_s = chunk_length_s
+        self.generate_kwargs = generate_kwargs or {}
+
+    def __call__(self, items: list) -> list:
+        # Pipeline girdi sözlüklerini değiştirir; her çağrıda yenileri oluşturulur.
+        inputs = [{"raw": audio, "sampling_rate": SAMPLING_RATE} for audio in items]
+        with self.get_pipe() as pipe:
+            results = pipe(
+                inputs,
+                batch_size=self.batch_size,
+                chunk_length_s=self.chunk_length_s,
+                generate_kwargs=self.generate_kwargs,
+            )
+        return [result["text"].strip() for result in results]
+
+
+def stream_transcription(batcher, audio: np.ndarray, sampling_rate: int = SAMPLING_RATE,
+                         chunk_seconds: float = CHUNK_SECONDS):
+    """
+    Kaydı parçalara bölüp hepsini toplayıcıya gönderir ve her parçanın
+    sonucunu sırayla, hazır olur olmaz verir:
+        {"chunk": 0, "start": 0.0, "end": 29.4, "text": "..."}
+    Akış yarıda bırakılırsa (istemci gitti) henüz başlamamış parçalar iptal edilir.
+    """
+    spans = split_on_silence(audio, sampling_rate, chunk_seconds)
+    futures = [batcher.submit(audio[start:end]) for start, end in spans]
+    try:
+        for index, ((start, end), future) in enumerate(zip(spans, futures)):
+            yield {
+                "chunk": index,
+                "start": round(start / sampling_rate, 2),
+                "end": round(end / sampling_rate, 2),
+                "text": future.result(),
+            }
+    finally:
+        for future in futures:
+            future.cancel()
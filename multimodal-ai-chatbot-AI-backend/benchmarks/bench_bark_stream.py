@@ -0,0 +1,124 @@
+# benchmarks/bench_bark_stream.py
+# Bark seslendirme yolunun ilk sese kadar geçen süresini (time-to-first-audio)
+# ve toplam süresini eski yolla karşılaştırır.
+#
+# CPU'da küçük, rastgele ağırlıklı bir BarkModel (tiny_models.py) kullanılır.
+#   - legacy:   Eski yol; metin her 250 karakterde kesilir, parçalar sırayla
+#               üretilir, np.concatenate + scipy ile BytesIO'ya WAV yazılır ve
+#               ancak sonra ilk bayt gönderilir.
+#   - streamed: Cümle sınırlarında bölme, ilk parça tek başına, kalanlar tek
+#               generate çağrısında toplu; WAV başlığı hemen, her parçanın
+#               PCM'i hazır olur olmaz gönderilir.
+# Ayrıca eski bölmenin kaç kelimeyi ortadan kestiği de raporlanır.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 benchmarks/bench_bark_stream.py --paragraphs 2 --runs 2
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import scipy.io.wavfile
+import torch
+
+from speech_stream import BarkSynthesizer, split_sentences, stream_speech, wav_stream
+from tiny_models import build_tiny_bark
+
+PARAGRAPH = (
+    "Pardus, Türkiye'de geliştirilen ve Debian tabanlı bir Linux dağıtımıdır. Kamu kurumlarında ve okullarda "
+    "yaygın olarak kullanılır. Kurulumu kolaydır, güncellemeleri düzenli olarak yayınlanır ve kullanıcı dostu "
+    "bir masaüstü ortamı sunar! Peki, Pardus'u günlük işlerde nasıl kullanabilirsiniz? Öncelikle uygulama "
+    "merkezinden ihtiyaç duyduğunuz programları kurabilir, ardından ofis belgelerinizi, internet tarayıcınızı ve "
+    "e-posta istemcinizi rahatlıkla kullanabilirsiniz. Sistem yöneticileri için ise komut satırı araçları, "
+    "paket yöneticisi ve servis yönetimi gibi güçlü özellikler bulunmaktadır."
+)
+
+
+def legacy(model, processor, text: str):
+    # Eski endpoint: 250 karakterde kes, sırayla üret, birleştir, WAV yaz, gönder.
+    start = time.perf_counter()
+    chunks = [text[i:i + 250] for i in range(0, len(text), 250)]
+    outputs = []
+    for chunk in chunks:
+        inputs = processor(chunk, voice_preset=None, return_tensors="pt")
+        with torch.inference_mode():
+            speech = model.generate(**dict(inputs), do_sample=True)
+        outputs.append(speech[0].cpu().numpy())
+    buffer = io.BytesIO()
+    scipy.io.wavfile.write(buffer, rate=model.generation_config.sample_rate, data=np.concatenate(outputs))
+    first = time.perf_counter() - start # İlk bayt ancak dosya tamamlanınca gönderilir
+    return {"chunks": len(chunks), "header_ms": first * 1000, "first_audio_ms": first * 1000,
+            "total_ms": first * 1000, "bytes": len(buffer.getvalue())}
+
+
+def streamed(model, processor, text: str, batch_size: int):
+    start = time.perf_counter()
+    chunks = split_sentences(text, max_chars=250)
+    synthesizer = BarkSynthesizer(model, processor, "cpu")
+    header_at = first_audio_at = None
+    total = 0
+    for index, data in enumerate(wav_stream(synthesizer.sample_rate, stream_speech(synthesizer, chunks, batch_size=batch_size))):
+        now = time.perf_counter()
+        if index == 0:
+            header_at = now
+        elif first_audio_at is None:
+            first_audio_at = now
+        total += len(data)
+    end = time.perf_counter()
+    return {"chunks": len(chunks), "header_ms": (header_at - start) * 1000,
+            "first_audio_ms": (first_audio_at - start) * 1000, "total_ms": (end - start) * 1000, "bytes": total}
+
+
+def words_cut(chunks: list) -> int:
+    # Bir parçanın sonu ile sonrakinin başı aynı kelimenin parçalarıysa kelime bölünmüştür.
+    return sum(1 for a, b in zip(chunks, chunks[1:]) if a and b and not a[-1].isspace() and not b[0].isspace())
+
+
+def summarize(rows: list) -> dict:
+    return {key: round(statistics.median(r[key] for r in rows), 1) for key in rows[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bark akışlı seslendirme testi")
+    parser.add_argument("--paragraphs", type=int, default=2, help="Metindeki paragraf sayısı")
+    parser.add_argument("--runs", type=int, default=2, help="Tekrar sayısı")
+    parser.add_argument("--batch-size", type=int, default=8, help="İlk parçadan sonraki toplu iş boyutu")
+    parser.add_argument("--semantic-tokens", type=int, default=64, help="Parça başına anlamsal token")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    model, processor = build_tiny_bark(semantic_tokens=args.semantic_tokens)
+    text = "\n".join([PARAGRAPH] * args.paragraphs)
+    streamed(model, processor, "Isınma.", args.batch_size)
+
+    legacy_rows = [legacy(model, processor, text) for _ in range(args.runs)]
+    streamed_rows = [streamed(model, processor, text, args.batch_size) for _ in range(args.runs)]
+    result = {
+        "benchmark": "bark_stream",
+        "text_chars": len(text),
+        "words_cut_by_legacy_split": words_cut([text[i:i + 250] for i in range(0, len(text), 250)]),
+        "sentence_chunks": split_sentences(text, max_chars=250),
+        "legacy": summarize(legacy_rows),
+        "streamed": summarize(streamed_rows),
+    }
+    result["first_audio_speedup"] = round(result["legacy"]["first_audio_ms"] / result["streamed"]["first_audio_ms"], 2)
+    result["total_speedup"] = round(result["legacy"]["total_ms"] / result["streamed"]["total_ms"], 2)
+    print(f"ilk ses: {result['legacy']['first_audio_ms']:.0f} ms -> {result['streamed']['first_audio_ms']:.0f} ms, "
+          f"toplam: {result['legacy']['total_ms']:.0f} ms -> {result['streamed']['total_ms']:.0f} ms", file=sys.stderr)
+
+    text_out = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text_out + "\n")
+    print(text_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_load.py
+# Pardus API'si ve DeepSeekWeb için çevrimdışı yük ve gerileme testi.
+#
+# İki sunucu, küçük yedek modellerle ayrı süreçlerde başlatılır:
+#   - benchmarks/stand_in_server.py (Pardus.ipynb API'si: Gemma, Whisper, Bark)
+#   - ../pardus-deepseek/benchmarks/stand_in_server.py (SSE '/generate'; EOS
+#     kapalı, her istek tam '--max-new-tokens' token üretir)
+# Ardından load_generator.py ile aynı karışık iş yükü şu senaryolarla
+# çalıştırılır:
+#   - closed_c<N>: N eşzamanlı kullanıcı (her biri cevabı bekleyip yeni istek
+#                  gönderir).
+#   - open_r<R>:   Saniyede ortalama R istek (Poisson gelişleri); gecikme
+#                  planlanan gönderilme anından ölçülür.
+# Her senaryonun sonucu (uç nokta başına verim, gecikme, TTFT, ITL) tek bir
+# JSON dosyasında toplanır. '--baseline' ile önceki bir çalıştırmanın dosyası
+# verilirse senaryolar karşılaştırılır ve gerileme varsa 1 koduyla çıkılır.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 benchmarks/bench_load.py --concurrency 1 4 8 --rates 2 4 --duration 20 --output load.json
+#     python3 benchmarks/bench_load.py --baseline load.json
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import load_generator
+
+DEEPSEEK_ROOT = os.path.join(os.path.dirname(ROOT), "pardus-deepseek")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(cwd: str, script: str, port: int, extra: list) -> subprocess.Popen:
+    command = [sys.executable, script, "--host", "127.0.0.1", "--port", str(port)] + extra
+    return subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(process: subprocess.Popen, url: str, timeout: float = 180.0) -> float:
+    """Sunucu '/' isteğine cevap verene kadar bekler; başlama süresini döndürür."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Sunucu başlatılamadı ({url}), çıkış kodu {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Sunucu {timeout:g} s içinde hazır olmadı: {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yedek modelli sunucularla yük ve gerileme testi")
+    parser.add_argument("--mix", default=load_generator.DEFAULT_MIX, help="Uç nokta ağırlıkları")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 8], help="closed loop kullanıcı sayıları")
+    parser.add_argument("--rates", type=float, nargs="*", default=[2.0, 4.0], help="open loop istek/s değerleri")
+    parser.add_argument("--duration", type=float, default=20.0, help="Senaryo başına yük süresi (s)")
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=120.0, help="İstek başına zaman aşımı (s)")
+    parser.add_argument("--threads", type=int, default=0, help="Sunucuların torch iş parçacığı sayısı (0: varsayılan)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--threshold", type=float, default=load_generator.DEFAULT_THRESHOLD)
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    api_port, deepseek_port = free_port(), free_port()
+    threads = ["--threads", str(args.threads)]
+    servers = [
+        start_server(ROOT, os.path.join("benchmarks", "stand_in_server.py"), api_port, threads),
+        start_server(DEEPSEEK_ROOT, os.path.join("benchmarks", "stand_in_server.py"), deepseek_port,
+                     threads + ["--ignore-eos"]),
+    ]
+    result = {"benchmark": "load_scenarios", "cpu_count": os.cpu_count(), "startup_s": {}, "scenarios": {}}
+    try:
+        for name, server, port in (("api", servers[0], api_port), ("deepseek", servers[1], deepseek_port)):
+            result["startup_s"][name] = round(wait_ready(server, f"http://127.0.0.1:{port}/"), 2)
+        endpoints = load_generator.parse_mix(args.mix, load_generator.default_endpoints(
+            f"http://127.0.0.1:{api_port}", f"http://127.0.0.1:{deepseek_port}", args.max_new_tokens))
+
+        scenarios = [(f"closed_c{c}", "closed", c, None) for c in args.concurrency]
+        scenarios += [(f"open_r{rate:g}", "open", None, rate) for rate in args.rates]
+        for index, (name, mode, concurrency, rate) in enumerate(scenarios):
+            print(f"{name}:", file=sys.stderr)
+            # Modeller ilk senaryonun ısınma istekleriyle yüklenir.
+            run = load_generator.run_load(endpoints, mode, concurrency or 1, rate or 1.0, args.duration,
+                                          timeout=args.timeout, warmup=index == 0, seed=args.seed)
+            result["scenarios"][name] = run
+            overall = run["overall"]
+            print(f"  {overall['requests']} istek, {overall['errors']} hata, {overall['throughput_rps']} istek/s, "
+                  f"p90 {overall['latency_s']['p90'] if overall['latency_s'] else '-'} s", file=sys.stderr)
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["comparison"] = load_generator.compare_files(json.load(f), result, threshold=args.threshold)
+        print(load_generator.format_comparison(result["comparison"]), file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    if args.baseline and not result["comparison"]["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
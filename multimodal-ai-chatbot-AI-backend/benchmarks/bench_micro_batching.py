@@ -0,0 +1,130 @@
+# benchmarks/bench_micro_batching.py
+# Gemma endpoint'leri için dinamik mikro-toplamanın (micro_batcher.py) verimini
+# toplama penceresine (max_wait_ms) göre ölçer.
+#
+# CPU'da küçük, rastgele ağırlıklı bir sohbet modeli (tiny_models.py) ile N
+# istemci art arda istek gönderir (kapalı döngü). Her isteğin kendi
+# max_new_tokens değeri vardır. Karşılaştırma için eski düzen (her handler
+# generate'i tek başına çağırır) de aynı yükle ölçülür.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 benchmarks/bench_micro_batching.py --clients 16 --windows 0 5 10 25 50
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import torch
+
+from micro_batcher import GemmaBatchGenerator, GenerationItem, MicroBatcher
+from tiny_models import build_tiny_chat_model
+
+PROMPTS = [
+    "Pardus nedir?",
+    "Bu görseli detaylı bir şekilde açıkla.",
+    "Bana kısa bir şiir yaz.",
+    "Linux'ta bir dosyanın izinleri nasıl değiştirilir?",
+    "Türkiye'nin başkenti neresidir?",
+]
+
+
+def make_items(clients: int, requests: int, min_tokens: int, max_tokens: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [[
+        GenerationItem([{"role": "user", "content": [{"type": "text", "text": rng.choice(PROMPTS)}]}],
+                       rng.randint(min_tokens, max_tokens))
+        for _ in range(requests)
+    ] for _ in range(clients)]
+
+
+def run_load(call, workload: list) -> dict:
+    latencies, tokens = [], []
+    lock = threading.Lock()
+
+    def client(items):
+        for item in items:
+            start = time.perf_counter()
+            call(item)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                tokens.append(item.max_new_tokens)
+
+    threads = [threading.Thread(target=client, args=(items,)) for items in workload]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 2),
+        "tokens_per_s": round(sum(tokens) / elapsed, 1),
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 1),
+        "latency_ms_p95": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemma mikro-toplama verim testi")
+    parser.add_argument("--clients", type=int, default=16, help="Eşzamanlı istemci sayısı")
+    parser.add_argument("--requests", type=int, default=4, help="İstemci başına istek")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 2, 5, 10, 25, 50], help="Toplama pencereleri (ms)")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--min-tokens", type=int, default=16)
+    parser.add_argument("--max-tokens", type=int, default=48)
+    parser.add_argument("--hidden-size", type=int, default=128)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=0, help="torch iş parçacığı sayısı (0: varsayılan)")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    model, processor = build_tiny_chat_model(hidden_size=args.hidden_size, layers=args.layers)
+
+    @contextlib.contextmanager
+    def get_model():
+        yield model, processor
+
+    generator = GemmaBatchGenerator(get_model, {"do_sample": True, "temperature": 0.7})
+    workload = make_items(args.clients, args.requests, args.min_tokens, args.max_tokens, seed=5)
+    generator([workload[0][0]]) # Isınma
+
+    result = {
+        "benchmark": "micro_batching",
+        "clients": args.clients,
+        "max_batch_size": args.max_batch_size,
+        "max_new_tokens_range": [args.min_tokens, args.max_tokens],
+        # Eski düzen: her handler kendi generate çağrısını yapar.
+        "unbatched": run_load(lambda item: generator([item])[0], workload),
+        "windows": [],
+    }
+    print(f"toplamasız: {result['unbatched']['requests_per_s']:.1f} istek/s", file=sys.stderr)
+    for window in args.windows:
+        batcher = MicroBatcher(generator, max_batch_size=args.max_batch_size, max_wait_ms=window).start()
+        row = {"max_wait_ms": window, **run_load(batcher, workload), "mean_batch_size": batcher.stats()["mean_batch_size"]}
+        batcher.stop()
+        result["windows"].append(row)
+        print(f"pencere {window:>5.1f} ms: {row['requests_per_s']:.1f} istek/s, ortalama toplu iş {row['mean_batch_size']}",
+              file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# benchmarks/bench_model_registry.py
+# Model kayıt defterinin (model_registry.py) davranışını ve açılış süresini
+# CPU'da küçük yedek (stand-in) modellerle doğrular.
+#
+# Gerçek Bark/Whisper/Gemma yerine, yüklenmesi belirli bir süre alan küçük
+# torch modelleri kullanılır. Kontroller:
+#   - startup:     Kayıt anında hiçbir model yüklenmez; açılış anlıktır.
+#   - coalescing:  Aynı modeli aynı anda isteyen N istek tek bir yüklemeyi bekler.
+#   - eviction:    Bütçe aşılınca en uzun süredir kullanılmayan boştaki model
+#                  atılır; kullanımdaki model asla atılmaz.
+#   - load_error:  Yükleme hatası bekleyen tüm isteklere iletilir, sonraki
+#                  istek yüklemeyi yeniden dener.
+#   - idle:        Boşta kalan model temizleyici tarafından atılır.
+#   - warmup:      Arka planda önceden yükleme açılışı geciktirmez.
+# Herhangi bir kontrol başarısız olursa program 1 koduyla çıkar.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 benchmarks/bench_model_registry.py --load-seconds 0.5 --clients 16
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from model_registry import ModelRegistry, estimate_size
+
+
+def stand_in_loader(name: str, hidden: int, load_seconds: float, calls: dict, fail_first: bool = False):
+    """Yüklenmesi 'load_seconds' süren küçük bir model üreten yükleme fonksiyonu."""
+
+    def load():
+        calls[name] = calls.get(name, 0) + 1
+        time.sleep(load_seconds) # Ağırlıkların diskten okunması
+        if fail_first and calls[name] == 1:
+            raise RuntimeError(f"{name} yüklenemedi (deneme hatası)")
+        model = torch.nn.Sequential(torch.nn.Linear(hidden, hidden), torch.nn.Linear(hidden, hidden))
+        return model, {"name": name}
+
+    return load
+
+
+def make_registry(args, budget_models: float = None, idle_timeout: float = None, calls: dict = None):
+    size = estimate_size(torch.nn.Sequential(torch.nn.Linear(args.hidden, args.hidden), torch.nn.Linear(args.hidden, args.hidden)))
+    registry = ModelRegistry(memory_budget=int(size * budget_models) if budget_models else None, idle_timeout=idle_timeout)
+    calls = calls if calls is not None else {}
+    for name in ("bark", "whisper", "gemma"):
+        registry.register(name, stand_in_loader(name, args.hidden, args.load_seconds, calls))
+    return registry, calls, size
+
+
+def check_startup(args) -> dict:
+    start = time.perf_counter()
+    registry, calls, _ = make_registry(args)
+    elapsed = (time.perf_counter() - start) * 1000
+    eager = 3 * args.load_seconds * 1000 # Eski düzen: üç model açılışta sırayla
+    return {"passed": not calls and elapsed < 50, "startup_ms": round(elapsed, 3), "eager_startup_ms": round(eager, 1)}
+
+
+def check_coalescing(args) -> dict:
+    registry, calls, _ = make_registry(args)
+    barrier = threading.Barrier(args.clients)
+    results, latencies = [], []
+
+    def client():
+        barrier.wait()
+        start = time.perf_counter()
+        with registry.use("gemma") as (model, info):
+            results.append(id(model))
+        latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = registry.stats()["models"]["gemma"]
+    return {
+        "passed": calls.get("gemma") == 1 and len(set(results)) == 1 and stats["coalesced_waits"] == args.clients - 1,
+        "clients": args.clients,
+        "loads": calls.get("gemma"),
+        "coalesced_waits": stats["coalesced_waits"],
+        "max_wait_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+def check_eviction(args) -> dict:
+    # Bütçe iki modele yetiyor.
+    registry, calls, _ = make_registry(args, budget_models=2.5)
+    for name in ("bark", "whisper"):
+        with registry.use(name):
+            pass
+    with registry.use("bark"):
+        pass # bark artık whisper'dan daha yeni kullanıldı
+    with registry.use("gemma"):
+        pass # whisper (en eski) atılmalı
+    loaded = {n: m["loaded"] for n, m in registry.stats()["models"].items()}
+    lru_ok = loaded == {"bark": True, "whisper": False, "gemma": True}
+
+    # Kullanımdaki model, bütçe aşılsa bile atılmaz.
+    registry2, _, _ = make_registry(args, budget_models=1.5)
+    with registry2.use("bark"):
+        with registry2.use("whisper"):
+            both_loaded = all(registry2.stats()["models"][n]["loaded"] for n in ("bark", "whisper"))
+    # İkisi de bırakılınca bütçe yeniden sağlanır.
+    within_budget = registry2.loaded_bytes() <= registry2.memory_budget
+    return {
+        "passed": lru_ok and both_loaded and within_budget,
+        "lru_order": loaded,
+        "in_use_not_evicted": both_loaded,
+        "within_budget_after_release": within_budget,
+        "reloads": calls,
+    }
+
+
+def check_load_error(args) -> dict:
+    registry = ModelRegistry()
+    calls = {}
+    registry.register("whisper", stand_in_loader("whisper", args.hidden, args.load_seconds, calls, fail_first=True))
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def client():
+        barrier.wait()
+        try:
+            registry.acquire("whisper")
+            registry.release("whisper")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=client) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with registry.use("whisper"):
+        retried = True
+    return {"passed": len(errors) == 4 and calls["whisper"] == 2 and retried, "failed_waiters": len(errors), "loads": calls["whisper"]}
+
+
+def check_idle(args) -> dict:
+    registry, _, _ = make_registry(args, idle_timeout=0.2)
+    registry.start(interval=0.05)
+    with registry.use("bark"):
+        time.sleep(0.4) # Kullanımdayken atılmamalı
+        kept = registry.stats()["models"]["bark"]["loaded"]
+    time.sleep(0.5)
+    evicted = not registry.stats()["models"]["bark"]["loaded"]
+    registry.stop()
+    return {"passed": kept and evicted, "kept_while_in_use": kept, "evicted_when_idle": evicted}
+
+
+def check_warmup(args) -> dict:
+    registry, calls, _ = make_registry(args)
+    start = time.perf_counter()
+    thread = registry.warm(["gemma", "whisper"])
+    returned_ms = (time.perf_counter() - start) * 1000
+    # Önceden yükleme sürerken gelen istek aynı yüklemeyi bekler.
+    with registry.use("gemma"):
+        pass
+    thread.join()
+    return {
+        "passed": returned_ms < 50 and calls == {"gemma": 1, "whisper": 1},
+        "warm_call_ms": round(returned_ms, 3),
+        "loads": calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model kayıt defteri doğrulaması")
+    parser.add_argument("--load-seconds", type=float, default=0.3, help="Yedek modelin yüklenme süresi")
+    parser.add_argument("--hidden", type=int, default=256, help="Yedek modelin katman genişliği")
+    parser.add_argument("--clients", type=int, default=16, help="Eşzamanlı ilk istek sayısı")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    checks = {
+        "startup": check_startup(args),
+        "coalescing": check_coalescing(args),
+        "eviction": check_eviction(args),
+        "load_error": check_load_error(args),
+        "idle": check_idle(args),
+        "warmup": check_warmup(args),
+    }
+    result = {"benchmark": "model_registry", "checks": checks, "passed": all(c["passed"] for c in checks.values())}
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
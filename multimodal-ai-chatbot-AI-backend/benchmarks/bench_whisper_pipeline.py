@@ -0,0 +1,168 @@
+# benchmarks/bench_whisper_pipeline.py
+# Whisper transkripsiyon yolunu (audio_pipeline.py) sentetik seslerle ölçer.
+#
+# CPU'da küçük, rastgele ağırlıklı bir Whisper pipeline'ı (tiny_models.py)
+# kurulur ve farklı uzunlukta (5-90 s) sentetik "konuşma" kayıtları (sessizlikle
+# ayrılmış ton patlamaları) WAV baytları olarak eşzamanlı istemcilerden gönderilir.
+#   - legacy:   Eski yol; yükleme geçici dosyaya yazılır, okunur ve her istek
+#               pipeline'ı tek başına çağırır.
+#   - batched:  Bellekte çözümleme + MicroBatcher ile toplu pipeline çağrısı.
+#   - streamed: Aynı toplu yol, parça parça kısmi transkript (ilk parçaya kadar
+#               geçen süre de ölçülür).
+# Model rastgele olduğu için metinler anlamsızdır; ölçülen şey sunucu yoludur.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 benchmarks/bench_whisper_pipeline.py --clients 8 --requests 2
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import scipy.io.wavfile
+
+from audio_pipeline import SAMPLING_RATE, WhisperBatchTranscriber, decode_audio, split_on_silence, stream_transcription
+from micro_batcher import MicroBatcher
+from tiny_models import build_tiny_whisper_pipeline
+
+
+def synthetic_speech(seconds: float, rng: random.Random, rate: int = 44100) -> bytes:
+    """Sessizlikle ayrılmış ton patlamalarından oluşan 16 bit stereo WAV üretir."""
+    samples = np.zeros(int(seconds * rate), dtype=np.float32)
+    position = 0
+    while position < len(samples):
+        burst = int(rng.uniform(0.3, 1.5) * rate)
+        t = np.arange(min(burst, len(samples) - position)) / rate
+        samples[position:position + len(t)] = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+        position += burst + int(rng.uniform(0.1, 0.6) * rate)
+    stereo = np.stack([samples, samples], axis=1)
+    buffer = io.BytesIO()
+    scipy.io.wavfile.write(buffer, rate, (stereo * 32767).astype(np.int16))
+    return buffer.getvalue()
+
+
+def run_load(handle, uploads: list) -> dict:
+    latencies, first = [], []
+    lock = threading.Lock()
+
+    def client(files):
+        for data in files:
+            start = time.perf_counter()
+            first_at = handle(data, start)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                first.append(first_at - start)
+
+    threads = [threading.Thread(target=client, args=(files,)) for files in uploads]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 2),
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 1),
+        "first_result_ms_p50": round(statistics.median(first) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper transkripsiyon yolu testi")
+    parser.add_argument("--clients", type=int, default=8, help="Eşzamanlı istemci sayısı")
+    parser.add_argument("--requests", type=int, default=2, help="İstemci başına istek")
+    parser.add_argument("--min-seconds", type=float, default=5)
+    parser.add_argument("--max-seconds", type=float, default=90)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=20)
+    parser.add_argument("--max-new-tokens", type=int, default=24, help="Parça başına üretilecek token")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="tiny_whisper_")
+    pipe = build_tiny_whisper_pipeline(os.path.join(work_dir, "tokenizer"))
+    lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def get_pipe():
+        yield pipe
+
+    rng = random.Random(9)
+    uploads = [[synthetic_speech(rng.uniform(args.min_seconds, args.max_seconds), rng) for _ in range(args.requests)]
+               for _ in range(args.clients)]
+    audio_seconds = sum(len(decode_audio(d)) for files in uploads for d in files) / SAMPLING_RATE
+    generate_kwargs = {"max_new_tokens": args.max_new_tokens}
+
+    def legacy(data, start):
+        # Eski yol: diske yaz, dosyadan oku, pipeline'ı tek başına çağır.
+        upload_dir = os.path.join(work_dir, "uploads")
+        os.makedirs(upload_dir, exist_ok=True)
+        path = os.path.join(upload_dir, f"{threading.get_ident()}.wav")
+        with open(path, "wb") as f:
+            f.write(data)
+        try:
+            with open(path, "rb") as f:
+                audio = decode_audio(f.read())
+            with lock: # Eşzamanlı pipeline çağrıları aynı modeli paylaşır
+                pipe(audio, chunk_length_s=30, generate_kwargs=generate_kwargs)
+        finally:
+            os.remove(path)
+        return time.perf_counter()
+
+    transcriber = WhisperBatchTranscriber(get_pipe, batch_size=args.batch_size, generate_kwargs=generate_kwargs)
+    batcher = MicroBatcher(transcriber, max_batch_size=args.batch_size, max_wait_ms=args.max_wait_ms).start()
+
+    def batched(data, start):
+        batcher(decode_audio(data))
+        return time.perf_counter()
+
+    def streamed(data, start):
+        first_at = None
+        for _ in stream_transcription(batcher, decode_audio(data)):
+            first_at = first_at or time.perf_counter()
+        return first_at
+
+    # Sınırların sessiz noktalara düştüğünü doğrula (parça sınırındaki enerji).
+    sample = decode_audio(uploads[0][0])
+    spans = split_on_silence(sample)
+    boundary_rms = [float(np.sqrt(np.mean(np.square(sample[max(0, e - 160):e + 160])))) for _, e in spans[:-1]]
+
+    legacy([uploads[0][0]][0], 0) # Isınma
+    result = {
+        "benchmark": "whisper_pipeline",
+        "clients": args.clients,
+        "requests": args.clients * args.requests,
+        "audio_seconds": round(audio_seconds, 1),
+        "chunk_boundary_rms": [round(v, 4) for v in boundary_rms],
+        "legacy": run_load(legacy, uploads),
+        "batched": run_load(batched, uploads),
+        "streamed": run_load(streamed, uploads),
+        "batcher": batcher.stats(),
+    }
+    batcher.stop()
+    for mode in ("legacy", "batched", "streamed"):
+        row = result[mode]
+        print(f"{mode:>8}: {row['requests_per_s']:.2f} istek/s, gecikme p50 {row['latency_ms_p50']:.0f} ms, "
+              f"ilk sonuç p50 {row['first_result_ms_p50']:.0f} ms", file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/stand_in_server.py
+# Pardus.ipynb'deki Flask API'sini küçük, CPU'da çalışan yedek modellerle başlatır.
+#
+# Defterdeki sunucu Gemma, Whisper ve Bark'ı Hugging Face'ten indirip GPU'ya
+# yükler. Yük testleri (bkz. load_generator.py) ise sunucu katmanını (istek
+# toplama, akış, model kayıt defteri) ölçer. Bu betik:
+#   - Defterden 'app = Flask(__name__)' içeren hücreyi okuyup olduğu gibi
+#     çalıştırır (uç noktalar, toplayıcılar ve ortam değişkenleri aynı kalır;
+#     hücre sonundaki app.run '__main__' dışında çalışmaz),
+#   - kayıt defterindeki 'gemma', 'whisper' ve 'bark' yükleyicilerini
+#     tiny_models.py'deki yedek modellerle değiştirir (modeller yine ilk
+#     istekte, bir kez yüklenir),
+#   - uygulamayı çok iş parçacıklı Werkzeug sunucusuyla çalıştırır.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 benchmarks/stand_in_server.py --port 5000
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import torch
+
+from tiny_models import build_tiny_bark, build_tiny_chat_model, build_tiny_whisper_pipeline
+
+NOTEBOOK = os.path.join(ROOT, "Pardus.ipynb")
+
+
+def load_app_cell(path: str = NOTEBOOK) -> str:
+    """Defterdeki Flask uygulamasını tanımlayan kod hücresinin kaynağı."""
+    with open(path, encoding="utf-8") as f:
+        notebook = json.load(f)
+    for cell in notebook["cells"]:
+        source = "".join(cell["source"])
+        if cell["cell_type"] == "code" and "app = Flask(__name__)" in source:
+            return source
+    raise ValueError(f"{path} içinde Flask uygulaması bulunamadı.")
+
+
+def build_app(args) -> dict:
+    """Hücreyi çalıştırır, yükleyicileri değiştirir ve hücrenin ad alanını döndürür."""
+    namespace = {"__name__": "pardus_stand_in"}
+    exec(compile(load_app_cell(), NOTEBOOK, "exec"), namespace)
+    registry = namespace["registry"]
+    work_dir = tempfile.mkdtemp(prefix="pardus_whisper_")
+    registry.register("gemma", lambda: build_tiny_chat_model(hidden_size=args.gemma_hidden_size))
+    registry.register("whisper", lambda: build_tiny_whisper_pipeline(work_dir))
+    registry.register("bark", lambda: build_tiny_bark(semantic_tokens=args.bark_semantic_tokens))
+    return namespace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pardus.ipynb API'sini yedek modellerle çalıştırır")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--gemma-hidden-size", type=int, default=128)
+    parser.add_argument("--bark-semantic-tokens", type=int, default=64, help="Parça başına anlamsal token")
+    parser.add_argument("--threads", type=int, default=0, help="torch iş parçacığı sayısı (0: varsayılan)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    app = build_app(args)["app"]
+    print(f"Pardus yedek sunucusu: http://{args.host}:{args.port}", file=sys.stderr)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmarks/tiny_models.py
+# Ölçümler için CPU'da çalışan küçük, rastgele ağırlıklı yedek (stand-in) modeller.
+#
+# Gerçek Gemma/Whisper/Bark modelleri GPU ve büyük indirmeler gerektirir.
+# Sunucu katmanlarını (toplama, akış, kayıt defteri) ölçmek için aynı
+# arayüze sahip birkaç katmanlık modeller yeterlidir.
+import torch
+
+
+class ByteChatTokenizer:
+    """UTF-8 baytlarını token olarak kullanan tokenizer (256 bayt + 3 özel token)."""
+
+    bos_token_id = 256
+    eos_token_id = 257
+    pad_token_id = 258
+    vocab_size = 259
+
+    def __init__(self):
+        self.padding_side = "right"
+
+    def encode(self, text: str) -> list:
+        return [self.bos_token_id] + list(text.encode("utf-8"))
+
+    def decode(self, ids, skip_special_tokens: bool = True) -> str:
+        return bytes(int(i) for i in ids if int(i) < 256).decode("utf-8", errors="replace")
+
+
+class TinyChatProcessor:
+    """Gemma işlemcisinin (AutoProcessor) sohbet şablonu arayüzünü taklit eder."""
+
+    def __init__(self):
+        self.tokenizer = ByteChatTokenizer()
+
+    def _render(self, messages: list) -> str:
+        parts = []
+        for message in messages:
+            text = "".join(c["text"] for c in message["content"] if c.get("type") == "text")
+            parts.append(f"<{message['role']}>{text}")
+        return "".join(parts) + "<model>"
+
+    def apply_chat_template(self, conversations, add_generation_prompt=True, tokenize=True,
+                            return_dict=True, return_tensors="pt", padding=False):
+        from transformers import BatchEncoding
+
+        batched = bool(conversations) and isinstance(conversations[0], list)
+        rows = [self.tokenizer.encode(self._render(c)) for c in (conversations if batched else [conversations])]
+        width = max(len(r) for r in rows)
+        pad = self.tokenizer.pad_token_id
+        input_ids, attention_mask = [], []
+        for row in rows:
+            fill = [pad] * (width - len(row))
+            ones, zeros = [1] * len(row), [0] * len(fill)
+            if self.tokenizer.padding_side == "left":
+                input_ids.append(fill + row)
+                attention_mask.append(zeros + ones)
+            else:
+                input_ids.append(row + fill)
+                attention_mask.append(ones + zeros)
+        return BatchEncoding({"input_ids": torch.tensor(input_ids), "attention_mask": torch.tensor(attention_mask)})
+
+    def decode(self, ids, skip_special_tokens: bool = True) -> str:
+        return self.tokenizer.decode(ids, skip_special_tokens)
+
+
+def build_tiny_chat_model(hidden_size: int = 128, layers: int = 2, heads: int = 4, seed: int = 0):
+    """Rastgele başlatılmış küçük bir Llama modeli ve TinyChatProcessor döndürür."""
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(seed)
+    processor = TinyChatProcessor()
+    config = LlamaConfig(
+        vocab_size=processor.tokenizer.vocab_size,
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=layers,
+        num_attention_heads=heads,
+        num_key_value_heads=heads,
+        max_position_embeddings=2048,
+        bos_token_id=processor.tokenizer.bos_token_id,
+        # EOS yok: rastgele model erken durmasın, her istek kendi sınırına kadar üretsin.
+        eos_token_id=None,
+        pad_token_id=processor.tokenizer.pad_token_id,
+    )
+    model = LlamaForCausalLM(config).eval()
+    return model, processor
+
+
+def build_tiny_whisper_pipeline(work_dir: str, d_model: int = 64, layers: int = 2, seed: int = 0):
+    """
+    Küçük bir Whisper yapılandırmasıyla rastgele ağırlıklı bir ASR pipeline'ı
+    kurar. Tokenizer, 'work_dir' altına yazılan bayt düzeyinde bir sözlükten
+    oluşturulur (indirme gerekmez).
+    """
+    import json
+    import os
+
+    from transformers import (
+        WhisperConfig, WhisperFeatureExtractor, WhisperForConditionalGeneration, WhisperTokenizer, pipeline,
+    )
+    from transformers.convert_slow_tokenizer import bytes_to_unicode
+
+    os.makedirs(work_dir, exist_ok=True)
+    vocab_path, merges_path = os.path.join(work_dir, "vocab.json"), os.path.join(work_dir, "merges.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        json.dump({ch: i for i, ch in enumerate(bytes_to_unicode().values())}, f)
+    with open(merges_path, "w", encoding="utf-8") as f:
+        f.write("#version: 0.2\n")
+    tokenizer = WhisperTokenizer(vocab_path, merges_path)
+    tokenizer.add_special_tokens({"additional_special_tokens": [
+        "<|startoftranscript|>", "<|tr|>", "<|translate|>", "<|transcribe|>",
+        "<|startoflm|>", "<|startofprev|>", "<|nocaptions|>", "<|notimestamps|>",
+    ]})
+    tokenizer.pad_token = tokenizer.eos_token
+
+    torch.manual_seed(seed)
+    config = WhisperConfig(
+        vocab_size=len(tokenizer),
+        d_model=d_model,
+        encoder_layers=layers,
+        decoder_layers=layers,
+        encoder_attention_heads=4,
+        decoder_attention_heads=4,
+        encoder_ffn_dim=d_model * 2,
+        decoder_ffn_dim=d_model * 2,
+        num_mel_bins=80,
+        decoder_start_token_id=tokenizer.convert_tokens_to_ids("<|startoftranscript|>"),
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.eos_token_id,
+        bos_token_id=tokenizer.eos_token_id,
+    )
+    model = WhisperForConditionalGeneration(config).eval()
+    model.generation_config.forced_decoder_ids = None
+    return pipeline(
+        "automatic-speech-recognition", model=model, tokenizer=tokenizer,
+        feature_extractor=WhisperFeatureExtractor(), device="cpu",
+    )
+
+
+class TinyBarkProcessor:
+    """BarkProcessor'ın arayüzünü taklit eder: metni bayt kimliklerine çevirip 256'ya dolgular."""
+
+    max_length = 256
+
+    def __call__(self, text, voice_preset=None, return_tensors="pt"):
+        from transformers import BatchEncoding
+
+        texts = [text] if isinstance(text, str) else list(text)
+        input_ids = torch.zeros((len(texts), self.max_length), dtype=torch.long)
+        attention_mask = torch.zeros_like(input_ids)
+        for row, item in enumerate(texts):
+            ids = list(item.encode("utf-8"))[:self.max_length]
+            input_ids[row, :len(ids)] = torch.tensor(ids)
+            attention_mask[row, :len(ids)] = 1
+        # Ses ön ayarı (voice_preset) yedek modelde kullanılmaz.
+        return BatchEncoding({"input_ids": input_ids, "attention_mask": attention_mask})
+
+
+def build_tiny_bark(hidden_size: int = 32, layers: int = 2, semantic_tokens: int = 64, seed: int = 0):
+    """
+    Küçük, rastgele ağırlıklı bir BarkModel ve TinyBarkProcessor döndürür.
+    Rastgele model EOS üretmediği için her parça 'semantic_tokens' anlamsal
+    token (yaklaşık semantic_tokens / 50 saniye ses) üretir.
+    """
+    from transformers import BarkConfig, BarkModel, EncodecConfig
+    from transformers.models.bark.configuration_bark import BarkCoarseConfig, BarkFineConfig, BarkSemanticConfig
+    from transformers.models.bark.generation_configuration_bark import (
+        BarkCoarseGenerationConfig, BarkFineGenerationConfig, BarkGenerationConfig, BarkSemanticGenerationConfig,
+    )
+
+    class _SubConfig(dict):
+        # BarkGenerationConfig alt ayarları hem sözlük hem to_dict() ile okuyor.
+        def to_dict(self):
+            return dict(self)
+
+    torch.manual_seed(seed)
+    common = {"hidden_size": hidden_size, "num_layers": layers, "num_heads": 2, "block_size": 1024}
+    config = BarkConfig(
+        semantic_config=BarkSemanticConfig(input_vocab_size=129600, output_vocab_size=10048, **common).to_dict(),
+        coarse_acoustics_config=BarkCoarseConfig(input_vocab_size=12096, output_vocab_size=12096, **common).to_dict(),
+        fine_acoustics_config=BarkFineConfig(input_vocab_size=1056, output_vocab_size=1056, n_codes_total=8,
+                                             n_codes_given=1, **common).to_dict(),
+        codec_config=EncodecConfig(target_bandwidths=[6.0], sampling_rate=24000, num_filters=4, codebook_size=1024,
+                                   upsampling_ratios=[8, 5, 4, 2], hidden_size=16, codebook_dim=16,
+                                   num_lstm_layers=1).to_dict(),
+    )
+    model = BarkModel(config).eval()
+    generation_config = BarkGenerationConfig()
+    generation_config.semantic_config = _SubConfig(BarkSemanticGenerationConfig(max_new_tokens=semantic_tokens).to_dict())
+    generation_config.coarse_acoustics_config = _SubConfig(BarkCoarseGenerationConfig().to_dict())
+    generation_config.fine_acoustics_config = _SubConfig(BarkFineGenerationConfig().to_dict())
+    model.generation_config = generation_config
+    return model, TinyBarkProcessor()
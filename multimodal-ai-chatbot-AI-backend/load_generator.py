@@ -0,0 +1,813 @@
+# load_generator.py
+# Model sunucuları için eşzamanlı yük üreteci ve çalıştırmalar arası karşılaştırma.
+#
+# PardusRun.ipynb uç noktaları tek tek, 'requests.post(..., timeout=300)' ile
+# deniyordu; DeepSeekWeb'in SSE '/generate' uç noktasının ise hiç istemcisi
+# yoktu. Eşzamanlı yük altında verim ve gecikme ölçülmediği için bir
+# değişikliğin sunucuyu yavaşlatıp yavaşlatmadığı da görülemiyordu.
+#
+# Bu modül asyncio ile (ek bağımlılık olmadan, HTTP/1.1 üzerinden) yük üretir:
+#   - closed loop: 'concurrency' kullanıcı, her biri cevabı bekleyip (ve
+#     isteğe bağlı düşünme süresinden sonra) yeni istek gönderir.
+#   - open loop:   İstekler, cevaplardan bağımsız olarak saniyede ortalama
+#     'rate' istekle (Poisson gelişleri) gönderilir. Gecikme, isteğin
+#     planlanan gönderilme anından ölçülür; yavaşlayan sunucu gelişleri
+#     geciktirip gecikmeyi olduğundan iyi göstermez.
+#   - Karışık iş yükü: Her istek, uç noktaların ağırlıklarına göre seçilir
+#     (örn. "gemma-text=4,deepseek=4,whisper=1").
+#   - Akışlı cevaplarda ilk token süresi (TTFT) ve tokenler arası gecikme
+#     (ITL) ölçülür: SSE'de her 'data' olayı, NDJSON'da her satır, WAV'da
+#     başlıktan sonraki her ses parçası bir olaydır. SSE 'error' olayı veya
+#     'done' olmadan kapanan akış hata sayılır. Sunucu tokenleri çerçevelerde
+#     birleştirdiği için (sse_stream.py) ITL çerçeveler arası süredir.
+#   - Sonuçlar (uç nokta başına ve toplam: istek/hata sayısı, durum kodları,
+#     verim, gecikme/TTFB/TTFT/ITL yüzdelikleri) JSON dosyasına yazılır.
+#   - 'compare', iki sonuç dosyasını karşılaştırır; eşiği aşan kötüleşmeleri
+#     gerileme olarak işaretler ve 1 koduyla çıkar (CI'da kullanılabilir).
+#     open loop'ta gönderilemeyen isteklerin oranı (dropped / issued) da hata
+#     oranı gibi mutlak artışla karşılaştırılır.
+#
+# Kullanım (multimodal-ai-chatbot-AI-backend klasöründen):
+#     python3 load_generator.py run --mode closed --concurrency 8 --duration 30 \
+#         --mix gemma-text=4,whisper=1,bark=1,deepseek=4 --output run.json
+#     python3 load_generator.py compare baseline.json run.json --threshold 0.1
+# Sunucuları küçük yedek modellerle başlatıp senaryoları çalıştırmak için
+# bkz. benchmarks/bench_load.py.
+import argparse
+import asyncio
+import codecs
+import io
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+import urllib.parse
+import uuid
+import wave
+
+DEFAULT_SERVER = "http://127.0.0.1:5000"
+DEFAULT_DEEPSEEK_SERVER = "http://127.0.0.1:5001"
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_MIX = "gemma-text=4,gemma-image=1,whisper=1,bark=1,deepseek=4"
+
+# Karşılaştırma eşikleri: bağıl değişim, saniye metriklerinde en küçük mutlak
+# fark (çok kısa sürelerdeki gürültü gerileme sayılmaz) ve hata oranı artışı.
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MIN_DELTA = 0.02
+DEFAULT_ERROR_RATE_DELTA = 0.01
+# Mutlak farkla karşılaştırılan oranlar.
+ABSOLUTE_METRICS = ("error_rate", "dropped_rate")
+
+# Akış türleri
+SSE = "sse"
+NDJSON = "ndjson"
+WAV = "wav"
+
+# Karşılaştırılan metrikler: (metrik, yüzdelik, büyük değer daha mı iyi)
+COMPARED_METRICS = (
+    ("throughput_rps", None, True),
+    ("latency_s", "p50", False),
+    ("latency_s", "p90", False),
+    ("latency_s", "p99", False),
+    ("ttft_s", "p50", False),
+    ("ttft_s", "p90", False),
+    ("itl_s", "p50", False),
+    ("itl_s", "p90", False),
+)
+
+PROMPTS = (
+    "Pardus'ta bir servisin durumunu nasıl kontrol ederim?",
+    "Linux'ta disk kullanımını gösteren komut nedir?",
+    "Bana kısa bir hikaye anlat.",
+    "Python'da bir listeyi nasıl sıralarım?",
+)
+
+READ_SIZE = 64 * 1024
+
+
+class Endpoint:
+    """
+    Yük testinde kullanılan bir istek türü. Gövde (JSON ya da multipart form)
+    bir kez kodlanır; 'prompts' verilirse her istekte biri seçilip 'prompt_field'
+    alanına (GET isteklerinde sorguya) yazılır.
+    """
+
+    __slots__ = ("name", "method", "url", "weight", "stream", "host", "port", "_variants")
+
+    def __init__(self, name: str, method: str, url: str, weight: float = 1.0, json_body: dict = None,
+                 form: dict = None, files: dict = None, stream: str = None, prompts=None, prompt_field: str = "prompt"):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"Sadece http adresleri destekleniyor: {url}")
+        self.name = name
+        self.method = method.upper()
+        self.url = url
+        self.weight = float(weight)
+        self.stream = stream
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self._variants = []
+        for prompt in (prompts or [None]):
+            query = urllib.parse.parse_qsl(parts.query)
+            body_json, body_form = dict(json_body or {}), dict(form or {})
+            if prompt is not None:
+                if self.method == "GET":
+                    query.append((prompt_field, prompt))
+                elif files:
+                    body_form[prompt_field] = prompt
+                else:
+                    body_json[prompt_field] = prompt
+            path = (parts.path or "/") + ("?" + urllib.parse.urlencode(query) if query else "")
+            headers, body = {}, b""
+            if files:
+                headers["Content-Type"], body = encode_multipart(body_form, files)
+            elif body_json or self.method == "POST":
+                headers["Content-Type"], body = "application/json", json.dumps(body_json).encode("utf-8")
+            self._variants.append(self._encode_request(path, headers, body))
+
+    def _encode_request(self, path: str, headers: dict, body: bytes) -> bytes:
+        lines = [f"{self.method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: close",
+                 "Accept: */*", f"Content-Length: {len(body)}"]
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + body
+
+    def request_bytes(self, rng: random.Random) -> bytes:
+        return self._variants[0] if len(self._variants) == 1 else rng.choice(self._variants)
+
+
+def encode_multipart(form: dict, files: dict) -> tuple[str, bytes]:
+    """multipart/form-data gövdesi. 'files': alan -> (dosya adı, bayt, içerik türü)."""
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for key, value in form.items():
+        out.write(f"--{boundary}\r\nContent-Disposition: form-data; name=\"{key}\"\r\n\r\n".encode("utf-8"))
+        out.write(str(value).encode("utf-8") + b"\r\n")
+    for key, (filename, data, content_type) in files.items():
+        out.write(f"--{boundary}\r\nContent-Disposition: form-data; name=\"{key}\"; filename=\"{filename}\"\r\n"
+                  f"Content-Type: {content_type}\r\n\r\n".encode("utf-8"))
+        out.write(data + b"\r\n")
+    out.write(f"--{boundary}--\r\n".encode("utf-8"))
+    return f"multipart/form-data; boundary={boundary}", out.getvalue()
+
+
+def synthetic_wav(seconds: float, rate: int = 16000, seed: int = 0) -> bytes:
+    """Sessizlikle ayrılmış ton patlamalarından oluşan 16 bit mono WAV (ffmpeg gerekmez)."""
+    rng = random.Random(seed)
+    total = int(seconds * rate)
+    samples = bytearray()
+    while len(samples) // 2 < total:
+        burst = int(rng.uniform(0.3, 1.2) * rate)
+        freq = rng.uniform(120, 300)
+        samples += b"".join(struct.pack("<h", int(9000 * math.sin(2 * math.pi * freq * i / rate)))
+                            for i in range(burst))
+        samples += bytes(2 * int(rng.uniform(0.1, 0.5) * rate))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(bytes(samples[:total * 2]))
+    return buffer.getvalue()
+
+
+def default_endpoints(server: str = DEFAULT_SERVER, deepseek_server: str = DEFAULT_DEEPSEEK_SERVER,
+                      max_new_tokens: int = 32, image: str = None, audio: str = None,
+                      audio_seconds: float = 5.0, speech_text: str = None) -> dict:
+    """
+    Pardus.ipynb API'sinin dört uç noktası ve DeepSeekWeb '/generate' için
+    hazır istek türleri (ağırlıklar 'parse_mix' ile verilir).
+    """
+    server, deepseek_server = server.rstrip("/"), deepseek_server.rstrip("/")
+    image = image or os.path.join(os.path.dirname(os.path.abspath(__file__)), "kedi.jpg")
+    with open(image, "rb") as f:
+        image_file = (os.path.basename(image), f.read(), "image/jpeg")
+    if audio:
+        with open(audio, "rb") as f:
+            audio_file = (os.path.basename(audio), f.read(), "application/octet-stream")
+    else:
+        audio_file = ("speech.wav", synthetic_wav(audio_seconds), "audio/wav")
+    speech_text = speech_text or "Merhaba, Pardus'a hoş geldiniz. Bugün size nasıl yardımcı olabilirim?"
+    endpoints = [
+        Endpoint("gemma-text", "POST", server + "/gemma/generate-text", json_body={"max_new_tokens": max_new_tokens},
+                 prompts=PROMPTS),
+        Endpoint("gemma-image", "POST", server + "/gemma/generate-from-image",
+                 form={"max_new_tokens": max_new_tokens}, files={"image": image_file}, prompts=PROMPTS[:1]),
+        Endpoint("whisper", "POST", server + "/whisper/transcribe", files={"audio": audio_file}),
+        Endpoint("whisper-stream", "POST", server + "/whisper/transcribe?stream=1", files={"audio": audio_file},
+                 stream=NDJSON),
+        Endpoint("bark", "POST", server + "/bark/generate-speech", json_body={"text": speech_text}, stream=WAV),
+        Endpoint("deepseek", "GET", f"{deepseek_server}/generate?max_new_tokens={max_new_tokens}", stream=SSE,
+                 prompts=PROMPTS),
+    ]
+    return {endpoint.name: endpoint for endpoint in endpoints}
+
+
+def parse_mix(mix: str, endpoints: dict) -> list:
+    """"ad=ağırlık,..." biçimindeki karışımı seçilen Endpoint listesine çevirir."""
+    selected = []
+    for item in mix.split(","):
+        name, _, weight = item.strip().partition("=")
+        if not name:
+            continue
+        if name not in endpoints:
+            raise ValueError(f"Bilinmeyen uç nokta '{name}'. Seçenekler: {', '.join(endpoints)}")
+        endpoint = endpoints[name]
+        endpoint.weight = float(weight) if weight else 1.0
+        if endpoint.weight > 0:
+            selected.append(endpoint)
+    if not selected:
+        raise ValueError("İş yükünde en az bir uç nokta olmalı.")
+    return selected
+
+
+# --- Akış ayrıştırıcıları ---
+# feed() gelen baytlardaki yeni token olaylarının sayısını döndürür; finish()
+# akış bittikten sonra varsa hatayı döndürür.
+
+class _SSEParser:
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.buffer = ""
+        self.error = None
+        self.done = False
+
+    def feed(self, data: bytes) -> int:
+        self.buffer = (self.buffer + self.decoder.decode(data)).replace("\r\n", "\n")
+        count = 0
+        while "\n\n" in self.buffer:
+            block, self.buffer = self.buffer.split("\n\n", 1)
+            event, lines = "message", None
+            for line in block.split("\n"):
+                if line.startswith(":"):
+                    continue  # Yorum (keep-alive)
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "event":
+                    event = value
+                elif field == "data":
+                    lines = (lines or []) + [value]
+            if lines is None:
+                continue
+            if event == "error":
+                self.error = "SSE hata olayı: " + "\n".join(lines)
+            elif event == "done":
+                self.done = True
+            elif event == "message":
+                count += 1
+        return count
+
+    def finish(self):
+        if self.error is None and not self.done:
+            return "SSE akışı 'done' olayı olmadan kapandı"
+        return self.error
+
+
+class _NDJSONParser:
+    def __init__(self):
+        self.buffer = b""
+        self.error = None
+
+    def feed(self, data: bytes) -> int:
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        count = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            count += 1
+            try:
+                item = json.loads(line)
+            except ValueError:
+                self.error = "Geçersiz NDJSON satırı"
+                continue
+            if isinstance(item, dict) and "error" in item:
+                self.error = str(item["error"])
+        return count
+
+    def finish(self):
+        return self.error
+
+
+class _WAVParser:
+    HEADER = 44
+
+    def __init__(self):
+        self.header_left = self.HEADER
+        self.audio_bytes = 0
+
+    def feed(self, data: bytes) -> int:
+        audio = max(0, len(data) - self.header_left)
+        self.header_left = max(0, self.header_left - len(data))
+        self.audio_bytes += audio
+        return 1 if audio else 0
+
+    def finish(self):
+        return None if self.audio_bytes else "Ses verisi gelmedi"
+
+
+PARSERS = {SSE: _SSEParser, NDJSON: _NDJSONParser, WAV: _WAVParser}
+
+
+# --- İstek ---
+
+class Sample:
+    """Tek bir isteğin ölçümü. Süreler saniye; 'start' çalıştırmanın başına göredir."""
+
+    __slots__ = ("endpoint", "start", "status", "latency", "ttfb", "ttft", "itl", "events", "bytes", "error")
+
+    def __init__(self, endpoint: str, start: float):
+        self.endpoint = endpoint
+        self.start = start
+        self.status = None
+        self.latency = None
+        self.ttfb = None
+        self.ttft = None
+        self.itl = []
+        self.events = 0
+        self.bytes = 0
+        self.error = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _read_head(reader) -> tuple[int, dict]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Sunucu cevap vermeden bağlantıyı kapattı")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return status, headers
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+
+async def _iter_body(reader, headers: dict):
+    """Cevap gövdesini geldiği parçalar halinde verir (chunked, Content-Length ya da kapanışa kadar)."""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        left = int(headers["content-length"])
+        while left > 0:
+            data = await reader.read(min(left, READ_SIZE))
+            if not data:
+                raise ConnectionError("Gövde tamamlanmadan bağlantı kapandı")
+            left -= len(data)
+            yield data
+    else:
+        while data := await reader.read(READ_SIZE):
+            yield data
+
+
+async def _exchange(endpoint: Endpoint, payload: bytes, sample: Sample, started: float):
+    reader, writer = await asyncio.open_connection(endpoint.host, endpoint.port)
+    try:
+        writer.write(payload)
+        await writer.drain()
+        sample.status, headers = await _read_head(reader)
+        parser = PARSERS[endpoint.stream]() if endpoint.stream and sample.status < 400 else None
+        last_event = None
+        async for data in _iter_body(reader, headers):
+            now = time.perf_counter()
+            if sample.ttfb is None:
+                sample.ttfb = now - started
+            sample.bytes += len(data)
+            if parser is None:
+                continue
+            events = parser.feed(data)
+            if events:
+                if sample.ttft is None:
+                    sample.ttft = now - started
+                else:
+                    sample.itl.append(now - last_event)
+                # Aynı okumada gelen olaylar aynı anda ulaşmış sayılır.
+                sample.itl.extend([0.0] * (events - 1))
+                sample.events += events
+                last_event = now
+        if sample.status >= 400:
+            sample.error = f"HTTP {sample.status}"
+        elif parser is not None:
+            sample.error = parser.finish()
+    finally:
+        writer.close()
+
+
+async def send_request(endpoint: Endpoint, rng: random.Random, origin: float, timeout: float = DEFAULT_TIMEOUT,
+                       scheduled: float = None) -> Sample:
+    """
+    Bir isteği gönderir ve ölçer. 'scheduled' verilirse (open loop) süreler
+    isteğin planlanan gönderilme anından başlar.
+    """
+    started = scheduled if scheduled is not None else time.perf_counter()
+    sample = Sample(endpoint.name, started - origin)
+    try:
+        await asyncio.wait_for(_exchange(endpoint, endpoint.request_bytes(rng), sample, started), timeout)
+    except asyncio.TimeoutError:
+        sample.error = f"Zaman aşımı ({timeout:g} s)"
+    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+        sample.error = f"{type(e).__name__}: {e}"
+    sample.latency = time.perf_counter() - started
+    return sample
+
+
+# --- Yük modları ---
+
+class _Progress:
+    """Çalışma sırasında belirli aralıklarla stderr'e durum yazar."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.done = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    def add(self, sample: Sample):
+        self.done += 1
+        self.errors += not sample.ok
+
+    async def report(self, origin: float):
+        while self.interval > 0:
+            await asyncio.sleep(self.interval)
+            print(f"  {time.perf_counter() - origin:6.1f} s: {self.done} istek, {self.errors} hata, "
+                  f"{self.in_flight} sürüyor", file=sys.stderr)
+
+
+async def _closed_loop(endpoints, weights, rng, origin, deadline, requests, concurrency, think_time, timeout,
+                       progress) -> tuple[list, int, int]:
+    samples = []
+    issued = 0
+
+    async def user():
+        nonlocal issued
+        while time.perf_counter() < deadline and (requests is None or issued < requests):
+            issued += 1
+            endpoint = rng.choices(endpoints, weights)[0]
+            progress.in_flight += 1
+            sample = await send_request(endpoint, rng, origin, timeout)
+            progress.in_flight -= 1
+            progress.add(sample)
+            samples.append(sample)
+            if think_time:
+                await asyncio.sleep(rng.expovariate(1 / think_time))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return samples, 0, issued
+
+
+async def _open_loop(endpoints, weights, rng, origin, deadline, requests, rate, max_in_flight, timeout,
+                     progress) -> tuple[list, int, int]:
+    samples, tasks = [], set()
+    dropped, issued = 0, 0
+    arrival = origin
+
+    async def run(endpoint, scheduled):
+        progress.in_flight += 1
+        sample = await send_request(endpoint, rng, origin, timeout, scheduled)
+        progress.in_flight -= 1
+        progress.add(sample)
+        samples.append(sample)
+
+    while requests is None or issued < requests:
+        arrival += rng.expovariate(rate)
+        if arrival >= deadline:
+            break
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        issued += 1
+        if max_in_flight and progress.in_flight >= max_in_flight:
+            # Sınır doluysa istek gönderilmez; sunucunun yetişemediği gelişler sayılır.
+            dropped += 1
+            continue
+        task = asyncio.ensure_future(run(rng.choices(endpoints, weights)[0], arrival))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return samples, dropped, issued
+
+
+async def _run(endpoints, mode, concurrency, rate, duration, requests, think_time, max_in_flight, timeout,
+               warmup, seed, progress_interval) -> dict:
+    rng = random.Random(seed)
+    result = {"warmup": {}}
+    # Isınma: modeller ilk istekte yüklendiği için her uç nokta bir kez,
+    # ölçümlerin dışında çağrılır.
+    for endpoint in endpoints if warmup else ():
+        sample = await send_request(endpoint, rng, time.perf_counter(), timeout)
+        result["warmup"][endpoint.name] = {"seconds": round(sample.latency, 3), "error": sample.error}
+        print(f"  ısınma {endpoint.name}: {sample.latency:.2f} s" + (f" ({sample.error})" if sample.error else ""),
+              file=sys.stderr)
+
+    progress = _Progress(progress_interval)
+    weights = [endpoint.weight for endpoint in endpoints]
+    origin = time.perf_counter()
+    deadline = origin + duration if duration else math.inf
+    reporter = asyncio.ensure_future(progress.report(origin))
+    try:
+        if mode == "closed":
+            samples, dropped, issued = await _closed_loop(endpoints, weights, rng, origin, deadline, requests, concurrency,
+                                                          think_time, timeout, progress)
+        else:
+            samples, dropped, issued = await _open_loop(endpoints, weights, rng, origin, deadline, requests, rate,
+                                                        max_in_flight, timeout, progress)
+    finally:
+        reporter.cancel()
+    result["elapsed_s"] = round(time.perf_counter() - origin, 3)
+    result["issued"] = issued
+    result["dropped"] = dropped
+    result["dropped_rate"] = round(dropped / issued, 4) if issued else 0.0
+    result["samples"] = samples
+    return result
+
+
+def run_load(endpoints: list, mode: str = "closed", concurrency: int = 8, rate: float = 4.0, duration: float = 30.0,
+             requests: int = None, think_time: float = 0.0, max_in_flight: int = 256, timeout: float = DEFAULT_TIMEOUT,
+             warmup: bool = True, seed: int = 0, progress_interval: float = 5.0) -> dict:
+    """
+    Yükü üretir ve JSON'a yazılabilecek sonucu döndürür.
+
+    Args:
+        endpoints (list): Ağırlıklarıyla birlikte Endpoint listesi.
+        mode (str): "closed" (sabit kullanıcı sayısı) ya da "open" (sabit geliş hızı).
+        concurrency (int): closed loop'ta eşzamanlı kullanıcı sayısı.
+        rate (float): open loop'ta saniyedeki ortalama istek sayısı.
+        duration (float): Yeni istek gönderme süresi (s); 0 ise sadece 'requests' sınırı.
+        requests (int): Gönderilecek en fazla istek sayısı.
+        think_time (float): closed loop'ta istekler arası ortalama bekleme (s).
+        max_in_flight (int): open loop'ta aynı anda süren en fazla istek (0: sınırsız).
+        timeout (float): İstek başına zaman aşımı (s).
+        warmup (bool): Ölçümden önce her uç noktayı bir kez çağır.
+        seed (int): Uç nokta ve istem seçimi ile gelişlerin tohumu.
+        progress_interval (float): stderr'e durum yazma aralığı (s; 0: kapalı).
+    """
+    if mode not in ("closed", "open"):
+        raise ValueError(f"Bilinmeyen mod: {mode}")
+    if not duration and not requests:
+        raise ValueError("'duration' ya da 'requests' verilmeli.")
+    run = asyncio.run(_run(endpoints, mode, concurrency, rate, duration, requests, think_time, max_in_flight, timeout,
+                           warmup, seed, progress_interval))
+    samples = run.pop("samples")
+    elapsed = run["elapsed_s"]
+    return {
+        "benchmark": "load",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "mode": mode,
+            "concurrency": concurrency if mode == "closed" else None,
+            "rate": rate if mode == "open" else None,
+            "duration_s": duration,
+            "requests": requests,
+            "think_time_s": think_time,
+            "timeout_s": timeout,
+            "seed": seed,
+            "mix": {endpoint.name: endpoint.weight for endpoint in endpoints},
+            "urls": {endpoint.name: endpoint.url for endpoint in endpoints},
+        },
+        **run,
+        "overall": summarize(samples, elapsed),
+        "endpoints": {endpoint.name: summarize([s for s in samples if s.endpoint == endpoint.name], elapsed)
+                      for endpoint in endpoints},
+    }
+
+
+# --- Özet ---
+
+def percentiles(values: list) -> dict:
+    """p50/p90/p99 (doğrusal aradeğerleme), ortalama ve en büyük değer; değer yoksa None."""
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def at(q):
+        k = (len(ordered) - 1) * q
+        low = int(k)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+    result = {f"p{round(q * 100)}": round(at(q), 4) for q in (0.5, 0.9, 0.99)}
+    result["mean"] = round(sum(ordered) / len(ordered), 4)
+    result["max"] = round(ordered[-1], 4)
+    return result
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """İstek ölçümlerinin özeti. Süre yüzdelikleri başarılı isteklerden hesaplanır."""
+    ok = [s for s in samples if s.ok]
+    codes = {}
+    for sample in samples:
+        key = str(sample.status) if sample.status is not None else "none"
+        codes[key] = codes.get(key, 0) + 1
+    errors = []
+    for sample in samples:
+        if not sample.ok and sample.error not in errors and len(errors) < 5:
+            errors.append(sample.error)
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "status_codes": codes,
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "latency_s": percentiles([s.latency for s in ok]),
+        "ttfb_s": percentiles([s.ttfb for s in ok if s.ttfb is not None]),
+        "ttft_s": percentiles([s.ttft for s in ok if s.ttft is not None]),
+        "itl_s": percentiles([gap for s in ok for gap in s.itl]),
+        "events_per_request": round(sum(s.events for s in ok) / len(ok), 2) if ok else 0.0,
+        "bytes": sum(s.bytes for s in samples),
+        "error_samples": errors,
+    }
+
+
+# --- Karşılaştırma ---
+
+def _metric(summary: dict, name: str, key: str):
+    value = summary.get(name)
+    if key is not None:
+        value = value.get(key) if value else None
+    return value
+
+
+def _dropped_rate(run: dict) -> float:
+    # 'issued' alanı olmayan eski dosyalarda gönderilen istekler + düşenler.
+    issued = run.get("issued", run["overall"]["requests"] + run.get("dropped", 0))
+    return round(run.get("dropped", 0) / issued, 4) if issued else 0.0
+
+
+def _absolute_row(scope: str, metric: str, before: float, after: float, max_delta: float) -> dict:
+    # Oranlar mutlak artışla değerlendirilir (0'dan bağıl değişim anlamsız).
+    delta = after - before
+    return {"scope": scope, "metric": metric, "baseline": before, "current": after, "change": round(delta, 4),
+            "verdict": "regression" if delta > max_delta else "improvement" if delta < -max_delta else "ok"}
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+                    min_delta: float = DEFAULT_MIN_DELTA, error_rate_delta: float = DEFAULT_ERROR_RATE_DELTA,
+                    scope_prefix: str = "") -> list:
+    """
+    İki 'run_load' sonucunu toplamda ve uç nokta başına karşılaştırır. Her
+    satırın 'verdict' değeri "regression", "improvement", "ok" ya da
+    "missing" (uç nokta yeni çalıştırmada yok) olur.
+    """
+    rows = [_absolute_row(scope_prefix + "overall", "dropped_rate", _dropped_rate(baseline), _dropped_rate(current),
+                          error_rate_delta)]
+    scopes = [("overall", baseline["overall"], current["overall"])]
+    for name, summary in baseline["endpoints"].items():
+        scopes.append((name, summary, current["endpoints"].get(name)))
+    for scope, old, new in scopes:
+        scope = scope_prefix + scope
+        if new is None:
+            rows.append({"scope": scope, "metric": "requests", "baseline": old["requests"], "current": None,
+                         "change": None, "verdict": "missing"})
+            continue
+        rows.append(_absolute_row(scope, "error_rate", old["error_rate"], new["error_rate"], error_rate_delta))
+        for name, key, higher_is_better in COMPARED_METRICS:
+            before, after = _metric(old, name, key), _metric(new, name, key)
+            if before is None or after is None or before == 0:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            # Saniye metriklerinde çok küçük mutlak farklar gürültü sayılır.
+            noise = not higher_is_better and abs(after - before) < min_delta
+            verdict = "ok" if noise else "regression" if worse > threshold else "improvement" if worse < -threshold else "ok"
+            rows.append({"scope": scope, "metric": name + (f".{key}" if key else ""), "baseline": before,
+                         "current": after, "change": round(change, 4), "verdict": verdict})
+    return rows
+
+
+def compare_files(baseline: dict, current: dict, **options) -> dict:
+    """
+    İki sonuç dosyasını karşılaştırır. Birden fazla senaryo içeren dosyalarda
+    ('scenarios', bkz. benchmarks/bench_load.py) ortak senaryolar ayrı ayrı
+    karşılaştırılır.
+    """
+    if "scenarios" in baseline:
+        pairs = [(name + "/", run, current.get("scenarios", {}).get(name))
+                 for name, run in baseline["scenarios"].items()]
+    else:
+        pairs = [("", baseline, current)]
+    rows, mismatched = [], []
+    for prefix, old, new in pairs:
+        if new is None:
+            rows.append({"scope": prefix.rstrip("/"), "metric": "scenario", "baseline": None, "current": None,
+                         "change": None, "verdict": "missing"})
+            continue
+        for key in ("mode", "concurrency", "rate", "mix", "duration_s", "requests"):
+            if old["config"].get(key) != new["config"].get(key):
+                mismatched.append(prefix + key)
+        rows.extend(compare_results(old, new, scope_prefix=prefix, **options))
+    regressions = [row for row in rows if row["verdict"] in ("regression", "missing")]
+    return {
+        "ok": not regressions,
+        "regressions": regressions,
+        "improvements": [row for row in rows if row["verdict"] == "improvement"],
+        # Farklı ayarlarla alınmış çalıştırmaların karşılaştırması yanıltıcı olabilir.
+        "config_mismatch": mismatched,
+        "rows": rows,
+    }
+
+
+def format_comparison(report: dict) -> str:
+    """Gerileme ve iyileşmelerin okunabilir tablosu."""
+    lines = []
+    for title, rows in (("GERİLEME", report["regressions"]), ("İYİLEŞME", report["improvements"])):
+        for row in rows:
+            change = "" if row["change"] is None else f"{row['change']:+.4f}" if row["metric"] in ABSOLUTE_METRICS \
+                else f"{row['change']:+.1%}"
+            lines.append(f"{title:<9} {row['scope']:<28} {row['metric']:<16} {row['baseline']!s:>10} -> "
+                         f"{row['current']!s:<10} {change}")
+    if report["config_mismatch"]:
+        lines.append("Uyarı: ayarları farklı çalıştırmalar: " + ", ".join(report["config_mismatch"]))
+    lines.append("Gerileme yok." if report["ok"] else f"{len(report['regressions'])} gerileme bulundu.")
+    return "\n".join(lines)
+
+
+def _write_json(data: dict, output: str = None):
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def _add_compare_options(parser):
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Gerileme sayılan bağıl kötüleşme")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Süre metriklerinde gerileme sayılacak en küçük fark (s)")
+    parser.add_argument("--error-rate-delta", type=float, default=DEFAULT_ERROR_RATE_DELTA,
+                        help="Gerileme sayılan hata oranı ve düşen istek oranı artışı")
+
+
+def _compare_options(args) -> dict:
+    return {"threshold": args.threshold, "min_delta": args.min_delta, "error_rate_delta": args.error_rate_delta}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model sunucuları için yük üreteci ve gerileme karşılaştırması")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Yük üretir ve sonuçları JSON olarak yazar")
+    run.add_argument("--server", default=DEFAULT_SERVER, help="Pardus.ipynb API adresi")
+    run.add_argument("--deepseek-server", default=DEFAULT_DEEPSEEK_SERVER, help="DeepSeekWeb adresi")
+    run.add_argument("--mix", default=DEFAULT_MIX, help="Uç nokta ağırlıkları (örn. gemma-text=4,deepseek=1)")
+    run.add_argument("--mode", choices=["closed", "open"], default="closed")
+    run.add_argument("--concurrency", type=int, default=8, help="closed: eşzamanlı kullanıcı sayısı")
+    run.add_argument("--rate", type=float, default=4.0, help="open: saniyedeki ortalama istek")
+    run.add_argument("--duration", type=float, default=30.0, help="Yük süresi (s; 0: sadece --requests)")
+    run.add_argument("--requests", type=int, help="Gönderilecek en fazla istek")
+    run.add_argument("--think-time", type=float, default=0.0, help="closed: istekler arası ortalama bekleme (s)")
+    run.add_argument("--max-in-flight", type=int, default=256, help="open: aynı anda süren en fazla istek")
+    run.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="İstek başına zaman aşımı (s)")
+    run.add_argument("--max-new-tokens", type=int, default=32, help="Gemma/DeepSeek istek başına token")
+    run.add_argument("--image", help="gemma-image için görsel (varsayılan: kedi.jpg)")
+    run.add_argument("--audio", help="whisper için ses dosyası (varsayılan: sentetik WAV)")
+    run.add_argument("--audio-seconds", type=float, default=5.0, help="Sentetik sesin süresi (s)")
+    run.add_argument("--no-warmup", action="store_true", help="Isınma isteklerini atla")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--progress", type=float, default=5.0, help="Durum yazma aralığı (s; 0: kapalı)")
+    run.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    run.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    _add_compare_options(run)
+    compare = commands.add_parser("compare", help="İki sonuç dosyasını karşılaştırır")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--output", help="Karşılaştırma raporunun yazılacağı dosya")
+    _add_compare_options(compare)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        report = compare_files(baseline, current, **_compare_options(args))
+        print(format_comparison(report), file=sys.stderr)
+        _write_json(report, args.output)
+        sys.exit(0 if report["ok"] else 1)
+
+    endpoints = parse_mix(args.mix, default_endpoints(args.server, args.deepseek_server, args.max_new_tokens,
+                                                      args.image, args.audio, args.audio_seconds))
+    result = run_load(endpoints, args.mode, args.concurrency, args.rate, args.duration, args.requests,
+                      args.think_time, args.max_in_flight, args.timeout, not args.no_warmup, args.seed, args.progress)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["comparison"] = compare_files(json.load(f), result, **_compare_options(args))
+        print(format_comparison(result["comparison"]), file=sys.stderr)
+    _write_json(result, args.output)
+    if args.baseline and not result["comparison"]["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
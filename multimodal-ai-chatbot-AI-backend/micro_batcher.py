@@ -0,0 +1,218 @@
+# micro_batcher.py
+# Gemma metin ve görsel endpoint'leri için dinamik mikro-toplama (micro-batching).
+#
+# Eski düzende her Flask isteği gemma_model.generate'i tek başına çağırıyordu.
+# Eşzamanlı isteklerde çağrılar sıraya giriyor, hızlandırıcı (GPU) istekler
+# arasında çoğunlukla boş bekliyordu. MicroBatcher istekleri kısa bir süre
+# (örn. 10 ms) ya da en fazla N istek birikene kadar toplar, tek bir toplu
+# çağrıda işler ve sonuçları bekleyen isteklere dağıtır.
+#
+#   - MicroBatcher: Genel toplayıcı. Her toplu iş (batch) kendi iş parçacığında
+#     'process_batch(items)' ile işlenir; sonuçlar sırayla isteklere döner.
+#     Toplu iş hata verirse istekler tek tek yeniden işlenir; hatalı bir istek
+#     (bozuk mesaj ya da görsel) sadece kendi isteğini başarısız kılar.
+#   - GemmaBatchGenerator: Sohbet mesajlarını sola dolgulu (left padding) tek bir
+#     girdiye çevirir, tek bir generate çağrısı yapar ve her isteğin kendi
+#     max_new_tokens sınırını uygular (sınırına ulaşan satır erken durur).
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+
+# Bir toplu işte en fazla istek.
+DEFAULT_MAX_BATCH_SIZE = 8
+# İlk istekten sonra diğerleri için beklenecek en uzun süre (milisaniye).
+DEFAULT_MAX_WAIT_MS = 10.0
+
+
+class MicroBatcher:
+    """
+    İstekleri kısa bir zaman penceresinde toplayıp birlikte işleyen kuyruk.
+
+    Args:
+        process_batch: İstek listesini alıp aynı sırada sonuç listesi döndüren fonksiyon.
+        max_batch_size (int): Bir toplu işteki en fazla istek.
+        max_wait_ms (float): İlk istekten sonra toplu işin dolması için beklenecek süre.
+        name (str): İş parçacığı adı (günlüklerde ayırt etmek için).
+    """
+
+    def __init__(self, process_batch, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, name: str = "micro-batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self._pending = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        # İstatistikler
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.split_batches = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, item) -> Future:
+        """İsteği kuyruğa ekler; sonucu taşıyan bir Future döndürür."""
+        future = Future()
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Toplayıcı durduruldu.")
+            self._pending.append((item, future))
+            self._cond.notify()
+        return future
+
+    def __call__(self, item, timeout: float = None):
+        """İsteği gönderir ve sonucunu bekler (Flask handler'ları için)."""
+        return self.submit(item).result(timeout)
+
+    def _collect(self) -> list:
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._stopping)
+            if not self._pending:
+                return []
+            # İlk istek geldi; pencere dolana ya da toplu iş dolana kadar bekle.
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            # Beklerken iptal edilen (örn. zaman aşımı) istekler atlanır.
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._process_one_by_one(batch)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _process_one_by_one(self, batch: list):
+        # Hatanın hangi istekten geldiği bilinmez; her istek kendi sonucunu
+        # ya da kendi hatasını alır.
+        self.split_batches += 1
+        for item, future in batch:
+            try:
+                result = self.process_batch([item])[0]
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_seen_batch,
+            "split_batches": self.split_batches,
+        }
+
+
+class GenerationItem:
+    """Toplu üretime gönderilen tek bir istek."""
+
+    def __init__(self, messages: list, max_new_tokens: int = 512):
+        self.messages = messages
+        self.max_new_tokens = max(1, int(max_new_tokens))
+
+
+class _PerRowTokenLimit:
+    # Her satırı kendi max_new_tokens sınırında durduran StoppingCriteria.
+    # Satır başına bool döndürür; biten satırlar generate tarafından dolgu
+    # tokeniyle devam ettirilir, hepsi bitince çağrı sona erer.
+
+    def __init__(self, prompt_length: int, limits: torch.Tensor):
+        self.prompt_length = prompt_length
+        self.limits = limits
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return (input_ids.shape[1] - self.prompt_length) >= self.limits
+
+
+class GemmaBatchGenerator:
+    """
+    Gemma sohbet isteklerini toplu olarak üreten işlemci. MicroBatcher'a
+    'process_batch' olarak verilir.
+
+    Args:
+        get_model: (model, processor) döndüren fonksiyon ya da bağlam yöneticisi
+            fabrikası. Model kayıt defteriyle kullanılırken
+            'lambda: registry.use("gemma")' verilir.
+        generate_kwargs (dict): generate'e iletilecek ek ayarlar (örn. sıcaklık).
+    """
+
+    def __init__(self, get_model, generate_kwargs: dict = None):
+        self.get_model = get_model
+        self.generate_kwargs = generate_kwargs or {}
+
+    def __call__(self, items: list) -> list:
+        with self.get_model() as (model, processor):
+            return self.generate(model, processor, items)
+
+    def generate(self, model, processor, items: list) -> list:
+        from transformers import StoppingCriteriaList
+
+        tokenizer = getattr(processor, "tokenizer", processor)
+        # Farklı uzunluktaki istemler sola dolgulanır; üretim hepsinde aynı sütunda başlar.
+        padding_side, tokenizer.padding_side = tokenizer.padding_side, "left"
+        try:
+            inputs = processor.apply_chat_template(
+                [item.messages for item in items], add_generation_prompt=True, tokenize=True,
+                return_dict=True, return_tensors="pt", padding=True,
+            ).to(model.device)
+        finally:
+            tokenizer.padding_side = padding_side
+
+        input_len = inputs["input_ids"].shape[-1]
+        limits = torch.tensor([item.max_new_tokens for item in items], device=inputs["input_ids"].device)
+        stopping = StoppingCriteriaList([_PerRowTokenLimit(input_len, limits)])
+        with torch.inference_mode():
+            generation = model.generate(
+                **inputs,
+                max_new_tokens=int(limits.max()),
+                stopping_criteria=stopping,
+                pad_token_id=tokenizer.pad_token_id,
+                **self.generate_kwargs,
+            )
+        # Her satırın sadece kendi sınırı kadar yeni tokeni çözülür.
+        return [
+            processor.decode(generation[row][input_len:input_len + item.max_new_tokens], skip_special_tokens=True)
+            for row, item in enumerate(items)
+        ]
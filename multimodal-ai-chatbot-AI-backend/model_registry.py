@@ -0,0 +1,305 @@
+# model_registry.py
+# Modelleri ilk kullanımda yükleyen, bellek bütçeli model kayıt defteri.
+#
+# Eski düzende Bark, Whisper-large-v3 ve Gemma-3 uygulama açılırken sırayla
+# yükleniyordu: açılış dakikalar sürüyor ve sadece tek bir endpoint kullanılsa
+# bile üç model birden bellekte duruyordu. ModelRegistry ile:
+#   - Her model sadece bir yükleme fonksiyonuyla kaydedilir; ilk istekte yüklenir.
+#   - Aynı modeli aynı anda isteyen istekler tek bir yüklemeyi bekler
+#     (yükleme birleştirme); model iki kez yüklenmez.
+#   - Toplam bellek bir bütçeyle sınırlanabilir. Yeni bir model sığmıyorsa,
+#     o anda kullanılmayan modeller en uzun süredir kullanılmayandan başlanarak
+#     (LRU) bellekten atılır. Kullanımdaki bir model asla atılmaz.
+#   - İsteğe bağlı olarak belirli süre boşta kalan modeller de atılır ve açılışta
+#     bazı modeller arka planda önceden yüklenebilir (warm-up).
+#
+# Kullanım:
+#     registry = ModelRegistry(memory_budget=20 * 1024**3)
+#     registry.register("whisper", load_whisper)
+#     with registry.use("whisper") as whisper_pipe:
+#         whisper_pipe(...)
+import contextlib
+import gc
+import threading
+import time
+
+try:
+    import torch
+except ImportError: # Boyut tahmini ve GPU belleği boşaltma için gerekli değil.
+    torch = None
+
+
+def estimate_size(obj, _seen=None) -> int:
+    """
+    Bir model paketinin (model, işlemci, pipeline veya bunların tuple/dict'i)
+    parametre ve buffer'larının toplam boyutunu bayt olarak tahmin eder.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if torch is not None and isinstance(obj, torch.nn.Module):
+        tensors = list(obj.parameters()) + list(obj.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    if isinstance(obj, dict):
+        return sum(estimate_size(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_size(v, seen) for v in obj)
+    # transformers pipeline'ları modeli '.model' özelliğinde tutar.
+    model = getattr(obj, "model", None)
+    return estimate_size(model, seen) if model is not None else 0
+
+
+class ModelNotRegistered(KeyError):
+    """Kayıtlı olmayan bir model istendi."""
+
+
+class _Slot:
+    """Bir modelin kayıt bilgisi ve yükleme durumu."""
+
+    def __init__(self, name: str, loader, size: int = None, unloader=None):
+        self.name = name
+        self.loader = loader
+        self.declared_size = size
+        self.unloader = unloader
+        self.value = None
+        self.size = 0
+        self.loaded = False
+        self.loading = None   # Yükleme sürerken bekleyenlerin beklediği olay
+        self.error = None     # Son yüklemenin hatası (bekleyenlere iletilir)
+        self.in_use = 0
+        self.last_used = 0.0
+        # İstatistikler
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.hits = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+
+class ModelRegistry:
+    """
+    Modelleri ilk kullanımda yükleyen ve bellek bütçesine göre atan kayıt defteri.
+
+    Args:
+        memory_budget (int): Yüklü modellerin toplam en fazla boyutu (bayt).
+            None ise sınır yoktur.
+        idle_timeout (float): Verilirse bu kadar saniye kullanılmayan modeller
+            arka plandaki temizleyici tarafından atılır.
+    """
+
+    def __init__(self, memory_budget: int = None, idle_timeout: float = None):
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self._slots = {}
+        self._lock = threading.Condition()
+        self._reaper = None
+        self._stopping = False
+
+    # --- Kayıt ---
+
+    def register(self, name: str, loader, size: int = None, unloader=None):
+        """
+        Bir modeli kaydeder. 'loader' argümansız çağrılır ve yüklenen nesneyi
+        (örn. (model, processor)) döndürür. 'size' verilmezse yüklemeden sonra
+        parametrelerden hesaplanır; verilirse yüklemeden önce yer açmak için
+        kullanılır. 'unloader' atılırken nesneyle çağrılır.
+        """
+        with self._lock:
+            self._slots[name] = _Slot(name, loader, size, unloader)
+
+    def names(self) -> list:
+        return list(self._slots)
+
+    # --- Kullanım ---
+
+    def _slot(self, name: str) -> _Slot:
+        slot = self._slots.get(name)
+        if slot is None:
+            raise ModelNotRegistered(name)
+        return slot
+
+    def acquire(self, name: str):
+        """
+        Modeli (gerekirse yükleyerek) döndürür ve kullanımda olarak işaretler.
+        Her acquire için bir release çağrılmalıdır; 'use' bunu kendisi yapar.
+        """
+        with self._lock:
+            slot = self._slot(name)
+            while True:
+                if slot.loaded:
+                    slot.in_use += 1
+                    slot.hits += 1
+                    slot.last_used = time.monotonic()
+                    return slot.value
+                if slot.loading is None:
+                    break
+                # Başka bir istek bu modeli yüklüyor; onun sonucunu bekle.
+                slot.coalesced += 1
+                event = slot.loading
+                self._lock.wait_for(lambda: slot.loading is not event)
+                if not slot.loaded and slot.error is not None:
+                    raise slot.error
+            slot.loading = object()
+            slot.error = None
+            # Boyutu önceden biliniyorsa yüklemeden önce yer aç.
+            if slot.declared_size:
+                self._make_room(slot.declared_size, exclude=slot)
+        # Yükleme kilit dışında yapılır: diğer modeller bu sırada kullanılabilir.
+        start = time.perf_counter()
+        try:
+            value = slot.loader()
+        except BaseException as e:
+            with self._lock:
+                slot.error = e
+                slot.loading = None
+                self._lock.notify_all()
+            raise
+        elapsed = time.perf_counter() - start
+        size = slot.declared_size or estimate_size(value)
+        with self._lock:
+            slot.value = value
+            slot.size = size
+            slot.loaded = True
+            slot.loading = None
+            slot.loads += 1
+            slot.load_seconds += elapsed
+            slot.in_use += 1
+            slot.last_used = time.monotonic()
+            self._make_room(0, exclude=slot)
+            self._lock.notify_all()
+            return value
+
+    def release(self, name: str):
+        with self._lock:
+            slot = self._slot(name)
+            slot.in_use = max(0, slot.in_use - 1)
+            slot.last_used = time.monotonic()
+            # Bütçe kullanımdaki modeller yüzünden aşılmışsa, artık atılabilir.
+            self._make_room(0)
+
+    @contextlib.contextmanager
+    def use(self, name: str):
+        """'with registry.use(ad) as model:' bloğu boyunca modeli kullanımda tutar."""
+        value = self.acquire(name)
+        try:
+            yield value
+        finally:
+            self.release(name)
+
+    # --- Bellekten atma ---
+
+    def loaded_bytes(self) -> int:
+        return sum(s.size for s in self._slots.values() if s.loaded)
+
+    def _make_room(self, incoming: int, exclude: _Slot = None):
+        # Kilit tutulurken çağrılır. Bütçe aşılıyorsa boştaki modelleri LRU sırasıyla at.
+        if self.memory_budget is None:
+            return
+        idle = sorted(
+            (s for s in self._slots.values() if s.loaded and s.in_use == 0 and s is not exclude),
+            key=lambda s: s.last_used,
+        )
+        for slot in idle:
+            if self.loaded_bytes() + incoming <= self.memory_budget:
+                break
+            self._unload(slot)
+
+    def _unload(self, slot: _Slot):
+        value, slot.value = slot.value, None
+        slot.loaded = False
+        slot.size = 0
+        slot.evictions += 1
+        if slot.unloader is not None:
+            slot.unloader(value)
+        del value
+        gc.collect()
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def evict(self, name: str) -> bool:
+        """Model boştaysa bellekten atar. Atıldıysa True döndürür."""
+        with self._lock:
+            slot = self._slot(name)
+            if not slot.loaded or slot.in_use:
+                return False
+            self._unload(slot)
+            return True
+
+    def evict_idle(self, max_idle: float) -> list:
+        """'max_idle' saniyeden uzun süredir kullanılmayan modelleri atar."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [s for s in self._slots.values() if s.loaded and s.in_use == 0 and now - s.last_used > max_idle]
+            for slot in stale:
+                self._unload(slot)
+        return [s.name for s in stale]
+
+    def _reap(self, interval: float):
+        while True:
+            with self._lock:
+                if self._lock.wait_for(lambda: self._stopping, interval):
+                    return
+            self.evict_idle(self.idle_timeout)
+
+    def start(self, interval: float = None):
+        """idle_timeout verilmişse boştaki modelleri atan temizleyiciyi başlatır."""
+        if self.idle_timeout is not None and self._reaper is None:
+            interval = interval or max(1.0, self.idle_timeout / 4)
+            self._reaper = threading.Thread(target=self._reap, args=(interval,), name="model-reaper", daemon=True)
+            self._reaper.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+
+    # --- Önceden yükleme ---
+
+    def warm(self, names, background: bool = True):
+        """
+        Verilen modelleri önceden yükler. 'background' True ise yükleme ayrı bir
+        iş parçacığında yapılır ve açılışı geciktirmez; bu sırada gelen istekler
+        aynı yüklemeyi bekler. Başlatılan iş parçacığını (ya da None) döndürür.
+        """
+        names = [n for n in names if n]
+
+        def run():
+            for name in names:
+                try:
+                    self.acquire(name)
+                    self.release(name)
+                except Exception as e:
+                    print(f"'{name}' modeli önceden yüklenemedi: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_budget": self.memory_budget,
+                "loaded_bytes": self.loaded_bytes(),
+                "models": {
+                    s.name: {
+                        "loaded": s.loaded,
+                        "loading": s.loading is not None,
+                        "in_use": s.in_use,
+                        "size": s.size,
+                        "loads": s.loads,
+                        "load_seconds": round(s.load_seconds, 3),
+                        "hits": s.hits,
+                        "coalesced_waits": s.coalesced,
+                        "evictions": s.evictions,
+                    }
+                    for s in self._slots.values()
+                },
+            }
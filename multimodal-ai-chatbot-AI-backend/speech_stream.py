@@ -0,0 +1,144 @@
+# speech_stream.py
+# Bark için cümle sınırlarında bölme, toplu üretim ve akışlı WAV yanıtı.
+#
+# Eski /bark/generate-speech metni her 250 karakterde bir kesiyor (kelimeler
+# ortadan bölünüyordu), parçaları bark_model.generate ile sırayla üretiyor,
+# hepsini np.concatenate ile birleştiriyor ve ancak ondan sonra BytesIO'ya WAV
+# yazıyordu. Uzun metinlerde ilk bayt, tüm parçaların süresi toplamı kadar
+# gecikiyordu. Bu modülde:
+#   - split_sentences: Metni cümle sınırlarından böler; sınırı aşan cümleler
+#     virgül ya da boşluklardan bölünür, kelimeler asla bölünmez.
+#   - BarkSynthesizer: Birden fazla parçayı tek bir generate çağrısında üretir
+#     (her parçanın gerçek ses uzunluğu ayrı döner).
+#   - stream_speech / wav_stream: Önce WAV başlığı gönderilir; ilk parça tek
+#     başına (hızlı ilk ses), kalanlar toplu olarak üretilir ve her parçanın
+#     PCM verisi hazır olur olmaz gönderilir.
+import re
+import struct
+
+import numpy as np
+
+# Bark'ın bir seferde rahat seslendirebildiği metin uzunluğu (karakter).
+DEFAULT_MAX_CHARS = 250
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def _split_long(sentence: str, max_chars: int) -> list:
+    # Önce yan cümlelerden (virgül vb.), gerekirse kelime aralarından böler.
+    parts = []
+    for clause in _CLAUSE_END.split(sentence):
+        if len(clause) <= max_chars:
+            parts.append(clause)
+            continue
+        line = ""
+        for word in clause.split():
+            if line and len(line) + 1 + len(word) > max_chars:
+                parts.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        if line:
+            parts.append(line)
+    return parts
+
+
+def split_sentences(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> list:
+    """
+    Metni cümle sınırlarından, her biri en fazla 'max_chars' karakter olan
+    parçalara böler. Ardışık kısa cümleler aynı parçada birleştirilir.
+    Tek başına sınırı aşan kelimeler olduğu gibi bırakılır.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        pieces.extend(_split_long(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def wav_header(sample_rate: int, channels: int = 1, bits: int = 16, data_size: int = None) -> bytes:
+    """
+    PCM WAV başlığı. 'data_size' bilinmiyorsa (akış) boyut alanları en büyük
+    değere ayarlanır; oynatıcılar dosyayı sonuna kadar okur.
+    """
+    block_align = channels * bits // 8
+    data_size = 0xFFFFFFFF if data_size is None else data_size
+    riff_size = 0xFFFFFFFF if data_size == 0xFFFFFFFF else 36 + data_size
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, bits)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def to_pcm16(audio: np.ndarray) -> bytes:
+    """[-1, 1] aralığındaki float sesi 16 bit PCM baytlarına çevirir."""
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class BarkSynthesizer:
+    """
+    Metin parçalarını tek bir generate çağrısında seslendirir.
+
+    Args:
+        model: BarkModel (ya da aynı generate arayüzüne sahip model).
+        processor: BarkProcessor.
+        device: Girdilerin taşınacağı cihaz.
+        generate_kwargs (dict): generate'e iletilecek ek ayarlar.
+    """
+
+    def __init__(self, model, processor, device, generate_kwargs: dict = None):
+        self.model = model
+        self.processor = processor
+        self.device = device
+        self.generate_kwargs = {"do_sample": True, **(generate_kwargs or {})}
+
+    @property
+    def sample_rate(self) -> int:
+        return self.model.generation_config.sample_rate
+
+    def __call__(self, texts: list, voice_preset: str = None) -> list:
+        import torch
+
+        inputs = self.processor(texts, voice_preset=voice_preset, return_tensors="pt")
+        # voice_preset'ten gelenler dahil tüm tensörleri doğru cihaza taşı.
+        inputs = {key: value.to(self.device) for key, value in inputs.items() if value is not None}
+        with torch.inference_mode():
+            audio, lengths = self.model.generate(**inputs, return_output_lengths=True, **self.generate_kwargs)
+        # Toplu çıktı en uzun parçaya göre dolguludur; her parça kendi uzunluğunda kesilir.
+        return [audio[i, :int(lengths[i])].float().cpu().numpy() for i in range(len(texts))]
+
+
+def stream_speech(synthesize, chunks: list, first_batch: int = 1, batch_size: int = 8, **kwargs):
+    """
+    Parçaları sırayla seslendirip her birinin sesini hazır olur olmaz verir.
+    İlk toplu iş küçük tutulur (ilk sese kadar geçen süre), kalanlar
+    'batch_size'lık gruplar halinde tek çağrıda üretilir.
+    """
+    position = 0
+    size = max(1, first_batch)
+    while position < len(chunks):
+        batch = chunks[position:position + size]
+        for audio in synthesize(batch, **kwargs):
+            yield audio
+        position += len(batch)
+        size = max(1, batch_size)
+
+
+def wav_stream(sample_rate: int, audio_chunks):
+    """Önce WAV başlığını, ardından her ses parçasının PCM verisini verir."""
+    yield wav_header(sample_rate)
+    for audio in audio_chunks:
+        yield to_pcm16(audio)
@@ -1,56 +1,327 @@
 # agent/action_executor.py
-import subprocess
+import atexit
 import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
 
-# Çalıştırılacak kod için oluşturulacak geçici dosyanın adı.
+from .history_manager import clip_text, CHARS_PER_TOKEN
+from .interpreter_pool import process_group_options, terminal_foreground
+
+# Çalıştırılacak kod için oluşturulacak geçici dosyanın adının ön eki.
 # Başına _ koymak, genellikle geçici veya dahili kullanım için olan
 # dosyalarda kullanılan bir isimlendirme geleneğidir.
-TEMP_SCRIPT_NAME = "_temp_pardus_agent_script.py"
+# Dosya adının geri kalanı her çalıştırmada rastgele üretilir; böylece aynı
+# dizinde çalışan iki ajan (veya API sunucusundaki eşzamanlı oturumlar)
+# birbirinin betiğinin üzerine yazmaz.
+TEMP_SCRIPT_PREFIX = "_temp_pardus_agent_"
+
+# --- Kaynak sınırları ---
+# Bir betiğin en fazla çalışabileceği gerçek (duvar saati) süre, saniye.
+# Süre dolduğunda betik ve başlattığı tüm alt süreçler (süreç grubu) sonlandırılır.
+DEFAULT_TIMEOUT = 900
+# Zaman aşımında önce SIGTERM gönderilir; süreç bu kadar saniye içinde
+# kapanmazsa SIGKILL ile öldürülür.
+KILL_GRACE_SECONDS = 3
+# Her çıktı akışı (stdout/stderr) için bellekte tutulacak baş ve son kısım (bayt).
+# Aradaki çıktı sadece sayılır, saklanmaz; böylece gigabaytlarca çıktı üreten bir
+# betik bile ajanın belleğini şişiremez.
+CAPTURE_HEAD_BYTES = 64 * 1024
+CAPTURE_TAIL_BYTES = 64 * 1024
+# Bir sonraki istemde modele gönderilecek çıktı özetinin en fazla uzunluğu (karakter).
+MAX_DIGEST_CHARS = 4000
+
+# Çalışma zamanında configure_limits ile değiştirilebilen ayarlar.
+timeout = DEFAULT_TIMEOUT
+cpu_limit_seconds = None  # RLIMIT_CPU (None: sınırsız)
+memory_limit_mb = None    # RLIMIT_AS (None: sınırsız)
+
+# Etkinleştirildiğinde betikler, önceden ısıtılmış yorumlayıcı havuzunda
+# çalıştırılır (bkz. interpreter_pool.py). None ise her betik için yeni bir
+# 'python3' süreci başlatılır (soğuk başlangıç).
+_pool = None
+
+# O anda çalışan betik süreçleri. Paralel plan adımları (bkz. plan_executor.py)
+# ana iş parçacığında çalışmadığı için Ctrl+C onlara ulaşmaz; terminate_running
+# ile hepsi birlikte durdurulur.
+_running = set()
+_running_lock = threading.Lock()
+
 
-def execute_script(python_code: str) -> tuple[str, str, int]:
+def configure_limits(timeout_seconds=DEFAULT_TIMEOUT, cpu_seconds=None, memory_mb=None):
     """
-    Verilen Python kodunu geçici bir dosyaya yazar ve ayrı bir süreçte çalıştırır.
-    
+    Betiklere uygulanacak zaman aşımını ve isteğe bağlı CPU/bellek sınırlarını ayarlar.
+    None verilen sınırlar uygulanmaz. Havuz açıksa, yeni sınırların işçilere de
+    uygulanması için havuz yeniden başlatılır.
+    """
+    global timeout, cpu_limit_seconds, memory_limit_mb
+    timeout = timeout_seconds
+    cpu_limit_seconds = cpu_seconds
+    memory_limit_mb = memory_mb
+    if _pool is not None:
+        size = _pool.size
+        disable_pool()
+        enable_pool(size)
+
+
+def _apply_rlimits():
+    """
+    Alt süreçte, Python betiği başlamadan hemen önce çalışır (preexec_fn).
+    Ayarlanmış CPU ve bellek sınırlarını uygular.
+    """
+    import resource
+    if cpu_limit_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit_seconds, cpu_limit_seconds + 1))
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _preexec_fn():
+    # Sınır yoksa preexec_fn hiç kullanılmaz (daha hızlı ve thread-güvenli).
+    return _apply_rlimits if (cpu_limit_seconds or memory_limit_mb) else None
+
+
+def enable_pool(size: int = 2):
+    """
+    Yorumlayıcı havuzu modunu açar. İşçiler hemen arka planda başlatılır,
+    böylece ilk betik onaylandığında hazır beklerler.
+    """
+    global _pool
+    from .interpreter_pool import InterpreterPool
+    if _pool is None:
+        _pool = InterpreterPool(size=size, preexec_fn=_preexec_fn())
+        # Program kapanırken bekleyen işçileri temizle.
+        atexit.register(disable_pool)
+    return _pool
+
+
+def disable_pool():
+    """Yorumlayıcı havuzunu kapatır ve soğuk başlangıç moduna döner."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+class HeadTailBuffer:
+    """
+    Bir çıktı akışının sadece ilk 'head' ve son 'tail' baytını tutan sabit
+    boyutlu tampon. Aradaki kısım atılır ama kaç bayt atıldığı sayılır.
+    """
+
+    def __init__(self, head: int = CAPTURE_HEAD_BYTES, tail: int = CAPTURE_TAIL_BYTES):
+        self.head_limit = head
+        self.tail_limit = tail
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes):
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            # Tampon büyümesin diye son kısım sadece sınırın iki katını aşınca kırpılır.
+            if len(self.tail) > 2 * self.tail_limit:
+                del self.tail[:-self.tail_limit]
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.head) - min(len(self.tail), self.tail_limit)
+
+    def getvalue(self) -> str:
+        tail = bytes(self.tail[-self.tail_limit:]) if self.tail_limit else b""
+        if self.dropped > 0:
+            middle = f"\n[... {self.dropped} bayt çıktı atlandı ...]\n".encode("utf-8")
+            data = bytes(self.head) + middle + tail
+        else:
+            data = bytes(self.head) + tail
+        return data.decode("utf-8", errors="replace")
+
+
+def _pump(stream, buffer: HeadTailBuffer, echo_to):
+    """Bir borudan (pipe) gelen çıktıyı okur, tampona yazar ve isteğe bağlı olarak ekrana basar."""
+    try:
+        while True:
+            data = os.read(stream.fileno(), 65536)
+            if not data:
+                break
+            buffer.write(data)
+            if echo_to is not None:
+                echo_to.write(data)
+                echo_to.flush()
+    except (OSError, ValueError):
+        pass
+    finally:
+        stream.close()
+
+
+def _kill_group(process: subprocess.Popen):
+    """Betiği ve başlattığı tüm alt süreçleri (süreç grubunu) sonlandırır."""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        try:
+            process.wait(timeout=KILL_GRACE_SECONDS)
+            # Ana süreç öldü; grupta kalan alt süreçler için SIGKILL yine de gönderilir.
+            if sig == signal.SIGTERM:
+                continue
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def terminate_running():
+    """Çalışmakta olan tüm betikleri (ve süreç gruplarını) sonlandırır."""
+    with _running_lock:
+        processes = list(_running)
+    for process in processes:
+        _kill_group(process)
+
+
+def _collect(process: subprocess.Popen, stdin_data: bytes, echo: bool, timeout_seconds) -> tuple[str, str, int]:
+    """
+    Çalışan bir sürecin çıktısını canlı olarak okur, sınırlı tamponlarda toplar
+    ve zaman aşımını uygular.
+    """
+    with _running_lock:
+        _running.add(process)
+    out_buf, err_buf = HeadTailBuffer(), HeadTailBuffer()
+    echo_out = getattr(sys.stdout, "buffer", None) if echo else None
+    echo_err = getattr(sys.stderr, "buffer", None) if echo else None
+    readers = [
+        threading.Thread(target=_pump, args=(process.stdout, out_buf, echo_out), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, err_buf, echo_err), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    if process.stdin is not None:
+        try:
+            if stdin_data:
+                process.stdin.write(stdin_data)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    timed_out = interrupted = False
+    try:
+        # Betik çalışırken terminal onun grubundadır; Ctrl+C'yi betik alır.
+        with terminal_foreground(process.pid):
+            process.wait(timeout=timeout_seconds)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill_group(process)
+    except KeyboardInterrupt:
+        # Terminal devredilemediyse Ctrl+C ajana gelir: betiği durdur ama
+        # ajanı kapatma (kesme yukarı iletilmez).
+        interrupted = True
+        _kill_group(process)
+    finally:
+        with _running_lock:
+            _running.discard(process)
+        for reader in readers:
+            # Grubun dışına kaçmış bir süreç boruyu açık tutabilir; sonsuza kadar bekleme.
+            reader.join(timeout=KILL_GRACE_SECONDS)
+
+    process.poll()
+    interrupted = interrupted or process.returncode == -signal.SIGINT
+    stdout, stderr = out_buf.getvalue(), err_buf.getvalue()
+    if timed_out:
+        stderr += f"\n[Ajan: Betik {timeout_seconds} saniyelik zaman aşımını geçtiği için sonlandırıldı.]"
+    elif interrupted:
+        stderr += "\n[Ajan: Betik Ctrl+C ile durduruldu.]"
+    return stdout, stderr, process.returncode
+
+
+def execute_script(python_code: str, echo: bool = False, timeout_seconds=None) -> tuple[str, str, int]:
+    """
+    Verilen Python kodunu ayrı bir süreçte (kendi süreç grubunda) çalıştırır.
+    Havuz modu açıksa kod, hazırdaki bir işçi yorumlayıcıya boru (pipe) üzerinden
+    gönderilir; değilse geçici bir dosyaya yazılıp yeni bir 'python3' ile çalıştırılır.
+
+    Çıktı, sabit boyutlu baş+son tamponlarında toplanır; 'echo' True ise aynı anda
+    terminale de canlı olarak basılır. Zaman aşımı dolarsa betik ve tüm alt
+    süreçleri sonlandırılır.
+
     Args:
         python_code (str): AI tarafından üretilen çalıştırılabilir Python kodu.
-        
+        echo (bool): Çıktının çalışırken terminale basılıp basılmayacağı.
+        timeout_seconds (float): Zaman aşımı (None ise modül ayarı kullanılır).
+
     Returns:
         tuple[str, str, int]: Bir tuple içinde şu üç değeri döndürür:
-            - stdout (str): Betiğin standart çıktısı.
-            - stderr (str): Betiğin standart hata çıktısı.
-            - returncode (int): Betiğin çıkış kodu (0 ise başarılı).
+            - stdout (str): Betiğin standart çıktısı (gerekirse ortası kırpılmış).
+            - stderr (str): Betiğin standart hata çıktısı (gerekirse ortası kırpılmış).
+            - returncode (int): Betiğin çıkış kodu (0 ise başarılı, negatifse sinyalle sonlandı).
     """
+    if timeout_seconds is None:
+        timeout_seconds = timeout
+
+    if _pool is not None:
+        try:
+            worker = _pool.acquire()
+            return _collect(worker, _pool.encode_job(python_code), echo, timeout_seconds)
+        except Exception as e:
+            return "", f"Ajan betik yürütme hatası: {e}", 1
+
     # try...finally bloğu, işlem sırasında bir hata oluşsa bile
     # 'finally' kısmının her zaman çalışmasını garanti eder.
     # Bu, geçici dosyanın her durumda silinmesini sağlar.
+    script_path = None
     try:
         # 1. Kodu Geçici Dosyaya Yazma
-        # 'w' (write) moduyla ve utf-8 kodlamasıyla dosyayı açıyoruz.
+        # Betiğin yerel dosyalara göreli erişimi bozulmasın diye dosya mevcut
+        # dizinde, benzersiz bir adla oluşturulur.
         # utf-8, Türkçe karakterler gibi uluslararası karakterlerin
         # sorunsuz yazılmasını sağlar.
-        with open(TEMP_SCRIPT_NAME, "w", encoding='utf-8') as f:
+        fd, script_path = tempfile.mkstemp(prefix=TEMP_SCRIPT_PREFIX, suffix=".py", dir=os.getcwd())
+        with os.fdopen(fd, "w", encoding='utf-8') as f:
             f.write(python_code)
-        
-        # 2. Ayrı Süreçte Çalıştırma ve Çıktıları Yakalama
-        # subprocess.run() fonksiyonu, yeni bir komut çalıştırmak için kullanılır.
-        result = subprocess.run(
-            ["python3", TEMP_SCRIPT_NAME], # Çalıştırılacak komut ve argümanları.
-            capture_output=True,           # stdout ve stderr'i yakalamak için True yapıyoruz.
-            text=True,                     # Çıktıları metin (string) olarak almak için.
-            encoding='utf-8'               # Çıktıların doğru kodlamayla okunmasını sağlar.
+
+        # 2. Ayrı Süreçte Çalıştırma
+        # Betik kendi süreç grubunda (ama ajanın oturumunda) başlatılır;
+        # zaman aşımında betiğin başlattığı alt süreçler de birlikte
+        # sonlandırılabilir. Çalışırken terminal bu gruba verilir (örn. sudo
+        # parola sorabilir).
+        process = subprocess.Popen(
+            ["python3", script_path],      # Çalıştırılacak komut ve argümanları.
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **process_group_options(_preexec_fn()),
         )
-        
-        # 3. Sonuçları Döndürme
-        # subprocess.run'ın döndürdüğü result nesnesinden çıktıları alıyoruz.
-        return result.stdout, result.stderr, result.returncode
+
+        # 3. Çıktıları Canlı Okuma ve Sonuçları Döndürme
+        return _collect(process, None, echo, timeout_seconds)
 
     except Exception as e:
         # Eğer dosya yazma veya subprocess başlatma sırasında bir hata olursa,
         # bu hatayı stderr olarak döndürerek ana programı bilgilendiriyoruz.
         return "", f"Ajan betik yürütme hatası: {e}", 1 # Hata kodu olarak 1 döndür.
-        
+
     finally:
         # 4. Temizlik
         # Geçici betik dosyası hala mevcutsa, onu sil.
-        if os.path.exists(TEMP_SCRIPT_NAME):
-            os.remove(TEMP_SCRIPT_NAME)
\ No newline at end of file
+        if script_path and os.path.exists(script_path):
+            os.remove(script_path)
+
+
+def summarize_output(stdout: str, stderr: str, returncode: int, max_chars: int = MAX_DIGEST_CHARS) -> str:
+    """
+    Bir sonraki istemde modele gönderilecek, boyutu sınırlı çıktı özetini üretir.
+    Hata çıktısına (genellikle daha kısa ve daha önemli) bütçenin en fazla
+    yarısı ayrılır; geri kalanı standart çıktıya verilir.
+    """
+    err_budget = min(len(stderr), max_chars // 2)
+    out_budget = max_chars - err_budget
+    stdout = clip_text(stdout, out_budget // CHARS_PER_TOKEN)
+    stderr = clip_text(stderr, max(1, err_budget // CHARS_PER_TOKEN))
+    return f"Çıkış Kodu: {returncode}\nSTDOUT:\n{stdout}\n\nSTDERR:\n{stderr}"
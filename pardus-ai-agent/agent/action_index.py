@@ -0,0 +1,305 @@
+# agent/action_index.py
+# Daha önce başarıyla çalışmış eylemler için yerel benzerlik dizini.
+#
+# Yöneticiler asistandan sık sık aynı şeyleri ister ("htop kur", "disk
+# kullanımını göster", "nginx'i yeniden başlat"). Her seferinde modele gitmek
+# yerine, arşivdeki başarılı (çıkış kodu 0) etkileşimlerin istemleri üzerinde
+# bir TF-IDF dizini tutulur. Yeni istek geçmişteki bir istemle yeterince
+# benzerse, o betik modele hiç gitmeden anında önerilir.
+#
+# - Kelimeler küçük harfe çevrilir, Türkçe karakterler sadeleştirilir ve ilk 4
+#   harfine indirgenir. Türkçe ekleri kabaca atmak için basit ama etkili bir
+#   yöntemdir ("diskin" -> "disk", "başlatır mısın" -> "basl").
+# - Dizin boyutu sınırlıdır: kayıt sayısı veya toplam betik boyutu aşılırsa en
+#   uzun süredir kullanılmayan kayıtlar (LRU) atılır.
+# - Betiklerde geçen kelimeler (paket, servis, dosya adları gibi) "varlık"
+#   sayılır. İstekte böyle bir kelime varsa, aday kaydın isteminde ya da
+#   betiğinde de geçmelidir; böylece "ssh çalışıyor mu kontrol et" isteğine
+#   "docker çalışıyor mu kontrol et" betiği önerilmez.
+# - İstemdeki sayılar, dosya yolları ve tırnak içindeki argümanlar birebir
+#   eşleşmesi gereken değerlerdir: "1 dakika sonra kapat" isteğine "5 dakika
+#   sonra kapat" betiği ne kadar benzer olursa olsun önerilmez.
+# - Önerilen bir betik başarısız olursa kayıt dizinden silinir; başarısız olan
+#   betikle aynı koda sahip tüm kayıtlar da geçersiz sayılır.
+import collections
+import hashlib
+import math
+import re
+import unicodedata
+
+# İki istemin "aynı istek" sayılması için gereken en düşük benzerlik (0-1).
+DEFAULT_THRESHOLD = 0.8
+# Dizinde tutulacak en fazla kayıt ve en fazla toplam betik boyutu (karakter).
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_CHARS = 2_000_000
+# Kelimelerin indirgeneceği uzunluk (kaba kök bulma).
+STEM_LENGTH = 4
+
+# Anlam taşımayan sık kelimeler (sadeleştirilmiş kök halleriyle karşılaştırılır).
+STOPWORDS = {
+    "bir", "bu", "su", "ve", "ile", "icin", "bana", "beni", "lutf", "misi",
+    "musu", "mi", "mu", "de", "da", "ki", "ne", "sunu", "bunu",
+    "the", "a", "an", "to", "of", "and", "plea", "my",
+}
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Birebir eşleşmesi gereken değerler: sayılar (örn. "5", "3.11"), boşlukla
+# başlayan dosya yolları ve çift tırnak, ters tırnak ya da boşlukla ayrılmış
+# tek tırnak içindeki argümanlar ("nginx'i" gibi eklerdeki kesme işareti
+# tırnak sayılmaz).
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_PATH_RE = re.compile(r"(?:(?<=\s)|^)((?:~|\.{1,2})?/[^\s'\"`]*)")
+_QUOTED_RE = re.compile(r"\"([^\"\n]+)\"|`([^`\n]+)`|(?:(?<=\s)|^)'([^'\n]+)'(?=\s|$|[.,;:!?])")
+
+
+def tokenize(text: str) -> list:
+    """İstemi kök kelimelere ayırır."""
+    # Büyük/küçük harf ve Türkçe karakter farkları eşleşmeyi bozmasın:
+    # "NGINX'i Başlat" ile "nginxi baslat" aynı köklere iner.
+    text = unicodedata.normalize("NFKD", text.lower().replace("ı", "i"))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        if word.isdigit():
+            tokens.append(word) # Sayılar kısaltılmaz ve tek haneliler de tutulur.
+            continue
+        stem = word[:STEM_LENGTH]
+        # Tek harfli parçalar (örn. "nginx'i" içindeki "i") anlam taşımaz.
+        if len(stem) > 1 and stem not in STOPWORDS:
+            tokens.append(stem)
+    return tokens
+
+
+def extract_entities(text: str) -> frozenset:
+    """İstemdeki birebir eşleşmesi gereken değerler (sayılar, yollar, tırnaklı argümanlar)."""
+    entities = {("path", path.rstrip(".,;:!?")) for path in _PATH_RE.findall(text)}
+    entities.update(("quoted", next(group for group in groups if group).strip())
+                    for groups in _QUOTED_RE.findall(text))
+    entities.update(("number", number.replace(",", ".")) for number in _NUMBER_RE.findall(text))
+    return frozenset(entities)
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha1(code.strip().encode("utf-8")).hexdigest()
+
+
+class IndexEntry:
+    """Dizindeki bir başarılı eylem."""
+
+    __slots__ = ("entry_id", "prompt", "reasoning", "code", "code_hash", "archive_id", "terms", "code_terms",
+                 "entities", "hits")
+
+    def __init__(self, entry_id, prompt, reasoning, code, archive_id=None):
+        self.entry_id = entry_id
+        self.prompt = prompt
+        self.reasoning = reasoning
+        self.code = code
+        self.code_hash = code_hash(code)
+        self.archive_id = archive_id
+        # Terim -> terim frekansı (tf).
+        self.terms = collections.Counter(tokenize(prompt))
+        self.code_terms = frozenset(tokenize(code))
+        self.entities = extract_entities(prompt)
+        self.hits = 0
+
+
+class Match:
+    """lookup() sonucu: eşleşen kayıt ve benzerlik skoru."""
+
+    def __init__(self, entry: IndexEntry, score: float):
+        self.entry = entry
+        self.score = score
+
+    @property
+    def code(self) -> str:
+        return self.entry.code
+
+    @property
+    def reasoning(self) -> str:
+        return self.entry.reasoning
+
+
+class ActionIndex:
+    """
+    Başarılı eylemler üzerinde TF-IDF kosinüs benzerliğiyle arama yapan dizin.
+
+    Args:
+        threshold (float): Eşleşme sayılması için gereken en düşük benzerlik.
+        max_entries (int): Dizindeki en fazla kayıt sayısı.
+        max_chars (int): Dizindeki betiklerin toplam en fazla boyutu.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_chars: int = DEFAULT_MAX_CHARS,
+    ):
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.max_chars = max_chars
+        # entry_id -> IndexEntry; sıra en eski kullanımdan en yeniye (LRU).
+        self.entries = collections.OrderedDict()
+        # Terim -> o terimi içeren kayıtların kimlikleri (ters dizin).
+        self.postings = collections.defaultdict(set)
+        # Betiklerde geçen kelimeler ve kaç kayıtta geçtikleri (varlık sözlüğü).
+        self.code_vocab = collections.Counter()
+        # Aynı (istem, betik) çiftinin iki kez eklenmemesi için.
+        self._keys = {}
+        self.total_chars = 0
+        self._next_id = 1
+        # İstatistikler
+        self.lookups = 0
+        self.hits = 0
+        self.evicted = 0
+        self.invalidated = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # --- Ekleme / silme ---
+
+    def add(self, prompt: str, reasoning: str, code: str, archive_id: int = None) -> IndexEntry:
+        """Başarılı bir eylemi dizine ekler (zaten varsa en yeni konuma taşır)."""
+        key = (" ".join(tokenize(prompt)), code_hash(code))
+        if key in self._keys:
+            entry = self.entries[self._keys[key]]
+            self.entries.move_to_end(entry.entry_id)
+            return entry
+        entry = IndexEntry(self._next_id, prompt, reasoning, code, archive_id)
+        self._next_id += 1
+        if not entry.terms:
+            return entry # İçinde anlamlı kelime olmayan istemler dizinlenmez.
+        self.entries[entry.entry_id] = entry
+        self._keys[key] = entry.entry_id
+        for term in entry.terms:
+            self.postings[term].add(entry.entry_id)
+        self.code_vocab.update(entry.code_terms)
+        self.total_chars += len(code)
+        self._evict()
+        return entry
+
+    def remove(self, entry_id: int):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for term in entry.terms:
+            ids = self.postings.get(term)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.postings[term]
+        self.code_vocab.subtract(entry.code_terms)
+        for term in entry.code_terms:
+            if self.code_vocab[term] <= 0:
+                del self.code_vocab[term]
+        self._keys.pop((" ".join(tokenize(entry.prompt)), entry.code_hash), None)
+        self.total_chars -= len(entry.code)
+
+    def _evict(self):
+        # En uzun süredir kullanılmayan kayıtları sınırlar sağlanana kadar at.
+        while len(self.entries) > self.max_entries or (self.total_chars > self.max_chars and len(self.entries) > 1):
+            oldest = next(iter(self.entries))
+            self.remove(oldest)
+            self.evicted += 1
+
+    def invalidate(self, code: str) -> int:
+        """Verilen betikle aynı koda sahip tüm kayıtları siler. Silinen sayıyı döndürür."""
+        digest = code_hash(code)
+        stale = [e.entry_id for e in self.entries.values() if e.code_hash == digest]
+        for entry_id in stale:
+            self.remove(entry_id)
+        self.invalidated += len(stale)
+        return len(stale)
+
+    def record(self, prompt: str, reasoning: str, code: str, returncode: int, archive_id: int = None):
+        """
+        Çalıştırılan bir betiğin sonucunu dizine işler: başarılıysa eklenir,
+        başarısızsa aynı betiği içeren kayıtlar geçersiz kılınır.
+        """
+        if not code:
+            return
+        if returncode == 0:
+            self.add(prompt, reasoning, code, archive_id)
+        else:
+            self.invalidate(code)
+
+    # --- Arama ---
+
+    def _idf(self, term: str) -> float:
+        # Yumuşatılmış ters doküman frekansı.
+        return math.log((len(self.entries) + 1) / (len(self.postings.get(term, ())) + 1)) + 1
+
+    def _weights(self, terms: collections.Counter) -> dict:
+        return {t: (1 + math.log(tf)) * self._idf(t) for t, tf in terms.items()}
+
+    def search(self, prompt: str, limit: int = 3) -> list:
+        """En benzer kayıtları (eşik uygulamadan) skor sırasıyla döndürür."""
+        query = self._weights(collections.Counter(tokenize(prompt)))
+        if not query:
+            return []
+        query_norm = math.sqrt(sum(w * w for w in query.values()))
+        # İstekteki varlık kelimeleri (herhangi bir betikte geçenler).
+        entities = [t for t in query if t in self.code_vocab]
+        values = extract_entities(prompt)
+        candidates = set()
+        for term in query:
+            candidates.update(self.postings.get(term, ()))
+        results = []
+        for entry_id in candidates:
+            entry = self.entries[entry_id]
+            if any(t not in entry.terms and t not in entry.code_terms for t in entities):
+                continue # İstek, bu kaydın ilgilenmediği bir şeyden bahsediyor.
+            if entry.entities != values:
+                continue # Sayı, yol ya da argüman farklı: başka bir betik gerekir.
+            doc = self._weights(entry.terms)
+            dot = sum(w * doc[t] for t, w in query.items() if t in doc)
+            doc_norm = math.sqrt(sum(w * w for w in doc.values()))
+            results.append(Match(entry, dot / (query_norm * doc_norm)))
+        results.sort(key=lambda m: (m.score, m.entry.entry_id), reverse=True)
+        return results[:limit]
+
+    def lookup(self, prompt: str) -> Match or None:
+        """
+        İsteğe eşik üzerinde benzeyen en iyi kaydı döndürür (yoksa None).
+        Bulunan kayıt LRU sırasında en yeni konuma taşınır.
+        """
+        self.lookups += 1
+        results = self.search(prompt, limit=1)
+        if not results or results[0].score < self.threshold:
+            return None
+        match = results[0]
+        match.entry.hits += 1
+        self.entries.move_to_end(match.entry.entry_id)
+        self.hits += 1
+        return match
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "terms": len(self.postings),
+            "chars": self.total_chars,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "evicted": self.evicted,
+            "invalidated": self.invalidated,
+        }
+
+
+def build_from_archive(limit: int = DEFAULT_MAX_ENTRIES, **kwargs) -> ActionIndex:
+    """
+    Arşivdeki en son 'limit' betikli etkileşimden bir dizin oluşturur.
+    Başarılı olanlar eklenir, sonradan başarısız olan betikler geçersiz kılınır.
+    Ek anahtar kelimeler ActionIndex'e iletilir.
+    """
+    from . import archive_manager
+
+    index = ActionIndex(**kwargs)
+    # Eskiden yeniye işlenir; böylece en yeni kayıtlar LRU sırasının sonunda olur.
+    for row in reversed(archive_manager.recent_actions(limit)):
+        if row["returncode"] is None:
+            continue # Sonucu bilinmeyen (eski düzenden aktarılmış) kayıtlar.
+        index.record(row["prompt"], row["reasoning"], row["code"], row["returncode"], row["id"])
+    return index
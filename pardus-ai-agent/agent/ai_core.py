@@ -1,5 +1,9 @@
 # agent/ai_core.py
-import google.generativeai as genai
+import re
+import threading
+
+from .backends import ModelBackend, create_backend
+from .history_manager import HistoryManager
 
 # --- PARDUS'A ÖZEL GELİŞMİŞ SİSTEM TALİMATI ---
 # Bu metin, AI'ın nasıl davranacağını belirleyen anayasasıdır.
@@ -70,8 +74,53 @@ except Exception as e:
 
 """
 
+# --- PARALEL ADIM PLANLARI ---
+# Yapılandırmada "parallel_steps": true ise sistem talimatına eklenir. Model,
+# birbirinden bağımsız adımları '# @step' işaretleriyle ayırır; bu adımlar
+# plan_executor.py tarafından aynı anda, ayrı süreçlerde çalıştırılır.
+# İşaretler Python yorumu olduğundan plan, tek bir betik olarak da (sırayla)
+# çalıştırılabilir.
+PLAN_PROMPT = """
+PARALEL ADIMLAR:
+Görev birbirinden bağımsız adımlardan oluşuyorsa (örn. birden fazla servisi kontrol etmek, birden fazla sunucuya bağlanmak veya birden fazla depoyu indirmek), kod bloğunu `# @step <ad>` satırlarıyla adımlara böl:
+- Bağımsız adımlar aynı anda, ayrı süreçlerde çalışır. Bir adım başka adımların bitmesini bekliyorsa `# @step <ad> after=<ad1>,<ad2>` yaz.
+- İlk `# @step` satırından önceki kod (örn. import'lar) her adımın başına eklenir.
+- Adımlar değişken paylaşamaz; bir adımın sonucunu sonraki adıma aktarman gerekiyorsa geçici bir dosya kullan.
+- Adım adları harf, rakam, '_' ve '-' içerebilir. Tek adımlık işler için işaret kullanma.
+
+ÖRNEK PLAN:
+```python
+'''
+Plan:
+1. nginx ve ssh servislerinin durumunu aynı anda kontrol edeceğim.
+2. İki kontrol bitince özet yazacağım.
+'''
+import subprocess
+
+# @step nginx
+r = subprocess.run(['systemctl', 'is-active', 'nginx'], capture_output=True, text=True)
+open('/tmp/durum_nginx', 'w').write(r.stdout.strip())
+
+# @step ssh
+r = subprocess.run(['systemctl', 'is-active', 'ssh'], capture_output=True, text=True)
+open('/tmp/durum_ssh', 'w').write(r.stdout.strip())
+
+# @step ozet after=nginx,ssh
+for name in ('nginx', 'ssh'):
+    print(name, open(f'/tmp/durum_{name}').read())
+```
+"""
+
+
+def build_system_prompt(config: dict) -> str:
+    """Yapılandırmaya göre modelin sistem talimatını oluşturur."""
+    if config.get('parallel_steps'):
+        return SYSTEM_PROMPT + PLAN_PROMPT
+    return SYSTEM_PROMPT
+
 
 # 'model' adında, bu dosyanın her yerinden erişilebilecek bir değişken tanımlıyoruz.
+# Bu değişken bir model arka ucu (backends.ModelBackend) tutar.
 model = None
 
 def setup_model(api_key: str, model_name: str) -> bool:
@@ -79,51 +128,144 @@ def setup_model(api_key: str, model_name: str) -> bool:
     Verilen API anahtarı ve model adı ile Gemini modelini başlatır.
     'SYSTEM_PROMPT'u AI'ın ana talimatı olarak ayarlar.
     
+    Başarı durumunda True, hata durumunda False döndürür.
+    """
+    return setup_backend({"backend": "gemini", "api_key": api_key, "model_name": model_name})
+
+
+def setup_backend(config: dict) -> bool:
+    """
+    Yapılandırmadaki "backend" anahtarına göre model arka ucunu başlatır
+    ("gemini" varsayılan, "local" API anahtarı gerektirmeyen yerel sahte model).
+
     Başarı durumunda True, hata durumunda False döndürür.
     """
     global model  # Bu fonksiyonun, dosya seviyesindeki 'model' değişkenini değiştireceğini belirtiyoruz.
     try:
-        # API anahtarını Google kütüphanesine tanıtıyoruz.
-        genai.configure(api_key=api_key)
-        
-        # Seçilen model adı ve sistem talimatı ile AI model nesnesini oluşturuyoruz.
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            system_instruction=SYSTEM_PROMPT
-        )
+        model = create_backend(config, build_system_prompt(config))
         return True # İşlem başarılı.
     except Exception as e:
         # Bağlantı veya anahtar hatası gibi bir sorun olursa...
-        print(f"❌ API veya Model hatası: Gemini modeli başlatılamadı. Lütfen API anahtarınızın geçerli ve internet bağlantınızın olduğundan emin olun. Hata: {e}")
+        print(f"❌ API veya Model hatası: Model başlatılamadı. Lütfen API anahtarınızın geçerli ve internet bağlantınızın olduğundan emin olun. Hata: {e}")
         model = None # Modeli 'None' olarak bırak.
         return False # İşlem başarısız.
 
 
-def generate_action(full_prompt: str, history: list) -> tuple[str, list]:
+# Arka planda başlatılan model kurulumunun iş parçacığı (bkz. setup_backend_async).
+_setup_thread = None
+
+
+def setup_backend_async(config: dict) -> threading.Thread:
+    """
+    setup_backend'i arka planda çalıştırır. Model istemcisinin (örn.
+    google.generativeai) içe aktarılması ve kurulumu saniyeler sürebilir;
+    bu sırada kullanıcı ilk isteğini yazabilir. İlk model çağrısından önce
+    wait_for_model() ile kurulumun bitmesi beklenir.
+    """
+    global _setup_thread
+    _setup_thread = threading.Thread(target=setup_backend, args=(config,), name="model-setup", daemon=True)
+    _setup_thread.start()
+    return _setup_thread
+
+
+def wait_for_model(timeout: float = None) -> bool:
+    """Arka plandaki kurulum bitene kadar bekler. Model hazırsa True döner."""
+    if _setup_thread is not None:
+        _setup_thread.join(timeout)
+    return model is not None
+
+
+def set_backend(backend: ModelBackend):
+    """Hazır oluşturulmuş bir arka ucu (örn. testlerde yerel model) etkin model yapar."""
+    global model
+    model = backend
+
+
+def build_prompt(user_prompt: str, last_command_output: str) -> str:
+    """
+    Modele gönderilecek tam istemi oluşturur. Bir önceki işlemin sonucu da
+    eklenir; böylece AI bir sonraki adımını buna göre planlar.
+    """
+    return (
+        f"Kullanıcı İsteği: {user_prompt}\n\n"
+        f"Önceki Komutun Çıktısı (stdout/stderr):\n---\n{last_command_output}\n---"
+    )
+
+
+def generate_action(full_prompt: str, history: HistoryManager) -> tuple[str, HistoryManager]:
     """
     Verilen prompt ve sohbet geçmişine dayanarak AI'dan bir eylem (betik) veya 
     metin cevabı üretmesini ister.
     
-    Geriye AI'ın ham metin cevabını ve güncellenmiş sohbet geçmişini döndürür.
+    Sohbet oturumu her turda yeniden kurulmaz; 'history' içindeki oturum
+    yeniden kullanılır ve geçmiş, token bütçesi içinde kalacak şekilde kırpılır.
+    
+    Geriye AI'ın ham metin cevabını ve güncellenmiş geçmiş yöneticisini döndürür.
     """
     # Eğer model kurulumu başarısız olduysa, hata mesajı döndür.
     if not model:
         return "HATA: AI modeli yüklenemedi. Lütfen uygulamayı --reconfigure ile yeniden yapılandırın.", history
 
     try:
-        # 'start_chat' ile mevcut sohbet geçmişini vererek bağlamı koruyoruz.
-        chat = model.start_chat(history=history)
+        # Mevcut sohbet oturumunu al (yoksa kompakt geçmişle bir kez oluşturulur).
+        chat = history.get_chat(model)
         
         # Kullanıcının isteğini modele gönderiyoruz.
         response = chat.send_message(full_prompt)
         
-        # Modelin cevabını ve yeni, güncellenmiş sohbet geçmişini döndürüyoruz.
-        return response.text, chat.history
+        # Turu geçmişe ekle; gerekirse eski turlar özete katlanır.
+        history.record(full_prompt, response.text)
+        return response.text, history
     except Exception as e:
         # AI ile iletişim sırasında bir sorun olursa (örn: internet kesintisi)...
+        # Oturumun geçmişi yarım kalmış olabilir; bir sonraki turda yeniden kurulsun.
+        history.discard_chat()
         return f"AI ile iletişimde bir hata oluştu: {e}", history
 
 
+def stream_action(full_prompt: str, history: HistoryManager):
+    """
+    generate_action'ın akış (streaming) sürümü. Modelin cevabını parça parça,
+    geldiği anda üreten bir generator döndürür.
+    
+    Tüm parçalar tüketildiğinde tur geçmişe eklenir. Bir hata olursa hata
+    mesajı tek bir parça olarak üretilir (generate_action ile aynı davranış).
+    """
+    if not model:
+        yield "HATA: AI modeli yüklenemedi. Lütfen uygulamayı --reconfigure ile yeniden yapılandırın."
+        return
+
+    chunks = []
+    try:
+        chat = history.get_chat(model)
+        # stream=True ile cevap, üretildikçe parça parça gelir.
+        response = chat.send_message(full_prompt, stream=True)
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Metin içermeyen parçalar (örn. sadece bitiş bilgisi) atlanır.
+                continue
+            if text:
+                chunks.append(text)
+                yield text
+    except Exception as e:
+        history.discard_chat()
+        yield f"AI ile iletişimde bir hata oluştu: {e}"
+        return
+    history.record(full_prompt, "".join(chunks))
+
+
+def format_action(reasoning: str, code: str) -> str:
+    """
+    Düşünce süreci ve kodu, modelin cevap formatında tek bir metne çevirir
+    (parse_response'un tersi). Modele gitmeden önerilen eylemlerin sohbet
+    geçmişine eklenmesi için kullanılır.
+    """
+    body = f"'''\n{reasoning}\n'''\n{code}" if reasoning else code
+    return f"```python\n{body}\n```"
+
+
 def parse_response(text: str) -> tuple[str or None, str or None, str or None]:
     """
     AI tarafından üretilen ham metni analiz eder.
@@ -166,4 +308,172 @@ def parse_response(text: str) -> tuple[str or None, str or None, str or None]:
             code_to_execute = code_to_execute[r_end + len(reasoning_end_tag):].strip()
             
     # Sonucu döndür: plain_text=None, reasoning=Bulunan düşünce, code=Temizlenmiş kod.
-    return None, reasoning, code_to_execute
\ No newline at end of file
+    return None, reasoning, code_to_execute
+
+
+# '# @step <ad>' veya '# @step <ad> after=<ad1>,<ad2>' biçimindeki adım işareti.
+STEP_MARKER = re.compile(r"^[ \t]*#[ \t]*@step[ \t]+([\w-]+)(?:[ \t]+after=([\w, \t-]*?))?[ \t]*$", re.MULTILINE)
+
+
+class PlanStep:
+    """Paralel bir plandaki tek adım: adı, çalıştırılacak kodu ve beklediği adımlar."""
+
+    __slots__ = ("step_id", "code", "after")
+
+    def __init__(self, step_id: str, code: str, after: tuple = ()):
+        self.step_id = step_id
+        self.code = code
+        self.after = tuple(after)
+
+    def __repr__(self):
+        return f"PlanStep({self.step_id!r}, after={self.after!r})"
+
+
+def parse_plan(code: str) -> list or None:
+    """
+    parse_response'un döndürdüğü kodda '# @step' işaretleri varsa kodu adımlara
+    böler ve adımları (PlanStep listesi, koddaki sırayla) döndürür. İşaret
+    yoksa None döndürür; kod tek bir betik olarak çalıştırılır.
+
+    İlk işaretten önceki kod her adımın başına eklenir. Aynı ad iki kez
+    kullanılırsa, bilinmeyen bir adım beklenirse veya bağımlılıklar döngü
+    oluşturursa ValueError yükseltilir.
+    """
+    if not code:
+        return None
+    markers = list(STEP_MARKER.finditer(code))
+    if not markers:
+        return None
+    prelude = code[:markers[0].start()].strip()
+    steps = []
+    for index, marker in enumerate(markers):
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(code)
+        body = code[marker.end():end].strip()
+        after = [name for name in re.split(r"[,\s]+", marker.group(2) or "") if name]
+        steps.append(PlanStep(marker.group(1), f"{prelude}\n\n{body}" if prelude else body, after))
+
+    known = set()
+    for step in steps:
+        if step.step_id in known:
+            raise ValueError(f"Plan adımı iki kez tanımlanmış: {step.step_id}")
+        known.add(step.step_id)
+    for step in steps:
+        for name in step.after:
+            if name not in known:
+                raise ValueError(f"'{step.step_id}' adımı tanımlanmamış bir adımı bekliyor: {name}")
+    # Döngü kontrolü (Kahn algoritması): her adım bir kez sıralanabilmeli.
+    waiting = {step.step_id: set(step.after) for step in steps}
+    while waiting:
+        ready = [name for name, deps in waiting.items() if not deps]
+        if not ready:
+            raise ValueError(f"Plan adımlarının bağımlılıkları döngü oluşturuyor: {', '.join(sorted(waiting))}")
+        for name in ready:
+            del waiting[name]
+        for deps in waiting.values():
+            deps.difference_update(ready)
+    return steps
+
+
+class StreamingResponseParser:
+    """
+    parse_response'un artımlı (incremental) sürümü. Model cevabı parça parça
+    geldikçe 'feed' ile beslenir ve ekrana hemen basılabilecek olayları döndürür:
+
+    - ("text", metin)      : ```python etiketinden önceki (veya kod içermeyen) düz metin.
+    - ("reasoning", metin) : Kod bloğunun başındaki '''...''' düşünce süreci.
+    - ("code", metin)      : Kod bloğunun içeriği (etiket açıldığı anda tamponlanmaya başlar).
+
+    Etiketler parçalar arasında bölünebileceği için, etiketin başı olabilecek son
+    birkaç karakter bir sonraki parçaya kadar bekletilir.
+    Akış bittiğinde 'finish' çağrılır; sonuç her zaman parse_response ile aynıdır.
+    """
+
+    CODE_START_TAG = "```python"
+    CODE_END_TAG = "```"
+    REASONING_TAG = "'''"
+
+    # Durumlar
+    SEEK_FENCE = "seek_fence"
+    AFTER_FENCE = "after_fence"
+    REASONING = "reasoning"
+    CODE = "code"
+    DONE = "done"
+
+    def __init__(self):
+        self.state = self.SEEK_FENCE
+        self.full_text = []
+        self.buffer = ""
+        # finish() çağrıldığında kod bloğu açık kaldıysa (kapanış etiketi gelmediyse) True.
+        self.open_block = False
+
+    def feed(self, chunk: str) -> list:
+        """Yeni bir parçayı işler ve oluşan olayların listesini döndürür."""
+        self.full_text.append(chunk)
+        if self.state == self.DONE:
+            return []
+        self.buffer += chunk
+        events = []
+        while True:
+            before = (self.state, len(self.buffer))
+            self._step(events)
+            if (self.state, len(self.buffer)) == before:
+                break
+        return events
+
+    def _emit(self, events: list, kind: str, text: str):
+        if text:
+            events.append((kind, text))
+
+    def _emit_until(self, events: list, kind: str, tag: str, next_state: str):
+        """'tag' bulunana kadar tampondaki metni olay olarak üretir."""
+        index = self.buffer.find(tag)
+        if index != -1:
+            self._emit(events, kind, self.buffer[:index])
+            self.buffer = self.buffer[index + len(tag):]
+            self.state = next_state
+            return
+        # Etiketin başlangıcı olabilecek son karakterleri sakla.
+        safe = len(self.buffer) - (len(tag) - 1)
+        if safe > 0:
+            self._emit(events, kind, self.buffer[:safe])
+            self.buffer = self.buffer[safe:]
+
+    def _step(self, events: list):
+        if self.state == self.SEEK_FENCE:
+            self._emit_until(events, "text", self.CODE_START_TAG, self.AFTER_FENCE)
+        elif self.state == self.AFTER_FENCE:
+            # Düşünce süreci olup olmadığını anlamak için ilk 3 anlamlı karakteri bekle.
+            stripped = self.buffer.lstrip()
+            if len(stripped) < len(self.REASONING_TAG):
+                return
+            if stripped.startswith(self.REASONING_TAG):
+                self.buffer = stripped[len(self.REASONING_TAG):]
+                self.state = self.REASONING
+            else:
+                self.buffer = stripped
+                self.state = self.CODE
+        elif self.state == self.REASONING:
+            self._emit_until(events, "reasoning", self.REASONING_TAG, self.CODE)
+        elif self.state == self.CODE:
+            self._emit_until(events, "code", self.CODE_END_TAG, self.DONE)
+            if self.state == self.DONE:
+                self.buffer = ""
+
+    def finish(self) -> tuple[list, tuple]:
+        """
+        Akışı sonlandırır. Bekletilen son karakterleri olay olarak döndürür ve
+        tam metin üzerinde parse_response sonucunu verir: (olaylar, (plain_text, reasoning, code)).
+        """
+        events = []
+        self.open_block = self.state in (self.AFTER_FENCE, self.REASONING, self.CODE)
+        if self.buffer and self.state != self.DONE:
+            kind = {self.SEEK_FENCE: "text", self.REASONING: "reasoning"}.get(self.state, "code")
+            self._emit(events, kind, self.buffer)
+        self.buffer = ""
+        self.state = self.DONE
+        return events, parse_response(self.text)
+
+    @property
+    def text(self) -> str:
+        """Şimdiye kadar gelen tüm parçaların birleşimi."""
+        return "".join(self.full_text)
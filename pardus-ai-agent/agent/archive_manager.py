@@ -1,9 +1,81 @@
 # agent/archive_manager.py
-import os
+# Etkileşim arşivi.
+#
+# Eskiden her etkileşim, saniye çözünürlüklü zaman damgasıyla adlandırılmış ayrı
+# bir klasöre (3 dosya) yazılıyordu. Aynı saniyedeki iki işlem birbirinin üzerine
+# yazıyor, uzun süre kullanılan makinelerde on binlerce klasör birikiyor ve
+# arşivde arama yapmanın tek yolu dosya sistemini taramak oluyordu.
+#
+# Artık tüm etkileşimler tek bir SQLite veritabanına (agent_archive/archive.db)
+# sadece ekleme (append-only) yapılarak yazılır. İstem, düşünce süreci, kod ve
+# çıktı üzerinde bir tam metin (FTS5) dizini tutulur; böylece '/history <sorgu>'
+# komutu yüz binlerce kayıt üzerinde milisaniyeler içinde cevap verir.
+# Eski klasör düzeni, arşiv ilk açıldığında otomatik olarak içe aktarılır
+# (eski klasörler silinmez).
+#
+# Yazma işlemi isteğe bağlı olarak bir arka plan yazıcısına (ArchiveWriter)
+# devredilebilir. Bu durumda log_interaction kaydı sadece sınırlı bir kuyruğa
+# koyar ve hemen döner; disk (örn. NFS üzerindeki ev dizini) ne kadar yavaş
+# olursa olsun bir sonraki istem beklemez.
+import atexit
 import datetime
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
 
 # Tüm arşivlerin toplanacağı ana klasörün adı.
 ARCHIVE_DIR = "agent_archive"
+# Arşiv veritabanının dosya adı (ARCHIVE_DIR içinde).
+ARCHIVE_DB_NAME = "archive.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid         TEXT NOT NULL UNIQUE,
+    created_at  TEXT NOT NULL,
+    prompt      TEXT NOT NULL,
+    reasoning   TEXT,
+    code        TEXT,
+    stdout      TEXT,
+    stderr      TEXT,
+    returncode  INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Tam metin dizini. 'content' ile asıl tabloya bağlanır; metin iki kez saklanmaz.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+    prompt, reasoning, code, output,
+    content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Arka plan yazıcısının varsayılan ayarları.
+DEFAULT_QUEUE_SIZE = 1000     # Kuyrukta bekleyebilecek en fazla kayıt.
+DEFAULT_BATCH_SIZE = 64       # Tek bir işlemde (transaction) yazılacak en fazla kayıt.
+DEFAULT_FLUSH_INTERVAL = 0.5  # Bir kaydın kuyrukta bekleyebileceği en uzun süre (saniye).
+DEFAULT_BLOCK_TIMEOUT = 0.05  # Kuyruk doluyken kaydı bırakmadan önce beklenecek süre (saniye).
+
+# fsync politikası -> SQLite 'synchronous' ayarı.
+#   off:    diske zorlamaz; en hızlısı, elektrik kesintisinde son kayıtlar kaybolabilir.
+#   normal: WAL kontrol noktalarında fsync (varsayılan).
+#   full:   her toplu yazma (batch) sonunda fsync.
+FSYNC_POLICIES = {"off": "OFF", "normal": "NORMAL", "full": "FULL"}
+
+_connection = None
+_connection_path = None
+_has_fts = False
+_lock = threading.Lock()
+_synchronous = "NORMAL"
+_writer = None
+
 
 def ensure_archive_dir_exists():
     """
@@ -12,53 +84,461 @@ def ensure_archive_dir_exists():
     """
     os.makedirs(ARCHIVE_DIR, exist_ok=True)
 
+
+def _db_path() -> str:
+    return os.path.abspath(os.path.join(ARCHIVE_DIR, ARCHIVE_DB_NAME))
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Arşiv veritabanı bağlantısını döndürür. Bağlantı ilk çağrıda açılır, şema
+    oluşturulur ve (gerekirse) eski klasör düzeni içe aktarılır.
+    """
+    global _connection, _connection_path, _has_fts
+    path = _db_path()
+    if _connection is not None and _connection_path == path:
+        return _connection
+    ensure_archive_dir_exists()
+    # API sunucusu arşive farklı iş parçacıklarından yazar; erişim _lock ile korunur.
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={_synchronous}")
+    conn.executescript(SCHEMA)
+    try:
+        conn.executescript(FTS_SCHEMA)
+        _has_fts = True
+    except sqlite3.OperationalError:
+        # SQLite FTS5 desteği olmadan derlenmişse arama LIKE ile yapılır.
+        _has_fts = False
+    conn.commit()
+    _connection, _connection_path = conn, path
+    migrate_legacy_archive(conn)
+    return conn
+
+
+def close():
+    """Açık veritabanı bağlantısını kapatır."""
+    global _connection, _connection_path
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _connection, _connection_path = None, None
+
+
+def _new_uid(now: datetime.datetime) -> str:
+    # Zaman damgası sıralanabilirlik, rastgele kısım ise benzersizlik sağlar.
+    return now.strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:12]
+
+
+def _insert(conn, uid, created_at, prompt, reasoning, code, stdout, stderr, returncode) -> int:
+    cursor = conn.execute(
+        "INSERT OR IGNORE INTO interactions (uid, created_at, prompt, reasoning, code, stdout, stderr, returncode) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (uid, created_at, prompt, reasoning, code, stdout, stderr, returncode),
+    )
+    if cursor.rowcount == 0:
+        return None # Bu kayıt zaten var (örn. tekrar çalışan bir göç).
+    row_id = cursor.lastrowid
+    if _has_fts:
+        conn.execute(
+            "INSERT INTO interactions_fts (rowid, prompt, reasoning, code, output) VALUES (?, ?, ?, ?, ?)",
+            (row_id, prompt, reasoning or "", code or "", f"{stdout or ''}\n{stderr or ''}"),
+        )
+    return row_id
+
+
+def set_fsync_policy(policy: str):
+    """Arşiv veritabanının fsync politikasını ('off', 'normal', 'full') ayarlar."""
+    global _synchronous
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Geçersiz fsync politikası: {policy} ({', '.join(FSYNC_POLICIES)})")
+    with _lock:
+        _synchronous = FSYNC_POLICIES[policy]
+        if _connection is not None:
+            _connection.execute(f"PRAGMA synchronous={_synchronous}")
+
+
+def _new_record(prompt, reasoning, code, stdout, stderr, returncode) -> tuple:
+    # Zaman damgası kaydın yazıldığı değil, oluştuğu anı göstersin.
+    now = datetime.datetime.now()
+    return (_new_uid(now), now.isoformat(timespec="seconds"),
+            prompt, reasoning, code, stdout, stderr, returncode)
+
+
+def _write_batch(records: list) -> list:
+    """Kayıtları tek bir işlemde (transaction) yazar ve satır numaralarını döndürür."""
+    with _lock:
+        conn = get_connection()
+        with conn: # Tablo ve dizin birlikte güncellenir; fsync işlem başına bir kez yapılır.
+            return [_insert(conn, *record) for record in records]
+
+
+class ArchiveWriter:
+    """
+    Arşiv kayıtlarını arka planda, toplu halde yazan iş parçacığı.
+
+    Kayıtlar sınırlı bir kuyruğa alınır. Yazıcı ilk kaydı aldıktan sonra
+    'flush_interval' süresi dolana ya da 'batch_size' kayda ulaşana kadar
+    bekleyip hepsini tek işlemde yazar. Kuyruk doluysa çağıran en fazla
+    'block_timeout' kadar bekletilir (geri basınç); yine yer açılmazsa kayıt
+    bırakılır (drop) ve sayaçlara işlenir.
+
+    Args:
+        queue_size (int): Kuyruğun kapasitesi.
+        batch_size (int): Bir işlemde yazılacak en fazla kayıt.
+        flush_interval (float): Bir kaydın diske yazılmadan önce bekleyebileceği en uzun süre.
+        block_timeout (float): Kuyruk doluyken beklenecek en uzun süre (0: hiç bekleme).
+    """
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+    ):
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        # Sayaçlar
+        self.enqueued = 0   # Kuyruğa alınan kayıt
+        self.written = 0    # Veritabanına yazılan kayıt
+        self.failed = 0     # Yazma hatası nedeniyle kaybolan kayıt
+        self.dropped = 0    # Kuyruk dolu olduğu için bırakılan kayıt
+        self.blocked = 0    # Kuyruk dolu olduğu için çağıranın bekletildiği durum
+        self.batches = 0    # Yapılan toplu yazma (transaction) sayısı
+        self.max_depth = 0  # Görülen en yüksek kuyruk derinliği
+        self._done = threading.Condition()
+        self._flush_now = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: tuple) -> bool:
+        """Kaydı kuyruğa alır. Kayıt bırakıldıysa False döner."""
+        if self._stopping:
+            return False
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._done:
+                self.blocked += 1
+            try:
+                if self.block_timeout <= 0:
+                    raise queue.Full
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                with self._done:
+                    self.dropped += 1
+                return False
+        with self._done:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def _collect(self) -> list:
+        # İlk kaydı bekle, ardından süre dolana veya parti dolana kadar topla.
+        try:
+            batch = [self.queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._flush_now.is_set() or self._stopping:
+                # Bekleme süresi doldu; kuyrukta hazır olanları da alıp yaz.
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    pass
+                break
+            try:
+                batch.append(self.queue.get(timeout=min(remaining, 0.05)))
+            except queue.Empty:
+                pass
+        return batch
+
+    def _run(self):
+        while not (self._stopping and self.queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                _write_batch(batch)
+                written, failed = len(batch), 0
+            except Exception as e:
+                written, failed = 0, len(batch)
+                print(f"UYARI: Arşivleme sırasında bir hata oluştu: {e}")
+            with self._done:
+                self.written += written
+                self.failed += failed
+                self.batches += 1
+                self._done.notify_all()
+
+    def pending(self) -> int:
+        """Kuyruğa alınmış ama henüz işlenmemiş kayıt sayısı."""
+        with self._done:
+            return self.enqueued - self.written - self.failed
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Şu ana kadar kuyruğa alınmış tüm kayıtlar yazılana kadar bekler.
+        Süre dolmadan tamamlandıysa True döner.
+        """
+        with self._done:
+            target = self.enqueued
+        self._flush_now.set()
+        try:
+            with self._done:
+                return self._done.wait_for(
+                    lambda: self.written + self.failed >= target or not self._thread.is_alive(),
+                    timeout,
+                ) and self.written + self.failed >= target
+        finally:
+            self._flush_now.clear()
+
+    def stop(self, timeout: float = 10.0):
+        """Yeni kayıt kabulünü durdurur, kuyruğu boşaltır ve iş parçacığını sonlandırır."""
+        self._stopping = True
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._done:
+            return {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "blocked": self.blocked,
+                "batches": self.batches,
+                "queue_depth": self.queue.qsize(),
+                "max_queue_depth": self.max_depth,
+            }
+
+
+def start_background_writer(
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+    fsync: str = None,
+) -> ArchiveWriter:
+    """
+    Arka plan yazıcısını başlatır. Bundan sonra log_interaction kayıtları
+    kuyruğa alır ve hemen döner. Program kapanırken kuyruk otomatik boşaltılır.
+    """
+    global _writer
+    if fsync is not None:
+        set_fsync_policy(fsync)
+    if _writer is None:
+        _writer = ArchiveWriter(queue_size, batch_size, flush_interval, block_timeout)
+        atexit.register(stop_background_writer)
+    return _writer
+
+
+def stop_background_writer(timeout: float = 10.0):
+    """Bekleyen kayıtları yazar ve senkron yazma moduna döner."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop(timeout)
+        if writer.pending():
+            print(f"UYARI: {writer.pending()} arşiv kaydı yazılamadan kapatıldı.")
+
+
+def flush(timeout: float = None) -> bool:
+    """Arka plan yazıcısı varsa kuyruktaki kayıtların yazılmasını bekler."""
+    return _writer.flush(timeout) if _writer is not None else True
+
+
+def writer_stats() -> dict:
+    """Arka plan yazıcısının sayaçları (yazıcı kapalıysa boş sözlük)."""
+    return _writer.stats() if _writer is not None else {}
+
+
 def log_interaction(
     prompt: str,
     reasoning: str,
     code: str,
     stdout: str,
-    stderr: str
+    stderr: str,
+    returncode: int = None,
+    verbose: bool = True,
 ):
     """
-    Bir etkileşimin tüm detaylarını zaman damgalı bir klasöre kaydeder.
-    
+    Bir etkileşimin tüm detaylarını arşiv veritabanına kaydeder.
+    Arka plan yazıcısı açıksa kayıt sadece kuyruğa alınır.
+
     Args:
         prompt (str): Kullanıcının orijinal isteği.
         reasoning (str): AI'ın düşünce süreci ve planı.
         code (str): AI tarafından üretilen ve çalıştırılan Python kodu.
         stdout (str): Çalıştırılan kodun standart çıktısı.
         stderr (str): Çalıştırılan kodun ürettiği hata mesajları.
+        returncode (int): Kodun çıkış kodu (bilinmiyorsa None).
+        verbose (bool): Arşivleme sonrası kullanıcıya bilgi mesajı basılsın mı.
+
+    Returns:
+        int: Kaydın arşivdeki numarası (hata durumunda ya da kayıt kuyruğa
+        alındığında None; numara henüz belli değildir).
     """
     try:
-        ensure_archive_dir_exists()
-        
-        # Benzersiz ve sıralanabilir bir klasör adı için zaman damgası oluşturuyoruz.
-        # Format: YYYYMMDD_HHMMSS (YılAyGün_SaatDakikaSaniye)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        session_dir = os.path.join(ARCHIVE_DIR, timestamp)
-        os.makedirs(session_dir, exist_ok=True)
-
-        # 1. Kullanıcının ne istediğini kaydet.
-        with open(os.path.join(session_dir, "prompt.txt"), "w", encoding='utf-8') as f:
-            f.write(prompt)
-            
-        # 2. AI'ın ne düşündüğünü ve hangi kodu ürettiğini kaydet.
-        # Bu dosyanın uzantısını .py yaparak kodun renklendirilmesini kolaylaştırıyoruz.
-        with open(os.path.join(session_dir, "reasoning_and_code.py"), "w", encoding='utf-8') as f:
-            f.write(f"# --- AI Düşünce Süreci ---\n'''\n{reasoning}\n'''\n\n")
-            f.write("# --- Üretilen Kod ---\n")
-            f.write(code)
-
-        # 3. Kodun çalıştırılması sonucunda ne olduğunu kaydet.
-        with open(os.path.join(session_dir, "output.log"), "w", encoding='utf-8') as f:
-            f.write("--- STDOUT (Standart Çıktı) ---\n")
-            f.write(stdout)
-            f.write("\n\n--- STDERR (Hata Çıktısı) ---\n")
-            f.write(stderr)
-            
-        print(f"🗂️  Bu işlem şuraya arşivlendi: {session_dir}")
+        record = _new_record(prompt, reasoning, code, stdout, stderr, returncode)
+        writer = _writer
+        if writer is not None:
+            if writer.submit(record):
+                if verbose:
+                    print("🗂️  Bu işlem arşivleniyor (arka planda).")
+            elif verbose:
+                # Bırakılan kayıtlar ayrıca writer_stats()['dropped'] sayacında görünür.
+                print("UYARI: Arşiv kuyruğu dolu, bu işlem arşivlenemedi.")
+            return None
+        row_id = _write_batch([record])[0]
+        if verbose:
+            print(f"🗂️  Bu işlem arşivlendi: #{row_id} ({_db_path()})")
+        return row_id
 
     except Exception as e:
         # Arşivleme sırasında bir hata olursa programın çökmesini engelle.
         # Sadece bir uyarı mesajı yazdır.
-        print(f"UYARI: Arşivleme sırasında bir hata oluştu: {e}")
\ No newline at end of file
+        print(f"UYARI: Arşivleme sırasında bir hata oluştu: {e}")
+        return None
+
+
+def _fts_query(query: str) -> str:
+    """
+    Kullanıcının yazdığı serbest metni güvenli bir FTS5 sorgusuna çevirir.
+    Her kelime tırnak içine alınır (özel karakterler sorgu sözdizimini bozmasın);
+    son kelime önek (prefix) olarak aranır.
+    """
+    terms = [t.replace('"', '""') for t in query.split() if t.strip()]
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(query: str = "", limit: int = 10) -> list:
+    """
+    Arşivde arama yapar. Sorgu boşsa en son kayıtları döndürür.
+    Sonuçlar en yeniden eskiye doğru sıralanır.
+
+    Returns:
+        list[dict]: id, uid, created_at, prompt, returncode alanlarını içeren kayıtlar.
+    """
+    columns = "i.id, i.uid, i.created_at, i.prompt, i.returncode"
+    with _lock:
+        conn = get_connection()
+        match = _fts_query(query) if query else ""
+        if not match:
+            rows = conn.execute(
+                f"SELECT {columns} FROM interactions i ORDER BY i.id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        elif _has_fts:
+            rows = conn.execute(
+                f"SELECT {columns} FROM interactions_fts f JOIN interactions i ON i.id = f.rowid "
+                "WHERE interactions_fts MATCH ? ORDER BY f.rowid DESC LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        else:
+            pattern = f"%{query}%"
+            rows = conn.execute(
+                f"SELECT {columns} FROM interactions i WHERE i.prompt LIKE ? OR i.code LIKE ? "
+                "OR i.reasoning LIKE ? ORDER BY i.id DESC LIMIT ?",
+                (pattern, pattern, pattern, limit),
+            ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_interaction(row_id: int) -> dict or None:
+    """Verilen numaralı kaydın tüm alanlarını döndürür."""
+    with _lock:
+        row = get_connection().execute("SELECT * FROM interactions WHERE id = ?", (row_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def recent_actions(limit: int = 500) -> list:
+    """
+    Betik içeren en son 'limit' kaydı (en yeniden eskiye) döndürür.
+
+    Returns:
+        list[dict]: id, prompt, reasoning, code, returncode alanlarını içeren kayıtlar.
+    """
+    with _lock:
+        rows = get_connection().execute(
+            "SELECT id, prompt, reasoning, code, returncode FROM interactions "
+            "WHERE code IS NOT NULL AND code != '' ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def count() -> int:
+    """Arşivdeki toplam kayıt sayısı."""
+    with _lock:
+        return get_connection().execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+
+# --- Eski klasör düzeninden göç ---
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def _parse_legacy_dir(session_dir: str) -> tuple:
+    """Eski düzendeki bir etkileşim klasörünü (prompt, reasoning, code, stdout, stderr) olarak okur."""
+    prompt = _read(os.path.join(session_dir, "prompt.txt"))
+
+    reasoning, code = "", _read(os.path.join(session_dir, "reasoning_and_code.py"))
+    code_marker = "# --- Üretilen Kod ---\n"
+    if code_marker in code:
+        head, code = code.split(code_marker, 1)
+        head = head.replace("# --- AI Düşünce Süreci ---\n", "", 1).strip()
+        if head.startswith("'''") and head.endswith("'''"):
+            head = head[3:-3]
+        reasoning = head.strip()
+
+    output = _read(os.path.join(session_dir, "output.log"))
+    output = output.replace("--- STDOUT (Standart Çıktı) ---\n", "", 1)
+    stdout, _, stderr = output.partition("\n\n--- STDERR (Hata Çıktısı) ---\n")
+    return prompt, reasoning, code, stdout, stderr
+
+
+def migrate_legacy_archive(conn: sqlite3.Connection = None) -> int:
+    """
+    ARCHIVE_DIR altındaki eski 'YYYYMMDD_HHMMSS/' klasörlerini veritabanına aktarır.
+    Her klasör 'legacy_<klasör adı>' kimliğiyle eklenir; tekrar çalıştırmak güvenlidir.
+    Eski klasörler silinmez. Geriye aktarılan kayıt sayısını döndürür.
+    """
+    conn = conn or get_connection()
+    if conn.execute("SELECT value FROM meta WHERE key = 'legacy_migrated'").fetchone():
+        return 0
+    migrated = 0
+    try:
+        names = sorted(os.listdir(ARCHIVE_DIR))
+    except FileNotFoundError:
+        names = []
+    with conn:
+        for name in names:
+            session_dir = os.path.join(ARCHIVE_DIR, name)
+            if not os.path.isfile(os.path.join(session_dir, "prompt.txt")):
+                continue
+            try:
+                created_at = datetime.datetime.strptime(name, "%Y%m%d_%H%M%S").isoformat()
+            except ValueError:
+                created_at = datetime.datetime.fromtimestamp(os.path.getmtime(session_dir)).isoformat(timespec="seconds")
+            prompt, reasoning, code, stdout, stderr = _parse_legacy_dir(session_dir)
+            if _insert(conn, f"legacy_{name}", created_at, prompt, reasoning, code, stdout, stderr, None):
+                migrated += 1
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', ?)",
+                     (datetime.datetime.now().isoformat(timespec="seconds"),))
+    if migrated:
+        print(f"🗂️  Eski arşivden {migrated} kayıt veritabanına aktarıldı.")
+    return migrated
@@ -0,0 +1,94 @@
+# agent/backends.py
+# Model arka uçları (backend).
+#
+# Ajanın geri kalanı modelden sadece iki şey bekler: 'start_chat(history)' ile
+# bir sohbet oturumu açmak ve bu oturumda 'send_message(mesaj, stream)' çağırmak.
+# Bu arayüz ModelBackend sınıfında tanımlanır. Gemini bunun bir uygulamasıdır;
+# API anahtarı gerektirmeyen, deterministik yerel arka uç (stub_model.StubModel)
+# ise testler ve performans ölçümleri için kullanılır.
+#
+# Hangi arka ucun kullanılacağı yapılandırmadaki "backend" anahtarıyla seçilir
+# ("gemini" varsayılan, "local" yerel sahte model).
+
+
+class ModelBackend:
+    """
+    Tüm model arka uçlarının uyması gereken arayüz.
+
+    'start_chat' tarafından döndürülen sohbet nesnesi şunları sağlamalıdır:
+      - 'history' alanı (Gemini formatında mesaj listesi, yazılabilir)
+      - 'send_message(message, stream=False)': stream=False iken '.text' alanı
+        olan bir cevap, stream=True iken '.text' alanı olan parçaların
+        üzerinde dönülebilen bir nesne.
+    """
+
+    # Kullanıcıya gösterilecek kısa ad.
+    name = "backend"
+
+    def start_chat(self, history=None):
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        """Arka ucu tek satırda tanımlar (örn. karşılama mesajı için)."""
+        return self.name
+
+
+class GeminiBackend(ModelBackend):
+    """
+    Google Gemini arka ucu. google.generativeai kütüphanesi sadece bu arka uç
+    kullanıldığında içe aktarılır.
+
+    Args:
+        api_key (str): Google AI API anahtarı.
+        model_name (str): Model adı (örn. "models/gemini-2.5-flash").
+        system_prompt (str): Modelin sistem talimatı.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str, system_prompt: str):
+        import google.generativeai as genai
+
+        # API anahtarını Google kütüphanesine tanıtıyoruz.
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        # Seçilen model adı ve sistem talimatı ile AI model nesnesini oluşturuyoruz.
+        self.model = genai.GenerativeModel(model_name=model_name, system_instruction=system_prompt)
+
+    def start_chat(self, history=None):
+        return self.model.start_chat(history=history)
+
+    def describe(self) -> str:
+        return self.model_name
+
+
+def describe_config(config: dict) -> str:
+    """Arka ucu oluşturmadan, yapılandırmadan kısa bir model adı üretir."""
+    if config.get("backend", "gemini") == "gemini":
+        return config.get("model_name", "gemini")
+    return "yerel sahte model"
+
+
+def create_backend(config: dict, system_prompt: str) -> ModelBackend:
+    """
+    Yapılandırmaya göre uygun arka ucu oluşturur.
+
+    "backend": "local" için kullanılan isteğe bağlı anahtarlar:
+      - "local_latency": ilk parçadan önceki gecikme (saniye)
+      - "local_tokens_per_second": üretim hızı (0: beklemeden)
+      - "local_script": hazır cevapları içeren JSON dosyasının yolu
+        (bkz. stub_model.load_script)
+    """
+    kind = config.get("backend", "gemini")
+    if kind == "gemini":
+        return GeminiBackend(config["api_key"], config["model_name"], system_prompt)
+    if kind == "local":
+        from . import stub_model
+        responses, rules = stub_model.load_script(config["local_script"]) if config.get("local_script") else (None, None)
+        return stub_model.StubModel(
+            latency=config.get("local_latency", 0.0),
+            tokens_per_second=config.get("local_tokens_per_second", 0),
+            responses=responses,
+            rules=rules,
+        )
+    raise ValueError(f"Bilinmeyen model arka ucu: {kind} (gemini, local)")
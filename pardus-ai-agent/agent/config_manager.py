@@ -1,7 +1,6 @@
 # agent/config_manager.py
 import json
 import os
-from getpass import getpass
 
 # Pardus ve genel Linux standartlarına uygun olarak, yapılandırma dosyasını
 # kullanıcının ev dizinindeki .config klasörünün altına yerleştiriyoruz.
@@ -59,6 +58,8 @@ def prompt_for_config() -> dict:
     print("\n--- Pardus AI Asistanı Kurulumu ---")
     print("Google AI Studio'dan (https://aistudio.google.com/app/apikey) bir API anahtarı almanız gerekmektedir.")
     
+    from getpass import getpass # Sadece kurulum sırasında gerekli; açılışı yavaşlatmasın.
+
     # getpass kullanarak, kullanıcı API anahtarını yazarken ekranda görünmesini engelliyoruz.
     # Bu, temel bir güvenlik önlemidir.
     api_key = getpass("Lütfen Google AI API Anahtarınızı girin: ")
@@ -0,0 +1,174 @@
+# agent/history_manager.py
+# Sohbet geçmişini bir token bütçesi içinde tutan yardımcı modül.
+# Uzun oturumlarda her istekte tüm geçmişin yeniden gönderilmesi hem yavaşlığa
+# hem de bağlam sınırının aşılmasına yol açar. Bu modül, her tur için tahmini
+# bir token sayısı tutar; bütçe aşıldığında en eski turları kısa bir özete
+# (digest) katlayarak geçmişin boyutunu sabit tutar.
+
+# Varsayılan toplam geçmiş bütçesi (tahmini token).
+DEFAULT_TOKEN_BUDGET = 6000
+# Bir mesajın geçmişte kaplayabileceği en fazla token. Daha uzun mesajlar
+# (örn. 'apt update' çıktısı taşıyan istemler) baştan ve sondan kırpılır.
+DEFAULT_MAX_TURN_TOKENS = 1500
+# Özetin (digest) kaplayabileceği en fazla token.
+DEFAULT_DIGEST_TOKENS = 600
+# Bütçe ne olursa olsun asla özetlenmeyen son tur sayısı.
+DEFAULT_KEEP_RECENT_TURNS = 2
+
+# Kabaca 4 karakter = 1 token. Gerçek tokenizer'a gitmeden ucuz bir tahmin verir.
+CHARS_PER_TOKEN = 4
+
+CLIP_MARKER = "\n[... {} karakter kırpıldı ...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Verilen metnin yaklaşık token sayısını döndürür."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def clip_text(text: str, max_tokens: int) -> str:
+    """
+    Metni, baş ve son kısmını koruyarak en fazla 'max_tokens' boyutuna indirir.
+    Komut çıktılarında genellikle hem ilk satırlar hem de son satırlar (hata
+    mesajları) önemlidir; bu yüzden ortadaki kısım atılır.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    head = max_chars // 2
+    tail = max_chars - head
+    removed = len(text) - head - tail
+    return text[:head] + CLIP_MARKER.format(removed) + text[-tail:]
+
+
+def _first_line(text: str, prefix: str = "") -> str:
+    """Metindeki (isteğe bağlı ön eki atılmış) ilk boş olmayan satırı döndürür."""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("```") or line == "'''":
+            continue
+        if prefix and line.startswith(prefix):
+            line = line[len(prefix):].strip()
+        return line[:160]
+    return ""
+
+
+class HistoryManager:
+    """
+    Gemini sohbet geçmişini token bütçesi içinde tutar ve sohbet oturumunu
+    (ChatSession) turlar arasında yeniden kullanır.
+
+    Geçmiş, (rol, metin, token) üçlülerinden oluşan bir liste olarak tutulur.
+    Toplam tahmini token sayısı bütçeyi aştığında en eski tur çiftleri
+    tek satırlık özetlere dönüştürülerek 'digest' içine katlanır.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_turn_tokens: int = DEFAULT_MAX_TURN_TOKENS,
+        digest_tokens: int = DEFAULT_DIGEST_TOKENS,
+        keep_recent_turns: int = DEFAULT_KEEP_RECENT_TURNS,
+    ):
+        self.token_budget = token_budget
+        self.max_turn_tokens = max_turn_tokens
+        self.digest_tokens = digest_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.turns = []        # [{"role": ..., "text": ..., "tokens": ...}, ...]
+        self.digest_lines = [] # Özetlenmiş eski turların kısa açıklamaları.
+        self.total_tokens = 0  # 'turns' içindeki mesajların tahmini toplamı.
+        self.evicted_turns = 0 # İstatistik için: özete katlanan tur sayısı.
+        self.chat = None       # Yeniden kullanılan sohbet oturumu.
+        self._chat_model = None
+
+    # --- Sohbet oturumu ---
+
+    def get_chat(self, model):
+        """
+        Verilen model için sohbet oturumunu döndürür. Oturum ilk çağrıda bir kez
+        oluşturulur; sonraki turlarda aynı nesne kullanılır.
+        """
+        if self.chat is None or self._chat_model is not model:
+            self.chat = model.start_chat(history=self.as_messages())
+            self._chat_model = model
+        return self.chat
+
+    def discard_chat(self):
+        """Oturumu bırakır; bir sonraki turda kompakt geçmişle yeniden kurulur."""
+        self.chat = None
+        self._chat_model = None
+
+    def _sync_chat(self):
+        """Oturumun geçmişini, yöneticinin kompakt geçmişiyle değiştirir."""
+        if self.chat is not None:
+            self.chat.history = self.as_messages()
+
+    # --- Geçmiş yönetimi ---
+
+    def _append(self, role: str, text: str):
+        text = clip_text(text or "", self.max_turn_tokens)
+        tokens = estimate_tokens(text)
+        self.turns.append({"role": role, "text": text, "tokens": tokens})
+        self.total_tokens += tokens
+
+    def record(self, prompt: str, response: str):
+        """
+        Bir turu (kullanıcı istemi + model cevabı) geçmişe ekler, gerekirse eski
+        turları özete katlar ve sohbet oturumunu güncel geçmişle eşitler.
+        """
+        self._append("user", prompt)
+        self._append("model", response)
+        self._enforce_budget()
+        self._sync_chat()
+
+    def digest_text(self) -> str:
+        """Özetlenmiş eski turları tek bir metin olarak döndürür."""
+        if not self.digest_lines:
+            return ""
+        return "Önceki konuşmanın özeti:\n" + "\n".join(self.digest_lines)
+
+    def prompt_tokens(self) -> int:
+        """Bir sonraki istekte modele gidecek geçmişin tahmini token sayısı."""
+        return self.total_tokens + estimate_tokens(self.digest_text())
+
+    def _enforce_budget(self):
+        # Son 'keep_recent_turns' tur çifti her zaman korunur.
+        min_messages = self.keep_recent_turns * 2
+        while self.prompt_tokens() > self.token_budget and len(self.turns) > min_messages:
+            user_turn = self.turns.pop(0)
+            model_turn = self.turns.pop(0) if self.turns else {"text": "", "tokens": 0}
+            self.total_tokens -= user_turn["tokens"] + model_turn["tokens"]
+            self.evicted_turns += 1
+            self._add_digest_line(user_turn["text"], model_turn["text"])
+
+    def _add_digest_line(self, prompt: str, response: str):
+        request = _first_line(prompt, "Kullanıcı İsteği:") or "(boş istek)"
+        answer = _first_line(response) or "(boş cevap)"
+        self.digest_lines.append(f"- İstek: {request} -> Cevap: {answer}")
+        # Özet de kendi bütçesini aşarsa en eski satırlar atılır.
+        while len(self.digest_lines) > 1 and estimate_tokens(self.digest_text()) > self.digest_tokens:
+            self.digest_lines.pop(0)
+
+    def as_messages(self) -> list:
+        """Geçmişi Gemini'nin beklediği [{"role", "parts"}] formatına çevirir."""
+        messages = []
+        digest = self.digest_text()
+        if digest:
+            messages.append({"role": "user", "parts": [digest]})
+            messages.append({"role": "model", "parts": ["Anlaşıldı, bu özeti dikkate alacağım."]})
+        for turn in self.turns:
+            messages.append({"role": turn["role"], "parts": [turn["text"]]})
+        return messages
+
+    def reset(self):
+        """Tüm geçmişi ve özeti temizler. Sohbet oturumu bir sonraki turda yeniden kurulur."""
+        self.turns = []
+        self.digest_lines = []
+        self.total_tokens = 0
+        self.evicted_turns = 0
+        self.discard_chat()
+
+    def __len__(self):
+        return len(self.turns)
@@ -0,0 +1,209 @@
+# agent/interpreter_pool.py
+# Önceden başlatılmış (pre-warmed) Python yorumlayıcılarından oluşan bir havuz.
+#
+# Her onaylanan betik için sıfırdan 'python3' başlatmak, yorumlayıcının açılış
+# süresini ve 'subprocess', 'shutil', 'requests' gibi modüllerin içe aktarma
+# süresini her seferinde kullanıcıya ödetir. Bu havuz, işçi (worker)
+# yorumlayıcıları kullanıcı daha betiği onaylamadan arka planda başlatır ve bu
+# modülleri önceden yükler. Betik işçiye geçici dosya olmadan, stdin borusu
+# (pipe) üzerinden gönderilir.
+#
+# Yalıtım için her işçi yalnızca BİR betik çalıştırır; betik bittiğinde işçi
+# sonlanır ve yerine hemen yenisi başlatılır. Böylece bir betiğin değiştirdiği
+# global durum (içe aktarılan modüller, ortam değişkenleri vb.) bir sonrakine
+# sızmaz.
+import collections
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+# İşçileri başlatmak için kullanılan yorumlayıcı (action_executor ile aynı).
+PYTHON_EXECUTABLE = "python3"
+
+# Hata mesajlarında (traceback) betiğin adı olarak görünecek isim.
+SCRIPT_FILENAME = "<pardus-agent-script>"
+
+# Havuzdaki işçilerin önceden yükleyeceği modüller.
+PRELOAD_MODULES = ("subprocess", "shutil", "requests")
+
+# İşçi yorumlayıcının çalıştırdığı kod. 'python3 -c' ile verilir; önce modülleri
+# yükler, sonra stdin'den bir başlık satırı (JSON) ve betiğin kendisini bekler.
+WORKER_SOURCE = r'''
+import json, linecache, os, signal, sys, traceback
+for _name in %(preload)r:
+    try:
+        __import__(_name)
+    except ImportError:
+        pass
+_header = sys.stdin.buffer.readline()
+if not _header:
+    sys.exit(0)
+_meta = json.loads(_header)
+_code = sys.stdin.buffer.read().decode("utf-8")
+sys.stdin.close()
+sys.stdin = open(os.devnull)
+os.chdir(_meta["cwd"])
+_filename = %(filename)r
+linecache.cache[_filename] = (len(_code), None, _code.splitlines(True), _filename)
+_globals = {"__name__": "__main__", "__builtins__": __builtins__}
+try:
+    exec(compile(_code, _filename, "exec"), _globals)
+except SystemExit:
+    raise
+except KeyboardInterrupt as _e:
+    # Ctrl+C ile durdurulan betik, normal bir python3 gibi SIGINT ile çıkar.
+    traceback.print_exception(type(_e), _e, _e.__traceback__.tb_next)
+    sys.stderr.flush()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    os.kill(os.getpid(), signal.SIGINT)
+except BaseException as _e:
+    traceback.print_exception(type(_e), _e, _e.__traceback__.tb_next)
+    sys.exit(1)
+''' % {"preload": PRELOAD_MODULES, "filename": SCRIPT_FILENAME}
+
+
+def process_group_options(preexec_fn=None) -> dict:
+    """
+    Alt süreci ajanla aynı oturumda ama kendi süreç grubunda başlatan Popen
+    argümanları. Ayrı grup sayesinde betik ve başlattığı alt süreçler os.killpg
+    ile birlikte sonlandırılabilir. Arka plandaki bir grup terminalden okuyamaz
+    (SIGTTIN ile durur); betik çalışırken terminal terminal_foreground ile
+    gruba verilmelidir.
+    """
+    if sys.version_info >= (3, 11):
+        return {"process_group": 0, "preexec_fn": preexec_fn}
+
+    def preexec():
+        os.setpgid(0, 0)
+        if preexec_fn is not None:
+            preexec_fn()
+
+    return {"preexec_fn": preexec}
+
+
+def _set_terminal_owner(fd: int, pgid: int):
+    # Arka plandaki bir grup terminali devrederken SIGTTOU alır; geçiş
+    # sırasında bu iş parçacığında sinyal engellenir.
+    blocked = signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTTOU})
+    try:
+        os.tcsetpgrp(fd, pgid)
+    finally:
+        signal.pthread_sigmask(signal.SIG_SETMASK, blocked)
+
+
+@contextlib.contextmanager
+def terminal_foreground(pgid: int):
+    """
+    Çalışma süresince kontrol terminalini 'pgid' süreç grubuna verir (ön plan),
+    sonra ajana geri alır. Böylece betik terminalden okuyabilir ('sudo' parola
+    sorabilir, input() çalışır) ve Ctrl+C doğrudan betiğe gider. Terminal yoksa,
+    ajan ön planda değilse ya da ana iş parçacığında değilsek (paralel plan
+    adımları) hiçbir şey yapmaz. Terminal devredildiyse True verir.
+    """
+    try:
+        fd = sys.stdin.fileno()
+        owner = os.tcgetpgrp(fd) if os.isatty(fd) else None
+    except (AttributeError, ValueError, OSError):
+        owner = None
+    if owner != os.getpgrp() or threading.current_thread() is not threading.main_thread():
+        yield False
+        return
+    try:
+        _set_terminal_owner(fd, pgid)
+    except OSError:
+        # Süreç çoktan bitmiş olabilir.
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        try:
+            _set_terminal_owner(fd, owner)
+        except OSError:
+            pass
+
+
+class InterpreterPool:
+    """
+    Tek kullanımlık, önceden ısıtılmış işçi yorumlayıcı havuzu.
+
+    Args:
+        size (int): Her an hazırda bekletilecek işçi sayısı.
+        python (str): İşçileri başlatmak için kullanılacak yorumlayıcı.
+        preexec_fn (callable): İşçi başlamadan önce alt süreçte çalışacak fonksiyon
+            (örn. kaynak sınırlarını uygulamak için).
+    """
+
+    def __init__(self, size: int = 2, python: str = PYTHON_EXECUTABLE, preexec_fn=None):
+        self.size = max(1, size)
+        self.python = python
+        self.preexec_fn = preexec_fn
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.spawned = 0
+        self._fill()
+
+    def _spawn(self) -> subprocess.Popen:
+        self.spawned += 1
+        return subprocess.Popen(
+            [self.python, "-c", WORKER_SOURCE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Her işçi kendi süreç grubunda (ama ajanın oturumunda) çalışır;
+            # zaman aşımında betiğin başlattığı alt süreçlerle birlikte
+            # sonlandırılabilir. Betik çalışırken terminal bu gruba verilir.
+            **process_group_options(self.preexec_fn),
+        )
+
+    def _fill(self):
+        # Havuzdaki hazır işçi sayısını 'size' değerine tamamla.
+        while not self._closed and len(self._idle) < self.size:
+            self._idle.append(self._spawn())
+
+    def acquire(self) -> subprocess.Popen:
+        """
+        Hazırdaki bir işçiyi havuzdan alır ve yerine yenisini başlatır.
+        Hazırda canlı işçi yoksa hemen yeni bir tane başlatılır.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Yorumlayıcı havuzu kapatıldı.")
+            worker = None
+            while self._idle:
+                candidate = self._idle.popleft()
+                if candidate.poll() is None:
+                    worker = candidate
+                    break
+                # Beklerken ölmüş bir işçi: kaynaklarını temizle.
+                candidate.communicate()
+            if worker is None:
+                worker = self._spawn()
+            self._fill()
+            return worker
+
+    def encode_job(self, python_code: str, cwd: str = None) -> bytes:
+        """
+        İşçinin stdin'ine yazılacak veriyi hazırlar: bir JSON başlık satırı
+        (çalışma dizini) ve ardından betiğin kendisi.
+        """
+        header = json.dumps({"cwd": cwd or os.getcwd()}).encode("utf-8") + b"\n"
+        return header + python_code.encode("utf-8")
+
+    def close(self):
+        """Hazırda bekleyen tüm işçileri sonlandırır."""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                worker = self._idle.popleft()
+                # Boş bir başlıkla (EOF) işçi kendiliğinden çıkar.
+                try:
+                    worker.communicate(b"", timeout=1)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
+                    worker.communicate()
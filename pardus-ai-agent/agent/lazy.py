@@ -0,0 +1,31 @@
+# agent/lazy.py
+# Tembel (lazy) modül içe aktarma.
+# lazy_module("agent.archive_manager") çağrısı modülü hemen yüklemez; modülün
+# kodu, bir niteliğine (fonksiyon, sınıf, değişken) ilk erişildiği anda
+# çalıştırılır. Böylece '--reconfigure' veya '/help' gibi kısa kullanımlarda
+# sqlite3, subprocess gibi hiç ihtiyaç duyulmayan modüllerin yükleme süresi
+# ödenmez.
+import importlib.util
+import sys
+
+
+def lazy_module(name: str):
+    """
+    Verilen tam adlı modülü tembel olarak içe aktarır ve modül nesnesini döndürür.
+    Modül zaten yüklüyse doğrudan onu döndürür.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"Modül bulunamadı: {name}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    # Normal içe aktarmada olduğu gibi alt modülü üst paketin niteliği yap.
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
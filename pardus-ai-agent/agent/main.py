@@ -1,14 +1,25 @@
 # agent/main.py
 import sys
 import os
+import time
 from colorama import init, Fore, Style
 
 # Projemizdeki diğer modülleri içeri aktarıyoruz.
 # '.' (nokta) ifadesi, "bu paket içindeki" anlamına gelir.
 from . import config_manager
-from . import ai_core
-from . import action_executor
-from . import archive_manager
+from . import history_manager
+from . import metrics
+from .backends import describe_config
+from .lazy import lazy_module
+
+# Bu modüller tembel (lazy) yüklenir: ilk kullanıldıkları ana kadar (örn. ilk
+# betik çalıştırılana kadar) subprocess, sqlite3 gibi bağımlılıkları yüklenmez
+# ve ilk istem ekrana hemen gelir.
+ai_core = lazy_module(__package__ + ".ai_core")
+action_executor = lazy_module(__package__ + ".action_executor")
+archive_manager = lazy_module(__package__ + ".archive_manager")
+action_index = lazy_module(__package__ + ".action_index")
+plan_executor = lazy_module(__package__ + ".plan_executor")
 
 # colorama'yı başlatarak Windows'ta da renklerin çalışmasını sağlıyoruz.
 # autoreset=True ile her print sonrası renkler otomatik sıfırlanır.
@@ -38,9 +49,38 @@ def print_help():
   {Renkler.BILGI}/reconfigure{Renkler.RESET}    : API anahtarını ve modeli yeniden yapılandırır.
   {Renkler.BILGI}/cwd{Renkler.RESET}            : Mevcut çalışma dizinini gösterir.
   {Renkler.BILGI}/clear{Renkler.RESET}          : Sohbet geçmişini temizler ve asistanı sıfırlar.
+  {Renkler.BILGI}/history [sorgu]{Renkler.RESET} : Arşivde arar (sorgu yoksa son işlemleri listeler).
+  {Renkler.BILGI}/stats [reset]{Renkler.RESET}  : Tur süreleri ve boyut istatistiklerini gösterir (veya sıfırlar).
   {Renkler.BILGI}/exit, /quit{Renkler.RESET}    : Asistanı sonlandırır.
     """)
 
+def print_history(query):
+    """/history komutuyla arşivde arama yapar ve sonuçları listeler."""
+    # Kuyrukta bekleyen son kayıtlar da sonuçlarda görünsün.
+    archive_manager.flush(timeout=2)
+    results = archive_manager.search(query, limit=10)
+    if not results:
+        print(Renkler.UYARI + "Arşivde eşleşen bir kayıt bulunamadı.")
+        return
+    for item in results:
+        first_line = (item['prompt'].strip().splitlines() or [""])[0][:80]
+        code = item['returncode']
+        status = "?" if code is None else ("✅" if code == 0 else f"❌ {code}")
+        print(f"{Renkler.BILGI}#{item['id']:<6}{Renkler.RESET} {item['created_at']}  {status:<5} {first_line}")
+
+def print_stats(argument):
+    """/stats komutuyla tur ölçümlerinin özetini basar ('/stats reset' sıfırlar)."""
+    if argument == "reset":
+        metrics.reset()
+        print(Renkler.BASARI + "İstatistikler sıfırlandı.")
+        return
+    print(metrics.format_stats())
+    # Arka plan arşiv yazıcısı çalışıyorsa kuyruk durumu da gösterilir.
+    if runtime_ready:
+        writer = archive_manager.writer_stats()
+        if writer:
+            print("arşiv yazıcısı: " + ", ".join(f"{k}={v}" for k, v in writer.items()))
+
 def handle_internal_command(prompt, history):
     """
     Kullanıcının girdiği komutun dahili bir komut olup olmadığını kontrol eder.
@@ -59,13 +99,166 @@ def handle_internal_command(prompt, history):
     if cmd == "/cwd":
         print(Renkler.BILGI + f"Mevcut Dizin: {os.getcwd()}")
         return True, history
+    if cmd == "/history" or cmd.startswith("/history "):
+        print_history(prompt.strip()[len("/history"):].strip())
+        return True, history
+    if cmd == "/stats" or cmd.startswith("/stats "):
+        print_stats(cmd[len("/stats"):].strip())
+        return True, history
     if cmd == "/clear":
         os.system('clear') # Terminali temizle
         print_welcome_message()
         print(Renkler.BASARI + "Sohbet geçmişi temizlendi.")
-        return True, [] # Sohbet geçmişini sıfırla
+        history.reset() # Sohbet geçmişini ve özetini sıfırla
+        return True, history
     return False, history
 
+def stream_response(full_prompt, history, turn):
+    """
+    Modelin cevabını akış modunda alır ve geldiği anda ekrana basar.
+    Düz metin ve düşünce süreci canlı olarak gösterilir; kod ise etiket açıldığı
+    anda tamponlanır ve onay öncesi bütün olarak gösterilir.
+    İlk parçanın gelme süresi ve ayrıştırıcıda geçen süre 'turn'e eklenir.
+
+    Geriye (plain_text, reasoning, code, shown) döndürür. 'shown', ekrana canlı
+    basılmış olay türlerinin kümesidir (tekrar basmamak için kullanılır); kod
+    bloğu kapanmadan biten bir cevabın kodu da basılırsa "code" içerir.
+    """
+    parser = ai_core.StreamingResponseParser()
+    shown = set()
+    pending_code = []
+
+    def render(events):
+        for kind, text in events:
+            if kind == "code":
+                pending_code.append(text)
+                continue # Kod, onay ekranında bütün olarak gösterilir.
+            if kind not in shown:
+                if kind == "text":
+                    print(f"\n{Renkler.BILGI}🤖 Pardus Asistanı: ", end="")
+                else:
+                    print(f"\n{Renkler.BASLIK}🤖 Asistan'ın Eylem Planı:{Renkler.RESET}")
+                    print(f"{Style.BRIGHT}Düşünce Süreci:{Renkler.RESET}", end="")
+                shown.add(kind)
+            print(text, end="", flush=True)
+
+    start = time.perf_counter()
+    parse_seconds = 0.0
+    for chunk in ai_core.stream_action(full_prompt, history):
+        before = time.perf_counter()
+        if start is not None:
+            turn.add("first_chunk", before - start)
+            start = None
+        events = parser.feed(chunk)
+        parse_seconds += time.perf_counter() - before
+        render(events)
+    before = time.perf_counter()
+    events, (plain_text, reasoning, code) = parser.finish()
+    turn.add("parse", parse_seconds + time.perf_counter() - before)
+    turn.observe("response_chars", len(parser.text))
+    render(events)
+    if parser.open_block and code is None:
+        # Kapanmamış kod bloğu çalıştırılmaz (cevap düz metin sayılır); tamponlanan
+        # kod da metnin geri kalanı olarak basılır, yoksa hiç gösterilmezdi.
+        print("".join(pending_code), end="")
+        shown.add("code")
+    if shown:
+        print(Renkler.RESET)
+    return plain_text, reasoning, code, shown
+
+# Betik çalıştırma altyapısı (sınırlar, havuz, arşiv yazıcısı) hazırlandı mı?
+runtime_ready = False
+
+def prepare_runtime(config):
+    """
+    Betik çalıştırma ve arşivleme altyapısını hazırlar. Açılışı yavaşlatmamak
+    için ilk betik çalıştırılmadan hemen önce bir kez çağrılır (yorumlayıcı
+    havuzu modunda ise havuz önceden ısınsın diye açılışta çağrılır).
+    """
+    global runtime_ready
+    if runtime_ready:
+        return
+    runtime_ready = True
+    # Betiklere uygulanacak zaman aşımı ve isteğe bağlı CPU/bellek sınırları.
+    action_executor.configure_limits(
+        timeout_seconds=config.get('script_timeout', action_executor.DEFAULT_TIMEOUT),
+        cpu_seconds=config.get('script_cpu_limit'),
+        memory_mb=config.get('script_memory_limit_mb'),
+    )
+    # İsteğe bağlı: betikleri önceden ısıtılmış yorumlayıcı havuzunda çalıştır.
+    # Yapılandırmada "executor_mode": "pool" ile açılır.
+    if config.get('executor_mode') == 'pool':
+        action_executor.enable_pool(config.get('executor_pool_size', 2))
+    # Arşiv kayıtları arka planda, toplu halde yazılır; yavaş disk bir sonraki
+    # istemi bekletmez. "archive_background": false ile senkron yazmaya dönülür.
+    if config.get('archive_background', True):
+        archive_manager.start_background_writer(fsync=config.get('archive_fsync', 'normal'))
+
+def split_plan(code, config):
+    """
+    "parallel_steps" açıksa kodu '# @step' işaretlerine göre adımlara böler
+    (bkz. ai_core.parse_plan). Plan değilse veya geçersizse None döndürür;
+    bu durumda kod tek bir betik olarak çalıştırılır.
+    """
+    if not config.get('parallel_steps'):
+        return None
+    try:
+        return ai_core.parse_plan(code)
+    except ValueError as e:
+        print(f"{Renkler.UYARI}⚠️  Plan adımlara bölünemedi ({e}); betik tek parça olarak çalıştırılacak.{Renkler.RESET}")
+        return None
+
+def print_step_result(result):
+    """Bir plan adımının sonucunu, adım bittiği anda ekrana basar."""
+    if result.status == plan_executor.SKIPPED:
+        print(f"{Renkler.UYARI}⏭️  [{result.step_id}] atlandı: {result.stderr}{Renkler.RESET}")
+        return
+    if result.status == plan_executor.CANCELLED and result.returncode is None:
+        print(f"{Renkler.UYARI}⏹️  [{result.step_id}] {result.stderr}{Renkler.RESET}")
+        return
+    icon, color = ("✅", Renkler.BASARI) if result.status == plan_executor.OK else ("❌", Renkler.HATA)
+    print(f"{color}{icon} [{result.step_id}] {result.seconds:.1f} s, çıkış kodu {result.returncode}{Renkler.RESET}")
+    if result.stdout:
+        print(result.stdout.rstrip())
+    if result.stderr:
+        print(Renkler.HATA + result.stderr.rstrip())
+
+# Daha önce başarılı olmuş eylemlerin benzerlik dizini (ilk istekte arşivden kurulur).
+action_idx = None
+
+def get_action_index(config):
+    """
+    Benzerlik dizinini döndürür; ilk çağrıda arşivden oluşturur.
+    Yapılandırmada "action_index": false ise None döndürür.
+    """
+    global action_idx
+    if action_idx is None and config.get('action_index', True):
+        action_idx = action_index.build_from_archive(
+            limit=config.get('action_index_size', action_index.DEFAULT_MAX_ENTRIES),
+            threshold=config.get('action_index_threshold', action_index.DEFAULT_THRESHOLD),
+        )
+    return action_idx
+
+def offer_cached_action(user_prompt, config, turn):
+    """
+    İsteğe çok benzeyen, daha önce başarıyla çalışmış bir betik varsa kullanıcıya
+    önerir. Kullanıcı kabul ederse (reasoning, code), etmezse None döndürür.
+    """
+    with turn.stage("cache_lookup"):
+        index = get_action_index(config)
+        match = index.lookup(user_prompt) if index is not None else None
+    if match is None:
+        return None
+    entry = match.entry
+    source = f"#{entry.archive_id} " if entry.archive_id else ""
+    print(f"{Renkler.BILGI}💡 Bu isteğe çok benzeyen bir istek daha önce başarıyla çalıştırıldı "
+          f"({source}\"{entry.prompt.strip()[:60]}\", benzerlik %{match.score * 100:.0f}).{Renkler.RESET}")
+    with turn.stage("confirm_wait"):
+        answer = input(f"{Renkler.UYARI}Önceki betik kullanılsın mı? (Hayır: AI'a sorulur) [y/N]: {Renkler.RESET}")
+    if answer.lower() != 'y':
+        return None
+    return match.reasoning, match.code
+
 def main():
     """Ana uygulama fonksiyonu. setup.py tarafından çağrılır."""
     # Program --reconfigure argümanıyla başlatıldıysa, yapılandırmayı sor ve çık.
@@ -75,20 +268,37 @@ def main():
 
     # Ayarları yüklemeye çalış. Yoksa, kullanıcıdan yeni ayar iste.
     config = config_manager.load_config() or config_manager.prompt_for_config()
-    
-    # AI modelini yükle. Başarısız olursa, programdan çık.
-    if not ai_core.setup_model(config['api_key'], config['model_name']):
-        sys.exit(1)
-    
+    # Tur ölçümleri her zaman bellekte tutulur ('/stats'); "metrics_file"
+    # ayarlıysa Prometheus metni veya JSON satırları olarak dosyaya da yazılır.
+    # Hatalı bir ayar (bilinmeyen biçim, yazılamayan klasör) ajanı durdurmaz;
+    # ölçümler yine bellekte tutulur.
+    try:
+        metrics.configure(config)
+    except (ValueError, OSError) as e:
+        print(f"{Renkler.UYARI}⚠️  Metrikler dosyaya yazılamayacak ({e}); dışa aktarma kapalı.{Renkler.RESET}")
+
+    # AI modelini (yapılandırmadaki arka ucu) arka planda yükle. Kullanıcı ilk
+    # isteğini yazarken model istemcisi hazırlanır; ilk çağrıdan önce beklenir.
+    ai_core.setup_backend_async(config)
+    if config.get('executor_mode') == 'pool':
+        prepare_runtime(config)
+
     print_welcome_message()
-    print(f"🤖 Model {Style.BRIGHT}{config['model_name']}{Renkler.RESET} ile hizmetinizde.")
+    print(f"🤖 Model {Style.BRIGHT}{describe_config(config)}{Renkler.RESET} ile hizmetinizde.")
     
     # Sohbet geçmişini ve son komutun çıktısını tutacak değişkenleri başlat.
-    conversation_history = []
+    # Geçmiş, yapılandırmadaki token bütçesini aşmayacak şekilde yönetilir.
+    conversation_history = history_manager.HistoryManager(
+        token_budget=config.get('history_token_budget', history_manager.DEFAULT_TOKEN_BUDGET)
+    )
     last_command_output = "Yok (ilk komut)."
+    # Akış modu varsayılan olarak açıktır; '--no-stream' veya yapılandırmadaki
+    # "stream_responses": false ile kapatılabilir.
+    stream_mode = "--no-stream" not in sys.argv and config.get('stream_responses', True)
 
     # Ana uygulama döngüsü
     while True:
+        turn = None
         try:
             # Kullanıcıya gösterilecek olan şık prompt'u oluştur.
             current_dir = os.path.basename(os.getcwd())
@@ -99,51 +309,111 @@ def main():
             if is_internal:
                 continue # Eğer dahili komutsa, AI'a gitmeden döngünün başına dön.
 
+            # Turun adımlarının süreleri ve boyutları ölçülür (bkz. metrics.py, '/stats').
+            turn = metrics.start_turn()
+
             # === GERİ BİLDİRİM DÖNGÜSÜ ===
             # AI'a göndereceğimiz tam prompt'u oluşturuyoruz.
             # Bu, AI'ın bir önceki işlemin sonucundan haberdar olmasını sağlar.
-            full_prompt = (
-                f"Kullanıcı İsteği: {user_prompt}\n\n"
-                f"Önceki Komutun Çıktısı (stdout/stderr):\n---\n{last_command_output}\n---"
-            )
+            with turn.stage("prompt_build"):
+                full_prompt = ai_core.build_prompt(user_prompt, last_command_output)
+            turn.observe("prompt_chars", len(full_prompt))
             
-            print(Renkler.BILGI + "🤖 Pardus Asistanı düşünüyor...")
-            # AI'dan bir eylem üretmesini iste ve sohbet geçmişini güncelle.
-            response_text, conversation_history = ai_core.generate_action(full_prompt, conversation_history)
-            
-            # AI'ın cevabını analiz et: düz metin mi, yoksa kod mu?
-            plain_text, reasoning, code = ai_core.parse_response(response_text)
+            # Aynı istek daha önce başarıyla çalıştırıldıysa modele gitmeden öner.
+            cached = offer_cached_action(user_prompt, config, turn)
+            if cached:
+                reasoning, code = cached
+                plain_text, shown = None, set()
+                metrics.inc("cached_actions_total")
+                # Model bir sonraki turda bu adımdan haberdar olsun.
+                conversation_history.record(full_prompt, ai_core.format_action(reasoning, code))
+            else:
+                print(Renkler.BILGI + "🤖 Pardus Asistanı düşünüyor...")
+                # Arka plandaki model kurulumu bitmediyse bekle; başarısız olduysa çık.
+                with turn.stage("model_wait"):
+                    model_ready = ai_core.wait_for_model()
+                if not model_ready:
+                    sys.exit(1)
+                if stream_mode:
+                    # Cevap geldikçe ekrana basılır; sohbet geçmişi akış sonunda güncellenir.
+                    with turn.stage("model_call"):
+                        plain_text, reasoning, code, shown = stream_response(full_prompt, conversation_history, turn)
+                else:
+                    # AI'dan bir eylem üretmesini iste ve sohbet geçmişini güncelle.
+                    with turn.stage("model_call"):
+                        response_text, conversation_history = ai_core.generate_action(full_prompt, conversation_history)
+                    turn.observe("response_chars", len(response_text))
+                    # AI'ın cevabını analiz et: düz metin mi, yoksa kod mu?
+                    with turn.stage("parse"):
+                        plain_text, reasoning, code = ai_core.parse_response(response_text)
+                    shown = set()
 
             if code:
                 # Eğer AI bir kod bloğu ürettiyse...
-                print(f"\n{Renkler.BASLIK}🤖 Asistan'ın Eylem Planı:{Renkler.RESET}")
-                if reasoning:
-                    print(f"{Style.BRIGHT}Düşünce Süreci:{Renkler.RESET}\n{reasoning}")
+                # (Akış modunda başlık ve düşünce süreci zaten canlı basılmış olabilir.)
+                if "reasoning" not in shown:
+                    print(f"\n{Renkler.BASLIK}🤖 Asistan'ın Eylem Planı:{Renkler.RESET}")
+                    if reasoning:
+                        print(f"{Style.BRIGHT}Düşünce Süreci:{Renkler.RESET}\n{reasoning}")
                 print(f"\n{Style.BRIGHT}Önerilen Betik:{Renkler.RESET}\n{Renkler.BASARI}{code}{Renkler.RESET}")
+                # Kod '# @step' adımlarına bölünmüşse bağımsız adımlar aynı anda çalışır.
+                plan = split_plan(code, config)
+                workers = config.get('plan_workers', plan_executor.DEFAULT_WORKERS) if plan else 0
+                if plan:
+                    print(f"{Renkler.BILGI}🧩 Plan: {len(plan)} adım, en fazla {workers} tanesi aynı anda çalışacak.{Renkler.RESET}")
                 
                 # Kullanıcıdan betiği çalıştırmak için onay iste.
-                confirm = input(f"{Renkler.UYARI}Bu betiği çalıştırmak istiyor musunuz? [y/N]: {Renkler.RESET}")
+                with turn.stage("confirm_wait"):
+                    confirm = input(f"{Renkler.UYARI}Bu betiği çalıştırmak istiyor musunuz? [y/N]: {Renkler.RESET}")
                 if confirm.lower() == 'y':
+                    prepare_runtime(config)
                     print(f"\n{Renkler.BILGI}🚀 Betik çalıştırılıyor...{Renkler.RESET}")
-                    # Betiği çalıştır ve çıktılarını al.
-                    stdout, stderr, returncode = action_executor.execute_script(code)
-                    # Bir sonraki istek için geri bildirim değişkenini güncelle.
-                    last_command_output = f"STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}"
-                    
-                    print(f"\n{Style.BRIGHT}--- ÇIKTI (STDOUT) ---{Renkler.RESET}\n{stdout or '[Boş]'}")
-                    if stderr:
-                        print(f"\n{Style.BRIGHT}{Renkler.HATA}--- HATA (STDERR) ---{Renkler.RESET}\n{stderr}")
+                    print(f"{Style.BRIGHT}--- ÇIKTI ---{Renkler.RESET}")
+                    if plan:
+                        # Adımların çıktıları birbirine karışmasın diye her adımın
+                        # sonucu, adım bittiği anda bütün olarak basılır.
+                        with turn.stage("execute"):
+                            results = plan_executor.execute_plan(plan, workers, on_result=print_step_result)
+                        metrics.inc("plan_steps_total", len(plan))
+                        # Ctrl+C planı durdurur ama ajanı kapatmaz (tek betikteki gibi).
+                        cancelled = any(r.status == plan_executor.CANCELLED for r in results)
+                        # Arşive ve dizine tek betik gibi kaydedilir; modele adım adım özet gider.
+                        stdout, stderr, returncode = plan_executor.combine_output(results)
+                        last_command_output = plan_executor.summarize_plan(results)
+                    else:
+                        # Betiği çalıştır; çıktısı çalışırken canlı olarak ekrana basılır.
+                        with turn.stage("execute"):
+                            stdout, stderr, returncode = action_executor.execute_script(code, echo=True)
+                        cancelled = False
+                        # Bir sonraki istek için geri bildirim değişkenini güncelle.
+                        # Modele çıktının tamamı değil, boyutu sınırlı bir özeti gider.
+                        last_command_output = action_executor.summarize_output(stdout, stderr, returncode)
+                    turn.observe("output_chars", len(stdout) + len(stderr))
                     
-                    print(f"{Renkler.BASARI}✅ Betik tamamlandı. (Çıkış Kodu: {returncode}){Renkler.RESET}")
+                    print(f"{Style.BRIGHT}--- ÇIKTI SONU ---{Renkler.RESET}")
+                    if cancelled:
+                        print(f"{Renkler.UYARI}⏹️  Plan Ctrl+C ile durduruldu. (Çıkış Kodu: {returncode}){Renkler.RESET}")
+                    else:
+                        print(f"{Renkler.BASARI}✅ Betik tamamlandı. (Çıkış Kodu: {returncode}){Renkler.RESET}")
                     # Tüm etkileşimi arşive kaydet.
-                    archive_manager.log_interaction(user_prompt, reasoning or "Yok", code, stdout, stderr)
+                    with turn.stage("archive"):
+                        archive_manager.log_interaction(user_prompt, reasoning or "Yok", code, stdout, stderr, returncode)
+                    # Başarılı betikler benzerlik dizinine eklenir; başarısız olanlar
+                    # (önceden önerilmiş olsalar bile) dizinden çıkarılır.
+                    if action_idx is not None:
+                        action_idx.record(user_prompt, reasoning, code, returncode)
+                    turn.finish("cancelled" if cancelled else "executed" if returncode == 0 else "failed")
                 else:
                     print(Renkler.UYARI + "✋ İşlem iptal edildi.")
                     last_command_output = "Kullanıcı işlemi iptal etti."
+                    turn.finish("cancelled")
             else:
                 # Eğer AI sadece sohbet ettiyse, cevabını ekrana bas.
-                print(f"\n{Renkler.BILGI}🤖 Pardus Asistanı: {plain_text}{Renkler.RESET}")
+                # (Akış modunda metnin tamamı zaten canlı basıldıysa tekrar basma.)
+                if not (shown == {"text"} or "code" in shown):
+                    print(f"\n{Renkler.BILGI}🤖 Pardus Asistanı: {plain_text}{Renkler.RESET}")
                 last_command_output = "Asistan bir betik üretmedi, sadece konuştu."
+                turn.finish("chat")
         except (KeyboardInterrupt, EOFError):
             # Ctrl+C veya Ctrl+D ile çıkış yapıldığında...
             print(f"\n{Renkler.UYARI}👋 Hoşça kalın!");
@@ -151,6 +421,8 @@ def main():
         except Exception as e:
             # Beklenmedik bir hata oluşursa programın çökmesini engelle.
             print(f"\n{Renkler.HATA}Beklenmedik bir hata oluştu: {e}")
+            if turn is not None:
+                turn.finish("error")
 
 # Bu dosya doğrudan çalıştırılırsa main() fonksiyonunu çağırır.
 # Ancak bizim projemizde asıl çağrı setup.py'daki entry_point üzerinden yapılır.
@@ -0,0 +1,391 @@
+# agent/metrics.py
+# Tur başına ölçümler (instrumentation).
+#
+# Eskiden ana döngüde zamanın nereye gittiği hiç kaydedilmiyordu: model çağrısı
+# (generate_action / stream_action), parse_response, kullanıcının onay vermesi
+# için geçen süre, execute_script'in çalışma süresi ve log_interaction tamamen
+# görünmezdi; istem ve cevap boyutları da öyle. Yavaşlık şikayetlerinde "model
+# mi yavaş, betik mi, disk mi?" sorusunun cevabı yoktu.
+#
+# Bu modül süreç içinde, düşük maliyetli sayaçlar ve histogramlar tutar:
+#   - Histogramlar sabit, logaritmik aralıklı kovalardan (bucket) oluşur. Bir
+#     gözlem sadece bir ikili arama (bisect) ve birkaç toplama demektir; örnek
+#     listesi tutulmaz, bellek kullanımı sabittir. Yüzdelikler (p50/p90/p99)
+#     kovalardan ara değerlemeyle tahmin edilir.
+#   - Her REPL turu bir Turn nesnesiyle izlenir: 'with turn.stage("model_call"):'
+#     adımın süresini, turn.observe("prompt_chars", n) boyutları kaydeder;
+#     turn.finish() turu histogramlara işler.
+#   - '/stats' dahili komutu özet tabloyu basar ('/stats reset' sıfırlar).
+#   - İsteğe bağlı dışa aktarma (yapılandırmada "metrics_file"):
+#       "metrics_format": "prometheus" -> Dosya, Prometheus metin biçiminde
+#           (node_exporter'ın textfile toplayıcısına uygun) en fazla
+#           "metrics_export_interval" saniyede bir ve çıkışta atomik olarak
+#           yeniden yazılır.
+#       "metrics_format": "jsonl" -> Her tur, adım süreleri ve boyutlarıyla
+#           birlikte dosyaya tek satırlık bir JSON kaydı olarak eklenir.
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+
+# Dışa aktarılan metrik adlarının ön eki.
+METRIC_PREFIX = "pardus_agent_"
+
+# Süre histogramlarının kova üst sınırları (saniye): 100 µs'den ~30 dakikaya,
+# her onlukta 1-1.5-2-3-5-7 adımları (komşu sınırlar arası oran en fazla 5/3).
+TIME_BUCKETS = tuple(round(m * 10.0 ** e, 6) for e in range(-4, 4) for m in (1, 1.5, 2, 3, 5, 7)
+                     if m * 10.0 ** e <= 2000)
+# Boyut histogramlarının kova üst sınırları (karakter/bayt): 64'ten 16M'ye, 2'nin kuvvetleri.
+SIZE_BUCKETS = tuple(float(2 ** e) for e in range(6, 25))
+
+# Varsayılan dışa aktarma ayarları.
+DEFAULT_FORMAT = "prometheus"
+DEFAULT_EXPORT_INTERVAL = 15.0  # Prometheus dosyasının en sık yeniden yazılma aralığı (saniye).
+FORMATS = ("prometheus", "jsonl")
+
+# Tur adımları; '/stats' tablosu ve JSON kayıtları bu sırayı izler.
+STAGES = (
+    "prompt_build",   # ai_core.build_prompt
+    "cache_lookup",   # Benzerlik dizininde arama (action_index.lookup)
+    "model_wait",     # Arka plandaki model kurulumunun beklenmesi (ilk turda)
+    "model_call",     # generate_action / stream_action (akışta ekrana basma ve ayrıştırma dahil)
+    "first_chunk",    # Akış modunda ilk parçanın gelme süresi
+    "parse",          # parse_response / StreamingResponseParser
+    "confirm_wait",   # Kullanıcının betiği onaylaması için geçen süre
+    "execute",        # action_executor.execute_script
+    "archive",        # archive_manager.log_interaction
+    "turn",           # Turun tamamı (istem girildikten sonra)
+)
+
+
+def _is_size(name: str) -> bool:
+    return name.endswith(("_chars", "_bytes"))
+
+
+class Histogram:
+    """
+    Sabit kovalı histogram. observe() O(log k) sürer ve bellek ayırmaz.
+    Kova sayaçları kümülatif değildir; dışa aktarırken toplanır.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Son kova: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float or None:
+        """
+        q (0-1) yüzdeliğini kovalardan tahmin eder. Kova sınırları geometrik
+        dizildiği için hedef sıra, kova içinde logaritmik ölçekte ara değerlenir;
+        kova sınırları gözlenen en küçük/büyük değerle daraltılır.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = max(self.bounds[index - 1] if index > 0 else self.min, self.min)
+                high = min(self.bounds[index] if index < len(self.bounds) else self.max, self.max)
+                fraction = (rank - seen) / n
+                if low > 0:
+                    return low * (high / low) ** fraction
+                return low + (high - low) * fraction
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p99": self.quantile(0.99),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """
+    Sayaç ve histogramların tutulduğu kayıt defteri (registry). İş parçacığı
+    güvenlidir (serve_api.py gibi eşzamanlı kullanımlar için); REPL'de kilit
+    hiçbir zaman çekişmeye girmez.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.started_at = time.time()
+        self.exporter = None  # Ayarlanırsa her tur sonunda çağrılır (bkz. Exporter).
+
+    def inc(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _histogram(self, name: str) -> Histogram:
+        # Kilit tutulurken çağrılır. Adı _chars/_bytes ile bitenler boyut, diğerleri süredir.
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(SIZE_BUCKETS if _is_size(name) else TIME_BUCKETS)
+        return histogram
+
+    def observe(self, name: str, value: float):
+        with self.lock:
+            self._histogram(name).observe(value)
+
+    def observe_many(self, values: dict, suffix: str = ""):
+        """Bir turun tüm değerlerini tek kilitle işler."""
+        with self.lock:
+            for name, value in values.items():
+                self._histogram(name + suffix).observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        """Tüm sayaçların ve histogram özetlerinin JSON'a uygun kopyası."""
+        with self.lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+                "counters": dict(self.counters),
+                "histograms": {name: h.summary() for name, h in self.histograms.items()},
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus metin biçimi (exposition format 0.0.4)."""
+        lines = []
+        with self.lock:
+            families = {}
+            for series, value in sorted(self.counters.items()):
+                # 'ad{etiket="değer"}' biçimindeki sayaçlar aynı ailede toplanır.
+                family = series.split("{", 1)[0]
+                families.setdefault(family, []).append((series, value))
+            for family, series_list in families.items():
+                lines.append(f"# TYPE {METRIC_PREFIX}{family} counter")
+                lines.extend(f"{METRIC_PREFIX}{series} {value}" for series, value in series_list)
+            for name, h in sorted(self.histograms.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(h.bounds, h.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum!r}")
+                lines.append(f"{metric}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+class _Stage:
+    """Turn.stage()'in döndürdüğü bağlam yöneticisi (context manager)."""
+
+    __slots__ = ("turn", "name", "start")
+
+    def __init__(self, turn, name: str):
+        self.turn = turn
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        values = self.turn.values
+        # Aynı adım bir turda birden fazla çalışırsa süreler toplanır.
+        values[self.name] = values.get(self.name, 0.0) + (time.perf_counter() - self.start)
+        return False
+
+
+class Turn:
+    """
+    Tek bir REPL turunun ölçümleri. Değerler turun sonunda (finish) tek seferde
+    histogramlara işlenir; böylece yarıda kalan turlar istatistikleri bozmaz.
+    """
+
+    __slots__ = ("registry", "start", "values", "sizes", "outcome")
+
+    def __init__(self, registry: Metrics = None):
+        self.registry = registry or REGISTRY
+        self.start = time.perf_counter()
+        self.values = {}
+        self.sizes = {}
+        self.outcome = None
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def add(self, name: str, seconds: float):
+        """Bağlam yöneticisiyle ölçülemeyen bir adımın süresini ekler."""
+        self.values[name] = self.values.get(name, 0.0) + seconds
+
+    def observe(self, name: str, value: float):
+        """Boyut türünden bir değer kaydeder (örn. "prompt_chars")."""
+        self.sizes[name] = value
+
+    def finish(self, outcome: str):
+        """
+        Turu sonlandırır ve kaydeder. 'outcome': "executed", "failed",
+        "cancelled", "chat" veya "error".
+        """
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        self.values["turn"] = time.perf_counter() - self.start
+        registry = self.registry
+        registry.observe_many(self.values, "_seconds")
+        registry.observe_many(self.sizes)
+        registry.inc(f'turns_total{{outcome="{outcome}"}}')
+        if registry.exporter is not None:
+            registry.exporter.turn_finished(self)
+
+    def record(self) -> dict:
+        """JSON satırı olarak yazılacak tur kaydı (süreler milisaniye)."""
+        record = {"ts": round(time.time(), 3), "outcome": self.outcome}
+        for name in STAGES:
+            if name in self.values:
+                record[name + "_ms"] = round(self.values[name] * 1000, 3)
+        record.update(self.sizes)
+        return record
+
+
+class Exporter:
+    """
+    Ölçümleri bir dosyaya yazar. Prometheus biçiminde dosya geçici bir dosyaya
+    yazılıp yeniden adlandırılır (okuyucu hiçbir zaman yarım dosya görmez);
+    JSONL biçiminde her tur satır olarak eklenir.
+    """
+
+    def __init__(self, path: str, fmt: str = DEFAULT_FORMAT, interval: float = DEFAULT_EXPORT_INTERVAL,
+                 registry: Metrics = None):
+        # 'registry': Prometheus dosyasına yazılacak kayıt defteri (varsayılan REGISTRY).
+        if fmt not in FORMATS:
+            raise ValueError(f"Bilinmeyen metrik biçimi: {fmt} (geçerli: {', '.join(FORMATS)})")
+        self.path = os.path.expanduser(path)
+        self.format = fmt
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self.last_export = 0.0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def turn_finished(self, turn: Turn):
+        try:
+            if self.format == "jsonl":
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(turn.record(), ensure_ascii=False) + "\n")
+            elif time.monotonic() - self.last_export >= self.interval:
+                self.write()
+        except OSError as e:
+            # Ölçüm yazılamaması asistanı durdurmamalı.
+            print(f"UYARI: Metrikler dosyaya yazılamadı ({self.path}): {e}")
+
+    def write(self):
+        """Prometheus dosyasını hemen yeniden yazar."""
+        if self.format != "prometheus":
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render_prometheus())
+        os.replace(tmp_path, self.path)
+        self.last_export = time.monotonic()
+
+    def close(self):
+        try:
+            self.write()
+        except OSError:
+            pass
+
+
+# Varsayılan (süreç genelindeki) kayıt defteri.
+REGISTRY = Metrics()
+
+
+def configure(config: dict) -> Exporter or None:
+    """
+    Yapılandırmadaki "metrics_file", "metrics_format" ve
+    "metrics_export_interval" anahtarlarına göre dışa aktarmayı açar.
+    "metrics_file" yoksa ölçümler sadece bellekte tutulur ('/stats').
+    """
+    path = config.get('metrics_file')
+    if not path:
+        return None
+    if REGISTRY.exporter is None:
+        REGISTRY.exporter = Exporter(path, config.get('metrics_format', DEFAULT_FORMAT),
+                                     config.get('metrics_export_interval', DEFAULT_EXPORT_INTERVAL))
+        # Çıkışta son durum da yazılsın.
+        atexit.register(REGISTRY.exporter.close)
+    return REGISTRY.exporter
+
+
+def start_turn() -> Turn:
+    return Turn(REGISTRY)
+
+
+def inc(name: str, amount: int = 1):
+    REGISTRY.inc(name, amount)
+
+
+def snapshot() -> dict:
+    return REGISTRY.snapshot()
+
+
+def reset():
+    REGISTRY.reset()
+
+
+def _format_value(name: str, value: float) -> str:
+    if value is None:
+        return "-"
+    if _is_size(name):
+        return f"{value:,.0f}"
+    if value < 0.001:
+        return f"{value * 1e6:.0f} µs"
+    if value < 1:
+        return f"{value * 1000:.1f} ms"
+    return f"{value:.2f} s"
+
+
+def format_stats(snap: dict = None) -> str:
+    """'/stats' komutunun bastığı özet tablo."""
+    snap = snap or snapshot()
+    histograms = snap["histograms"]
+    if not histograms and not snap["counters"]:
+        return "Henüz ölçülmüş bir tur yok."
+    # Önce tur adımları (STAGES sırasıyla), sonra boyutlar.
+    names = [s + "_seconds" for s in STAGES if s + "_seconds" in histograms]
+    names += sorted(n for n in histograms if n not in names)
+    width = max(len(n) for n in names) if names else 10
+    lines = [f"{'ölçüm':<{width}} {'adet':>6} {'ort.':>10} {'p50':>10} {'p90':>10} {'p99':>10} {'en çok':>10}"]
+    for name in names:
+        s = histograms[name]
+        cells = [_format_value(name, s.get(k)) for k in ("mean", "p50", "p90", "p99", "max")]
+        lines.append(f"{name:<{width}} {s['count']:>6} " + " ".join(f"{c:>10}" for c in cells))
+    if snap["counters"]:
+        lines.append("")
+        lines.extend(f"{name} = {value}" for name, value in sorted(snap["counters"].items()))
+    return "\n".join(lines)
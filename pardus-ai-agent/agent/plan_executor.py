@@ -0,0 +1,226 @@
+# agent/plan_executor.py
+# Çok adımlı eylem planlarının paralel çalıştırılması.
+#
+# Sistem talimatı modelden karmaşık görevleri adımlara bölmesini istiyor, ama
+# execute_script tüm betiği tek bir süreçte, sırayla çalıştırıyordu. Birden
+# fazla servisi kontrol etmek veya birden fazla depoyu indirmek gibi işlerde
+# her adım bir öncekini bekliyor, geri bildirim de ancak hepsi bitince
+# geliyordu.
+#
+# Model kodu '# @step <ad> after=<ad1>,<ad2>' işaretleriyle adımlara
+# böldüğünde (bkz. ai_core.PLAN_PROMPT ve ai_core.parse_plan), adımlar bir
+# bağımlılık grafiği (DAG) olarak çalıştırılır:
+#   - Beklediği adımların hepsi başarıyla biten her adım, en fazla
+#     'max_workers' adımın aynı anda çalıştığı bir iş parçacığı havuzunda,
+#     kendi sürecinde (action_executor.execute_script) başlatılır. Zaman
+#     aşımı, kaynak sınırları ve yorumlayıcı havuzu tek betikteki gibi
+#     uygulanır.
+#   - Başarısız olan bir adımı (doğrudan veya dolaylı olarak) bekleyen adımlar
+#     çalıştırılmaz ("skipped"); bağımsız adımlar devam eder.
+#   - Her adımın sonucu, bittiği anda 'on_result' ile bildirilir (ekrana
+#     basmak için); planın tamamı bitmeden ilk sonuçlar görülür.
+#   - summarize_plan, modele bir sonraki turda gönderilecek çıktı özetini adım
+#     adım, toplam boyutu sınırlı olarak üretir.
+# Ctrl+C, çalışan tüm adımları (süreç gruplarıyla birlikte) durdurur ama
+# ajanı kapatmaz: durdurulan ve hiç başlamamış adımlar "cancelled" olarak,
+# bitmiş adımların sonuçlarıyla birlikte döndürülür.
+import concurrent.futures
+import time
+
+from . import action_executor
+
+# Aynı anda çalışabilecek en fazla adım sayısı (yapılandırmada "plan_workers").
+DEFAULT_WORKERS = 4
+
+# Adım durumları
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+
+class StepResult:
+    """Bir plan adımının sonucu. Süreler planın başlangıcına göre saniyedir."""
+
+    __slots__ = ("step_id", "status", "stdout", "stderr", "returncode", "started", "finished")
+
+    def __init__(self, step_id: str, status: str, stdout: str = "", stderr: str = "", returncode: int = None,
+                 started: float = None, finished: float = None):
+        self.step_id = step_id
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = returncode
+        self.started = started
+        self.finished = finished
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def to_dict(self) -> dict:
+        return {
+            "step": self.step_id,
+            "status": self.status,
+            "returncode": self.returncode,
+            "started": None if self.started is None else round(self.started, 3),
+            "seconds": round(self.seconds, 3),
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+        }
+
+
+def execute_plan(steps: list, max_workers: int = DEFAULT_WORKERS, on_result=None, timeout_seconds=None) -> list:
+    """
+    Plan adımlarını bağımlılıklarına uyarak, bağımsız olanları aynı anda çalıştırır.
+
+    Args:
+        steps (list): ai_core.parse_plan'in döndürdüğü PlanStep listesi
+            (doğrulanmış; bilinmeyen bağımlılık veya döngü içermez).
+        max_workers (int): Aynı anda çalışabilecek en fazla adım sayısı.
+        on_result (callable): Her adım bittiğinde (veya atlandığında) ana iş
+            parçacığında StepResult ile çağrılır.
+        timeout_seconds (float): Adım başına zaman aşımı (None ise
+            action_executor'daki ayar kullanılır).
+
+    Returns:
+        list: Adımların StepResult listesi (plandaki sırayla). Ctrl+C ile
+            kesilen planda durdurulan ve başlamamış adımlar CANCELLED olur.
+    """
+    by_id = {step.step_id: step for step in steps}
+    waiting = {step.step_id: set(step.after) for step in steps}
+    dependents = {step.step_id: [] for step in steps}
+    for step in steps:
+        for name in step.after:
+            dependents[name].append(step.step_id)
+    results = {}
+    origin = time.perf_counter()
+
+    def run(step) -> StepResult:
+        started = time.perf_counter() - origin
+        stdout, stderr, returncode = action_executor.execute_script(step.code, timeout_seconds=timeout_seconds)
+        return StepResult(step.step_id, OK if returncode == 0 else FAILED, stdout, stderr, returncode,
+                          started, time.perf_counter() - origin)
+
+    def settle(result: StepResult):
+        # Sonucu kaydeder; başarısız adımı bekleyenleri zincirleme atlar.
+        results[result.step_id] = result
+        if on_result is not None:
+            on_result(result)
+        for name in dependents[result.step_id]:
+            if name in results:
+                continue
+            # Henüz sonucu olmayan bir bağımlı adım, başlamamış (beklemede) demektir.
+            if result.status == OK:
+                waiting[name].discard(result.step_id)
+            else:
+                del waiting[name]
+                now = time.perf_counter() - origin
+                settle(StepResult(name, SKIPPED, stderr=f"'{result.step_id}' adımı tamamlanamadığı için çalıştırılmadı.",
+                                  started=now, finished=now))
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="plan-step")
+    running = {}
+    try:
+        while waiting or running:
+            # Bekleyeceği adım kalmayanları plandaki sırayla başlat.
+            for step in steps:
+                name = step.step_id
+                if name in waiting and not waiting[name]:
+                    del waiting[name]
+                    running[executor.submit(run, by_id[name])] = name
+            if not running:
+                # Doğrulanmış bir planda olamaz: kalan adımlar birbirini bekliyor.
+                raise ValueError(f"Plan adımlarının bağımlılıkları döngü oluşturuyor: {', '.join(sorted(waiting))}")
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    now = time.perf_counter() - origin
+                    result = StepResult(name, FAILED, stderr=f"Ajan adım yürütme hatası: {e}", returncode=1,
+                                        started=now, finished=now)
+                settle(result)
+    except KeyboardInterrupt:
+        # Ctrl+C: yeni adım başlatma, çalışanları durdur; kesme yukarı
+        # iletilmez (ajan kapanmaz).
+        for future in running:
+            future.cancel()
+        # Süreci henüz başlamak üzere olan adımlar da yakalansın diye hepsi
+        # bitene kadar tekrarlanır.
+        while not all(future.done() for future in running):
+            action_executor.terminate_running()
+            concurrent.futures.wait(running, timeout=0.1)
+        now = time.perf_counter() - origin
+        for future, name in running.items():
+            if future.cancelled():
+                result = StepResult(name, CANCELLED, stderr="Ctrl+C ile iptal edildi; çalıştırılmadı.",
+                                    started=now, finished=now)
+            else:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = StepResult(name, FAILED, stderr=f"Ajan adım yürütme hatası: {e}", returncode=1,
+                                        started=now, finished=now)
+                if result.status != OK:
+                    result.status = CANCELLED
+            results[name] = result
+            if on_result is not None:
+                on_result(result)
+        for step in steps:
+            if step.step_id not in results:
+                results[step.step_id] = result = StepResult(
+                    step.step_id, CANCELLED, stderr="Ctrl+C ile iptal edildi; çalıştırılmadı.", started=now, finished=now)
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        executor.shutdown(wait=True)
+    return [results[step.step_id] for step in steps]
+
+
+def plan_returncode(results: list) -> int:
+    """Planın çıkış kodu: ilk başarısız (ya da iptal edilen) adımın kodu, hepsi başarılıysa 0."""
+    for result in results:
+        if result.status in (FAILED, CANCELLED):
+            return result.returncode or 1
+    # Sadece atlanan adım olamaz (atlama bir başarısızlıktan kaynaklanır).
+    return 0
+
+
+def combine_output(results: list) -> tuple[str, str, int]:
+    """
+    Adım çıktılarını başlıklarla tek bir (stdout, stderr, returncode) üçlüsüne
+    çevirir; arşive ve benzerlik dizinine tek betik gibi kaydedilir.
+    """
+    out, err = [], []
+    for result in results:
+        header = f"--- [{result.step_id}] {result.status} ---\n"
+        if result.stdout:
+            out.append(header + result.stdout)
+        if result.stderr:
+            err.append(header + result.stderr)
+    return "\n".join(out), "\n".join(err), plan_returncode(results)
+
+
+def summarize_plan(results: list, max_chars: int = action_executor.MAX_DIGEST_CHARS) -> str:
+    """
+    Bir sonraki istemde modele gönderilecek, adım adım çıktı özeti. Karakter
+    bütçesi adımlar arasında eşit bölünür; atlanan adımlar tek satırla geçer.
+    """
+    counts = {status: sum(r.status == status for r in results) for status in (OK, FAILED, SKIPPED, CANCELLED)}
+    lines = [f"Plan: {len(results)} adım ({counts[OK]} başarılı, {counts[FAILED]} başarısız, "
+             f"{counts[SKIPPED]} atlandı" + (f", {counts[CANCELLED]} iptal edildi)" if counts[CANCELLED] else ")")]
+    executed = [r for r in results if r.returncode is not None]
+    budget = max(200, max_chars // max(1, len(executed)))
+    for result in results:
+        if result.status == SKIPPED:
+            lines.append(f"\n[{result.step_id}] ATLANDI: {result.stderr}")
+        elif result.returncode is None:
+            lines.append(f"\n[{result.step_id}] İPTAL EDİLDİ: {result.stderr}")
+        else:
+            lines.append(f"\n[{result.step_id}] ({result.seconds:.1f} s)\n"
+                         + action_executor.summarize_output(result.stdout, result.stderr, result.returncode, budget))
+    return "\n".join(lines)
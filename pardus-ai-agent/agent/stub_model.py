@@ -0,0 +1,145 @@
+# agent/stub_model.py
+# API anahtarı gerektirmeyen, yerel ve deterministik bir sahte (stub) model.
+# google.generativeai'daki GenerativeModel / ChatSession arayüzünün ajan
+# tarafından kullanılan kısmını taklit eder. Yük testleri ve geliştirme
+# sırasında gerçek Gemini modeli yerine ai_core.model olarak atanabilir ya da
+# yapılandırmada "backend": "local" ile seçilebilir (bkz. backends.py).
+#
+# Cevaplar deterministiktir: önce istemde geçen anahtar kelimelere göre
+# kurallar (rules) denenir, eşleşme yoksa hazır cevaplar (responses) sırayla
+# döndürülür. Böylece aynı senaryo her çalıştırmada aynı turları üretir.
+import json
+import time
+
+from .backends import ModelBackend
+
+# Stub modelin varsayılan olarak döndürdüğü cevap. Gerçek modelin ürettiği
+# formatla (düşünce süreci + Python kod bloğu) aynıdır.
+DEFAULT_STUB_RESPONSE = """```python
+'''
+Plan:
+1. Mevcut dizinin içeriğini listeleyeceğim.
+'''
+import os
+print(os.listdir('.'))
+```"""
+
+
+class StubResponse:
+    """Gemini cevap nesnesinin sadece '.text' alanını taklit eder."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubStreamResponse:
+    """
+    Akış (stream=True) modundaki Gemini cevabını taklit eder. Üzerinde
+    dönüldükçe cevabı küçük parçalar halinde, her parça arasında bekleyerek üretir.
+    """
+
+    def __init__(self, model, text: str):
+        self.model = model
+        self.text = text
+
+    def __iter__(self):
+        size = self.model.chunk_chars
+        for start in range(0, len(self.text), size):
+            if self.model.token_delay:
+                time.sleep(self.model.token_delay)
+            yield StubResponse(self.text[start:start + size])
+
+
+class StubChat:
+    """ChatSession benzeri sohbet nesnesi: geçmiş tutar ve 'send_message' sağlar."""
+
+    def __init__(self, model, history=None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, message: str, stream: bool = False):
+        # Gerçek bir ağ çağrısını (ilk token gecikmesini) taklit etmek için bekle.
+        if self.model.latency:
+            time.sleep(self.model.latency)
+        text = self.model.respond(message)
+        self.history.append({"role": "user", "parts": [message]})
+        self.history.append({"role": "model", "parts": [text]})
+        if stream:
+            return StubStreamResponse(self.model, text)
+        # Akışsız modda tüm cevabın üretilmesi beklenir.
+        if self.model.token_delay:
+            chunks = -(-len(text) // self.model.chunk_chars)
+            time.sleep(self.model.token_delay * chunks)
+        return StubResponse(text)
+
+
+def load_script(path: str) -> tuple:
+    """
+    Hazır cevap senaryosunu bir JSON dosyasından okur. Beklenen biçim:
+
+        {
+          "responses": ["sırayla döndürülecek cevap", ...],
+          "rules": [{"match": "htop", "response": "..."}, ...]
+        }
+
+    Geriye (responses, rules) döndürür; rules, (anahtar kelime, cevap) listesidir.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    rules = [(rule["match"], rule["response"]) for rule in data.get("rules", [])]
+    return data.get("responses") or None, rules or None
+
+
+class StubModel(ModelBackend):
+    """
+    GenerativeModel benzeri sahte model (yerel arka uç).
+
+    Args:
+        latency (float): Her 'send_message' çağrısında ilk parçadan önce beklenecek süre (saniye).
+        response_text (str): Kural ya da hazır cevap yoksa döndürülecek sabit cevap.
+        token_delay (float): Her parça (yaklaşık bir token) için beklenecek süre (saniye).
+        chunk_chars (int): Akış modunda bir parçanın karakter uzunluğu.
+        tokens_per_second (float): Üretim hızı. Verilirse 'token_delay' bundan hesaplanır.
+        responses (list[str]): Sırayla (başa dönerek) döndürülecek hazır cevaplar.
+        rules (list[tuple]): (anahtar kelime, cevap) çiftleri; istemde anahtar
+            kelime geçerse (büyük/küçük harf duyarsız) ilk eşleşen cevap döner.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        response_text: str = DEFAULT_STUB_RESPONSE,
+        token_delay: float = 0.0,
+        chunk_chars: int = 4,
+        tokens_per_second: float = 0,
+        responses: list = None,
+        rules: list = None,
+    ):
+        self.latency = latency
+        self.response_text = response_text
+        self.chunk_chars = chunk_chars
+        # Bir parça yaklaşık bir token kabul edilir.
+        self.token_delay = 1.0 / tokens_per_second if tokens_per_second else token_delay
+        self.responses = list(responses or [])
+        self.rules = [(keyword.lower(), text) for keyword, text in (rules or [])]
+        self.calls = 0
+
+    def respond(self, message: str) -> str:
+        """Verilen mesaja karşılık gelen (deterministik) cevabı seçer."""
+        self.calls += 1
+        lowered = message.lower()
+        for keyword, text in self.rules:
+            if keyword in lowered:
+                return text
+        if self.responses:
+            return self.responses[(self.calls - 1) % len(self.responses)]
+        return self.response_text
+
+    def start_chat(self, history=None) -> StubChat:
+        return StubChat(self, history)
+
+    def describe(self) -> str:
+        rate = f"{1.0 / self.token_delay:.0f} token/sn" if self.token_delay else "anında"
+        return f"yerel sahte model (gecikme {self.latency * 1000:.0f} ms, {rate})"
@@ -0,0 +1,156 @@
+# benchmarks/bench_action_index.py
+# Benzerlik dizininin (action_index) isabet oranını ve kazandırdığı süreyi ölçer.
+#
+# Bir oturum kaydı (session log) baştan sona yeniden oynatılır. Her istek için
+# önce dizinde arama yapılır:
+#   - İsabet (hit): model çağrısı atlanır; kazanılan süre = model gecikmesi.
+#     Önerilen betiğin doğru niyete (intent) ait olup olmadığı da kontrol edilir.
+#   - Iska (miss): "model" betiği üretir, betik çalışır ve sonucu dizine işlenir.
+# Bazı niyetlerin betikleri her zaman başarısız olur; bunların dizinden
+# çıkarıldığı (invalidation) sayaçlarda görülür.
+#
+# Varsayılan olarak gerçekçi bir yönetici oturumu (aynı isteklerin farklı
+# söylenişleri) üretilir. '--archive' ile gerçek bir arşiv veritabanındaki
+# istekler kronolojik sırayla oynatılabilir.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_action_index.py --requests 2000 --model-latency 2.5
+#     python3 benchmarks/bench_action_index.py --archive agent_archive/archive.db
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import action_index
+
+PACKAGES = ["htop", "nginx", "git", "docker.io", "neofetch", "curl", "vim", "postgresql", "redis-server", "tmux"]
+SERVICES = ["nginx", "ssh", "cron", "postgresql", "docker", "apache2"]
+
+# Niyet -> (söyleniş şablonları, betik üretici, betik başarılı mı?)
+INTENTS = {}
+for pkg in PACKAGES:
+    INTENTS[f"install:{pkg}"] = ([
+        "{x} kur", "{x} paketini kur", "sisteme {x} kur", "{x} yükle", "{x} paketini yükle lütfen",
+        "bana {x} kurar mısın", "install {x}",
+    ], pkg, f"subprocess.run(['sudo', 'apt', 'install', '-y', '{pkg}'])", pkg != "docker.io")
+for svc in SERVICES:
+    INTENTS[f"restart:{svc}"] = ([
+        "{x} servisini yeniden başlat", "{x} servisini restart et", "{x} yeniden başlat",
+        "{x} servisini yeniden başlatır mısın",
+    ], svc, f"subprocess.run(['sudo', 'systemctl', 'restart', '{svc}'])", True)
+    INTENTS[f"status:{svc}"] = ([
+        "{x} servisinin durumunu göster", "{x} durumu", "{x} çalışıyor mu kontrol et",
+    ], svc, f"subprocess.run(['systemctl', 'status', '{svc}'])", True)
+INTENTS["disk"] = (["disk kullanımını göster", "diskte ne kadar yer var", "disk doluluk oranını göster",
+                    "disk kullanımı"], "", "print(shutil.disk_usage('/'))", True)
+INTENTS["memory"] = (["bellek kullanımını göster", "ram kullanımı", "bellek durumunu göster"], "",
+                     "print(open('/proc/meminfo').read())", True)
+INTENTS["update"] = (["paket listesini güncelle", "apt update çalıştır", "sistem paketlerini güncelle"], "",
+                     "subprocess.run(['sudo', 'apt', 'update'])", True)
+
+
+def synthetic_session(requests: int, seed: int, failure_rate: float) -> list:
+    """
+    Zipf benzeri dağılımla (bazı istekler çok sık) bir oturum kaydı üretir.
+    Normalde başarılı olan betikler de 'failure_rate' olasılıkla başarısız olur
+    (örn. ağ kesintisi); bu durumda dizindeki kayıt geçersiz kılınmalıdır.
+    """
+    rng = random.Random(seed)
+    names = list(INTENTS)
+    rng.shuffle(names)
+    weights = [1.0 / (rank + 1) for rank in range(len(names))]
+    log = []
+    for _ in range(requests):
+        intent = rng.choices(names, weights)[0]
+        templates, subject, code, ok = INTENTS[intent]
+        log.append({
+            "prompt": rng.choice(templates).format(x=subject),
+            "intent": intent,
+            "code": "import subprocess, shutil\n" + code,
+            "returncode": 0 if ok and rng.random() >= failure_rate else 1,
+        })
+    return log
+
+
+def archive_session(path: str) -> list:
+    """Gerçek bir arşiv veritabanındaki betikli istekleri kronolojik sırayla okur."""
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT prompt, code, returncode FROM interactions WHERE code IS NOT NULL AND code != '' "
+        "AND returncode IS NOT NULL ORDER BY id"
+    ).fetchall()
+    conn.close()
+    # Gerçek kayıtlarda niyet bilinmez; doğru isabet = aynı betik.
+    return [{"prompt": p, "intent": c, "code": c, "returncode": r} for p, c, r in rows]
+
+
+def replay(log: list, index: action_index.ActionIndex, model_latency: float) -> dict:
+    lookup_ms = []
+    correct = wrong = 0
+    intent_of_code = {}
+    for item in log:
+        start = time.perf_counter()
+        match = index.lookup(item["prompt"])
+        lookup_ms.append((time.perf_counter() - start) * 1000)
+        if match is not None:
+            # Önerilen betiğin niyeti doğru mu?
+            if intent_of_code.get(match.code) == item["intent"]:
+                correct += 1
+            else:
+                wrong += 1
+            code = match.code
+        else:
+            code = item["code"] # Modelin üreteceği betik
+        intent_of_code[code] = item["intent"]
+        # Betik çalıştırıldı; sonucu dizine işle (başarısızsa geçersiz kılınır).
+        index.record(item["prompt"], "", code, item["returncode"])
+    hits = correct + wrong
+    return {
+        "requests": len(log),
+        "hits": hits,
+        "hit_rate": round(hits / len(log), 3) if log else 0.0,
+        "hit_precision": round(correct / hits, 3) if hits else None,
+        "wrong_hits": wrong,
+        "lookup_ms": {
+            "p50": round(statistics.median(lookup_ms), 4),
+            "p99": round(sorted(lookup_ms)[int(len(lookup_ms) * 0.99) - 1], 4),
+            "max": round(max(lookup_ms), 4),
+        },
+        "model_calls_saved": hits,
+        "latency_saved_s": round(hits * model_latency - sum(lookup_ms) / 1000, 2),
+        "index": index.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benzerlik dizini isabet oranı testi")
+    parser.add_argument("--requests", type=int, default=2000, help="Üretilecek istek sayısı")
+    parser.add_argument("--archive", help="Oynatılacak arşiv veritabanı (verilirse sentetik oturum kullanılmaz)")
+    parser.add_argument("--model-latency", type=float, default=2.5, help="Bir model çağrısının ortalama süresi (saniye)")
+    parser.add_argument("--threshold", type=float, default=action_index.DEFAULT_THRESHOLD, help="Benzerlik eşiği")
+    parser.add_argument("--max-entries", type=int, default=action_index.DEFAULT_MAX_ENTRIES, help="Dizin boyutu")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Betiklerin rastgele başarısız olma olasılığı")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    log = archive_session(args.archive) if args.archive else synthetic_session(args.requests, args.seed, args.failure_rate)
+    index = action_index.ActionIndex(threshold=args.threshold, max_entries=args.max_entries)
+    result = replay(log, index, args.model_latency)
+    result["config"] = {
+        "source": args.archive or "synthetic",
+        "threshold": args.threshold,
+        "max_entries": args.max_entries,
+        "failure_rate": None if args.archive else args.failure_rate,
+        "model_latency_s": args.model_latency,
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
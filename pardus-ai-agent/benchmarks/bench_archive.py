@@ -0,0 +1,102 @@
+# benchmarks/bench_archive.py
+# Arşiv veritabanının (archive_manager) göç ve arama performansını ölçer.
+# Geçici bir klasörde eski düzende birkaç etkileşim klasörü ve çok sayıda
+# (varsayılan 100.000) kayıt oluşturur, ardından '/history' sorgularının
+# gecikmesini raporlar.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_archive.py --records 100000
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import archive_manager
+
+WORDS = [
+    "nginx", "apache", "htop", "neofetch", "docker", "git", "python", "disk", "bellek",
+    "servis", "yedek", "kullanıcı", "paket", "güncelle", "kur", "kaldır", "log", "ağ",
+    "firewall", "ssh", "cron", "postgresql", "redis", "klasör", "dosya", "izin",
+]
+
+
+def make_legacy_dirs(count: int):
+    """Eski 'YYYYMMDD_HHMMSS/' düzeninde örnek klasörler oluşturur."""
+    base = datetime.datetime(2024, 1, 1)
+    for i in range(count):
+        name = (base + datetime.timedelta(seconds=i)).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(archive_manager.ARCHIVE_DIR, name)
+        os.makedirs(path)
+        with open(os.path.join(path, "prompt.txt"), "w", encoding="utf-8") as f:
+            f.write(f"eski istek {i}: legacyterim kur")
+        with open(os.path.join(path, "reasoning_and_code.py"), "w", encoding="utf-8") as f:
+            f.write(f"# --- AI Düşünce Süreci ---\n'''\nplan {i}\n'''\n\n# --- Üretilen Kod ---\nprint({i})")
+        with open(os.path.join(path, "output.log"), "w", encoding="utf-8") as f:
+            f.write(f"--- STDOUT (Standart Çıktı) ---\n{i}\n\n\n--- STDERR (Hata Çıktısı) ---\n")
+
+
+def fill(records: int, rng: random.Random):
+    """Arşive hızlıca çok sayıda kayıt ekler (tek bir işlem içinde)."""
+    conn = archive_manager.get_connection()
+    now = datetime.datetime.now()
+    with conn:
+        for i in range(records):
+            words = rng.sample(WORDS, 4)
+            prompt = f"{words[0]} {words[1]} için bir betik yaz ({i})"
+            code = f"import subprocess\nsubprocess.run(['sudo', 'apt', 'install', '-y', '{words[2]}'])"
+            archive_manager._insert(
+                conn, f"bench_{i}", now.isoformat(timespec="seconds"), prompt,
+                f"Plan: {words[3]} kontrol edilecek.", code, f"{words[2]} kuruldu", "", rng.choice([0, 0, 0, 1]),
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arşiv veritabanı performans testi")
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--legacy", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        archive_manager.ensure_archive_dir_exists()
+        make_legacy_dirs(args.legacy)
+
+        started = time.perf_counter()
+        archive_manager.get_connection() # Açılışta eski düzen otomatik aktarılır.
+        print(f"Göç: {args.legacy} klasör, {(time.perf_counter() - started) * 1000:.1f} ms")
+        assert archive_manager.search("legacyterim", limit=1000), "Eski kayıtlar bulunamadı"
+
+        started = time.perf_counter()
+        fill(args.records, rng)
+        print(f"Doldurma: {args.records} kayıt, {time.perf_counter() - started:.1f} sn")
+
+        started = time.perf_counter()
+        for i in range(100):
+            archive_manager.log_interaction(f"tekil kayıt {i}", "plan", "print(1)", "1", "", 0, verbose=False)
+        print(f"log_interaction: {(time.perf_counter() - started) * 10:.2f} ms/kayıt")
+
+        queries = [" ".join(rng.sample(WORDS, rng.choice([1, 2]))) for _ in range(args.queries)]
+        queries += ["nadirbulunanterim", "kur", ""]
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            archive_manager.search(query, limit=10)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        print(f"/history: {archive_manager.count()} kayıt üzerinde {len(queries)} sorgu  "
+              f"medyan = {statistics.median(latencies) * 1000:.2f} ms  "
+              f"p99 = {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms  "
+              f"max = {latencies[-1] * 1000:.2f} ms")
+        archive_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_archive_writer.py
+# Arşiv yazımının REPL tur gecikmesine etkisini ölçer.
+# Yavaş bir disk (örn. NFS), her yazma işlemine (transaction) yapay bir
+# gecikme eklenerek taklit edilir. Aynı tur dizisi önce senkron yazma ile,
+# sonra arka plan yazıcısı (ArchiveWriter) ile çalıştırılır ve log_interaction
+# çağrısının turu ne kadar beklettiği raporlanır. Son olarak küçük bir kuyrukla
+# ani bir yük (burst) gönderilip geri basınç/bırakma sayaçları gösterilir.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_archive_writer.py --turns 50 --storage-delay 0.2
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import archive_manager
+
+
+def inject_storage_delay(delay: float):
+    """Her toplu yazmadan önce 'delay' saniye bekleyen yavaş bir disk taklidi."""
+    original = archive_manager._write_batch
+
+    def slow_write_batch(records):
+        time.sleep(delay)
+        return original(records)
+
+    archive_manager._write_batch = slow_write_batch
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run_turns(turns: int, think_time: float) -> list:
+    """REPL turlarını taklit eder; her turun arşivleme için beklediği süreyi döndürür."""
+    latencies = []
+    for i in range(turns):
+        time.sleep(think_time) # Kullanıcının yazması + modelin cevabı + betiğin çalışması
+        start = time.perf_counter()
+        archive_manager.log_interaction(
+            f"istek {i}", "plan", f"print({i})", f"{i}\n", "", 0, verbose=False,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list, total: float):
+    print(f"{name:<12} tur başına arşiv beklemesi: p50={statistics.median(latencies):8.2f} ms  "
+          f"p99={percentile(latencies, 99):8.2f} ms  max={max(latencies):8.2f} ms  "
+          f"(toplam {total:.2f} sn)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arka plan arşiv yazıcısı performans testi")
+    parser.add_argument("--turns", type=int, default=50, help="Taklit edilecek REPL turu sayısı")
+    parser.add_argument("--storage-delay", type=float, default=0.2, help="Her yazma işlemine eklenen gecikme (saniye)")
+    parser.add_argument("--think-time", type=float, default=0.02, help="Turlar arasındaki süre (saniye)")
+    parser.add_argument("--burst", type=int, default=500, help="Ani yük testinde gönderilecek kayıt sayısı")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pardus_archive_writer_")
+    os.chdir(workdir)
+    archive_manager.get_connection()
+    inject_storage_delay(args.storage_delay)
+    print(f"Çalışma dizini: {workdir}  (yapay disk gecikmesi: {args.storage_delay * 1000:.0f} ms/işlem)")
+
+    # 1) Senkron yazma: her tur diskin cevabını bekler.
+    start = time.perf_counter()
+    sync_latencies = run_turns(args.turns, args.think_time)
+    report("senkron", sync_latencies, time.perf_counter() - start)
+
+    # 2) Arka plan yazıcısı: tur sadece kuyruğa ekleme kadar bekler.
+    writer = archive_manager.start_background_writer(flush_interval=0.05)
+    start = time.perf_counter()
+    bg_latencies = run_turns(args.turns, args.think_time)
+    total = time.perf_counter() - start
+    archive_manager.flush()
+    report("arka plan", bg_latencies, total)
+    print(f"             {writer.stats()}")
+    archive_manager.stop_background_writer()
+
+    expected = args.turns * 2
+    assert archive_manager.count() == expected, f"Beklenen {expected} kayıt, bulunan {archive_manager.count()}"
+    print(f"Arşivdeki kayıt sayısı: {archive_manager.count()} (beklenen {expected}) ✅")
+    print(f"Hızlanma (p50): {statistics.median(sync_latencies) / statistics.median(bg_latencies):.0f}x")
+
+    # 3) Ani yük: küçük kuyruk ve kısa geri basınç süresiyle sayaçları göster.
+    writer = archive_manager.start_background_writer(queue_size=32, batch_size=16, block_timeout=0.01)
+    start = time.perf_counter()
+    for i in range(args.burst):
+        archive_manager.log_interaction(f"burst {i}", "", "", "", "", 0, verbose=False)
+    elapsed = time.perf_counter() - start
+    archive_manager.flush()
+    stats = writer.stats()
+    archive_manager.stop_background_writer()
+    print(f"\nAni yük ({args.burst} kayıt, {elapsed:.2f} sn): {stats}")
+    assert stats["written"] + stats["dropped"] == args.burst
+
+
+if __name__ == "__main__":
+    main()
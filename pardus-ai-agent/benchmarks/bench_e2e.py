@@ -0,0 +1,179 @@
+# benchmarks/bench_e2e.py
+# Uçtan uca REPL turu ölçümü.
+# Bir senaryo (workload) dosyasındaki kullanıcı isteklerini, main.py'deki
+# döngünün yaptığı adımlarla sırayla çalıştırır ve her adımın süresini ayrı
+# ayrı ölçer:
+#     prompt_build -> model_call -> parse -> execute -> archive
+# Model olarak API anahtarı gerektirmeyen yerel arka uç (stub_model.StubModel)
+# kullanılır; cevaplar senaryodaki kurallardan deterministik olarak seçilir,
+# gecikme ve token hızı komut satırından ayarlanır. Sonuçlar (yüzdelikler)
+# makine tarafından okunabilir JSON olarak basılır veya dosyaya yazılır.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_e2e.py --repeat 20 --latency 0.05 --tokens-per-second 400
+#     python3 benchmarks/bench_e2e.py --workload benchmarks/workloads/sysadmin.json --output sonuc.json
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import ai_core, action_executor, archive_manager, history_manager, stub_model
+
+DEFAULT_WORKLOAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workloads", "sysadmin.json")
+
+STAGES = ("prompt_build", "model_call", "parse", "execute", "archive", "turn")
+
+
+def percentile(values: list, p: float) -> float:
+    """Doğrusal ara değerlemeli yüzdelik (p: 0-100)."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    k = (len(ordered) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize(samples: list) -> dict:
+    """Milisaniye cinsinden örneklerin özetini döndürür."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p90_ms": round(percentile(samples, 90), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+class Timer:
+    """'with timer.stage("ad"):' ile bir adımın süresini kaydeder."""
+
+    def __init__(self):
+        self.samples = {name: [] for name in STAGES}
+        self._name = None
+        self._start = 0.0
+
+    def stage(self, name: str):
+        self._name = name
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples[self._name].append((time.perf_counter() - self._start) * 1000)
+        return False
+
+
+def run_turn(user_prompt: str, execute: bool, state: dict, timer: Timer, stream: bool):
+    """main.py'deki döngünün tek bir turu (kullanıcı onayı her zaman 'y')."""
+    with timer.stage("prompt_build"):
+        full_prompt = ai_core.build_prompt(user_prompt, state["last_command_output"])
+
+    with timer.stage("model_call"):
+        if stream:
+            response_text = "".join(ai_core.stream_action(full_prompt, state["history"]))
+        else:
+            response_text, state["history"] = ai_core.generate_action(full_prompt, state["history"])
+
+    with timer.stage("parse"):
+        plain_text, reasoning, code = ai_core.parse_response(response_text)
+
+    if not code:
+        state["last_command_output"] = "Asistan bir betik üretmedi, sadece konuştu."
+        return
+    if not execute:
+        state["last_command_output"] = "Kullanıcı işlemi iptal etti."
+        return
+
+    with timer.stage("execute"):
+        stdout, stderr, returncode = action_executor.execute_script(code)
+        state["last_command_output"] = action_executor.summarize_output(stdout, stderr, returncode)
+
+    with timer.stage("archive"):
+        archive_manager.log_interaction(user_prompt, reasoning or "Yok", code, stdout, stderr, returncode, verbose=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca REPL turu performans testi")
+    parser.add_argument("--workload", default=DEFAULT_WORKLOAD, help="Senaryo dosyası (JSON)")
+    parser.add_argument("--repeat", type=int, default=10, help="Senaryonun kaç kez tekrarlanacağı")
+    parser.add_argument("--warmup", type=int, default=1, help="Ölçülmeyen ısınma tekrarı sayısı")
+    parser.add_argument("--latency", type=float, default=0.0, help="Yerel modelin ilk parça gecikmesi (saniye)")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="Yerel modelin üretim hızı (0: anında)")
+    parser.add_argument("--stream", action="store_true", help="Model cevabını akış modunda al")
+    parser.add_argument("--executor-pool", type=int, default=0, help="Yorumlayıcı havuzu boyutu (0: kapalı)")
+    parser.add_argument("--archive-background", action="store_true", help="Arşivi arka plan yazıcısıyla yaz")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya (verilmezse ekrana basılır)")
+    args = parser.parse_args()
+
+    with open(args.workload, "r", encoding="utf-8") as f:
+        workload = json.load(f)
+    responses, rules = stub_model.load_script(args.workload)
+    ai_core.set_backend(stub_model.StubModel(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        responses=responses,
+        rules=rules,
+    ))
+
+    # Betikler ve arşiv geçici bir dizinde çalışır.
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = tempfile.mkdtemp(prefix="pardus_e2e_")
+    os.chdir(workdir)
+    if args.executor_pool:
+        action_executor.enable_pool(args.executor_pool)
+    if args.archive_background:
+        archive_manager.start_background_writer()
+    archive_manager.get_connection() # Veritabanının açılışı ölçüme dahil olmasın.
+
+    timer = Timer()
+    state = {"history": history_manager.HistoryManager(), "last_command_output": "Yok (ilk komut)."}
+    started = time.perf_counter()
+    for iteration in range(args.warmup + args.repeat):
+        if iteration == args.warmup:
+            timer = Timer() # Isınma turlarını at.
+            started = time.perf_counter()
+        for turn in workload["turns"]:
+            turn_start = time.perf_counter()
+            run_turn(turn["prompt"], turn.get("execute", True), state, timer, args.stream)
+            timer.samples["turn"].append((time.perf_counter() - turn_start) * 1000)
+    elapsed = time.perf_counter() - started
+    archive_manager.stop_background_writer()
+
+    result = {
+        "benchmark": "e2e_turn",
+        "workload": workload.get("name", os.path.basename(args.workload)),
+        "config": {
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "latency_s": args.latency,
+            "tokens_per_second": args.tokens_per_second,
+            "stream": args.stream,
+            "executor_pool": args.executor_pool,
+            "archive_background": args.archive_background,
+            "python": platform.python_version(),
+        },
+        "turns": len(timer.samples["turn"]),
+        "elapsed_s": round(elapsed, 3),
+        "stages": {name: summarize(timer.samples[name]) for name in STAGES},
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_executor.py
+# action_executor.execute_script için betik başına gecikmeyi ölçer:
+# soğuk başlangıç (her betikte yeni 'python3') ile önceden ısıtılmış
+# yorumlayıcı havuzu karşılaştırılır.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_executor.py --runs 20 --gap 0.2
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import action_executor
+
+# Ajanın ürettiği tipik bir betiğe benzer: yaygın modülleri içe aktarır ve
+# kısa bir iş yapar.
+SCRIPT = """
+import subprocess
+import shutil
+try:
+    import requests
+except ImportError:
+    pass
+print(shutil.disk_usage('.').free > 0)
+"""
+
+
+def measure(runs: int, gap: float) -> list:
+    latencies = []
+    for _ in range(runs):
+        # REPL'de kullanıcı onayı arasında geçen süreyi taklit et; havuz bu
+        # sürede yeni işçiyi ısıtır.
+        time.sleep(gap)
+        started = time.perf_counter()
+        stdout, stderr, returncode = action_executor.execute_script(SCRIPT)
+        latencies.append(time.perf_counter() - started)
+        if returncode != 0:
+            raise RuntimeError(f"Betik başarısız oldu: {stderr}")
+    return latencies
+
+
+def report(name: str, latencies: list):
+    ordered = sorted(latencies)
+    p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+    print(f"{name:>14}: medyan = {statistics.median(latencies) * 1000:7.1f} ms   p90 = {p90 * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soğuk başlangıç ve yorumlayıcı havuzu karşılaştırması")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--gap", type=float, default=0.2, help="Betikler arası bekleme (sn)")
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    action_executor.disable_pool()
+    report("soğuk başlangıç", measure(args.runs, args.gap))
+
+    action_executor.enable_pool(args.pool_size)
+    try:
+        report("havuz", measure(args.runs, args.gap))
+    finally:
+        action_executor.disable_pool()
+
+
+if __name__ == "__main__":
+    main()
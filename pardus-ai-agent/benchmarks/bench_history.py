@@ -0,0 +1,96 @@
+# benchmarks/bench_history.py
+# Geçmiş yöneticisinin (history_manager) uzun oturumlarda prompt boyutunu
+# sabit tuttuğunu gösteren test düzeneği. Gerçek bir API anahtarı gerekmez;
+# yerel, sahte (fake) bir model kullanılır.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_history.py --turns 500
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import ai_core
+from agent import history_manager
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    """google.generativeai ChatSession'ın bu test için gereken kısmını taklit eder."""
+
+    def __init__(self, model, history):
+        self.model = model
+        self.history = list(history)
+
+    def send_message(self, message):
+        # Modele gidecek toplam metnin boyutunu (geçmiş + yeni mesaj) ölç.
+        sent_chars = sum(len(part) for item in self.history for part in item["parts"])
+        sent_chars += len(message)
+        self.model.sent_chars.append(sent_chars)
+        text = (
+            "```python\n'''\nPlan:\n1. Disk kullanımını kontrol edeceğim.\n'''\n"
+            "import subprocess\nsubprocess.run(['df', '-h'])\n```"
+        )
+        self.history.append({"role": "user", "parts": [message]})
+        self.history.append({"role": "model", "parts": [text]})
+        return FakeResponse(text)
+
+
+class FakeModel:
+    def __init__(self):
+        self.start_chat_calls = 0
+        self.sent_chars = []
+
+    def start_chat(self, history=None):
+        self.start_chat_calls += 1
+        return FakeChat(self, history or [])
+
+
+def simulate(turns: int, output_chars: int, token_budget: int) -> FakeModel:
+    """'turns' tur boyunca main.py'deki geri bildirim döngüsünü taklit eder."""
+    fake = FakeModel()
+    ai_core.model = fake
+    history = history_manager.HistoryManager(token_budget=token_budget)
+    last_command_output = "Yok (ilk komut)."
+    for i in range(turns):
+        full_prompt = (
+            f"Kullanıcı İsteği: {i}. adım: disk kullanımını göster\n\n"
+            f"Önceki Komutun Çıktısı (stdout/stderr):\n---\n{last_command_output}\n---"
+        )
+        _, history = ai_core.generate_action(full_prompt, history)
+        # Her turda büyük bir komut çıktısı üretildiğini varsayıyoruz.
+        last_command_output = f"STDOUT:\n{'x' * output_chars}\n\nSTDERR:\n"
+    return fake
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geçmiş yöneticisi prompt boyutu testi")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--output-chars", type=int, default=20000)
+    parser.add_argument("--budget", type=int, default=history_manager.DEFAULT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    fake = simulate(args.turns, args.output_chars, args.budget)
+    sizes = fake.sent_chars
+    for turn in (1, 10, 50, 100, 250, args.turns):
+        if turn <= len(sizes):
+            size = sizes[turn - 1]
+            print(f"Tur {turn:>4}: {size:>8} karakter (~{size // history_manager.CHARS_PER_TOKEN} token)")
+    print(f"start_chat çağrısı: {fake.start_chat_calls}")
+
+    # Isınma turlarından sonra prompt boyutu büyümemeli.
+    warmup = min(20, len(sizes))
+    steady_max = max(sizes[warmup:]) if len(sizes) > warmup else max(sizes)
+    early_max = max(sizes[:warmup])
+    ok = steady_max <= early_max * 1.1 and fake.start_chat_calls == 1
+    print("SONUÇ:", "BAŞARILI - prompt boyutu sabit" if ok else "BAŞARISIZ - prompt boyutu büyüyor")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/bench_metrics.py
+# Tur ölçümlerinin (agent/metrics.py) tur başına ek maliyetini ölçer.
+#
+# main.py'deki bir turun ölçüm çağrıları (start_turn, adım başına
+# 'with turn.stage(...)', boyut kayıtları ve finish) gövdeleri boş bırakılarak
+# aynı sırayla çalıştırılır ve ölçümsüz aynı turla karşılaştırılır:
+#   - memory:     Sadece bellekteki histogramlar ('/stats').
+#   - jsonl:      Her tur dosyaya bir JSON satırı olarak eklenir.
+#   - prometheus: Dosya her turda yeniden yazılır (en kötü durum, aralık 0)
+#                 ve varsayılan aralıkla (15 s; çoğu tur dosyaya dokunmaz).
+# Ayrıca kovalardan tahmin edilen yüzdeliklerin, log-normal dağılmış
+# örneklerin gerçek yüzdeliklerine göre bağıl hatası ve '/stats' tablosunun
+# oluşturulma süresi raporlanır.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_metrics.py --turns 20000
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import metrics
+
+# main.py'de bir turda (betik çalıştırılan, akışsız) ölçülen adımlar.
+TURN_STAGES = ("prompt_build", "cache_lookup", "model_wait", "model_call", "parse", "confirm_wait", "execute",
+               "archive")
+
+
+def bare_turn(registry):
+    # Ölçümsüz tur: aynı kontrol akışı, ölçüm çağrısı yok.
+    for _ in TURN_STAGES:
+        pass
+
+
+def instrumented_turn(registry):
+    turn = metrics.Turn(registry)
+    for name in TURN_STAGES:
+        with turn.stage(name):
+            pass
+    turn.observe("prompt_chars", 1800)
+    turn.observe("response_chars", 2400)
+    turn.observe("output_chars", 350)
+    turn.finish("executed")
+
+
+def per_turn_us(func, registry, turns: int, rounds: int) -> float:
+    """'rounds' turdan oluşan ölçümlerin medyanı, tur başına mikrosaniye."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(turns // rounds):
+            func(registry)
+        samples.append((time.perf_counter() - start) / (turns // rounds) * 1e6)
+    return statistics.median(samples)
+
+
+def overhead(registry, turns: int, rounds: int) -> dict:
+    bare = per_turn_us(bare_turn, registry, turns, rounds)
+    instrumented = per_turn_us(instrumented_turn, registry, turns, rounds)
+    return {"bare_us": round(bare, 3), "instrumented_us": round(instrumented, 3),
+            "overhead_us": round(instrumented - bare, 3)}
+
+
+def exact_percentile(ordered: list, q: float) -> float:
+    k = (len(ordered) - 1) * q
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def quantile_accuracy(samples: int, seed: int) -> dict:
+    # Model çağrısı süresine benzer bir dağılım: medyan ~1.5 s, uzun kuyruk.
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(0.4, 0.8) for _ in range(samples)]
+    histogram = metrics.Histogram(metrics.TIME_BUCKETS)
+    for value in values:
+        histogram.observe(value)
+    ordered = sorted(values)
+    result = {}
+    for q in (0.5, 0.9, 0.99):
+        exact = exact_percentile(ordered, q)
+        estimate = histogram.quantile(q)
+        result[f"p{round(q * 100)}"] = {"exact": round(exact, 4), "estimate": round(estimate, 4),
+                                        "relative_error": round(abs(estimate - exact) / exact, 4)}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tur ölçümlerinin ek maliyet testi")
+    parser.add_argument("--turns", type=int, default=20000, help="Her mod için ölçülecek tur sayısı")
+    parser.add_argument("--rounds", type=int, default=10, help="Medyanı alınacak ölçüm sayısı")
+    parser.add_argument("--samples", type=int, default=100000, help="Yüzdelik doğruluğu için örnek sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    result = {"benchmark": "metrics", "turns": args.turns, "stages_per_turn": len(TURN_STAGES)}
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = {
+            "memory": None,
+            "jsonl": ("turns.jsonl", "jsonl", 0),
+            "prometheus_every_turn": ("every.prom", "prometheus", 0),
+            "prometheus_default": ("default.prom", "prometheus", metrics.DEFAULT_EXPORT_INTERVAL),
+        }
+        for mode, export in modes.items():
+            registry = metrics.Metrics()
+            if export:
+                name, fmt, interval = export
+                registry.exporter = metrics.Exporter(os.path.join(tmp, name), fmt, interval, registry)
+            # Prometheus dosyası her turda yazılıyorsa çok daha az tur yeterli.
+            turns = args.turns // 20 if mode == "prometheus_every_turn" else args.turns
+            result[mode] = overhead(registry, turns, args.rounds)
+            print(f"{mode}: tur başına {result[mode]['overhead_us']} µs", file=sys.stderr)
+        prom_bytes = os.path.getsize(os.path.join(tmp, "every.prom"))
+
+    start = time.perf_counter()
+    for _ in range(100):
+        table = metrics.format_stats(registry.snapshot())
+    result["stats_render_ms"] = round((time.perf_counter() - start) / 100 * 1000, 3)
+    result["stats_lines"] = len(table.splitlines())
+    result["prometheus_file_bytes"] = prom_bytes
+    result["quantile_accuracy"] = quantile_accuracy(args.samples, args.seed)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
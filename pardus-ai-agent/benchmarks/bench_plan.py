@@ -0,0 +1,129 @@
+# benchmarks/bench_plan.py
+# Paralel adım planlarının (plan_executor.py) kazandırdığı süreyi ölçer.
+#
+# Ağ/disk bekleyen gerçek adımların yerine 'time.sleep' yapan adımlarla iki
+# senaryo kurulur (süreler tohumla üretilir, her çalıştırmada aynıdır):
+#   - fan_out:  N sunucunun (örn. servis durumu) birbirinden bağımsız kontrolü
+#               ve hepsini bekleyen bir özet adımı.
+#   - pipeline: N deponun indirilmesi, her birinin kendi indirmesini bekleyen
+#               bir açma/kurma adımı ve hepsini bekleyen bir özet adımı.
+# Plan, modelin cevap formatında bir metne çevrilip ai_core.parse_response ve
+# ai_core.parse_plan'den geçirilir (gerçek akıştaki gibi). Ardından:
+#   - serial:    Kodun tamamı tek betik olarak (eski davranış) çalıştırılır.
+#   - workers=k: execute_plan ile en fazla k adım aynı anda çalıştırılır.
+# Her mod için toplam süre, ilk adım sonucunun gelme süresi (seri modda geri
+# bildirim ancak her şey bitince gelir) ve kritik yola (bağımlılık zincirindeki
+# en uzun toplam uyku) göre alt sınır raporlanır.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_plan.py --steps 8 --workers 1 2 4 8
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import action_executor, ai_core, plan_executor
+
+
+def fan_out(steps: int, rng: random.Random) -> tuple[str, dict, dict]:
+    """Kod, adım başına uyku süresi ve bağımlılıklar."""
+    sleeps, deps, blocks = {}, {}, []
+    for i in range(steps):
+        name = f"sunucu{i + 1}"
+        sleeps[name] = round(rng.uniform(0.3, 1.0), 2)
+        deps[name] = []
+    sleeps["ozet"], deps["ozet"] = 0.0, list(sleeps)
+    for name in sleeps:
+        after = f" after={','.join(deps[name])}" if deps[name] else ""
+        blocks.append(f"# @step {name}{after}\ntime.sleep({sleeps[name]})\nprint('{name} tamam')")
+    return "import time\n\n" + "\n\n".join(blocks), sleeps, deps
+
+
+def pipeline(steps: int, rng: random.Random) -> tuple[str, dict, dict]:
+    sleeps, deps, blocks = {}, {}, []
+    for i in range(steps):
+        sleeps[f"indir{i + 1}"], deps[f"indir{i + 1}"] = round(rng.uniform(0.3, 0.8), 2), []
+        sleeps[f"kur{i + 1}"], deps[f"kur{i + 1}"] = round(rng.uniform(0.1, 0.4), 2), [f"indir{i + 1}"]
+    sleeps["ozet"], deps["ozet"] = 0.0, [f"kur{i + 1}" for i in range(steps)]
+    for name in sleeps:
+        after = f" after={','.join(deps[name])}" if deps[name] else ""
+        blocks.append(f"# @step {name}{after}\ntime.sleep({sleeps[name]})\nprint('{name} tamam')")
+    return "import time\n\n" + "\n\n".join(blocks), sleeps, deps
+
+
+def critical_path(sleeps: dict, deps: dict) -> float:
+    memo = {}
+
+    def longest(name):
+        if name not in memo:
+            memo[name] = sleeps[name] + max((longest(d) for d in deps[name]), default=0.0)
+        return memo[name]
+
+    return max(longest(name) for name in sleeps)
+
+
+def run_scenario(code: str, sleeps: dict, deps: dict, workers_list: list) -> dict:
+    # Kod, modelin cevap formatından geçirilerek çıkarılır.
+    response = ai_core.format_action("Plan: adımları aynı anda çalıştır.", code)
+    _, _, extracted = ai_core.parse_response(response)
+    steps = ai_core.parse_plan(extracted)
+
+    result = {"steps": len(steps), "total_sleep_s": round(sum(sleeps.values()), 2),
+              "critical_path_s": round(critical_path(sleeps, deps), 2)}
+    start = time.perf_counter()
+    stdout, stderr, returncode = action_executor.execute_script(extracted)
+    serial = time.perf_counter() - start
+    result["serial"] = {"seconds": round(serial, 3), "first_result_s": round(serial, 3), "returncode": returncode}
+    print(f"  serial: {serial:.2f} s", file=sys.stderr)
+
+    for workers in workers_list:
+        first = []
+        start = time.perf_counter()
+        results = plan_executor.execute_plan(steps, workers,
+                                             on_result=lambda r: first or first.append(time.perf_counter() - start))
+        elapsed = time.perf_counter() - start
+        result[f"workers_{workers}"] = {
+            "seconds": round(elapsed, 3),
+            "first_result_s": round(first[0], 3),
+            "speedup": round(serial / elapsed, 2),
+            "all_ok": all(r.status == plan_executor.OK for r in results),
+        }
+        print(f"  workers={workers}: {elapsed:.2f} s (x{serial / elapsed:.2f})", file=sys.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paralel adım planı hızlanma testi")
+    parser.add_argument("--steps", type=int, default=8, help="Bağımsız adım (sunucu/depo) sayısı")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Denenecek işçi sayıları")
+    parser.add_argument("--executor-pool", type=int, default=0, help="Yorumlayıcı havuzu boyutu (0: kapalı)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    # Geçici betik dosyaları ayrı bir dizinde oluşturulur.
+    os.chdir(tempfile.mkdtemp(prefix="pardus_plan_"))
+    if args.executor_pool:
+        action_executor.enable_pool(args.executor_pool)
+
+    result = {"benchmark": "plan_executor", "cpu_count": os.cpu_count(), "executor_pool": args.executor_pool}
+    for name, build in (("fan_out", fan_out), ("pipeline", pipeline)):
+        print(f"{name}:", file=sys.stderr)
+        result[name] = run_scenario(*build(args.steps, random.Random(args.seed)), args.workers)
+    action_executor.disable_pool()
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# benchmarks/bench_startup.py
+# Açılış (cold start) süresini ölçer.
+#
+# 1) İçe aktarma raporu: 'python3 -X importtime' ile agent.main modülünü yükler
+#    ve en pahalı modülleri listeler (açılışta hangi modüllerin yüklendiğini
+#    takip etmek için).
+# 2) İlk isteme kadar geçen süre: asistanı geçici bir HOME dizini ve hazır bir
+#    config.json ile başlatır, 'Pardus 👤 >' istemi ekrana gelene kadar geçen
+#    süreyi ölçer. Model istemcisi arka planda yüklendiği için bu süre model
+#    kütüphanesinin yüklenme süresini içermemelidir.
+#
+# Sonuç hedefi (varsayılan 150 ms) aşarsa program 1 koduyla çıkar; böylece
+# CI'da izlenebilir. Modelin kütüphanesinin (google.generativeai) ve colorama'nın
+# kurulu olması gerekir.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_startup.py --runs 10 --target-ms 150 --output startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPT_MARKER = "Pardus 👤 >".encode("utf-8")
+
+# Asistanı kurulu 'pardus-ai-agent' komutunun yaptığı gibi başlatır.
+LAUNCH_CODE = "from agent.main import main; main()"
+
+
+def child_env(home: str) -> dict:
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_report(module: str, env: dict, top: int) -> dict:
+    """'-X importtime' çıktısını ayrıştırır ve en pahalı modülleri döndürür."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return {"module": module, "error": result.stderr.strip().splitlines()[-1]}
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    total = next((r["cumulative_us"] for r in rows if r["module"] == module), 0)
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 2),
+        "modules_loaded": len(rows),
+        "top_self": sorted(rows, key=lambda r: r["self_us"], reverse=True)[:top],
+    }
+
+
+def time_to_prompt(env: dict, timeout: float = 30.0) -> float:
+    """Asistanı başlatır ve istem ekrana gelene kadar geçen süreyi (ms) döndürür."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", LAUNCH_CODE],
+        cwd=env["HOME"], env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    output = b""
+    try:
+        while PROMPT_MARKER not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f"Asistan istem göstermeden kapandı:\n{output.decode('utf-8', 'replace')}")
+            output += chunk
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError("İstem zaman aşımı içinde görünmedi.")
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        # EOF (Ctrl+D) ile asistan kapanır.
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        process.stdout.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Açılış süresi ölçümü")
+    parser.add_argument("--runs", type=int, default=10, help="Ölçüm tekrarı")
+    parser.add_argument("--target-ms", type=float, default=150.0, help="İlk isteme kadar hedef süre (medyan)")
+    parser.add_argument("--backend", default="gemini", choices=["gemini", "local"], help="config.json'daki arka uç")
+    parser.add_argument("--top", type=int, default=10, help="Raporda gösterilecek modül sayısı")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp(prefix="pardus_startup_")
+    config_dir = os.path.join(home, ".config", "pardus-ai-agent")
+    os.makedirs(config_dir)
+    with open(os.path.join(config_dir, "config.json"), "w") as f:
+        # Sahte anahtar: model kurulumu ağa çıkmaz, sadece istemci oluşturulur.
+        json.dump({"api_key": "benchmark", "model_name": "models/gemini-2.5-flash", "backend": args.backend}, f)
+    env = child_env(home)
+
+    report = import_report("agent.main", env, args.top)
+    deferred = import_report("google.generativeai", env, 0)
+    time_to_prompt(env) # Isınma (disk önbelleği)
+    samples = [time_to_prompt(env) for _ in range(args.runs)]
+    median = statistics.median(samples)
+
+    result = {
+        "benchmark": "startup",
+        "backend": args.backend,
+        "import_agent_main": report,
+        "deferred_import_ms": {"google.generativeai": deferred.get("total_ms", deferred.get("error"))},
+        "time_to_prompt_ms": {
+            "runs": len(samples),
+            "min": round(min(samples), 2),
+            "median": round(median, 2),
+            "max": round(max(samples), 2),
+        },
+        "target_ms": args.target_ms,
+        "passed": median <= args.target_ms,
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    print(f"\nİlk isteme kadar (medyan): {median:.1f} ms  hedef: {args.target_ms:.0f} ms  "
+          f"{'BAŞARILI' if result['passed'] else 'BAŞARISIZ'}")
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_streaming.py
+# Akış (streaming) modunun "ilk çıktıya kadar geçen süre"yi (time-to-first-output)
+# ne kadar kısalttığını ölçer. Token başına yapay gecikmesi olan sahte bir model
+# kullanılır; API anahtarı gerekmez.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/bench_streaming.py --latency 0.3 --token-delay 0.01
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import ai_core
+from agent import history_manager
+from agent import stub_model
+
+# Gerçekçi uzunlukta bir cevap: uzun bir düşünce süreci ve ardından kod.
+RESPONSE = (
+    "```python\n'''\nPlan:\n"
+    + "".join(f"{i}. Adım: sistem durumunu kontrol edip sonucu raporlayacağım.\n" for i in range(1, 9))
+    + "'''\nimport subprocess\n"
+    + "".join(f"subprocess.run(['echo', 'adim {i}'])\n" for i in range(20))
+    + "```"
+)
+
+
+def run_blocking(prompt):
+    history = history_manager.HistoryManager()
+    started = time.perf_counter()
+    text, _ = ai_core.generate_action(prompt, history)
+    ai_core.parse_response(text)
+    total = time.perf_counter() - started
+    # Akışsız modda kullanıcı, cevabın tamamı gelene kadar hiçbir şey görmez.
+    return total, total
+
+
+def run_streaming(prompt):
+    history = history_manager.HistoryManager()
+    parser = ai_core.StreamingResponseParser()
+    started = time.perf_counter()
+    first_output = None
+    for chunk in ai_core.stream_action(prompt, history):
+        events = parser.feed(chunk)
+        if first_output is None and any(kind != "code" for kind, _ in events):
+            first_output = time.perf_counter() - started
+    parser.finish()
+    total = time.perf_counter() - started
+    return first_output if first_output is not None else total, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Akış modu ilk çıktı süresi ölçümü")
+    parser.add_argument("--latency", type=float, default=0.3, help="Modelin ilk token gecikmesi (sn)")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Parça başına gecikme (sn)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    ai_core.model = stub_model.StubModel(
+        latency=args.latency, response_text=RESPONSE, token_delay=args.token_delay
+    )
+    prompt = "Kullanıcı İsteği: sistem durumunu raporla"
+    for name, runner in (("akışsız", run_blocking), ("akış", run_streaming)):
+        results = [runner(prompt) for _ in range(args.runs)]
+        ttfo = statistics.median(r[0] for r in results) * 1000
+        total = statistics.median(r[1] for r in results) * 1000
+        print(f"{name:>8}: ilk çıktı = {ttfo:8.1f} ms   toplam = {total:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
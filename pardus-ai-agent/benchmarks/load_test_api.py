@@ -0,0 +1,149 @@
+# benchmarks/load_test_api.py
+# serve_api.py için yük testi. Sunucuyu sahte (stub) modelle aynı süreç içinde
+# başlatır ve 1, 10 ve 100 eşzamanlı oturum için /prompt gecikmesinin p50/p99
+# değerlerini raporlar. --url verilirse dışarıda çalışan bir sunucu test edilir.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/load_test_api.py
+#     PARDUS_API_TOKEN=... python3 benchmarks/load_test_api.py --url http://127.0.0.1:8080 --sessions 1 10 100
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    """Sıralı olmayan bir listeden yüzdelik değeri (en yakın sıra yöntemiyle) döndürür."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Client:
+    """Tek bir keep-alive bağlantısı üzerinden JSON istekleri gönderen basit istemci."""
+
+    def __init__(self, host, port, token):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nAuthorization: Bearer {self.token}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        data = await self.reader.readexactly(length)
+        return status, json.loads(data)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def run_session(host, port, token, session_id, requests_per_session, latencies, statuses):
+    client = Client(host, port, token)
+    try:
+        for i in range(requests_per_session):
+            started = time.perf_counter()
+            status, _ = await client.request("POST", f"/sessions/{session_id}/prompt", {"prompt": f"istek {i}"})
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+        await client.request("DELETE", f"/sessions/{session_id}")
+    finally:
+        await client.close()
+
+
+async def run_level(host, port, token, sessions, requests_per_session):
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(host, port, token, f"bench-{sessions}-{i}", requests_per_session, latencies, statuses)
+        for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "statuses": statuses,
+    }
+
+
+async def main_async(args):
+    server = service = None
+    token = args.token
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        import serve_api
+        from agent import ai_core
+        from agent import stub_model
+        ai_core.model = stub_model.StubModel(latency=args.stub_latency)
+        service = serve_api.AgentService(
+            model_workers=args.model_workers, max_queue_depth=args.max_queue_depth, archive=False, api_token=token
+        )
+        server = await serve_api.start_server(service, "127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    results = []
+    try:
+        for sessions in args.sessions:
+            result = await run_level(host, port, token, sessions, args.requests)
+            results.append(result)
+            print(
+                f"{sessions:>4} oturum: p50={result['p50_ms']:>8.2f} ms  p99={result['p99_ms']:>8.2f} ms  "
+                f"{result['throughput_rps']:>7.1f} istek/sn  durumlar={result['statuses']}"
+            )
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            service.shutdown()
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="serve_api.py yük testi")
+    parser.add_argument("--url", help="Dışarıda çalışan sunucunun adresi (verilmezse süreç içi sunucu başlatılır)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--requests", type=int, default=5, help="Oturum başına istek sayısı")
+    parser.add_argument("--stub-latency", type=float, default=0.05)
+    parser.add_argument("--model-workers", type=int, default=100)
+    parser.add_argument("--max-queue-depth", type=int, default=256)
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak da yazdır")
+    parser.add_argument("--token", default=os.environ.get("PARDUS_API_TOKEN", "bench-token"),
+                        help="API anahtarı (varsayılan: PARDUS_API_TOKEN)")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/stress_executor.py
+# action_executor'ın sınırlı çıktı yakalama, zaman aşımı ve kaynak sınırlarını
+# zorlayan betiklerle dener:
+#   1. Gigabaytlarca çıktı üreten bir betik: ajanın belleği sabit kalmalı,
+#      yakalanan çıktı ve modele giden özet sınırlı olmalı.
+#   2. Hiç bitmeyen bir betik (ve başlattığı alt süreç): zaman aşımında tüm
+#      süreç grubu sonlandırılmalı.
+#   3. CPU sınırı: sonsuz döngü RLIMIT_CPU ile durdurulmalı.
+#
+# Kullanım (pardus-ai-agent klasöründen):
+#     python3 benchmarks/stress_executor.py --gigabytes 2
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import action_executor
+
+FLOOD_SCRIPT = """
+import sys
+block = b"x" * 1023 + b"\\n"
+out = sys.stdout.buffer
+for _ in range({blocks}):
+    out.write(block)
+sys.stderr.write("bitti\\n")
+"""
+
+HANG_SCRIPT = """
+import subprocess, time
+child = subprocess.Popen(["sleep", "1000"])
+print("cocuk:", child.pid, flush=True)
+while True:
+    time.sleep(1)
+"""
+
+SPIN_SCRIPT = """
+while True:
+    pass
+"""
+
+
+def max_rss_mb() -> float:
+    # Linux'ta ru_maxrss kilobayt cinsindendir.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def check(name: str, ok: bool, detail: str) -> bool:
+    print(f"[{'OK' if ok else 'HATA'}] {name}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Betik yürütücü stres testi")
+    parser.add_argument("--gigabytes", type=float, default=1.0, help="Taşma betiğinin üreteceği çıktı (GB)")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--pool", action="store_true", help="Yorumlayıcı havuzu modunda çalıştır")
+    args = parser.parse_args()
+    if args.pool:
+        action_executor.enable_pool(1)
+
+    results = []
+
+    # 1. Çok büyük çıktı
+    rss_before = max_rss_mb()
+    blocks = int(args.gigabytes * 1024 * 1024)
+    started = time.perf_counter()
+    stdout, stderr, code = action_executor.execute_script(FLOOD_SCRIPT.format(blocks=blocks), timeout_seconds=600)
+    elapsed = time.perf_counter() - started
+    digest = action_executor.summarize_output(stdout, stderr, code)
+    rss_growth = max_rss_mb() - rss_before
+    captured_limit = action_executor.CAPTURE_HEAD_BYTES + action_executor.CAPTURE_TAIL_BYTES + 200
+    results.append(check(
+        "büyük çıktı",
+        code == 0 and len(stdout.encode()) <= captured_limit and len(digest) <= action_executor.MAX_DIGEST_CHARS + 200
+        and rss_growth < 64 and "bitti" in stderr,
+        f"{args.gigabytes} GB -> yakalanan {len(stdout)} karakter, özet {len(digest)} karakter, "
+        f"RSS artışı {rss_growth:.1f} MB, {elapsed:.1f} sn ({args.gigabytes * 1024 / elapsed:.0f} MB/sn)",
+    ))
+
+    # 2. Bitmeyen betik ve alt süreci
+    started = time.perf_counter()
+    stdout, stderr, code = action_executor.execute_script(HANG_SCRIPT, timeout_seconds=args.timeout)
+    elapsed = time.perf_counter() - started
+    child_alive = False
+    for line in stdout.splitlines():
+        if line.startswith("cocuk:"):
+            pid = int(line.split()[1])
+            time.sleep(0.2)
+            try:
+                os.kill(pid, 0)
+                # Zombi olarak kalmış olabilir; /proc üzerinden durumu kontrol et.
+                with open(f"/proc/{pid}/stat") as f:
+                    child_alive = f.read().split()[2] != "Z"
+            except (ProcessLookupError, FileNotFoundError):
+                child_alive = False
+    results.append(check(
+        "zaman aşımı",
+        code != 0 and elapsed < args.timeout + action_executor.KILL_GRACE_SECONDS * 2 + 1 and not child_alive
+        and "zaman aşımını" in stderr,
+        f"{elapsed:.2f} sn sonra sonlandırıldı, çıkış kodu {code}, alt süreç {'HAYATTA' if child_alive else 'sonlandırıldı'}",
+    ))
+
+    # 3. CPU sınırı
+    action_executor.configure_limits(timeout_seconds=30, cpu_seconds=1)
+    started = time.perf_counter()
+    _, _, code = action_executor.execute_script(SPIN_SCRIPT)
+    elapsed = time.perf_counter() - started
+    action_executor.configure_limits()
+    results.append(check("CPU sınırı", code != 0 and elapsed < 10, f"{elapsed:.2f} sn, çıkış kodu {code}"))
+
+    action_executor.disable_pool()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
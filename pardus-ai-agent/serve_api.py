@@ -0,0 +1,474 @@
+# serve_api.py
+# Pardus AI Asistanı için eşzamanlı (asyncio tabanlı) HTTP API sunucusu.
+#
+# Etkileşimli REPL (agent/main.py) tek bir kullanıcıya hizmet eder ve her adımda
+# 'input()' ile bloklanır. Bu sunucu ise aynı ajan çekirdeğini (ai_core ve
+# action_executor) otomasyon araçlarının birçok makine ve kullanıcı için aynı
+# anda kullanabilmesini sağlar.
+#
+# Temel özellikler:
+#   - Her oturumun (session) kendi sohbet geçmişi ve son komut çıktısı vardır.
+#   - Model çağrıları ve betik çalıştırmaları ayrı iş parçacığı havuzlarında
+#     yürütülür; yavaş bir istek diğerlerini bekletmez.
+#   - Tek bir model istemcisi (ai_core.model) tüm oturumlar arasında paylaşılır.
+#   - Toplam kuyruk derinliği ve oturum başına bekleyen istek sayısı sınırlıdır;
+#     sınır aşıldığında istek reddedilir (503 / 429) ve istemci geri çekilir.
+#
+# Uç noktalar (endpoints):
+#   GET    /health                      : Sunucu durumu ve sayaçlar.
+#   POST   /sessions/<id>/prompt        : {"prompt": "..."} -> AI cevabı, düşünce ve kod.
+#   POST   /sessions/<id>/execute       : {"code": "..."} (isteğe bağlı) -> betik çıktısı.
+#   DELETE /sessions/<id>               : Oturumu ve geçmişini siler.
+#
+# GÜVENLİK: REPL'deki onay adımının karşılığı, '/execute' çağrısının istemci
+# tarafından açıkça yapılmasıdır. '/prompt' hiçbir zaman kod çalıştırmaz.
+# '/sessions' altındaki her istek 'Authorization: Bearer <anahtar>' başlığı
+# ister (PARDUS_API_TOKEN ortam değişkeni ya da config.json'daki 'api_token';
+# ikisi de yoksa açılışta rastgele bir anahtar üretilip yazdırılır). POST
+# gövdeleri 'application/json' olmalıdır ve izin verilmeyen bir 'Origin'
+# başlığı taşıyan (tarayıcıdan gelen) istekler reddedilir. Böylece bir web
+# sayfası '/execute' ile makinede kod çalıştıramaz.
+#
+# Kullanım:
+#     python3 serve_api.py --port 8080
+#     python3 serve_api.py --stub-model --stub-latency 0.2   # API anahtarı olmadan
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import ai_core
+from agent import action_executor
+from agent import archive_manager
+from agent import config_manager
+from agent import history_manager
+
+# Tek bir isteğin gövdesi için üst sınır (bayt).
+MAX_BODY_BYTES = 1024 * 1024
+# İstek satırı ve başlıklar için üst sınır (satır sayısı).
+MAX_HEADER_LINES = 100
+# API anahtarının okunduğu ortam değişkeni (config.json'daki 'api_token'dan önce gelir).
+TOKEN_ENV_VAR = "PARDUS_API_TOKEN"
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class ApiError(Exception):
+    """İstemciye belirli bir HTTP durum koduyla döndürülecek hata."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Session:
+    """Tek bir istemci oturumunun durumunu tutar."""
+
+    def __init__(self, session_id: str, token_budget: int):
+        self.session_id = session_id
+        self.history = history_manager.HistoryManager(token_budget=token_budget)
+        self.last_command_output = "Yok (ilk komut)."
+        self.last_prompt = None
+        self.pending_code = None
+        self.pending_reasoning = None
+        # Aynı oturumdaki istekler sırayla işlenir (geçmiş tutarlılığı için);
+        # farklı oturumlar ise birbirini beklemez.
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+        self.last_used = time.monotonic()
+
+
+class AgentService:
+    """
+    Oturumları, iş parçacığı havuzlarını ve geri basınç (backpressure)
+    sınırlarını yöneten servis katmanı. HTTP katmanından bağımsızdır.
+    """
+
+    def __init__(
+        self,
+        model_workers: int = 16,
+        exec_workers: int = 4,
+        max_queue_depth: int = 256,
+        max_session_pending: int = 4,
+        max_sessions: int = 1000,
+        token_budget: int = history_manager.DEFAULT_TOKEN_BUDGET,
+        archive: bool = True,
+        api_token: str = None,
+        allowed_origins: tuple = (),
+    ):
+        if not api_token:
+            raise ValueError("API anahtarı (api_token) boş olamaz.")
+        self.model_pool = ThreadPoolExecutor(max_workers=model_workers, thread_name_prefix="model")
+        self.exec_pool = ThreadPoolExecutor(max_workers=exec_workers, thread_name_prefix="exec")
+        self.max_queue_depth = max_queue_depth
+        self.max_session_pending = max_session_pending
+        self.max_sessions = max_sessions
+        self.token_budget = token_budget
+        self.archive = archive
+        self.api_token = api_token
+        self.allowed_origins = frozenset(allowed_origins)
+        self.sessions = OrderedDict()
+        self.inflight = 0
+        self.counters = {"requests": 0, "rejected_queue": 0, "rejected_session": 0, "errors": 0}
+
+    # --- Oturum yönetimi ---
+
+    def get_session(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            self._evict_idle_sessions()
+            session = Session(session_id, self.token_budget)
+            self.sessions[session_id] = session
+        else:
+            self.sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def _evict_idle_sessions(self):
+        # En uzun süredir kullanılmayan (ve o an meşgul olmayan) oturumlar silinir.
+        if len(self.sessions) < self.max_sessions:
+            return
+        for session_id, session in list(self.sessions.items()):
+            if len(self.sessions) < self.max_sessions:
+                break
+            if session.waiting == 0 and not session.lock.locked():
+                del self.sessions[session_id]
+        if len(self.sessions) >= self.max_sessions:
+            raise ApiError(503, "Oturum sınırına ulaşıldı, daha sonra tekrar deneyin.")
+
+    def delete_session(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    # --- Yetkilendirme ---
+
+    def authorize(self, method: str, headers: dict):
+        """
+        Anahtarı, 'Origin' başlığını ve POST gövdesinin türünü denetler.
+        Uygun olmayan istekler ApiError ile reddedilir.
+        """
+        origin = headers.get("origin")
+        if origin is not None and origin not in self.allowed_origins:
+            raise ApiError(403, "Bu kaynaktan (Origin) gelen isteklere izin verilmiyor.")
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.api_token.encode()):
+            raise ApiError(401, "Geçerli bir 'Authorization: Bearer <anahtar>' başlığı gerekli.")
+        if method == "POST":
+            content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if content_type != "application/json":
+                raise ApiError(415, "Gövde 'application/json' türünde olmalıdır.")
+
+    # --- Geri basınç ---
+
+    async def _run_in_session(self, session_id: str, func):
+        """
+        'func(session)' korutinini oturum kilidi altında çalıştırır. Kuyruk
+        sınırları aşılırsa isteği hemen reddeder.
+        """
+        self.counters["requests"] += 1
+        if self.inflight >= self.max_queue_depth:
+            self.counters["rejected_queue"] += 1
+            raise ApiError(503, "Sunucu kuyruğu dolu, daha sonra tekrar deneyin.")
+        session = self.get_session(session_id)
+        if session.waiting >= self.max_session_pending:
+            self.counters["rejected_session"] += 1
+            raise ApiError(429, "Bu oturum için çok fazla bekleyen istek var.")
+
+        self.inflight += 1
+        session.waiting += 1
+        try:
+            async with session.lock:
+                return await func(session)
+        finally:
+            session.waiting -= 1
+            self.inflight -= 1
+            session.last_used = time.monotonic()
+
+    # --- İşlemler ---
+
+    async def prompt(self, session_id: str, user_prompt: str) -> dict:
+        async def _prompt(session: Session) -> dict:
+            # main.py'deki geri bildirim döngüsüyle aynı prompt formatı.
+            full_prompt = ai_core.build_prompt(user_prompt, session.last_command_output)
+            loop = asyncio.get_running_loop()
+            response_text, session.history = await loop.run_in_executor(
+                self.model_pool, ai_core.generate_action, full_prompt, session.history
+            )
+            plain_text, reasoning, code = ai_core.parse_response(response_text)
+            session.last_prompt = user_prompt
+            session.pending_code = code
+            session.pending_reasoning = reasoning
+            if not code:
+                session.last_command_output = "Asistan bir betik üretmedi, sadece konuştu."
+            return {"session": session.session_id, "text": plain_text, "reasoning": reasoning, "code": code}
+
+        return await self._run_in_session(session_id, _prompt)
+
+    async def execute(self, session_id: str, code: str = None) -> dict:
+        async def _execute(session: Session) -> dict:
+            script = code or session.pending_code
+            if not script:
+                raise ApiError(409, "Çalıştırılacak bir betik yok. Önce /prompt çağırın.")
+            loop = asyncio.get_running_loop()
+            # Modelin düşüncesi yalnızca onun ürettiği betik çalıştırıldıysa
+            # arşivlenir; istemcinin kendi kodu başka bir düşünceyle eşlenmez.
+            reasoning = session.pending_reasoning if script == session.pending_code else None
+            stdout, stderr, returncode = await loop.run_in_executor(
+                self.exec_pool, action_executor.execute_script, script
+            )
+            session.last_command_output = action_executor.summarize_output(stdout, stderr, returncode)
+            if self.archive:
+                await loop.run_in_executor(
+                    self.exec_pool, archive_manager.log_interaction,
+                    session.last_prompt or "", reasoning or "Yok",
+                    script, stdout, stderr, returncode, False,
+                )
+            session.pending_code = None
+            return {"session": session.session_id, "stdout": stdout, "stderr": stderr, "returncode": returncode}
+
+        return await self._run_in_session(session_id, _execute)
+
+    def stats(self) -> dict:
+        return {
+            "status": "ok",
+            "model_ready": ai_core.model is not None,
+            "sessions": len(self.sessions),
+            "inflight": self.inflight,
+            "max_queue_depth": self.max_queue_depth,
+            **self.counters,
+            "archive": archive_manager.writer_stats(),
+        }
+
+    def shutdown(self):
+        self.model_pool.shutdown(wait=False)
+        self.exec_pool.shutdown(wait=False)
+
+
+# --- HTTP katmanı ---
+
+async def read_request(reader: asyncio.StreamReader):
+    """
+    Bağlantıdan tek bir HTTP/1.1 isteği okur.
+    Bağlantı kapandıysa None döndürür.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").strip().split(" ", 2)
+    except ValueError:
+        raise ApiError(400, "Geçersiz istek satırı.")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ApiError(400, "Çok fazla başlık satırı.")
+
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise ApiError(400, "Geçersiz Content-Length başlığı.")
+    if length < 0:
+        raise ApiError(400, "Geçersiz Content-Length başlığı.")
+    if length > MAX_BODY_BYTES:
+        raise ApiError(413, "İstek gövdesi çok büyük.")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = version.upper() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    return method.upper(), target.split("?", 1)[0], headers, body, keep_alive
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+    )
+    if status in (429, 503):
+        head += "Retry-After: 1\r\n"
+    if status == 401:
+        head += "WWW-Authenticate: Bearer\r\n"
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+
+def _parse_json(body: bytes) -> dict:
+    if not body:
+        return {}
+    try:
+        data = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ApiError(400, "Gövde geçerli bir JSON değil.")
+    if not isinstance(data, dict):
+        raise ApiError(400, "Gövde bir JSON nesnesi olmalıdır.")
+    return data
+
+
+async def dispatch(service: AgentService, method: str, path: str, headers: dict, body: bytes) -> dict:
+    """İsteği ilgili servis fonksiyonuna yönlendirir."""
+    parts = [p for p in path.split("/") if p]
+    if parts == ["health"]:
+        if method != "GET":
+            raise ApiError(405, "Sadece GET desteklenir.")
+        return service.stats()
+
+    if len(parts) >= 2 and parts[0] == "sessions":
+        service.authorize(method, headers)
+        session_id = parts[1]
+        if len(parts) == 2:
+            if method != "DELETE":
+                raise ApiError(405, "Sadece DELETE desteklenir.")
+            return {"session": session_id, "deleted": service.delete_session(session_id)}
+        if len(parts) == 3 and method != "POST":
+            raise ApiError(405, "Sadece POST desteklenir.")
+        if parts[2:] == ["prompt"]:
+            data = _parse_json(body)
+            prompt = data.get("prompt")
+            if not isinstance(prompt, str) or not prompt.strip():
+                raise ApiError(400, "Lütfen 'prompt' anahtarıyla bir metin gönderin.")
+            return await service.prompt(session_id, prompt)
+        if parts[2:] == ["execute"]:
+            data = _parse_json(body)
+            return await service.execute(session_id, data.get("code"))
+
+    raise ApiError(404, "Böyle bir uç nokta yok.")
+
+
+async def handle_connection(service: AgentService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Tek bir TCP bağlantısı üzerindeki (keep-alive) istekleri sırayla işler."""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+                status, payload = 200, await dispatch(service, method, path, headers, body)
+            except ApiError as e:
+                status, payload = e.status, {"error": e.message}
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                service.counters["errors"] += 1
+                status, payload = 500, {"error": f"Beklenmedik bir hata oluştu: {e}"}
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service: AgentService, host: str, port: int) -> asyncio.AbstractServer:
+    return await asyncio.start_server(
+        lambda r, w: handle_connection(service, r, w), host=host, port=port, backlog=1024
+    )
+
+
+def setup_backend(args, config: dict) -> bool:
+    """Model istemcisini bir kez kurar; tüm oturumlar aynı istemciyi kullanır."""
+    if args.stub_model:
+        from agent import stub_model
+        ai_core.set_backend(stub_model.StubModel(latency=args.stub_latency))
+        return True
+    if not config:
+        print("❌ Yapılandırma bulunamadı. Önce 'pardus-ai-agent --reconfigure' çalıştırın.")
+        return False
+    return ai_core.setup_backend(config)
+
+
+def resolve_token(config: dict) -> str:
+    """
+    API anahtarını ortam değişkeninden ya da yapılandırmadan okur; ikisi de
+    yoksa bu çalıştırma için rastgele bir anahtar üretip yazdırır.
+    """
+    token = os.environ.get(TOKEN_ENV_VAR) or config.get("api_token")
+    if not token:
+        token = secrets.token_urlsafe(32)
+        print(f"🔑 API anahtarı üretildi (kalıcı yapmak için {TOKEN_ENV_VAR} ayarlayın): {token}")
+    return token
+
+
+async def serve(args, config: dict):
+    service = AgentService(
+        model_workers=args.model_workers,
+        exec_workers=args.exec_workers,
+        max_queue_depth=args.max_queue_depth,
+        max_session_pending=args.max_session_pending,
+        archive=not args.no_archive,
+        api_token=resolve_token(config),
+        allowed_origins=tuple(args.allow_origin or config.get("api_allowed_origins", ())),
+    )
+    if service.archive:
+        archive_manager.start_background_writer()
+    server = await start_server(service, args.host, args.port)
+    print(f"🚀 Pardus AI API dinleniyor: http://{args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pardus AI Asistanı HTTP API sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model-workers", type=int, default=16, help="Eşzamanlı model çağrısı sayısı")
+    parser.add_argument("--exec-workers", type=int, default=4, help="Eşzamanlı betik çalıştırma sayısı")
+    parser.add_argument("--max-queue-depth", type=int, default=256, help="Toplam bekleyen istek sınırı")
+    parser.add_argument("--max-session-pending", type=int, default=4, help="Oturum başına bekleyen istek sınırı")
+    parser.add_argument("--executor-pool", type=int, default=0, help="Önceden ısıtılmış yorumlayıcı sayısı (0: kapalı)")
+    parser.add_argument("--no-archive", action="store_true", help="Çalıştırılan betikleri arşivleme")
+    parser.add_argument("--allow-origin", action="append",
+                        help="İsteklerine izin verilen tarayıcı kaynağı (Origin; tekrarlanabilir)")
+    parser.add_argument("--stub-model", action="store_true", help="Gemini yerine yerel sahte model kullan")
+    parser.add_argument("--stub-latency", type=float, default=0.1, help="Sahte modelin gecikmesi (saniye)")
+    args = parser.parse_args()
+
+    config = config_manager.load_config() or {}
+    if not setup_backend(args, config):
+        sys.exit(1)
+    # Betiklere uygulanacak zaman aşımı ve isteğe bağlı CPU/bellek sınırları (main.py ile aynı).
+    action_executor.configure_limits(
+        timeout_seconds=config.get('script_timeout', action_executor.DEFAULT_TIMEOUT),
+        cpu_seconds=config.get('script_cpu_limit'),
+        memory_mb=config.get('script_memory_limit_mb'),
+    )
+    if args.executor_pool:
+        action_executor.enable_pool(args.executor_pool)
+    try:
+        asyncio.run(serve(args, config))
+    except KeyboardInterrupt:
+        print("\n👋 Sunucu kapatıldı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+# batch_scheduler.py
+# DeepSeekWeb için çok istemcili, sürekli toplu (continuous batching) üretim.
+#
+# Eski /generate rotası tek bir global 'current_stop_event' kullanıyordu: her yeni
+# istek bir öncekinin üretimini durduruyor, aynı anda sadece bir model.generate
+# çalışabiliyordu. Bu modüldeki zamanlayıcı tüm istekleri ortak bir kod çözme
+# (decode) döngüsünde birlikte işler:
+#
+#   - İstekler token sınırlarında gruba katılır ve gruptan ayrılır; uzun bir
+#     cevap, yeni gelen kısa bir isteği bekletmez.
+#   - Her adımda gruptaki tüm isteklerin bir sonraki tokeni tek bir model
+#     çağrısıyla (batch) üretilir. Farklı uzunluktaki geçmişler (KV cache) sola
+#     doğru dolgulanır (left padding) ve dikkat maskesiyle gizlenir.
+#   - Her isteğin kendi iptal tutamacı (GenerationRequest.cancel) ve kendi
+#     örnekleme ayarları (SamplingParams) vardır.
+#
+# Kullanım:
+#     scheduler = ContinuousBatchScheduler(model, tokenizer, max_batch_size=16)
+#     scheduler.start()
+#     handle = scheduler.submit(format_alpaca_prompt(soru), SamplingParams(temperature=0.6))
+#     for parca in handle:
+#         print(parca, end="")
+import collections
+import itertools
+import threading
+import time
+
+import torch
+import torch.nn.functional as F
+
+from sse_stream import DEFAULT_MAX_CHARS, DEFAULT_STALL_TIMEOUT, StreamChannel
+
+
+class SchedulerBusy(Exception):
+    """Bekleme kuyruğu dolu; istek kabul edilemedi (HTTP 503)."""
+
+
+class SamplingParams:
+    """
+    İsteğe özel örnekleme ayarları. Varsayılanlar eski /generate rotasıyla aynıdır.
+
+    Args:
+        max_new_tokens (int): Üretilecek en fazla token.
+        temperature (float): 0 ise açgözlü (greedy) seçim yapılır.
+        top_p (float): Çekirdek (nucleus) örnekleme eşiği.
+        top_k (int): En olası k token dışındakiler elenir (0: kapalı).
+        repetition_penalty (float): Daha önce geçen tokenlere uygulanan ceza (1: kapalı).
+        seed (int): Verilirse örnekleme bu tohumla tekrarlanabilir olur.
+        ignore_eos (bool): True ise EOS tokeninde durulmaz (ölçümler için).
+    """
+
+    def __init__(
+        self,
+        max_new_tokens: int = 2048,
+        temperature: float = 0.6,
+        top_p: float = 0.9,
+        top_k: int = 40,
+        repetition_penalty: float = 1.15,
+        seed: int = None,
+        ignore_eos: bool = False,
+    ):
+        self.max_new_tokens = max(1, int(max_new_tokens))
+        self.temperature = max(0.0, float(temperature))
+        self.top_p = min(1.0, max(0.0, float(top_p)))
+        self.top_k = max(0, int(top_k))
+        self.repetition_penalty = max(0.01, float(repetition_penalty))
+        self.seed = None if seed is None else int(seed)
+        self.ignore_eos = bool(ignore_eos)
+
+    # İstekten (örn. Flask request.args) okunabilen alanlar ve dönüştürücüleri.
+    FIELDS = {
+        "max_new_tokens": int,
+        "temperature": float,
+        "top_p": float,
+        "top_k": int,
+        "repetition_penalty": float,
+        "seed": int,
+    }
+
+    @classmethod
+    def from_dict(cls, values, max_new_tokens_limit: int = 2048) -> "SamplingParams":
+        """
+        Sorgu parametrelerinden ayar oluşturur. Geçersiz değerler ValueError
+        fırlatır; max_new_tokens sunucunun sınırını aşamaz.
+        """
+        kwargs = {}
+        for name, convert in cls.FIELDS.items():
+            if values.get(name) not in (None, ""):
+                try:
+                    kwargs[name] = convert(values.get(name))
+                except (TypeError, ValueError):
+                    raise ValueError(f"Geçersiz '{name}' değeri: {values.get(name)!r}")
+        kwargs["max_new_tokens"] = min(kwargs.get("max_new_tokens", max_new_tokens_limit), max_new_tokens_limit)
+        return cls(**kwargs)
+
+
+class GenerationRequest:
+    """
+    Zamanlayıcıya gönderilmiş tek bir üretim isteği. Üzerinde dönüldüğünde
+    üretilen metin parçalarını sırayla verir. 'cancel()' ile istek bir sonraki
+    token sınırında gruptan çıkarılır. Metin, boyutu sınırlı 'stream'
+    kanalından okunur; okuyucu uzun süre geride kalırsa istek iptal edilir.
+    """
+
+    def __init__(self, request_id: int, prompt_ids: list, params: SamplingParams,
+                 max_buffered_chars: int = DEFAULT_MAX_CHARS, stall_timeout: float = DEFAULT_STALL_TIMEOUT):
+        self.request_id = request_id
+        self.prompt_ids = prompt_ids
+        self.params = params
+        self.stream = StreamChannel(max_buffered_chars, stall_timeout)
+        self.done = threading.Event()
+        # "stop", "length", "cancelled", "slow_client" veya "error"
+        self.finish_reason = None
+        self.error = None
+        self.created_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.generated = []
+        self.reused_tokens = 0    # Önbellekten gelen istem tokenleri
+        # Zamanlayıcının iç durumu
+        self._cancel = threading.Event()
+        self._length = 0          # KV cache'teki gerçek token sayısı
+        self._next_token = None   # Bir sonraki adımda modele verilecek token
+        self._seen = set(prompt_ids)
+        self._pending_ids = []    # Henüz metne çevrilmemiş tokenler
+        self._pending_text = ""
+        self._generator = None
+
+    def cancel(self):
+        """Üretimi durdurur (istemci bağlantıyı kapattığında çağrılır)."""
+        self._cancel.set()
+        self.stream.close("cancelled")
+
+    @property
+    def cancelled(self) -> bool:
+        # Kanal, okuyucu çok geride kaldığında kendini kapatır.
+        return self._cancel.is_set() or self.stream.closed
+
+    def __iter__(self):
+        return iter(self.stream)
+
+    def text(self) -> str:
+        """İstek bitene kadar bekler ve üretilen metnin tamamını döndürür."""
+        return "".join(self)
+
+
+def cache_layers(cache) -> list:
+    """Model çıktısındaki past_key_values'u katman başına (key, value) listesine çevirir."""
+    if hasattr(cache, "layers"):
+        return [(layer.keys, layer.values) for layer in cache.layers]
+    if hasattr(cache, "key_cache"):
+        return list(zip(cache.key_cache, cache.value_cache))
+    return [(k, v) for k, v in cache]
+
+
+def make_cache(layers: list):
+    """(key, value) listesinden modele verilebilecek bir cache nesnesi oluşturur."""
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return tuple(layers)
+    if hasattr(DynamicCache, "from_legacy_cache"):
+        return DynamicCache.from_legacy_cache(tuple(layers))
+    return DynamicCache(ddp_cache_data=layers)
+
+
+def _left_pad(tensor: torch.Tensor, amount: int) -> torch.Tensor:
+    # [B, H, L, D] boyutlu tensörün dizi (L) boyutunu soldan doldurur.
+    return F.pad(tensor, (0, 0, amount, 0)) if amount else tensor
+
+
+class ContinuousBatchScheduler:
+    """
+    Ortak bir kod çözme döngüsünde birden fazla isteği birlikte işleyen zamanlayıcı.
+
+    Args:
+        model: Hugging Face tarzı nedensel dil modeli (input_ids, attention_mask,
+            position_ids, past_key_values kabul eden).
+        tokenizer: encode/decode ve eos_token_id sağlayan tokenizer.
+        max_batch_size (int): Aynı anda kod çözülen en fazla istek.
+        max_waiting (int): Gruba girmeyi bekleyebilecek en fazla istek.
+        max_seq_len (int): İstem + cevap için en fazla token.
+        device: Girdilerin konulacağı cihaz (verilmezse modelinki kullanılır).
+        max_buffered_chars (int): İstek başına okunmayı bekleyebilecek en fazla
+            karakter. Zamanlayıcı yavaş bir okuyucu için beklemez (bütün grup
+            dururdu); kanal 'stall_timeout' saniye dolu kalırsa istek iptal edilir.
+        stall_timeout (float): Yavaş okuyucu için tanınan süre.
+        prefix_cache (PrefixCache): Verilirse ortak istem ön eklerinin KV'si
+            yeniden kullanılır; biten isteklerin (istem + cevap) KV'si de
+            sohbetin sonraki turları için saklanır.
+    """
+
+    def __init__(self, model, tokenizer, max_batch_size: int = 16, max_waiting: int = 256,
+                 max_seq_len: int = 2048, device=None, max_buffered_chars: int = DEFAULT_MAX_CHARS,
+                 stall_timeout: float = DEFAULT_STALL_TIMEOUT, prefix_cache=None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_waiting = max_waiting
+        self.max_seq_len = max_seq_len
+        self.device = device or next(model.parameters()).device
+        self.max_buffered_chars = max_buffered_chars
+        self.stall_timeout = stall_timeout
+        self.prefix_cache = prefix_cache
+        self._ids = itertools.count(1)
+        self._waiting = collections.deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        # Grup durumu: aktif istekler, katman başına KV tensörleri ve dikkat maskesi.
+        self._active = []
+        self._layers = None
+        self._mask = None
+        # İstatistikler
+        self.steps = 0
+        self.tokens_generated = 0
+        self.completed = 0
+        self._batch_size_sum = 0
+
+    # --- Dış arayüz ---
+
+    def start(self):
+        """Kod çözme döngüsünü arka planda başlatır."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="batch-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Döngüyü durdurur; bekleyen ve aktif istekler iptal edilir."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, prompt, params: SamplingParams = None) -> GenerationRequest:
+        """
+        Yeni bir istek ekler. 'prompt' metin ya da token listesi olabilir.
+        Bekleme kuyruğu doluysa SchedulerBusy fırlatır.
+        """
+        params = params or SamplingParams()
+        prompt_ids = list(prompt) if not isinstance(prompt, str) else self.tokenizer.encode(prompt)
+        # Çok uzun istemlerin sonu (talimat + soru) korunur.
+        budget = max(1, self.max_seq_len - 1)
+        prompt_ids = prompt_ids[-budget:]
+        request = GenerationRequest(next(self._ids), prompt_ids, params, self.max_buffered_chars, self.stall_timeout)
+        with self._cond:
+            if self._stopping:
+                raise SchedulerBusy("Zamanlayıcı durduruldu.")
+            if len(self._waiting) >= self.max_waiting:
+                raise SchedulerBusy("Bekleme kuyruğu dolu.")
+            self._waiting.append(request)
+            self._cond.notify()
+        return request
+
+    def warm(self, prompt, pin: bool = True) -> int:
+        """
+        Bir ön eki (örn. şablonun giriş metni) önceden hesaplayıp önbelleğe
+        koyar. start()'tan önce çağrılmalıdır. Saklanan token sayısını döndürür.
+        """
+        if self.prefix_cache is None:
+            return 0
+        prompt_ids = list(prompt) if not isinstance(prompt, str) else self.tokenizer.encode(prompt)
+        with torch.inference_mode():
+            out = self.model(input_ids=torch.tensor([prompt_ids], device=self.device), use_cache=True)
+        entry = self.prefix_cache.insert(prompt_ids, cache_layers(out.past_key_values), pin=pin)
+        return len(entry.tokens) if entry is not None else 0
+
+    def stats(self) -> dict:
+        with self._cond:
+            waiting = len(self._waiting)
+        stats = {
+            "active": len(self._active),
+            "waiting": waiting,
+            "steps": self.steps,
+            "tokens_generated": self.tokens_generated,
+            "completed": self.completed,
+            "mean_batch_size": round(self._batch_size_sum / self.steps, 2) if self.steps else 0.0,
+        }
+        if self.prefix_cache is not None:
+            stats["prefix_cache"] = self.prefix_cache.stats()
+        return stats
+
+    # --- Döngü ---
+
+    def _loop(self):
+        with torch.inference_mode():
+            while True:
+                with self._cond:
+                    while not self._active and not self._waiting and not self._stopping:
+                        self._cond.wait()
+                    if self._stopping:
+                        break
+                try:
+                    self._step()
+                except Exception as e:
+                    # Bir model hatası tüm grubu etkiler; istekleri hatayla bitir,
+                    # döngü yeni isteklere hizmet etmeye devam etsin.
+                    for request in self._active:
+                        self._finish(request, "error", e)
+                    self._active, self._layers, self._mask = [], None, None
+        # Durdurulurken kalan tüm istekleri kapat.
+        for request in self._active + list(self._waiting):
+            self._finish(request, "cancelled")
+        self._active, self._layers, self._mask = [], None, None
+        self._waiting.clear()
+
+    def _step(self):
+        """Tek bir token sınırı: bitenleri çıkar, yenileri al, bir token üret."""
+        self._evict_finished()
+        self._admit()
+        if self._active:
+            self._decode()
+            self._evict_finished()
+
+    def _evict_finished(self):
+        keep = []
+        for index, request in enumerate(self._active):
+            if request.done.is_set():
+                if self.prefix_cache is not None and request.finish_reason in ("stop", "length"):
+                    self._save_row(index, request)
+                continue
+            if request.cancelled:
+                self._finish(request, "slow_client" if request.stream.stalled else "cancelled")
+                continue
+            keep.append(index)
+        if len(keep) == len(self._active):
+            return
+        self._active = [self._active[i] for i in keep]
+        if not keep:
+            self._layers, self._mask = None, None
+            return
+        rows = torch.tensor(keep, device=self.device)
+        mask = self._mask.index_select(0, rows)
+        # Artık hiçbir satırın kullanmadığı baştaki dolgu sütunlarını at.
+        start = int(mask.any(dim=0).nonzero()[0])
+        self._mask = mask[:, start:]
+        self._layers = [
+            (k.index_select(0, rows)[:, :, start:], v.index_select(0, rows)[:, :, start:])
+            for k, v in self._layers
+        ]
+
+    def _admit(self):
+        """Boş yer varsa bekleyen istekleri işler (prefill) ve gruba katar."""
+        joined = []
+        while len(self._active) + len(joined) < self.max_batch_size:
+            with self._cond:
+                if not self._waiting:
+                    break
+                request = self._waiting.popleft()
+            if request.cancelled:
+                self._finish(request, "cancelled")
+                continue
+            try:
+                layers, logits = self._prefill(request)
+                request._length = len(request.prompt_ids)
+                if request.params.seed is not None:
+                    request._generator = torch.Generator(device=self.device).manual_seed(request.params.seed)
+                self._accept(request, self._sample(logits, request))
+            except Exception as e:
+                # Hatalı istem (ya da prefill sırasında bellek hatası) sadece bu
+                # isteği bitirir; grup ve diğer bekleyenler etkilenmez.
+                self._finish(request, "error", e)
+                continue
+            joined.append((request, layers))
+        if joined:
+            try:
+                self._merge(joined)
+            except Exception as e:
+                # Gruba katılamayan istekler de akışları askıda kalmadan bitirilir;
+                # grubun kendisi _loop'ta hatayla sıfırlanır.
+                for request, _ in joined:
+                    self._finish(request, "error", e)
+                raise
+
+    def _prefill(self, request: GenerationRequest):
+        """İstemi modelden geçirir; (KV katmanları, son pozisyonun logitleri) döndürür."""
+        ids = request.prompt_ids
+        cached, reused = None, 0
+        if self.prefix_cache is not None:
+            # Son token için logit gerektiğinden en az bir token modelden geçmeli.
+            cached, reused = self.prefix_cache.lookup(ids, max_length=len(ids) - 1)
+        if cached is None:
+            out = self.model(input_ids=torch.tensor([ids], device=self.device), use_cache=True)
+        else:
+            out = self.model(
+                input_ids=torch.tensor([ids[reused:]], device=self.device),
+                attention_mask=torch.ones((1, len(ids)), dtype=torch.long, device=self.device),
+                position_ids=torch.arange(reused, len(ids), device=self.device).unsqueeze(0),
+                past_key_values=make_cache(cached),
+                use_cache=True,
+            )
+        request.reused_tokens = reused
+        layers = cache_layers(out.past_key_values)
+        if self.prefix_cache is not None:
+            self.prefix_cache.insert(ids, layers)
+        return layers, out.logits[0, -1]
+
+    def _save_row(self, row: int, request: GenerationRequest):
+        # Satırın gerçek tokenleri, sola dolgulu grubun son '_length' sütunudur.
+        length = request._length
+        tokens = request.prompt_ids + request.generated[:length - len(request.prompt_ids)]
+        layers = [(k[row:row + 1, :, -length:], v[row:row + 1, :, -length:]) for k, v in self._layers]
+        self.prefix_cache.insert(tokens, layers)
+
+    def _merge(self, joined: list):
+        """Yeni isteklerin KV geçmişlerini, sola dolgulayarak mevcut gruba ekler."""
+        current = self._mask.shape[1] if self._mask is not None else 0
+        width = max([current] + [layers[0][0].shape[2] for _, layers in joined])
+        masks, per_layer = [], []
+        if self._mask is not None:
+            masks.append(F.pad(self._mask, (width - current, 0)))
+            per_layer.append([(_left_pad(k, width - current), _left_pad(v, width - current)) for k, v in self._layers])
+        for request, layers in joined:
+            length = layers[0][0].shape[2]
+            mask = torch.zeros((1, width), dtype=torch.long, device=self.device)
+            mask[:, width - length:] = 1
+            masks.append(mask)
+            per_layer.append([(_left_pad(k, width - length), _left_pad(v, width - length)) for k, v in layers])
+            self._active.append(request)
+        self._mask = torch.cat(masks, dim=0)
+        self._layers = [
+            (torch.cat([group[i][0] for group in per_layer], dim=0), torch.cat([group[i][1] for group in per_layer], dim=0))
+            for i in range(len(per_layer[0]))
+        ]
+
+    def _decode(self):
+        """Gruptaki her istek için bir token üretir (tek model çağrısı)."""
+        batch = len(self._active)
+        input_ids = torch.tensor([[r._next_token] for r in self._active], device=self.device)
+        position_ids = torch.tensor([[r._length] for r in self._active], device=self.device)
+        attention_mask = torch.cat([self._mask, self._mask.new_ones((batch, 1))], dim=1)
+        out = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=make_cache(self._layers),
+            use_cache=True,
+        )
+        self._layers = cache_layers(out.past_key_values)
+        self._mask = attention_mask
+        self.steps += 1
+        self._batch_size_sum += batch
+        logits = out.logits[:, -1]
+        for row, request in enumerate(self._active):
+            request._length += 1
+            self._accept(request, self._sample(logits[row], request))
+
+    # --- Örnekleme ve çıktı ---
+
+    def _sample(self, logits: torch.Tensor, request: GenerationRequest) -> int:
+        params = request.params
+        logits = logits.float()
+        if params.repetition_penalty != 1.0 and request._seen:
+            seen = torch.tensor(list(request._seen), device=logits.device)
+            scores = logits.index_select(0, seen)
+            scores = torch.where(scores < 0, scores * params.repetition_penalty, scores / params.repetition_penalty)
+            logits = logits.index_copy(0, seen, scores)
+        if params.temperature == 0:
+            return int(torch.argmax(logits))
+        logits = logits / params.temperature
+        if params.top_k and params.top_k < logits.shape[-1]:
+            threshold = torch.topk(logits, params.top_k).values[-1]
+            logits = logits.masked_fill(logits < threshold, float("-inf"))
+        if params.top_p < 1.0:
+            sorted_logits, order = torch.sort(logits, descending=True)
+            cumulative = torch.softmax(sorted_logits, dim=-1).cumsum(dim=-1)
+            # Eşiği aşan ilk token dahil tutulur; en olası token her zaman kalır.
+            remove = cumulative - torch.softmax(sorted_logits, dim=-1) > params.top_p
+            logits = logits.index_fill(0, order[remove], float("-inf"))
+        probs = torch.softmax(logits, dim=-1)
+        return int(torch.multinomial(probs, 1, generator=request._generator))
+
+    def _accept(self, request: GenerationRequest, token: int):
+        """Üretilen tokeni isteğe işler, metni yayınlar ve durma koşullarını kontrol eder."""
+        if request.first_token_at is None:
+            request.first_token_at = time.perf_counter()
+        self.tokens_generated += 1
+        eos = getattr(self.tokenizer, "eos_token_id", None)
+        if token == eos and not request.params.ignore_eos:
+            self._finish(request, "stop")
+            return
+        request.generated.append(token)
+        request._seen.add(token)
+        request._next_token = token
+        self._emit(request)
+        if len(request.generated) >= request.params.max_new_tokens or request._length + 1 >= self.max_seq_len:
+            self._finish(request, "length")
+
+    def _emit(self, request: GenerationRequest, final: bool = False):
+        # Çok baytlı karakterler birden fazla tokene bölünebilir; yarım karakter
+        # (�) yayınlanmaz. Satır sonunda bekleyen tokenler sıfırlanır.
+        if not final:
+            request._pending_ids.append(request.generated[-1])
+        text = self.tokenizer.decode(request._pending_ids, skip_special_tokens=True)
+        if not final and text.endswith("\ufffd"):
+            return
+        new_text = text[len(request._pending_text):]
+        if new_text:
+            # Beklemeden yazılır; kanal kapandıysa istek bir sonraki adımda çıkarılır.
+            request.stream.put(new_text, block=False)
+        if text.endswith("\n") or final:
+            request._pending_ids, request._pending_text = [], ""
+        else:
+            request._pending_text = text
+
+    def _finish(self, request: GenerationRequest, reason: str, error: Exception = None):
+        if request.done.is_set():
+            return
+        if request._pending_ids:
+            self._emit(request, final=True)
+        request.finish_reason = reason
+        request.error = error
+        request.finished_at = time.perf_counter()
+        request.stream.close(reason)
+        request.done.set()
+        self.completed += 1
@@ -0,0 +1,152 @@
+# benchmarks/bench_continuous_batching.py
+# Sürekli toplu üretimin (continuous batching) verimini ölçer.
+#
+# CPU'da küçük, rastgele ağırlıklı bir model (tiny_model.py) ile aynı anda
+# 1..32 istemci akışı çalıştırılır ve saniyedeki token sayısı raporlanır.
+# Karşılaştırma için aynı yük, eski rotadaki gibi istekleri tek tek işleyen
+# (max_batch_size=1) zamanlayıcıyla da ölçülür.
+#
+# Ölçümden önce bir tutarlılık kontrolü yapılır: açgözlü (temperature=0)
+# üretimde, gruba farklı anlarda katılan isteklerin çıktısı tek başına
+# çalıştırıldıklarındakiyle aynı olmalıdır (dolgu/maske hatalarını yakalar).
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/bench_continuous_batching.py --streams 1 2 4 8 16 32 --tokens 64
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import torch
+
+from batch_scheduler import ContinuousBatchScheduler, SamplingParams
+from tiny_model import build_tiny_model
+
+QUESTIONS = [
+    "Pardus'ta paket nasıl kurulur?",
+    "Bir dizindeki tüm dosyaları listeleyen komutu yaz.",
+    "Systemd servisi nasıl yeniden başlatılır?",
+    "Disk kullanımını nasıl kontrol ederim?",
+    "Python ile bir dosyayı satır satır oku.",
+]
+
+
+def make_prompt(rng: random.Random) -> str:
+    # Farklı uzunlukta istemler (gerçek kullanımdaki gibi).
+    return "### Instruction:\n" + " ".join(rng.choice(QUESTIONS) for _ in range(rng.randint(1, 4))) + "\n\n### Response:\n"
+
+
+def run_load(scheduler, streams: int, requests_per_stream: int, tokens: int, seed: int) -> dict:
+    """'streams' istemci, her biri sırayla 'requests_per_stream' istek gönderir."""
+    rng = random.Random(seed)
+    prompts = [[make_prompt(rng) for _ in range(requests_per_stream)] for _ in range(streams)]
+    ttft, generated = [], []
+    lock = threading.Lock()
+
+    def client(index):
+        for n, prompt in enumerate(prompts[index]):
+            params = SamplingParams(max_new_tokens=tokens, temperature=0.8, seed=index * 1000 + n, ignore_eos=True)
+            handle = scheduler.submit(prompt, params)
+            handle.text()
+            with lock:
+                ttft.append(handle.first_token_at - handle.created_at)
+                generated.append(len(handle.generated))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(streams)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    ttft.sort()
+    return {
+        "streams": streams,
+        "requests": len(generated),
+        "tokens": sum(generated),
+        "seconds": round(elapsed, 3),
+        "tokens_per_s": round(sum(generated) / elapsed, 1),
+        "ttft_ms_p50": round(ttft[len(ttft) // 2] * 1000, 1),
+        "ttft_ms_max": round(ttft[-1] * 1000, 1),
+        "mean_batch_size": scheduler.stats()["mean_batch_size"],
+    }
+
+
+def consistency_check(model, tokenizer, tokens: int) -> bool:
+    """Grup içinde ve tek başına açgözlü üretimin aynı tokenleri verdiğini doğrular."""
+    rng = random.Random(1)
+    prompts = [make_prompt(rng) for _ in range(6)]
+    params = dict(max_new_tokens=tokens, temperature=0, repetition_penalty=1.0, ignore_eos=True)
+    scheduler = ContinuousBatchScheduler(model, tokenizer, max_batch_size=8).start()
+    try:
+        solo = []
+        for prompt in prompts:
+            handle = scheduler.submit(prompt, SamplingParams(**params))
+            handle.text()
+            solo.append(handle.generated)
+        handles = []
+        for prompt in prompts:
+            handles.append(scheduler.submit(prompt, SamplingParams(**params)))
+            time.sleep(0.005) # İstekler gruba farklı token sınırlarında katılsın.
+        for handle in handles:
+            handle.text()
+        return all(h.generated == s for h, s in zip(handles, solo))
+    finally:
+        scheduler.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sürekli toplu üretim verim testi")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Eşzamanlı akış sayıları")
+    parser.add_argument("--requests", type=int, default=2, help="Akış başına istek sayısı")
+    parser.add_argument("--tokens", type=int, default=64, help="İstek başına üretilecek token")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=0, help="torch iş parçacığı sayısı (0: varsayılan)")
+    parser.add_argument("--skip-baseline", action="store_true", help="Tek tek işleme ölçümünü atla")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    model, tokenizer = build_tiny_model(hidden_size=args.hidden_size, layers=args.layers)
+
+    result = {
+        "benchmark": "continuous_batching",
+        "model": {"hidden_size": args.hidden_size, "layers": args.layers, "vocab": tokenizer.vocab_size},
+        "tokens_per_request": args.tokens,
+        "consistent": consistency_check(model, tokenizer, 24),
+        "runs": [],
+    }
+    for streams in args.streams:
+        row = {"streams": streams}
+        batched = ContinuousBatchScheduler(model, tokenizer, max_batch_size=args.max_batch_size).start()
+        run_load(batched, 1, 1, 4, seed=0) # Isınma
+        row["batched"] = run_load(batched, streams, args.requests, args.tokens, seed=streams)
+        batched.stop()
+        if not args.skip_baseline:
+            sequential = ContinuousBatchScheduler(model, tokenizer, max_batch_size=1).start()
+            row["sequential"] = run_load(sequential, streams, args.requests, args.tokens, seed=streams)
+            sequential.stop()
+            row["speedup"] = round(row["batched"]["tokens_per_s"] / row["sequential"]["tokens_per_s"], 2)
+        result["runs"].append(row)
+        print(f"{streams:>3} akış: {row['batched']['tokens_per_s']:>8.1f} token/s"
+              + (f"  (tek tek: {row['sequential']['tokens_per_s']:.1f}, x{row['speedup']})" if "speedup" in row else ""),
+              file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
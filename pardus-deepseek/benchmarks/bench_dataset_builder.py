@@ -0,0 +1,163 @@
+# benchmarks/bench_dataset_builder.py
+# Veri seti oluşturucunun (dataset_builder.py) hızını (satır/s) ve en yüksek
+# bellek kullanımını (peak RSS) eski pandas akışıyla karşılaştırır.
+#
+# Üretilen sahte bir haber CSV'si (Baslik, Ozet, Icerik; satırların bir kısmı
+# tekrar) üzerinde:
+#   - legacy:  VerBirlesitm9re1.ipynb'deki csv_to_alpaca; pd.read_csv +
+#              df.iterrows() ile tek liste + json.dump. Bellek yüzünden
+#              varsayılan olarak verinin ilk '--legacy-rows' satırında ölçülür.
+#   - builder: dataset_builder.build_dataset; tam veri, tam ve Bloom tekrar
+#              ayıklamayla. Yazılan satır sayısı özgün satır sayısına eşit olmalı.
+# Her ölçüm ayrı bir süreçte yapılır; RSS değerleri o sürecin (ve işçilerinin)
+# en yüksek değeridir.
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/bench_dataset_builder.py --rows 2000000 --legacy-rows 300000
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("pardus linux dağıtım kurulum güncelleme masaüstü uygulama sistem yönetici paket servis ağ güvenlik "
+         "belge tarayıcı okul kurum kullanıcı dosya klasör ayar sürücü donanım yazılım geliştirici topluluk "
+         "haber ekonomi spor hava durumu seçim belediye eğitim sağlık teknoloji bilim kültür sanat").split()
+
+
+def make_fixture(path: str, rows: int, duplicate_ratio: float, seed: int) -> int:
+    # Sahte haber CSV'si yazar; özgün satır sayısını döndürür.
+    rng = random.Random(seed)
+    unique = 0
+    recent = []
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Baslik", "Ozet", "Icerik"])
+        for _ in range(rows):
+            if recent and rng.random() < duplicate_ratio:
+                row = list(rng.choice(recent))
+                # Bazı tekrarlar sadece boşluk farkı içerir.
+                if rng.random() < 0.5:
+                    row[2] = "  " + row[2].replace(" ", "  ")
+            else:
+                row = [" ".join(rng.choices(WORDS, k=6)).capitalize(),
+                       " ".join(rng.choices(WORDS, k=15)) + ".",
+                       " ".join(rng.choices(WORDS, k=45)) + "."]
+                unique += 1
+                recent.append(row)
+                if len(recent) > 10000:
+                    recent.pop(rng.randrange(len(recent)))
+            writer.writerow(row)
+    return unique
+
+
+def head_fixture(source: str, path: str, rows: int):
+    with open(source, encoding="utf-8", newline="") as src, open(path, "w", encoding="utf-8", newline="") as dst:
+        reader, writer = csv.reader(src), csv.writer(dst)
+        for index, row in enumerate(reader):
+            if index > rows:
+                break
+            writer.writerow(row)
+
+
+def peak_rss_mb(who) -> float:
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1) # Linux'ta KB cinsinden
+
+
+def child_legacy(input_path: str, output_path: str) -> dict:
+    import pandas as pd
+
+    start = time.perf_counter()
+    df = pd.read_csv(input_path)
+    alpaca_data = []
+    for index, row in df.iterrows():
+        alpaca_data.append({"instruction": row["Baslik"], "input": row["Ozet"], "output": row["Icerik"]})
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(alpaca_data, f, ensure_ascii=False, indent=4)
+    elapsed = time.perf_counter() - start
+    return {"rows": len(df), "written": len(alpaca_data), "seconds": round(elapsed, 2),
+            "rows_per_second": round(len(df) / elapsed), "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF)}
+
+
+def child_builder(input_path: str, output_dir: str, workers: int, dedup: str, expected_rows: int) -> dict:
+    from dataset_builder import build_dataset
+
+    manifest = build_dataset([("haber-csv", input_path)], output_dir, workers=workers, dedup=dedup,
+                             expected_rows=expected_rows)
+    source = manifest["sources"][0]
+    return {"rows": source["read"], "written": source["written"], "duplicates": source["duplicates"],
+            "shards": len(manifest["shards"]), "seconds": manifest["build"]["seconds"],
+            "rows_per_second": round(manifest["build"]["rows_per_second"]),
+            "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+            "peak_worker_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN), "dedup": manifest["dedup"]}
+
+
+def run_child(*args) -> dict:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *map(str, args)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veri seti oluşturucu hız ve bellek testi")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Üretilecek satır sayısı")
+    parser.add_argument("--legacy-rows", type=int, default=300_000, help="Eski akışın ölçüleceği satır sayısı (0: tümü)")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Tekrar eden satır oranı")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Oluşturucu işçi sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, *rest = args.child
+        if mode == "legacy":
+            result = child_legacy(*rest)
+        else:
+            input_path, output_dir, workers, dedup, expected = rest
+            result = child_builder(input_path, output_dir, int(workers), dedup, int(expected))
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = os.path.join(tmp, "haber.csv")
+        start = time.perf_counter()
+        unique = make_fixture(fixture, args.rows, args.duplicates, args.seed)
+        print(f"{args.rows:,} satırlık veri {time.perf_counter() - start:.1f} s'de üretildi "
+              f"({os.path.getsize(fixture) / 1024**2:.0f} MB)", file=sys.stderr)
+
+        legacy_input = fixture
+        if args.legacy_rows and args.legacy_rows < args.rows:
+            legacy_input = os.path.join(tmp, "haber_legacy.csv")
+            head_fixture(fixture, legacy_input, args.legacy_rows)
+        result = {
+            "benchmark": "dataset_builder",
+            "rows": args.rows,
+            "unique_rows": unique,
+            "fixture_mb": round(os.path.getsize(fixture) / 1024**2, 1),
+            "cpu_count": os.cpu_count(),
+            "legacy": run_child("legacy", legacy_input, os.path.join(tmp, "legacy.json")),
+        }
+        for dedup in ("exact", "bloom"):
+            result[f"builder_{dedup}"] = run_child("builder", fixture, os.path.join(tmp, f"out_{dedup}"),
+                                                   args.workers, dedup, args.rows)
+            print(f"{dedup}: {result[f'builder_{dedup}']['rows_per_second']:,} satır/s", file=sys.stderr)
+        result["exact_dedup_correct"] = result["builder_exact"]["written"] == unique
+        result["speedup"] = round(result["builder_exact"]["rows_per_second"] / result["legacy"]["rows_per_second"], 2)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/bench_model_snapshot.py
+# Anlık görüntü (model_snapshot.py) dışa aktarma ve yükleme yolunun soğuk
+# başlangıç süresini ve en yüksek bellek kullanımını (peak RSS) eski yolla
+# karşılaştırır.
+#
+# CPU'da küçük, rastgele ağırlıklı bir Llama modeli (varsayılan ~134M
+# parametre, float32) ve rslora'lı bir LoRA adaptörü (peft) kullanılır.
+#   - legacy_export:   denizhan.py; from_pretrained + save_pretrained.
+#   - snapshot_export: export_snapshot; LoRA birleştirilerek parçalı yazılır.
+#   - resume:          Dışa aktarma ikinci parçadan sonra kesilir ve yeniden
+#                      çalıştırılır; tamamlanmış parçalar atlanmalı.
+#   - legacy_start:    DeepSeekWeb; from_pretrained + PeftModel.from_pretrained
+#                      + ilk ileri geçiş (forward).
+#   - snapshot_start:  load_model (mmap, tembel) + ilk ileri geçiş; bir de
+#                      sha256 doğrulamalı hali.
+# Her ölçüm ayrı bir süreçte yapılır. Başlangıç ölçümlerinden önce dosyalar
+# sayfa önbelleğinden atılır (posix_fadvise), böylece disk okuması da ölçülür.
+# İki yolun çıktılarının (logit) aynı olduğu da doğrulanır.
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/bench_model_snapshot.py --hidden-size 768 --layers 12
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+
+def _status_mb(field: str) -> float:
+    # ru_maxrss exec'ten sonra ana süreçten devralınır; VmHWM ise yeni süreçte sıfırdan başlar.
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return round(int(line.split()[1]) / 1024, 1)
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def drop_page_cache(directory: str):
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def make_model(directory: str, hidden_size: int, layers: int, vocab_size: int, rank: int):
+    from peft import LoraConfig, get_peft_model
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(0)
+    config = LlamaConfig(vocab_size=vocab_size, hidden_size=hidden_size, intermediate_size=hidden_size * 8 // 3,
+                         num_hidden_layers=layers, num_attention_heads=max(1, hidden_size // 64),
+                         num_key_value_heads=max(1, hidden_size // 64), tie_word_embeddings=False)
+    model = LlamaForCausalLM(config).eval()
+    model.save_pretrained(os.path.join(directory, "base"))
+    # Eğitim not defterindeki gibi tüm doğrusal katmanlara rslora'lı LoRA.
+    lora = LoraConfig(r=rank, lora_alpha=rank, use_rslora=True, init_lora_weights=False,
+                      target_modules=["q_proj", "k_proj", "v_proj", "o_proj", "gate_proj", "up_proj", "down_proj"])
+    get_peft_model(model, lora).save_pretrained(os.path.join(directory, "lora"))
+    return sum(p.numel() for p in model.parameters())
+
+
+def _input_ids():
+    return torch.arange(1, 33).unsqueeze(0)
+
+
+def child(mode: str, work: str) -> dict:
+    base, lora, snap = (os.path.join(work, name) for name in ("base", "lora", "snap"))
+    # Kütüphanelerin içe aktarılması iki yolda da aynıdır; süreye katılmaz.
+    import peft  # noqa: F401
+    import transformers  # noqa: F401
+
+    baseline = _status_mb("VmRSS")
+    start = time.perf_counter()
+    result = {}
+    if mode == "legacy_export":
+        from transformers import AutoModelForCausalLM
+
+        model = AutoModelForCausalLM.from_pretrained(base)
+        model.save_pretrained(os.path.join(work, "legacy_copy"))
+    elif mode == "snapshot_export":
+        from model_snapshot import export_snapshot
+
+        manifest = export_snapshot(base, snap, max_shard_size="100MB", adapter=lora)
+        result["shards"] = len(manifest["shards"])
+    elif mode == "resume":
+        from model_snapshot import export_snapshot
+
+        out = os.path.join(work, "snap_resume")
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt(file, skipped):
+            if file.startswith("model-00002"):
+                raise Interrupted
+
+        try:
+            export_snapshot(base, out, max_shard_size="100MB", adapter=lora, progress=interrupt)
+        except Interrupted:
+            pass
+        start = time.perf_counter()
+        manifest = export_snapshot(base, out, max_shard_size="100MB", adapter=lora)
+        result.update(shards=len(manifest["shards"]), reused_shards=manifest["reused_shards"])
+    else:
+        drop_page_cache(base if mode == "legacy_start" else snap)
+        if mode == "legacy_start":
+            from peft import PeftModel
+            from transformers import AutoModelForCausalLM
+
+            model = PeftModel.from_pretrained(AutoModelForCausalLM.from_pretrained(base), lora).eval()
+        else:
+            from model_snapshot import load_model
+
+            model = load_model(snap, verify=mode == "snapshot_start_verify")
+        result["load_seconds"] = round(time.perf_counter() - start, 3)
+        # Yüklemeden hemen sonra (ileri geçişten önce) belleğe okunmuş kısım.
+        result["rss_after_load_mb"] = round(_status_mb("VmRSS") - baseline, 1)
+        with torch.inference_mode():
+            logits = model(_input_ids()).logits[0, -1]
+        torch.save(logits, os.path.join(work, f"{mode}.logits"))
+    # Ek bellek: en yüksek RSS'ten kütüphaneler yüklendikten sonraki RSS çıkarılır.
+    result.update(seconds=round(time.perf_counter() - start, 3), peak_rss_mb=_status_mb("VmHWM"),
+                  extra_rss_mb=round(_status_mb("VmHWM") - baseline, 1))
+    return result
+
+
+def run_child(mode: str, work: str) -> dict:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, work],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model anlık görüntüsü soğuk başlangıç testi")
+    parser.add_argument("--hidden-size", type=int, default=768)
+    parser.add_argument("--layers", type=int, default=12)
+    parser.add_argument("--vocab-size", type=int, default=32000)
+    parser.add_argument("--rank", type=int, default=16, help="LoRA rank")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as work:
+        params = make_model(work, args.hidden_size, args.layers, args.vocab_size, args.rank)
+        result = {"benchmark": "model_snapshot", "parameters": params,
+                  "base_mb": round(sum(os.path.getsize(os.path.join(work, "base", f))
+                                       for f in os.listdir(os.path.join(work, "base"))) / 1024**2, 1)}
+        for mode in ("legacy_export", "snapshot_export", "resume", "legacy_start", "snapshot_start",
+                     "snapshot_start_verify"):
+            result[mode] = run_child(mode, work)
+            print(f"{mode}: {result[mode]}", file=sys.stderr)
+        reference = torch.load(os.path.join(work, "legacy_start.logits"))
+        merged = torch.load(os.path.join(work, "snapshot_start.logits"))
+        result["max_logit_diff"] = float((reference - merged).abs().max())
+        result["identical"] = bool(torch.allclose(reference, merged, atol=1e-4))
+        result["start_speedup"] = round(result["legacy_start"]["seconds"] / result["snapshot_start"]["seconds"], 2)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
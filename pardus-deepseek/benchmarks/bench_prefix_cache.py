@@ -0,0 +1,142 @@
+# benchmarks/bench_prefix_cache.py
+# Ön ek KV önbelleğinin (prefix_cache.py) ilk tokene kadar geçen süreye (TTFT)
+# etkisini ölçer.
+#
+# CPU'da küçük, rastgele ağırlıklı bir modelle iki senaryo çalıştırılır:
+#   - template:   Farklı sorular, hepsi format_alpaca_prompt'un aynı Türkçe
+#                 giriş metniyle (giriş metni önceden önbelleğe alınır).
+#   - multi_turn: Çok turlu sohbetler; her tur bir önceki turun istemini ve
+#                 cevabını içerir.
+# Her senaryo önbellekli ve önbelleksiz çalıştırılır; açgözlü üretimde iki
+# durumun çıktıları aynı olmalıdır ("identical").
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/bench_prefix_cache.py --requests 20 --turns 6 --max-mb 64
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import torch
+
+from batch_scheduler import ContinuousBatchScheduler, SamplingParams
+from prefix_cache import PrefixCache
+from tiny_model import build_tiny_model
+
+# DeepSeekWeb'deki şablonla aynı.
+ALPACA_TEMPLATE = """Aşağıda bir görevi açıklayan bir talimat bulunmaktadır. İsteği uygun şekilde tamamlayan bir yanıt yazın.
+
+### Talimat:
+{instruction}
+
+### Yanıt:
+"""
+ALPACA_PREAMBLE = ALPACA_TEMPLATE.split("{instruction}")[0]
+
+QUESTIONS = [
+    "Pardus'ta paket nasıl kurulur?",
+    "Bir dizindeki tüm dosyaları listeleyen komutu yaz.",
+    "Systemd servisi nasıl yeniden başlatılır?",
+    "Disk kullanımını nasıl kontrol ederim?",
+    "Python ile bir dosyayı satır satır oku.",
+    "Ağ arayüzlerinin IP adreslerini göster.",
+]
+
+
+def template_prompts(count: int, rng: random.Random) -> list:
+    return [[ALPACA_TEMPLATE.format(instruction=rng.choice(QUESTIONS) + f" ({i})")] for i in range(count)]
+
+
+def conversation_prompts(count: int, turns: int, rng: random.Random) -> list:
+    # Her sohbet bir tur listesidir; istemler cevaplar bilinince oluşturulur.
+    return [[rng.choice(QUESTIONS) for _ in range(turns)] for _ in range(count)]
+
+
+def run(model, tokenizer, scenario: str, workload: list, tokens: int, cache: PrefixCache) -> dict:
+    scheduler = ContinuousBatchScheduler(model, tokenizer, max_batch_size=1, prefix_cache=cache)
+    scheduler.warm(ALPACA_PREAMBLE)
+    scheduler.start()
+    params = dict(max_new_tokens=tokens, temperature=0, repetition_penalty=1.0, ignore_eos=True)
+    ttft, prompt_tokens, outputs = [], [], []
+    try:
+        for item in workload:
+            history = ""
+            for instruction in item:
+                # Tek turlu senaryoda 'instruction' zaten tam istemdir.
+                prompt = instruction if scenario == "template" else history + ALPACA_TEMPLATE.format(instruction=instruction)
+                handle = scheduler.submit(prompt, SamplingParams(**params))
+                answer = handle.text()
+                ttft.append((handle.first_token_at - handle.created_at) * 1000)
+                prompt_tokens.append(len(handle.prompt_ids))
+                outputs.append(handle.generated)
+                history = prompt + answer + "\n\n"
+    finally:
+        scheduler.stop()
+    return {
+        "requests": len(ttft),
+        "prompt_tokens_mean": round(statistics.mean(prompt_tokens), 1),
+        "ttft_ms": {
+            "p50": round(statistics.median(ttft), 2),
+            "mean": round(statistics.mean(ttft), 2),
+            "max": round(max(ttft), 2),
+        },
+        "prefix_cache": cache.stats() if cache is not None else None,
+        "_outputs": outputs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ön ek KV önbelleği TTFT testi")
+    parser.add_argument("--requests", type=int, default=20, help="Tek turlu istek / sohbet sayısı")
+    parser.add_argument("--turns", type=int, default=6, help="Sohbet başına tur")
+    parser.add_argument("--tokens", type=int, default=32, help="Cevap başına token")
+    parser.add_argument("--max-mb", type=float, default=256, help="Önbellek bellek bütçesi (MB)")
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=0, help="torch iş parçacığı sayısı (0: varsayılan)")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    model, tokenizer = build_tiny_model(hidden_size=args.hidden_size, layers=args.layers, heads=8)
+    workloads = {
+        "template": template_prompts(args.requests, random.Random(args.seed)),
+        "multi_turn": conversation_prompts(max(1, args.requests // args.turns), args.turns, random.Random(args.seed)),
+    }
+    run(model, tokenizer, "template", workloads["template"][:2], 4, None) # Isınma
+
+    result = {
+        "benchmark": "prefix_cache",
+        "model": {"hidden_size": args.hidden_size, "layers": args.layers},
+        "max_mb": args.max_mb,
+        "scenarios": {},
+    }
+    for scenario, workload in workloads.items():
+        cold = run(model, tokenizer, scenario, workload, args.tokens, None)
+        cache = PrefixCache(max_bytes=int(args.max_mb * 1024 * 1024))
+        warm = run(model, tokenizer, scenario, workload, args.tokens, cache)
+        result["scenarios"][scenario] = {
+            "without_cache": {k: v for k, v in cold.items() if not k.startswith("_")},
+            "with_cache": {k: v for k, v in warm.items() if not k.startswith("_")},
+            "ttft_p50_speedup": round(cold["ttft_ms"]["p50"] / warm["ttft_ms"]["p50"], 2),
+            "identical": cold["_outputs"] == warm["_outputs"],
+        }
+        print(f"{scenario:>10}: TTFT p50 {cold['ttft_ms']['p50']:.1f} ms -> {warm['ttft_ms']['p50']:.1f} ms",
+              file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
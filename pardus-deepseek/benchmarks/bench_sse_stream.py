@@ -0,0 +1,179 @@
+# benchmarks/bench_sse_stream.py
+# SSE akış katmanını (sse_stream.py) sahte bir üreticiyle ölçer.
+#
+# Sahte üretici, model.generate gibi kendi iş parçacığında belirli bir hızla
+# token üretir. Üç istemci senaryosu çalıştırılır:
+#   - fast: Çerçeveleri geldiği anda okur.
+#   - slow: Her çerçeveden sonra bekler (yavaş ağ); kanalın sınırlı kaldığı ve
+#     üreticinin beklediği (backpressure) görülür.
+#   - drop: Birkaç çerçeveden sonra bağlantıyı kapatır; kopuştan sonra boşa
+#     üretilen token sayısı ölçülür.
+# Karşılaştırma için eski akış (sınırsız kuyruk, token başına bir olay, iptal
+# yok) da aynı senaryolarla çalıştırılır. İstemci tarafında olaylar SSE
+# kurallarına göre ayrıştırılır ve metnin eksiksiz geri kurulup kurulmadığı
+# ("text_intact") kontrol edilir.
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/bench_sse_stream.py --tokens 200 --rate 400
+import argparse
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sse_stream import StreamChannel, sse_events
+
+WORDS = ["Pardus", " için", " paket", " kurulumu", " şöyle", " yapılır", ":", "\n", "sudo", " apt", " install", "\n\n", " -y"]
+
+
+class FakeGenerator:
+    """Kendi iş parçacığında sabit hızla token üreten sahte model."""
+
+    def __init__(self, tokens: int, rate: float, seed: int, channel=None):
+        self.stream = channel
+        self.queue = queue.Queue() # Eski akış için
+        self.tokens = tokens
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.produced = 0
+        self.text = ""
+        self.finish_reason = None
+        self._cancel = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.stream is not None:
+            self.stream.close("cancelled")
+
+    def _run(self):
+        start = time.perf_counter()
+        for i in range(self.tokens):
+            if self._cancel.is_set():
+                self.finish_reason = "cancelled"
+                return
+            # Sabit hız: i. token başlangıçtan i/rate saniye sonra.
+            delay = start + i / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            token = self.rng.choice(WORDS)
+            self.produced += 1
+            self.text += token
+            if self.stream is not None:
+                if not self.stream.put(token):
+                    self.finish_reason = "cancelled"
+                    return
+            else:
+                self.queue.put(token)
+        self.finish_reason = "stop"
+        if self.stream is not None:
+            self.stream.close("stop")
+        else:
+            self.queue.put(None)
+
+
+def legacy_events(generator: FakeGenerator):
+    # DeepSeekWeb'in eski stream() fonksiyonu.
+    while True:
+        chunk = generator.queue.get()
+        if chunk is None:
+            yield "data: DONE\n\n"
+            break
+        yield f"data: {chunk}\n\n"
+
+
+def parse_sse(raw: str) -> str:
+    """Tarayıcı gibi ayrıştırır: varsayılan 'message' olaylarının verisini birleştirir."""
+    text = []
+    for block in raw.split("\n\n"):
+        event, data = "message", []
+        for line in block.split("\n"):
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[6:] if line.startswith("data: ") else line[5:])
+        if data and event == "message" and data != ["DONE"]:
+            text.append("\n".join(data))
+    return "".join(text)
+
+
+def run_client(mode: str, kind: str, args) -> dict:
+    seed = 11
+    if kind == "new":
+        channel = StreamChannel(max_chars=args.max_chars, stall_timeout=args.stall_timeout)
+        generator = FakeGenerator(args.tokens, args.rate, seed, channel)
+        events = sse_events(generator, flush_interval=args.flush_interval, frame_chars=args.frame_chars)
+    else:
+        generator = FakeGenerator(args.tokens, args.rate, seed)
+        events = legacy_events(generator)
+    raw, frames, max_depth = [], 0, 0
+    produced_at_drop = None
+    start = time.perf_counter()
+    for frame in events:
+        raw.append(frame)
+        frames += 1
+        max_depth = max(max_depth, generator.queue.qsize() if kind == "legacy" else generator.stream.max_buffered)
+        if mode == "slow":
+            time.sleep(args.slow_delay)
+        if mode == "drop" and frames >= args.drop_after:
+            produced_at_drop = generator.produced
+            events.close() # WSGI sunucusu bağlantı kopunca üreteci kapatır.
+            break
+    elapsed = time.perf_counter() - start
+    generator.thread.join(timeout=args.tokens / args.rate + 5)
+    result = {
+        "frames": frames,
+        "bytes": sum(len(f.encode("utf-8")) for f in raw),
+        "tokens_produced": generator.produced,
+        "tokens_per_frame": round(generator.produced / frames, 2) if frames else None,
+        "seconds": round(elapsed, 3),
+        "max_buffered": max_depth,
+        "max_buffered_unit": "tokens" if kind == "legacy" else "chars",
+    }
+    if kind == "new":
+        result["producer_blocked_s"] = round(generator.stream.blocked_seconds, 3)
+    if mode == "drop":
+        result["wasted_tokens_after_disconnect"] = generator.produced - produced_at_drop
+    else:
+        result["text_intact"] = parse_sse("".join(raw)) == generator.text
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE akış katmanı testi")
+    parser.add_argument("--tokens", type=int, default=200, help="Üretilecek token sayısı")
+    parser.add_argument("--rate", type=float, default=400, help="Üretim hızı (token/s)")
+    parser.add_argument("--flush-interval", type=float, default=0.05, help="Çerçeve birleştirme süresi (s)")
+    parser.add_argument("--frame-chars", type=int, default=512, help="Çerçeve boyutu sınırı")
+    parser.add_argument("--max-chars", type=int, default=128, help="Kanal boyutu sınırı")
+    parser.add_argument("--stall-timeout", type=float, default=10.0)
+    parser.add_argument("--slow-delay", type=float, default=0.1, help="Yavaş istemcinin çerçeve başına beklemesi (s)")
+    parser.add_argument("--drop-after", type=int, default=3, help="Bağlantının kapatıldığı çerçeve")
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    result = {"benchmark": "sse_stream", "config": vars(args).copy(), "scenarios": {}}
+    result["config"].pop("output")
+    for mode in ("fast", "slow", "drop"):
+        result["scenarios"][mode] = {kind: run_client(mode, kind, args) for kind in ("legacy", "new")}
+        row = result["scenarios"][mode]
+        print(f"{mode:>5}: çerçeve {row['legacy']['frames']} -> {row['new']['frames']}"
+              + (f", kopuş sonrası boşa token {row['legacy']['wasted_tokens_after_disconnect']}"
+                 f" -> {row['new']['wasted_tokens_after_disconnect']}" if mode == "drop" else ""),
+              file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/bench_token_store.py
+# Token deposunun (token_store.py) yeniden kullanımını ve paketleme /
+# gruplamanın dolgu oranına etkisini ölçer.
+#
+# VerBirlesitm9re1.ipynb'deki kaynakların uzunluk dağılımlarını taklit eden
+# sahte bir karışık veri seti (çok kısa cümle/yorumlardan çok uzun Wikipedia
+# maddelerine kadar) Alpaca JSONL parçaları olarak üretilir. Bu veriyle CPU'da
+# eğitilen küçük bir BPE tokenizer kullanılır (gerçek tokenizer indirme ister).
+#   - cold:        Depo boşken tüm parçaların token'lanması (eski akışta her
+#                  eğitim çalıştırmasında ödenen bedel).
+#   - warm:        Aynı tokenizer ve şablonla depo yeniden açılır; hiçbir parça
+#                  yeniden token'lanmamalı.
+#   - incremental: Yeni bir parça eklenir; sadece o parça token'lanmalı.
+#   - padding:     max_seq_length=2048'de rastgele toplu işler, uzunluğa göre
+#                  gruplama ve paketleme için gerçek token / toplam yuva oranı.
+# Depodan okunan token'ların doğrudan token'lamayla aynı olduğu da doğrulanır.
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/bench_token_store.py --rows 40000 --shards 4
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from token_store import MAX_SEQ_LENGTH, TokenStore, padding_report
+
+WORDS = ("pardus linux dağıtım kurulum güncelleme masaüstü uygulama sistem yönetici paket servis ağ güvenlik "
+         "belge tarayıcı okul kurum kullanıcı dosya klasör ayar sürücü donanım yazılım geliştirici topluluk "
+         "haber ekonomi spor hava durumu seçim belediye eğitim sağlık teknoloji bilim kültür sanat tarih "
+         "şehir nüfus yüzyıl savaş antlaşma üniversite kütüphane müze nehir dağ göl iklim tarım sanayi").split()
+
+# Kaynak adı: (karışımdaki payı, (instruction, input, output) için kelime sayısı
+# dağılımı: log-normal medyan ve yayılım). Değerler not defterindeki kaynakların
+# kabaca biçimini yansıtır.
+SOURCE_SHAPES = {
+    "wikipedia-tr": (0.25, {"input": (3, 0.4), "output": (450, 1.0)}),
+    "alpaca-tr": (0.15, {"input": (15, 0.6), "output": (70, 0.8)}),
+    "multilingual-sentences": (0.20, {"input": (12, 0.5), "output": "input"}),
+    "wikipedia-tr-summarization": (0.10, {"input": (60, 0.5), "output": (350, 0.6)}),
+    "100k-tr-news": (0.10, {"input": (30, 0.4), "output": (280, 0.6)}),
+    "turkish-youtube-comments": (0.15, {"input": (14, 0.8), "output": (10, 0.8)}),
+    "news-tr": (0.05, {"input": (140, 0.6), "output": (140, 0.6)}),
+}
+INSTRUCTIONS = {"multilingual-sentences": "Verilen metni olduğu gibi tekrar et.", "news-tr": "Verilen metni tamamla."}
+# Tokenizer'ın şablonun İngilizce metnini de öğrenmesi için.
+ALPACA_TEXT = "Below is an instruction that describes a task, paired with an input that provides further context."
+
+
+def _words(rng: random.Random, median: float, sigma: float) -> str:
+    count = max(1, int(rng.lognormvariate(np.log(median), sigma)))
+    return " ".join(rng.choices(WORDS, k=count))
+
+
+def make_record(rng: random.Random) -> dict:
+    names = list(SOURCE_SHAPES)
+    name = rng.choices(names, weights=[SOURCE_SHAPES[n][0] for n in names])[0]
+    shape = SOURCE_SHAPES[name][1]
+    record = {"instruction": INSTRUCTIONS.get(name, "Verilen başlığa göre bir metin yaz.")}
+    record["input"] = _words(rng, *shape["input"])
+    record["output"] = record["input"] if shape["output"] == "input" else _words(rng, *shape["output"])
+    return record
+
+
+def write_shard(path: str, rows: int, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(rows):
+            f.write(json.dumps(make_record(rng), ensure_ascii=False) + "\n")
+
+
+def build_tokenizer(vocab_size: int, seed: int):
+    # Sahte veriden küçük bir BPE tokenizer eğitir.
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+    from transformers import PreTrainedTokenizerFast
+
+    rng = random.Random(seed)
+    sample = [" ".join(make_record(rng).values()) for _ in range(2000)]
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    trainer = trainers.BpeTrainer(vocab_size=vocab_size, special_tokens=["<unk>", "<s>", "</s>", "<pad>"],
+                                  initial_alphabet=pre_tokenizers.ByteLevel.alphabet())
+    tokenizer.train_from_iterator(sample + [ALPACA_TEXT], trainer)
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>",
+                                   unk_token="<unk>", pad_token="<pad>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token deposu ve paketleme testi")
+    parser.add_argument("--rows", type=int, default=40000, help="Toplam örnek sayısı")
+    parser.add_argument("--shards", type=int, default=4, help="JSONL parça sayısı")
+    parser.add_argument("--vocab-size", type=int, default=4000, help="BPE sözlük boyutu")
+    parser.add_argument("--max-seq-length", type=int, default=MAX_SEQ_LENGTH)
+    parser.add_argument("--batch-size", type=int, default=8, help="Eğitim toplu iş boyutu (per_device_train_batch_size)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON sonuçların yazılacağı dosya")
+    args = parser.parse_args()
+
+    tokenizer = build_tokenizer(args.vocab_size, args.seed)
+    rng = random.Random(args.seed + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        per_shard = args.rows // args.shards
+        shards = [os.path.join(tmp, f"part-{i:05d}.jsonl") for i in range(args.shards)]
+        for path in shards:
+            write_shard(path, per_shard, rng)
+        extra = os.path.join(tmp, f"part-{args.shards:05d}.jsonl")
+        write_shard(extra, per_shard, rng)
+        cache = os.path.join(tmp, "token_cache")
+
+        cold = TokenStore(cache, tokenizer).build(shards)
+        warm = TokenStore(cache, tokenizer).build(shards)
+        incremental = TokenStore(cache, tokenizer).build(shards + [extra])
+
+        start = time.perf_counter()
+        store = TokenStore(cache, tokenizer)
+        lengths = store.lengths
+        open_seconds = time.perf_counter() - start
+
+        # Depodaki token'lar doğrudan token'lamayla aynı olmalı.
+        with open(shards[0], encoding="utf-8") as f:
+            sample = [json.loads(next(f)) for _ in range(50)]
+        expected = tokenizer([store.format(r) for r in sample])["input_ids"]
+        identical = all(store[i].tolist() == ids for i, ids in enumerate(expected))
+        report = padding_report(lengths, args.max_seq_length, args.batch_size, args.seed)
+
+    result = {
+        "benchmark": "token_store",
+        "rows": int(len(lengths)),
+        "cold": cold,
+        "warm": warm,
+        "incremental": incremental,
+        "open_seconds": round(open_seconds, 4),
+        "identical": identical,
+        "padding": report,
+    }
+    efficiency = report["efficiency"]
+    print(f"cold {cold['seconds']} s, warm {warm['seconds']} s, ek parça {incremental['seconds']} s; "
+          f"verim: rastgele {efficiency['random_batches']}, gruplu {efficiency['bucketed']}, "
+          f"paketli {efficiency['packed']}", file=sys.stderr)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
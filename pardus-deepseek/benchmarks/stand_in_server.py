@@ -0,0 +1,115 @@
+# benchmarks/stand_in_server.py
+# DeepSeekWeb.ipynb'deki '/generate' SSE sunucusunun küçük modelle çalışan bir kopyası.
+#
+# Defterdeki sunucu açılışta unsloth ile 4 bitlik modeli ve LoRA adaptörünü
+# yükler; GPU ve indirme olmadan çalıştırılamaz. Yük testleri (bkz.
+# multimodal-ai-chatbot-AI-backend/load_generator.py) ise sunucu katmanını,
+# yani zamanlayıcıyı, ön ek önbelleğini ve SSE akışını ölçer. Bu betik:
+#   - tiny_model.py'deki rastgele ağırlıklı Llama modelini ve ByteTokenizer'ı
+#     yükler,
+#   - ContinuousBatchScheduler, PrefixCache ve sse_events'i defterdeki
+#     ayarlarla kurar ve Alpaca şablonunun giriş metnini önceden hesaplar,
+#   - defterdeki '/generate?prompt=...' uç noktasını aynı hata kodlarıyla
+#     (400 geçersiz ayar, 503 dolu kuyruk) sunar.
+# '--ignore-eos' ile rastgele modelin erken EOS üretmesi engellenir; her istek
+# tam 'max_new_tokens' token üretir ve çalıştırmalar karşılaştırılabilir olur.
+#
+# Kullanım (pardus-deepseek klasöründen):
+#     python3 benchmarks/stand_in_server.py --port 5001 --ignore-eos
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import torch
+from flask import Flask, Response, jsonify, request
+
+from batch_scheduler import ContinuousBatchScheduler, SamplingParams, SchedulerBusy
+from prefix_cache import PrefixCache
+from sse_stream import sse_events
+from tiny_model import build_tiny_model
+
+# DeepSeekWeb.ipynb ile aynı şablon
+ALPACA_TEMPLATE = """Aşağıda bir görevi açıklayan bir talimat bulunmaktadır. İsteği uygun şekilde tamamlayan bir yanıt yazın.
+
+### Talimat:
+{instruction}
+
+### Yanıt:
+"""
+
+
+def format_alpaca_prompt(instruction):
+    return ALPACA_TEMPLATE.format(instruction=instruction)
+
+
+def create_app(scheduler: ContinuousBatchScheduler, ignore_eos: bool = False, max_new_tokens_limit: int = 2048):
+    app = Flask(__name__)
+
+    @app.route('/')
+    def index():
+        return "DeepSeek yedek sunucusu hazır: /generate?prompt=..."
+
+    @app.route('/stats')
+    def stats():
+        return jsonify(scheduler.stats())
+
+    @app.route('/generate')
+    def generate():
+        prompt = request.args.get('prompt', '')
+        try:
+            params = SamplingParams.from_dict(request.args, max_new_tokens_limit=max_new_tokens_limit)
+        except ValueError as e:
+            return Response(str(e), status=400)
+        params.ignore_eos = ignore_eos
+        try:
+            handle = scheduler.submit(format_alpaca_prompt(prompt), params)
+        except SchedulerBusy:
+            return Response("Sunucu şu anda dolu, lütfen tekrar deneyin.", status=503)
+        return Response(
+            sse_events(handle, flush_interval=0.05, frame_chars=512),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DeepSeekWeb '/generate' uç noktasının küçük modelli kopyası")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-waiting", type=int, default=64)
+    parser.add_argument("--max-new-tokens-limit", type=int, default=2048)
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=0, help="torch iş parçacığı sayısı (0: varsayılan)")
+    parser.add_argument("--no-prefix-cache", action="store_true", help="Ön ek önbelleğini kapat")
+    parser.add_argument("--ignore-eos", action="store_true", help="EOS'ta durma; her istek sınırına kadar üretsin")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    model, tokenizer = build_tiny_model(hidden_size=args.hidden_size, layers=args.layers)
+    scheduler = ContinuousBatchScheduler(
+        model,
+        tokenizer,
+        max_batch_size=args.max_batch_size,
+        max_waiting=args.max_waiting,
+        max_seq_len=2048,
+        max_buffered_chars=8192,
+        stall_timeout=10.0,
+        prefix_cache=None if args.no_prefix_cache else PrefixCache(max_bytes=256 * 1024**2),
+    )
+    scheduler.warm(ALPACA_TEMPLATE.split("{instruction}")[0])
+    scheduler.start()
+    print(f"DeepSeek yedek sunucusu: http://{args.host}:{args.port}", file=sys.stderr)
+    create_app(scheduler, args.ignore_eos, args.max_new_tokens_limit).run(host=args.host, port=args.port,
+                                                                           threaded=True)
+
+
+if __name__ == "__main__":
+    main()
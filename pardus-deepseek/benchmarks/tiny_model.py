@@ -0,0 +1,47 @@
+# benchmarks/tiny_model.py
+# Ölçümler için CPU'da çalışan küçük, rastgele ağırlıklı bir dil modeli.
+#
+# Gerçek DeepSeek modeli (unsloth + LoRA) GPU ve indirme gerektirir. Zamanlayıcı
+# gibi sunucu katmanlarını ölçmek için aynı arayüze sahip (LlamaForCausalLM)
+# ama birkaç katmanlık bir model ve bayt tabanlı bir tokenizer yeterlidir.
+import torch
+
+
+class ByteTokenizer:
+    """UTF-8 baytlarını token olarak kullanan basit tokenizer (256 bayt + 3 özel token)."""
+
+    bos_token_id = 256
+    eos_token_id = 257
+    pad_token_id = 258
+    vocab_size = 259
+
+    def encode(self, text: str, add_special_tokens: bool = True) -> list:
+        ids = list(text.encode("utf-8"))
+        return [self.bos_token_id] + ids if add_special_tokens else ids
+
+    def decode(self, ids, skip_special_tokens: bool = True) -> str:
+        data = bytes(i for i in ids if i < 256)
+        return data.decode("utf-8", errors="replace")
+
+
+def build_tiny_model(hidden_size: int = 64, layers: int = 2, heads: int = 4, seed: int = 0,
+                     max_positions: int = 4096):
+    """Rastgele başlatılmış küçük bir Llama modeli ve ByteTokenizer döndürür."""
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(seed)
+    tokenizer = ByteTokenizer()
+    config = LlamaConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=layers,
+        num_attention_heads=heads,
+        num_key_value_heads=heads,
+        max_position_embeddings=max_positions,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+    )
+    model = LlamaForCausalLM(config).eval()
+    return model, tokenizer
@@ -0,0 +1,539 @@
+# dataset_builder.py
+# Kaynak veri setlerini akış halinde, paralel olarak Alpaca biçimine çeviren
+# ve parçalı (sharded) JSONL olarak yazan veri seti oluşturucu.
+#
+# VerBirlesitm9re1.ipynb her kaynağı (wikipedia-tr, alpaca-tr,
+# multilingual-sentences, 100K-TR-News...) önce tamamen bir pandas DataFrame'e
+# yüklüyor, CSV için df.iterrows() ile tek dev bir liste kuruyor ve sonucu tek
+# bir CSV/JSON dosyası olarak yazıyordu. Çok GB'lık Wikipedia dökümünde bu
+# onlarca GB RAM istiyor ve tek çekirdekte çalışıyordu. Bu modülde:
+#   - Kayıtlar yerel dosyalardan (CSV, JSONL, JSON dizisi, Parquet; .gz dahil)
+#     parça parça okunur; dosyanın tamamı hiçbir zaman bellekte tutulmaz.
+#   - Her parça (varsayılan 2000 satır) işçi süreçlerde (ProcessPoolExecutor)
+#     ayrıştırılır, Alpaca alanlarına çevrilir, JSON satırına yazılır ve
+#     hash'lenir. Bekleyen parça sayısı sınırlıdır; okuma işçilerden hızlı
+#     olsa bile bellek büyümez. Çıktı sırası girdi sırasıyla aynıdır.
+#   - Tekrarlanan kayıtlar (boşluk ve büyük/küçük harf farkı yok sayılarak)
+#     64 bitlik hash kümesiyle ya da sabit bellekli bir Bloom filtresiyle atılır.
+#   - Sonuç, her biri en fazla 'shard_rows' satır olan JSONL dosyalarına ve
+#     dosyaların satır sayısı, boyutu ve sha256 özetini içeren manifest.json'a
+#     yazılır. Eğitimde load_dataset("json", data_files="veri/part-*.jsonl")
+#     ile doğrudan okunabilir. Parçalar önce çıktı klasöründeki gizli bir
+#     hazırlık klasörüne yazılır ve ancak çalışma başarıyla bitince yerine
+#     taşınır; yarıda kalan bir çalışma önceki veri setine dokunmaz.
+#
+# Kullanım:
+#     python3 dataset_builder.py --source wikipedia-tr=wikipedia-tr.parquet \
+#         --source alpaca-tr=alpaca-tr.jsonl --out veri --workers 8 --dedup bloom
+import argparse
+import collections
+import csv
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Not defterindeki dönüşümler. "@sütun" bir sütunun değeri, diğer metinler
+# sabit talimattır. "split" verilirse metin ikiye bölünür: ilk yarısı input,
+# ikinci yarısı output olur ("Verilen metni tamamla.").
+SOURCES = {
+    "wikipedia-tr": {"instruction": "Verilen başlığa göre bir metin yaz.", "input": "@title", "output": "@text"},
+    "alpaca-tr": {"instruction": "Verilen başlığa göre bir metin yaz.", "input": "@instruction", "output": "@output"},
+    "multilingual-sentences": {"instruction": "Verilen metni olduğu gibi tekrar et.", "input": "@text", "output": "@text"},
+    "wikipedia-tr-summarization": {"instruction": "Verilen başlığa göre bir metin yaz.", "input": "@summary", "output": "@text"},
+    "100k-tr-news": {"instruction": "Verilen başlığa göre bir metin yaz.", "input": "@Ozet", "output": "@Icerik"},
+    "turkish-youtube-comments": {"instruction": "Verilen başlığa göre bir metin yaz.", "input": "@Comment", "output": "@Reply"},
+    "news-tr": {"instruction": "Verilen metni tamamla.", "split": "@text"},
+    "turkic-train": {"instruction": "Verilen metni tamamla.", "split": "@text"},
+    "haber-csv": {"instruction": "@Baslik", "input": "@Ozet", "output": "@Icerik"},
+    # Daha önce Alpaca biçimine çevrilmiş dosyaları birleştirmek için.
+    "alpaca": {"instruction": "@instruction", "input": "@input", "output": "@output"},
+}
+
+# Bir işçiye tek seferde gönderilen satır sayısı.
+DEFAULT_BATCH_ROWS = 2000
+# Bir JSONL parçasındaki en fazla satır.
+DEFAULT_SHARD_ROWS = 100_000
+# Bloom filtresinin hedef yanlış pozitif oranı (tekrar sanılıp atılan özgün kayıt).
+DEFAULT_BLOOM_ERROR = 1e-4
+
+
+# --- Okuma (ana süreç) ---
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def _file_kind(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext in (".csv", ".json", ".parquet"):
+        return ext[1:]
+    raise ValueError(f"Desteklenmeyen dosya türü: {path}")
+
+
+def _chunks(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_json_array(f, read_size: int = 1 << 20):
+    # '[{...}, {...}]' biçimindeki dosyayı nesne nesne okur (json.load tümünü yükler).
+    decoder = json.JSONDecoder()
+    buffer, position, started = "", 0, False
+    while True:
+        chunk = f.read(read_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if not started and position < len(buffer):
+                if buffer[position] != "[":
+                    raise ValueError("JSON dosyası bir dizi ile başlamıyor.")
+                started = True
+                position += 1
+                continue
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break # Nesne henüz tamamlanmadı; daha fazla oku.
+            yield item
+            position = end
+        if not chunk:
+            if buffer[position:].strip():
+                raise ValueError("JSON dizisi beklenmedik şekilde bitti.")
+            return
+
+
+def read_batches(path: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """
+    Dosyayı 'batch_rows' satırlık parçalar halinde okur ve işçilere gidecek
+    (tür, sütunlar, satırlar) üçlülerini verir. JSONL satırları ayrıştırılmadan
+    gönderilir; JSON ayrıştırma işçilerde yapılır.
+    """
+    kind = _file_kind(path)
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+            yield "columns", None, batch.to_pydict()
+        return
+    with _open_text(path) as f:
+        if kind == "csv":
+            csv.field_size_limit(sys.maxsize) # Wikipedia metinleri varsayılan sınırı aşar
+            reader = csv.reader(f)
+            header = next(reader, None)
+            for rows in _chunks(reader, batch_rows):
+                yield "csv", header, rows
+        elif kind == "jsonl":
+            for lines in _chunks((line for line in f if line.strip()), batch_rows):
+                yield "jsonl", None, lines
+        else:
+            for records in _chunks(_iter_json_array(f), batch_rows):
+                yield "records", None, records
+
+
+# --- Dönüştürme (işçi süreçler) ---
+
+def _clean(value) -> str:
+    # pandas'tan gelen boş hücreler NaN (float) olur; metne "nan" diye girmemeli.
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value).strip()
+
+
+def _field(spec_value: str, record: dict) -> str:
+    if spec_value.startswith("@"):
+        return _clean(record.get(spec_value[1:]))
+    return spec_value
+
+
+def _records(kind: str, columns, rows):
+    if kind == "csv":
+        return (dict(zip(columns, row)) for row in rows)
+    if kind == "columns":
+        names = list(rows)
+        return (dict(zip(names, values)) for values in zip(*rows.values()))
+    return rows
+
+
+def iter_record_batches(path: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """
+    Dosyadaki kayıtları sözlük listeleri halinde verir (diğer aşamalar için,
+    örn. token_store). Bozuk JSON satırları atlanır.
+    """
+    for kind, columns, rows in read_batches(path, batch_rows):
+        if kind != "jsonl":
+            yield list(_records(kind, columns, rows))
+            continue
+        records = []
+        for line in rows:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass
+        yield records
+
+
+def dedup_key(entry: dict) -> int:
+    """Boşluk ve büyük/küçük harf farkları yok sayılarak kaydın 64 bitlik hash'i."""
+    text = "\x1f".join(" ".join(entry[key].split()).casefold() for key in ("instruction", "input", "output"))
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def convert_record(spec: dict, record: dict):
+    """Tek bir kaydı Alpaca sözlüğüne çevirir; çıktısı boşsa None döndürür."""
+    if "split" in spec:
+        text = _field(spec["split"], record)
+        mid = len(text) // 2
+        entry = {"instruction": _field(spec["instruction"], record), "input": text[:mid], "output": text[mid:]}
+    else:
+        entry = {key: _field(spec[key], record) for key in ("instruction", "input", "output")}
+    return entry if entry["output"] else None
+
+
+def _convert_batch(task):
+    # İşçide çalışır: (hash'ler, JSON satırları, atlanan satır sayısı) döndürür.
+    source_index, spec, kind, columns, rows = task
+    count = len(next(iter(rows.values()), [])) if kind == "columns" else len(rows)
+    keys, lines, skipped = [], [], 0
+    for record in _records(kind, columns, rows):
+        try:
+            if kind == "jsonl":
+                record = json.loads(record)
+            entry = convert_record(spec, record)
+        except (ValueError, AttributeError): # Bozuk JSON satırı ya da nesne olmayan kayıt
+            entry = None
+        if entry is None:
+            skipped += 1
+            continue
+        keys.append(dedup_key(entry))
+        lines.append(json.dumps(entry, ensure_ascii=False))
+    return source_index, count, keys, lines, skipped
+
+
+def _ordered_map(fn, tasks, workers: int):
+    # Sonuçları girdi sırasıyla verir; aynı anda en fazla 2 * workers parça bekler.
+    if workers <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# --- Tekrar ayıklama ---
+
+class ExactDeduplicator:
+    """64 bitlik hash'lerin kümesi. Kayıt başına ~60 bayt bellek kullanır."""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, key: int) -> bool:
+        """Kayıt yeniyse True döndürür."""
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def stats(self) -> dict:
+        return {"method": "exact", "entries": len(self._seen)}
+
+
+class BloomDeduplicator:
+    """
+    Sabit bellekli Bloom filtresi. 'capacity' kayıtta yanlış pozitif oranı en
+    fazla 'error_rate' olur: özgün bir kayıt bu olasılıkla tekrar sanılıp atılır,
+    tekrarlanan bir kayıt ise asla kaçırılmaz.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_BLOOM_ERROR):
+        capacity = max(1, capacity)
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.entries = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def add(self, key: int) -> bool:
+        # Çift hash'leme: i. konum = h1 + i * h2 (mod bit sayısı).
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        array, bits, new = self._array, self.bits, False
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not array[byte] & mask:
+                array[byte] |= mask
+                new = True
+        if new:
+            self.entries += 1
+        return new
+
+    def stats(self) -> dict:
+        return {"method": "bloom", "entries": self.entries, "capacity": self.capacity,
+                "error_rate": self.error_rate, "bytes": len(self._array), "hashes": self.hashes}
+
+
+class _NoDeduplicator:
+    def add(self, key: int) -> bool:
+        return True
+
+    def stats(self) -> dict:
+        return {"method": "none"}
+
+
+def make_deduplicator(method: str, capacity: int = None, error_rate: float = DEFAULT_BLOOM_ERROR):
+    if method == "exact":
+        return ExactDeduplicator()
+    if method == "bloom":
+        if not capacity:
+            raise ValueError("Bloom filtresi için beklenen kayıt sayısı (capacity) gerekli.")
+        return BloomDeduplicator(capacity, error_rate)
+    if method == "none":
+        return _NoDeduplicator()
+    raise ValueError(f"Bilinmeyen tekrar ayıklama yöntemi: {method}")
+
+
+# --- Yazma ---
+
+class ShardWriter:
+    """
+    JSON satırlarını 'prefix-00000.jsonl' biçimindeki parçalara yazar. Her parça
+    önce '.tmp' uzantısıyla yazılır, tamamlanınca yeniden adlandırılır; yarıda
+    kalan bir çalışmada 'abort' yazılmakta olan parçayı siler, eksik parça
+    kalmaz. 'publish' tamamlanan parçaları başka bir klasöre taşır.
+    """
+
+    def __init__(self, out_dir: str, prefix: str = "part", shard_rows: int = DEFAULT_SHARD_ROWS, compress: bool = False):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.shard_rows = max(1, shard_rows)
+        self.compress = compress
+        self.shards = []
+        self._file = None
+        self._rows = 0
+        self._bytes = 0
+        self._digest = None
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _path(self, index: int) -> str:
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        return os.path.join(self.out_dir, f"{self.prefix}-{index:05d}{suffix}")
+
+    def _open(self):
+        path = self._path(len(self.shards)) + ".tmp"
+        self._file = gzip.open(path, "wb", compresslevel=5) if self.compress else open(path, "wb")
+        self._rows = self._bytes = 0
+        self._digest = hashlib.sha256()
+
+    def _close(self):
+        self._file.close()
+        path = self._path(len(self.shards))
+        os.replace(path + ".tmp", path)
+        self.shards.append({
+            "file": os.path.basename(path),
+            "rows": self._rows,
+            "bytes": os.path.getsize(path),
+            "uncompressed_bytes": self._bytes,
+            "sha256": self._digest.hexdigest(), # Sıkıştırılmamış içeriğin özeti
+        })
+        self._file = None
+
+    def write(self, lines: list):
+        position = 0
+        while position < len(lines):
+            if self._file is None:
+                self._open()
+            take = lines[position:position + self.shard_rows - self._rows]
+            data = ("\n".join(take) + "\n").encode("utf-8")
+            self._file.write(data)
+            self._digest.update(data)
+            self._rows += len(take)
+            self._bytes += len(data)
+            position += len(take)
+            if self._rows >= self.shard_rows:
+                self._close()
+
+    def close(self) -> list:
+        if self._file is not None:
+            self._close()
+        return self.shards
+
+    def abort(self):
+        """Yazılmakta olan parçayı yeniden adlandırmadan kapatıp siler."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self._path(len(self.shards)) + ".tmp")
+            except FileNotFoundError:
+                pass
+
+    def remove_stale(self, directory: str = None):
+        """
+        'directory' (varsayılan: out_dir) içinde bu çalışmada yazılmamış
+        (önceki, daha büyük bir çalışmadan kalan) parçaları siler.
+        """
+        directory = directory or self.out_dir
+        current = {shard["file"] for shard in self.shards}
+        pattern = re.escape(self.prefix) + r"-\d{5}\.jsonl(\.gz)?(\.tmp)?"
+        for name in os.listdir(directory):
+            if re.fullmatch(pattern, name) and name not in current:
+                os.remove(os.path.join(directory, name))
+
+    def publish(self, target_dir: str):
+        """
+        Kapatılmış parçaları 'target_dir'e taşır ve orada bu çalışmaya ait
+        olmayan eski parçaları siler. Eski manifest.json önce silinir; böylece
+        taşıma sırasında klasörü yanlış tarif eden bir manifest kalmaz.
+        """
+        try:
+            os.remove(os.path.join(target_dir, "manifest.json"))
+        except FileNotFoundError:
+            pass
+        for shard in self.shards:
+            os.replace(os.path.join(self.out_dir, shard["file"]), os.path.join(target_dir, shard["file"]))
+        self.remove_stale(target_dir)
+
+
+# --- Oluşturucu ---
+
+def _resolve_spec(name_or_spec):
+    if isinstance(name_or_spec, dict):
+        return "custom", name_or_spec
+    if name_or_spec not in SOURCES:
+        raise ValueError(f"Bilinmeyen kaynak: {name_or_spec} (bilinenler: {', '.join(SOURCES)})")
+    return name_or_spec, SOURCES[name_or_spec]
+
+
+def build_dataset(sources: list, out_dir: str, workers: int = None, batch_rows: int = DEFAULT_BATCH_ROWS,
+                  shard_rows: int = DEFAULT_SHARD_ROWS, dedup: str = "exact", expected_rows: int = None,
+                  bloom_error: float = DEFAULT_BLOOM_ERROR, compress: bool = False, prefix: str = "part",
+                  progress=None) -> dict:
+    """
+    'sources' içindeki (kaynak adı ya da dönüşüm sözlüğü, dosya yolu) çiftlerini
+    sırayla okuyup Alpaca biçiminde 'out_dir' klasörüne yazar ve manifest'i
+    döndürür (ayrıca 'out_dir/manifest.json' olarak kaydedilir).
+    'progress' verilirse her parçadan sonra işlenen satır sayısıyla çağrılır.
+    """
+    workers = workers or os.cpu_count() or 1
+    resolved = [(*_resolve_spec(name), path) for name, path in sources]
+    for _, _, path in resolved:
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+    deduplicator = make_deduplicator(dedup, expected_rows, bloom_error)
+    # Parçalar önce hazırlık klasörüne yazılır; 'veri/part-*.jsonl' gibi bir
+    # desen alt klasördeki yarım çalışmayı görmez.
+    staging = os.path.join(out_dir, f".{prefix}-staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    writer = ShardWriter(staging, prefix, shard_rows, compress)
+    stats = [{"name": name, "path": path, "read": 0, "written": 0, "duplicates": 0, "skipped": 0}
+             for name, _, path in resolved]
+
+    def tasks():
+        for index, (_, spec, path) in enumerate(resolved):
+            for kind, columns, rows in read_batches(path, batch_rows):
+                yield index, spec, kind, columns, rows
+
+    start = time.perf_counter()
+    total = 0
+    try:
+        for index, count, keys, lines, skipped in _ordered_map(_convert_batch, tasks(), workers):
+            kept = [line for key, line in zip(keys, lines) if deduplicator.add(key)]
+            writer.write(kept)
+            source = stats[index]
+            source["read"] += count
+            source["skipped"] += skipped
+            source["written"] += len(kept)
+            source["duplicates"] += len(lines) - len(kept)
+            total += count
+            if progress is not None:
+                progress(total)
+        shards = writer.close()
+    except BaseException:
+        # Hata ya da Ctrl+C: yeni parçalar silinir, önceki veri seti olduğu gibi kalır.
+        writer.abort()
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    elapsed = time.perf_counter() - start
+
+    manifest = {
+        "format": "alpaca-jsonl",
+        "fields": ["instruction", "input", "output"],
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "rows": sum(s["rows"] for s in shards),
+        "shards": shards,
+        "sources": stats,
+        "dedup": deduplicator.stats(),
+        "build": {"workers": workers, "batch_rows": batch_rows, "shard_rows": shard_rows,
+                  "seconds": round(elapsed, 3), "rows_per_second": round(total / elapsed, 1) if elapsed else None},
+    }
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    writer.publish(out_dir)
+    # Manifest en son taşınır: varsa, klasördeki parçaları doğru tarif eder.
+    os.replace(os.path.join(staging, "manifest.json"), os.path.join(out_dir, "manifest.json"))
+    shutil.rmtree(staging, ignore_errors=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kaynak veri setlerini Alpaca biçiminde parçalı JSONL'e çevirir")
+    parser.add_argument("--source", action="append", required=True, metavar="AD=YOL",
+                        help=f"Kaynak adı ve dosya yolu (tekrarlanabilir). Adlar: {', '.join(SOURCES)}")
+    parser.add_argument("--out", required=True, help="Çıktı klasörü")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="İşçi süreç sayısı")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="İşçiye giden parça boyutu")
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS, help="JSONL parçası başına satır")
+    parser.add_argument("--dedup", choices=["exact", "bloom", "none"], default="exact", help="Tekrar ayıklama yöntemi")
+    parser.add_argument("--expected-rows", type=int, help="Bloom filtresi için beklenen toplam kayıt")
+    parser.add_argument("--bloom-error", type=float, default=DEFAULT_BLOOM_ERROR, help="Bloom yanlış pozitif oranı")
+    parser.add_argument("--gzip", action="store_true", help="Parçaları gzip ile sıkıştır")
+    args = parser.parse_args()
+
+    sources = []
+    for item in args.source:
+        name, sep, path = item.partition("=")
+        if not sep:
+            parser.error(f"--source AD=YOL biçiminde olmalı: {item}")
+        sources.append((name, path))
+
+    def progress(rows):
+        print(f"\r{rows:,} satır işlendi", end="", file=sys.stderr, flush=True)
+
+    manifest = build_dataset(sources, args.out, workers=args.workers, batch_rows=args.batch_rows,
+                             shard_rows=args.shard_rows, dedup=args.dedup, expected_rows=args.expected_rows,
+                             bloom_error=args.bloom_error, compress=args.gzip, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps({key: manifest[key] for key in ("rows", "sources", "dedup", "build")}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
-import os
-os.environ["HUGGING_FACE_HUB_TOKEN"] = "senin token" 
-
-from transformers import AutoTokenizer, AutoModelForCausalLM
-
-# Model ve tokenizer'ı yükle
-model_name = "deepseek-ai/DeepSeek-R1-Distill-Qwen-14B"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForCausalLM.from_pretrained(model_name)
-
-# Yerel dizine kaydet
-save_directory = "./deepseek-14B"  # Kaydedilecek klasör
-model.save_pretrained(save_directory)
-tokenizer.save_pretrained(save_directory)
\ No newline at end of file
+import os
+os.environ["HUGGING_FACE_HUB_TOKEN"] = "senin token" 
+
+from huggingface_hub import snapshot_download
+from model_snapshot import export_snapshot, verify_snapshot
+
+# Model dosyalarını indir (model RAM'e yüklenmez)
+model_name = "deepseek-ai/DeepSeek-R1-Distill-Qwen-14B"
+source_directory = snapshot_download(model_name, allow_patterns=["*.json", "*.safetensors", "*.model", "*.txt"])
+
+# Parçalı safetensors olarak yerel dizine kaydet (tensör tensör; yarıda kalırsa kaldığı yerden devam eder)
+# Eğitilmiş LoRA adaptörü birleştirilecekse: adapter="adaptör yolu"
+save_directory = "./deepseek-14B"  # Kaydedilecek klasör
+export_snapshot(source_directory, save_directory, max_shard_size="2GB", dtype="bfloat16")
+
+# Parçaların sha256 özetlerini kontrol et
+assert not verify_snapshot(save_directory)
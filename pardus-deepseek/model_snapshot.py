@@ -0,0 +1,511 @@
+# model_snapshot.py
+# Modelin parçalı (sharded) safetensors anlık görüntüsünü (snapshot) çıkarma
+# ve bellek eşlemeyle (mmap) tembel yükleme.
+#
+# denizhan.py DeepSeek-R1-Distill-Qwen-14B'yi varsayılan from_pretrained ile
+# tamamen CPU RAM'ine yükleyip save_pretrained ile yeniden kaydediyordu;
+# DeepSeekWeb ve eğitim not defteri ise modeli her açılışta baştan yüklüyor,
+# DeepSeekWeb ayrıca LoRA adaptörünü her açılışta PeftModel.from_pretrained ile
+# yeniden uyguluyordu. Bu modülde:
+#   - export_snapshot: Kaynak ağırlıkları (safetensors / pytorch_model*.bin
+#     klasörü ya da bellekteki bir model) tensör tensör okur, isteğe bağlı
+#     olarak LoRA adaptörünü ağırlıklara birleştirir ve en fazla
+#     'max_shard_size' boyutunda safetensors parçalarına yazar. Model hiçbir
+#     zaman tamamen belleğe yüklenmez; bellek en fazla bir parça kadardır.
+#   - Çıktı Hugging Face'in model.safetensors.index.json biçimindedir
+#     (from_pretrained doğrudan okur). snapshot.json her parçanın sha256
+#     özetini tutar; yarıda kalan bir dışa aktarma yeniden çalıştırıldığında
+#     tamamlanmış parçalar atlanır.
+#   - load_model: Parametreleri meta cihazda (bellek ayırmadan, rastgele
+#     başlatmadan) kurar ve parçalardaki tensörleri kopyalamadan bağlar. Sayfalar
+#     ancak kullanıldıkça diskten okunur.
+#
+# Kullanım:
+#     python3 model_snapshot.py export ./kaynak ./deepseek-14B --adapter ./lora --dtype bfloat16
+#     python3 model_snapshot.py verify ./deepseek-14B
+import argparse
+import collections
+import contextlib
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import struct
+import sys
+import time
+
+import torch
+
+INDEX_NAME = "model.safetensors.index.json"
+MANIFEST_NAME = "snapshot.json"
+# Varsayılan en büyük parça boyutu (bayt).
+DEFAULT_MAX_SHARD_SIZE = 2 * 1024**3
+
+_WEIGHT_FILE = re.compile(r"^(model|pytorch_model|adapter_model).*\.(safetensors|bin)$|\.index\.json$")
+
+
+def parse_size(value) -> int:
+    """'2GB', '500MB' ya da bayt sayısını bayta çevirir."""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", str(value).upper())
+    if not match:
+        raise ValueError(f"Geçersiz boyut: {value}")
+    number, unit = match.groups()
+    return int(float(number) * {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024**2, "MB": 1024**2,
+                                "G": 1024**3, "GB": 1024**3}[unit])
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+# --- Kaynak ---
+
+class _Source:
+    """Kaynak ağırlıkların adlarını, boyutlarını ve tek tek okunmasını sağlar."""
+
+    def __init__(self, source):
+        self.module = None
+        self.directory = None
+        self._files = {}    # tensör adı -> dosya
+        self._handles = {}
+        self._meta = {}     # tensör adı -> (shape, dtype)
+        self._offsets = {}  # safetensors: tensör adı -> (dosyadaki konum, bayt)
+        if isinstance(source, torch.nn.Module):
+            self.module = source
+            self._state = {}
+            seen = set()
+            for name, tensor in source.state_dict().items():
+                # Bağlı (tied) ağırlıklar bir kez yazılır; config'teki tie_word_embeddings yeniden bağlar.
+                key = (tensor.data_ptr(), tensor.shape) if tensor.device.type != "meta" else name
+                if key in seen:
+                    continue
+                seen.add(key)
+                self._state[name] = tensor
+                self._meta[name] = (tuple(tensor.shape), tensor.dtype)
+        else:
+            self.directory = source
+            self._scan(source)
+
+    def _scan(self, directory: str):
+        names = sorted(os.listdir(directory))
+        safetensors = [n for n in names if n.endswith(".safetensors") and not n.startswith("adapter_model")]
+        binaries = [n for n in names if n.startswith("pytorch_model") and n.endswith(".bin")]
+        if safetensors:
+            for file in safetensors:
+                data_start, header = _read_safetensors_header(os.path.join(directory, file))
+                for name, info in header.items():
+                    begin, end = info["data_offsets"]
+                    self._files[name] = file
+                    self._offsets[name] = (data_start + begin, end - begin)
+                    self._meta[name] = (tuple(info["shape"]), _SAFETENSORS_DTYPES[info["dtype"]])
+        elif binaries:
+            for file in binaries:
+                state = torch.load(os.path.join(directory, file), map_location="cpu", mmap=True, weights_only=True)
+                for name, tensor in state.items():
+                    self._files[name] = file
+                    self._meta[name] = (tuple(tensor.shape), tensor.dtype)
+                del state
+        else:
+            raise FileNotFoundError(f"Ağırlık dosyası bulunamadı: {directory}")
+        self._remaining = collections.Counter(self._files.values())
+
+    def names(self) -> list:
+        return list(self._meta)
+
+    def shape(self, name: str) -> tuple:
+        return self._meta[name][0]
+
+    def dtype(self, name: str) -> torch.dtype:
+        return self._meta[name][1]
+
+    def load(self, name: str) -> torch.Tensor:
+        if self.module is not None:
+            return self._state[name].detach()
+        file = self._files[name]
+        path = os.path.join(self.directory, file)
+        if name in self._offsets:
+            # safetensors: tensör baytları doğrudan yeni bir tensöre okunur (mmap
+            # kullanılmaz); parça yazılınca bellek serbest kalır.
+            offset, nbytes = self._offsets[name]
+            shape, dtype = self._meta[name]
+            tensor = torch.empty(shape, dtype=dtype)
+            if nbytes:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    f.readinto(tensor.view(-1).view(torch.uint8).numpy())
+            return tensor
+        handle = self._handles.get(file)
+        if handle is None:
+            handle = self._handles[file] = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        tensor = handle[name]
+        # Dosyanın son tensörü okununca mmap'li dosya bırakılır.
+        self._remaining[file] -= 1
+        if not self._remaining[file]:
+            del self._handles[file]
+        return tensor
+
+    def fingerprint(self) -> str:
+        # Tensör adları, biçimleri ve kaynak dosya boyutları; içerik okunmaz.
+        digest = hashlib.sha256()
+        for name, (shape, dtype) in self._meta.items():
+            digest.update(f"{name}:{shape}:{dtype};".encode())
+        if self.directory is not None:
+            for file in sorted(set(self._files.values())):
+                digest.update(f"{file}:{os.path.getsize(os.path.join(self.directory, file))};".encode())
+        return digest.hexdigest()
+
+    def copy_aux_files(self, out_dir: str):
+        # config, generation_config ve tokenizer dosyaları olduğu gibi kopyalanır.
+        if self.module is not None:
+            self.module.config.save_pretrained(out_dir)
+            generation_config = getattr(self.module, "generation_config", None)
+            if generation_config is not None:
+                generation_config.save_pretrained(out_dir)
+            return
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path) and not _WEIGHT_FILE.search(name) and name != MANIFEST_NAME:
+                shutil.copy2(path, os.path.join(out_dir, name))
+
+
+def _read_safetensors_header(path: str):
+    # safetensors: 8 baytlık başlık uzunluğu + JSON başlık + ham tensör verisi.
+    with open(path, "rb") as f:
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    header.pop("__metadata__", None)
+    return 8 + length, header
+
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8, "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+# --- LoRA birleştirme ---
+
+class LoraMerger:
+    """
+    PEFT LoRA adaptörünü (adapter_config.json + adapter_model.safetensors)
+    taban ağırlıklara birleştirir: W' = W + ölçek * (B @ A).
+    Ölçek lora_alpha / r, use_rslora ise lora_alpha / sqrt(r)'dir.
+    peft kütüphanesi gerekmez.
+    """
+
+    def __init__(self, adapter_dir: str):
+        with open(os.path.join(adapter_dir, "adapter_config.json"), encoding="utf-8") as f:
+            self.config = json.load(f)
+        if self.config.get("peft_type", "LORA") != "LORA" or self.config.get("use_dora"):
+            raise ValueError("Sadece düz LoRA adaptörleri birleştirilebilir (DoRA desteklenmiyor).")
+        path = os.path.join(adapter_dir, "adapter_model.safetensors")
+        if os.path.exists(path):
+            from safetensors.torch import load_file
+
+            weights = load_file(path)
+        else:
+            weights = torch.load(os.path.join(adapter_dir, "adapter_model.bin"), map_location="cpu", weights_only=True)
+        self.adapter_dir = adapter_dir
+        self.digest = _sha256_file(path) if os.path.exists(path) else None
+        self.lora = {}      # modül adı -> {"A": ..., "B": ...}
+        self.replace = {}   # modules_to_save: ağırlık adı -> yeni tensör
+        for key, tensor in weights.items():
+            name = key[len("base_model.model."):] if key.startswith("base_model.model.") else key
+            match = re.match(r"(.+)\.lora_([AB])(?:\.[^.]+)?\.weight$", name)
+            if match:
+                self.lora.setdefault(match.group(1), {})[match.group(2)] = tensor
+            else:
+                self.replace[name.replace(".modules_to_save", "").replace(".default", "")] = tensor
+
+    def _pattern_value(self, patterns: dict, module: str, default):
+        for key, value in (patterns or {}).items():
+            if re.match(rf"(.*\.)?{key}$", module):
+                return value
+        return default
+
+    def scale(self, module: str) -> float:
+        r = self._pattern_value(self.config.get("rank_pattern"), module, self.config["r"])
+        alpha = self._pattern_value(self.config.get("alpha_pattern"), module, self.config.get("lora_alpha", r))
+        return alpha / math.sqrt(r) if self.config.get("use_rslora") else alpha / r
+
+    def apply(self, name: str, tensor: torch.Tensor) -> torch.Tensor:
+        if name in self.replace:
+            return self.replace[name].to(tensor.dtype)
+        module = name[:-len(".weight")] if name.endswith(".weight") else None
+        pair = self.lora.get(module)
+        if pair is None:
+            return tensor
+        delta = pair["B"].float() @ pair["A"].float()
+        if self.config.get("fan_in_fan_out"):
+            delta = delta.T
+        return (tensor.float() + self.scale(module) * delta).to(tensor.dtype)
+
+    def missing(self, names: list) -> list:
+        """Adaptörde olup taban ağırlıklarda karşılığı olmayan adlar."""
+        names = set(names)
+        return sorted({m for m in self.lora if m + ".weight" not in names} | {n for n in self.replace if n not in names})
+
+
+# --- Dışa aktarma ---
+
+def _plan_shards(source: _Source, max_shard_size: int, dtype) -> list:
+    shards, current, size = [], [], 0
+    for name in source.names():
+        target = dtype if dtype is not None and source.dtype(name).is_floating_point else source.dtype(name)
+        nbytes = math.prod(source.shape(name)) * target.itemsize
+        if current and size + nbytes > max_shard_size:
+            shards.append((current, size))
+            current, size = [], 0
+        current.append(name)
+        size += nbytes
+    if current:
+        shards.append((current, size))
+    total = len(shards)
+    return [{"file": f"model-{i + 1:05d}-of-{total:05d}.safetensors", "tensors": names, "nbytes": nbytes}
+            for i, (names, nbytes) in enumerate(shards)]
+
+
+def export_snapshot(source, out_dir: str, max_shard_size=DEFAULT_MAX_SHARD_SIZE, dtype=None, adapter: str = None,
+                    progress=None) -> dict:
+    """
+    'source' (model klasörü ya da bellekteki model) ağırlıklarını 'out_dir'
+    klasörüne parçalı safetensors olarak yazar ve manifest'i döndürür.
+    'dtype' verilirse kayan noktalı tensörler bu türe çevrilir (örn.
+    torch.bfloat16). 'adapter' bir LoRA adaptör klasörüyse ağırlıklara
+    birleştirilir. 'progress' her parçadan sonra (dosya adı, atlandı mı) ile çağrılır.
+    """
+    from safetensors.torch import save_file
+
+    if isinstance(dtype, str):
+        dtype = getattr(torch, dtype)
+    max_shard_size = parse_size(max_shard_size)
+    os.makedirs(out_dir, exist_ok=True)
+    src = _Source(source)
+    merger = LoraMerger(adapter) if adapter else None
+    if merger is not None and merger.missing(src.names()):
+        raise ValueError(f"Adaptördeki bazı ağırlıklar modelde bulunamadı: {merger.missing(src.names())[:5]}")
+    shards = _plan_shards(src, max_shard_size, dtype)
+    plan_id = hashlib.sha256(json.dumps([
+        src.fingerprint(), merger.digest if merger else None, str(dtype), max_shard_size,
+    ]).encode()).hexdigest()
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    done = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous.get("plan_id") == plan_id:
+            done = {s["file"]: s for s in previous["shards"] if s.get("sha256")}
+    manifest = {
+        "format": "safetensors-sharded",
+        "plan_id": plan_id,
+        "complete": False,
+        "dtype": str(dtype).replace("torch.", "") if dtype else None,
+        "adapter": {"path": os.path.abspath(adapter), "sha256": merger.digest, "config": merger.config} if merger else None,
+        "shards": [],
+    }
+
+    start = time.perf_counter()
+    weight_map, reused = {}, 0
+    for shard in shards:
+        path = os.path.join(out_dir, shard["file"])
+        for name in shard["tensors"]:
+            weight_map[name] = shard["file"]
+        previous = done.get(shard["file"])
+        # Tamamlanmış parça (boyutu tutuyorsa) yeniden yazılmaz.
+        if previous and os.path.exists(path) and os.path.getsize(path) == previous["bytes"]:
+            manifest["shards"].append(previous)
+            reused += 1
+            if progress is not None:
+                progress(shard["file"], True)
+            continue
+        tensors = {}
+        for name in shard["tensors"]:
+            tensor = src.load(name)
+            if merger is not None and tensor.is_floating_point():
+                tensor = merger.apply(name, tensor)
+            if dtype is not None and tensor.is_floating_point():
+                tensor = tensor.to(dtype)
+            tensors[name] = tensor.contiguous()
+        save_file(tensors, path + ".tmp", metadata={"format": "pt"})
+        del tensors
+        os.replace(path + ".tmp", path)
+        manifest["shards"].append({"file": shard["file"], "tensors": len(shard["tensors"]),
+                                   "bytes": os.path.getsize(path), "sha256": _sha256_file(path)})
+        # Her parçadan sonra kaydedilir; kesilen bir çalışma buradan devam eder.
+        _write_json(manifest_path, manifest)
+        if progress is not None:
+            progress(shard["file"], False)
+
+    total_size = sum(s["nbytes"] for s in shards)
+    _write_json(os.path.join(out_dir, INDEX_NAME), {"metadata": {"total_size": total_size}, "weight_map": weight_map})
+    src.copy_aux_files(out_dir)
+    # Eski bir plandan kalan parçalar silinir.
+    current = {s["file"] for s in shards}
+    for name in os.listdir(out_dir):
+        if re.fullmatch(r"model-\d{5}-of-\d{5}\.safetensors(\.tmp)?", name) and name not in current:
+            os.remove(os.path.join(out_dir, name))
+    manifest.update({"complete": True, "total_size": total_size, "reused_shards": reused,
+                     "seconds": round(time.perf_counter() - start, 3)})
+    _write_json(manifest_path, manifest)
+    return manifest
+
+
+def snapshot_info(path: str):
+    """Klasör export_snapshot ile oluşturulmuşsa manifest'i, değilse None döndürür."""
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_snapshot(path: str) -> list:
+    """Parçaların sha256 özetlerini kontrol eder; bozuk ya da eksik parçaların listesini döndürür."""
+    manifest = snapshot_info(path)
+    if manifest is None or not manifest.get("complete"):
+        raise ValueError(f"Tamamlanmış bir anlık görüntü değil: {path}")
+    bad = []
+    for shard in manifest["shards"]:
+        file = os.path.join(path, shard["file"])
+        if not os.path.exists(file) or os.path.getsize(file) != shard["bytes"] or _sha256_file(file) != shard["sha256"]:
+            bad.append(shard["file"])
+    return bad
+
+
+# --- Yükleme ---
+
+class SnapshotReader:
+    """
+    Parçalı safetensors klasöründen tensörleri tembel olarak okur. Her parça
+    ilk kullanıldığında mmap ile açılır; tensörler dosyadan kopyalanmaz.
+    """
+
+    def __init__(self, path: str, verify: bool = False):
+        self.path = path
+        index_path = os.path.join(path, INDEX_NAME)
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                self.weight_map = json.load(f)["weight_map"]
+        else:
+            self.weight_map = None
+        if verify:
+            bad = verify_snapshot(path)
+            if bad:
+                raise ValueError(f"Sağlama toplamı tutmayan parçalar: {bad}")
+        self._handles = {}
+        if self.weight_map is None:
+            from safetensors import safe_open
+
+            with safe_open(os.path.join(path, "model.safetensors"), framework="pt") as f:
+                self.weight_map = {name: "model.safetensors" for name in f.keys()}
+
+    def keys(self) -> list:
+        return list(self.weight_map)
+
+    def __getitem__(self, name: str) -> torch.Tensor:
+        file = self.weight_map[name]
+        handle = self._handles.get(file)
+        if handle is None:
+            from safetensors import safe_open
+
+            handle = self._handles[file] = safe_open(os.path.join(self.path, file), framework="pt")
+        return handle.get_tensor(name)
+
+    def state_dict(self) -> dict:
+        return {name: self[name] for name in self.weight_map}
+
+
+@contextlib.contextmanager
+def _meta_parameters():
+    # Parametreler meta cihazda oluşturulur: bellek ayrılmaz ve rastgele başlatma
+    # maliyeti olmaz. Buffer'lar (örn. RoPE inv_freq) CPU'da normal hesaplanır.
+    register = torch.nn.Module.register_parameter
+
+    def register_meta(module, name, param):
+        register(module, name, param)
+        if param is not None and param.device.type != "meta":
+            module._parameters[name] = torch.nn.Parameter(param.to("meta"), requires_grad=param.requires_grad)
+
+    torch.nn.Module.register_parameter = register_meta
+    try:
+        yield
+    finally:
+        torch.nn.Module.register_parameter = register
+
+
+def load_model(path: str, model_class=None, device=None, verify: bool = False):
+    """
+    Anlık görüntüden modeli kurar. Ağırlıklar mmap'li parçalara bağlanır ve
+    ancak kullanıldıkça okunur. 'device' verilirse model oraya taşınır
+    (o sırada tüm ağırlıklar okunur). 4-bit gibi kuantize yükleme için
+    from_pretrained kullanılmalıdır; klasör onunla da uyumludur.
+    """
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    config = AutoConfig.from_pretrained(path)
+    model_class = model_class or AutoModelForCausalLM
+    with _meta_parameters():
+        model = model_class.from_config(config)
+    reader = SnapshotReader(path, verify=verify)
+    missing, unexpected = model.load_state_dict(reader.state_dict(), strict=False, assign=True)
+    if unexpected:
+        raise ValueError(f"Modelde karşılığı olmayan ağırlıklar: {unexpected[:5]}")
+    model.tie_weights()
+    empty = [name for name, param in model.named_parameters() if param.device.type == "meta"]
+    if empty:
+        raise ValueError(f"Anlık görüntüde eksik ağırlıklar: {empty[:5]}")
+    model.eval()
+    return model.to(device) if device is not None else model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parçalı safetensors anlık görüntüsü çıkarır ve doğrular")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Model klasörünü (ya da Hub adını) anlık görüntüye çevirir")
+    export.add_argument("source", help="safetensors/bin ağırlıklı model klasörü ya da Hugging Face model adı")
+    export.add_argument("out", help="Çıktı klasörü")
+    export.add_argument("--adapter", help="Birleştirilecek LoRA adaptör klasörü")
+    export.add_argument("--dtype", choices=["float32", "float16", "bfloat16"], help="Kayan noktalı tensörlerin türü")
+    export.add_argument("--max-shard-size", default="2GB", help="En büyük parça boyutu (örn. 2GB)")
+    verify = commands.add_parser("verify", help="Parçaların sha256 özetlerini kontrol eder")
+    verify.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        bad = verify_snapshot(args.path)
+        print(json.dumps({"path": args.path, "ok": not bad, "bad_shards": bad}, ensure_ascii=False, indent=2))
+        sys.exit(1 if bad else 0)
+
+    source = args.source
+    if not os.path.isdir(source):
+        # Hub'dan sadece dosyalar indirilir; model belleğe yüklenmez.
+        from huggingface_hub import snapshot_download
+
+        source = snapshot_download(source, allow_patterns=["*.json", "*.safetensors", "*.model", "*.txt"])
+
+    def progress(file, skipped):
+        print(f"{file} {'(zaten var, atlandı)' if skipped else 'yazıldı'}", file=sys.stderr)
+
+    manifest = export_snapshot(source, args.out, args.max_shard_size, args.dtype, args.adapter, progress)
+    print(json.dumps({key: manifest[key] for key in ("total_size", "reused_shards", "seconds")}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
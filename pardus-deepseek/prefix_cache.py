@@ -0,0 +1,187 @@
+# prefix_cache.py
+# Ortak istem ön ekleri için KV cache (past_key_values) yeniden kullanımı.
+#
+# DeepSeekWeb'e gelen her istem format_alpaca_prompt ile aynı Türkçe talimat
+# giriş metnini taşır; çok turlu sohbetlerde ise her yeni istem bir önceki turun
+# istemini ve cevabını aynen içerir. Bu ortak kısımların her seferinde baştan
+# modelden geçirilmesi (prefill) ilk tokene kadar geçen süreyi (TTFT) uzatır.
+#
+# PrefixCache, daha önce hesaplanmış token dizilerinin KV tensörlerini saklar:
+#   - Yeni bir istem geldiğinde saklanan diziler arasında en uzun ortak ön ek
+#     bulunur; bu kısmın KV'si kopyalanmadan (dilimlenerek) kullanılır, sadece
+#     kalan tokenler modelden geçirilir.
+#   - Arama, dizilerin blok (varsayılan 16 token) sınırlarındaki zincirleme
+#     hash'leriyle yapılır; istem uzunluğuyla doğrusal sürer.
+#   - Toplam bellek bir bütçeyle sınırlıdır; aşılınca en uzun süredir
+#     kullanılmayan (LRU) kayıtlar atılır. Sabitlenmiş (pin) kayıtlar (örn.
+#     şablon giriş metni) atılmaz.
+#
+# Saklanan tensörler yerinde değiştirilmez: model yeni tokenleri eklerken
+# (torch.cat) her zaman yeni tensörler oluşturur.
+import collections
+
+# Blok uzunluğu (token). Bundan kısa ortak ön ekler yeniden kullanılmaz.
+DEFAULT_BLOCK_SIZE = 16
+# Varsayılan bellek bütçesi (bayt).
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class PrefixEntry:
+    """Saklanan bir token dizisi ve katman başına (key, value) tensörleri."""
+
+    __slots__ = ("entry_id", "tokens", "layers", "nbytes", "hashes", "pinned", "hits")
+
+    def __init__(self, entry_id: int, tokens: tuple, layers: list, hashes: list, pinned: bool):
+        self.entry_id = entry_id
+        self.tokens = tokens
+        self.layers = layers
+        self.nbytes = sum(k.numel() * k.element_size() + v.numel() * v.element_size() for k, v in layers)
+        self.hashes = hashes
+        self.pinned = pinned
+        self.hits = 0
+
+
+def _block_hashes(tokens, block_size: int) -> list:
+    # Her tam blok için, dizinin o noktaya kadarki zincirleme hash'i.
+    hashes, h = [], 0
+    for end in range(block_size, len(tokens) + 1, block_size):
+        h = hash((h, tuple(tokens[end - block_size:end])))
+        hashes.append(h)
+    return hashes
+
+
+def _common_length(a, b) -> int:
+    n = min(len(a), len(b))
+    for i in range(n):
+        if a[i] != b[i]:
+            return i
+    return n
+
+
+class PrefixCache:
+    """
+    En uzun ortak ön ek eşleşmesiyle KV yeniden kullanımı yapan, bellek
+    bütçeli LRU önbellek.
+
+    Args:
+        max_bytes (int): Saklanan KV tensörlerinin toplam en fazla boyutu.
+        block_size (int): Eşleşme aramasında kullanılan blok uzunluğu.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.max_bytes = max_bytes
+        self.block_size = max(1, block_size)
+        # entry_id -> PrefixEntry; sıra en eski kullanımdan en yeniye (LRU).
+        self.entries = collections.OrderedDict()
+        # Blok hash'i -> o ön eki içeren kayıtlar.
+        self.blocks = collections.defaultdict(set)
+        self.total_bytes = 0
+        self._next_id = 1
+        # İstatistikler
+        self.lookups = 0
+        self.hits = 0
+        self.tokens_reused = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _find(self, tokens, hashes: list):
+        """(kayıt, ortak uzunluk) döndürür; blok sınırında eşleşme yoksa (None, 0)."""
+        for depth in range(len(hashes), 0, -1):
+            ids = self.blocks.get(hashes[depth - 1])
+            if not ids:
+                continue
+            # Aynı ön eki paylaşan kayıtlardan en yenisi; hash çakışmasına karşı tokenler doğrulanır.
+            entry = self.entries[max(ids)]
+            common = _common_length(entry.tokens, tokens)
+            if common >= depth * self.block_size:
+                return entry, common
+        return None, 0
+
+    def lookup(self, tokens, max_length: int = None):
+        """
+        'tokens' ile en uzun ortak ön eki paylaşan kaydı arar.
+        (katman listesi, yeniden kullanılan token sayısı) döndürür; eşleşme
+        yoksa (None, 0). Kullanılan uzunluk 'max_length'i aşmaz (modelin son
+        token için logit üretebilmesi için en az bir token bırakılmalıdır).
+        """
+        self.lookups += 1
+        entry, common = self._find(tokens, _block_hashes(tokens, self.block_size))
+        if max_length is not None:
+            common = min(common, max_length)
+        if entry is None or common < self.block_size:
+            return None, 0
+        entry.hits += 1
+        self.entries.move_to_end(entry.entry_id)
+        self.hits += 1
+        self.tokens_reused += common
+        layers = [(k[:, :, :common], v[:, :, :common]) for k, v in entry.layers]
+        return layers, common
+
+    def insert(self, tokens, layers: list, pin: bool = False):
+        """
+        Bir token dizisinin KV tensörlerini saklar. 'layers' [1, başlık, uzunluk,
+        boyut] şeklinde ve uzunluğu en az len(tokens) olmalıdır.
+        """
+        tokens = tuple(tokens)
+        if len(tokens) < self.block_size:
+            return None
+        hashes = _block_hashes(tokens, self.block_size)
+        existing, common = self._find(tokens, hashes)
+        if existing is not None and common == len(tokens):
+            # Bu dizi zaten saklı bir dizinin ön eki; yenisine gerek yok.
+            existing.pinned = existing.pinned or pin
+            self.entries.move_to_end(existing.entry_id)
+            return existing
+        if existing is not None and common == len(existing.tokens) and not existing.pinned:
+            # Yeni dizi eskisini tamamen kapsıyor (örn. sohbetin bir sonraki turu).
+            self._remove(existing.entry_id)
+        # Kopya: büyük bir tensörün dilimi saklanırsa bütün tensör bellekte kalırdı.
+        layers = [(k[:, :, :len(tokens)].contiguous(), v[:, :, :len(tokens)].contiguous()) for k, v in layers]
+        entry = PrefixEntry(self._next_id, tokens, layers, hashes, pin)
+        self._next_id += 1
+        if entry.nbytes > self.max_bytes:
+            return None
+        self.entries[entry.entry_id] = entry
+        for h in hashes:
+            self.blocks[h].add(entry.entry_id)
+        self.total_bytes += entry.nbytes
+        self._evict()
+        return entry
+
+    def _remove(self, entry_id: int):
+        entry = self.entries.pop(entry_id)
+        for h in entry.hashes:
+            ids = self.blocks.get(h)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.blocks[h]
+        self.total_bytes -= entry.nbytes
+
+    def _evict(self):
+        # Bütçe sağlanana kadar en uzun süredir kullanılmayan sabitlenmemiş kayıtları at.
+        for entry_id in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if not self.entries[entry_id].pinned:
+                self._remove(entry_id)
+                self.evicted += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.blocks.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "tokens_reused": self.tokens_reused,
+            "evicted": self.evicted,
+        }
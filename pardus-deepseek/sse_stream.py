@@ -0,0 +1,173 @@
+# sse_stream.py
+# DeepSeekWeb için bağlantı kopmasını algılayan, birleştirici SSE akış katmanı.
+#
+# Eski akışta her çözülen metin parçası sınırsız bir queue.Queue'ya konuyor ve
+# her parça ayrı bir SSE olayı olarak gönderiliyordu:
+#   - Tarayıcı EventSource'u kapatsa bile üretim max_new_tokens'a kadar sürüyordu.
+#   - Token başına bir olay, küçük ve çok sayıda ağ yazması demekti.
+#   - İstemci yavaşsa kuyruk sınırsız büyüyebiliyordu.
+#   - İçinde satır sonu olan parçalar "data: " önekini sadece ilk satıra
+#     aldığı için tarayıcıda kayboluyordu.
+#
+# Bu modül:
+#   - StreamChannel: üretici ile HTTP yanıtı arasında boyutu sınırlı bir kanal.
+#     Üretim iş parçacığı (örn. model.generate) kanal doluyken bekler
+#     (backpressure). Beklemesi diğer istekleri durduracak olan üreticiler
+#     (toplu zamanlayıcı) beklemeden yazar; kanal uzun süre dolu kalırsa istemci
+#     "yavaş" sayılır ve üretim iptal edilir.
+#   - sse_events: kanaldaki metni zaman ya da boyut sınırına göre tek bir SSE
+#     çerçevesinde birleştirir, boşta kalındığında canlı tutma (keep-alive)
+#     yorumu gönderir ve istemci bağlantıyı kapatınca üretimi iptal eder.
+#   - encode_sse: çok satırlı veriyi SSE kurallarına göre kodlar.
+import re
+import threading
+import time
+
+# Kanalda bekleyebilecek en fazla karakter.
+DEFAULT_MAX_CHARS = 8192
+# Kanal bu kadar süre (saniye) dolu kalırsa istemci yavaş sayılır.
+DEFAULT_STALL_TIMEOUT = 10.0
+# Bir çerçevede metin biriktirmek için beklenecek en uzun süre (saniye).
+DEFAULT_FLUSH_INTERVAL = 0.05
+# Bu kadar karakter biriktiğinde çerçeve beklemeden gönderilir.
+DEFAULT_FRAME_CHARS = 512
+# Hiç metin yoksa bu aralıkla canlı tutma yorumu gönderilir (saniye).
+DEFAULT_HEARTBEAT = 15.0
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+def encode_sse(data: str, event: str = None) -> str:
+    """
+    Veriyi bir SSE olayına çevirir. Her satır ayrı bir 'data:' alanı olur;
+    tarayıcı bunları satır sonlarıyla birleştirerek orijinal metni geri kurar.
+    """
+    lines = [] if event is None else [f"event: {event}"]
+    lines.extend("data: " + line for line in _LINE_BREAK.split(data))
+    return "\n".join(lines) + "\n\n"
+
+
+class StreamChannel:
+    """
+    Metin parçaları için sınırlı, birleştirici kanal. Okuyucu her seferinde
+    biriken metnin tamamını tek parça olarak alır.
+
+    Args:
+        max_chars (int): Kanalda bekleyebilecek en fazla karakter.
+        stall_timeout (float): Kanal bu süre boyunca dolu kalırsa kapatılır
+            ("slow_client").
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS, stall_timeout: float = DEFAULT_STALL_TIMEOUT):
+        self.max_chars = max(1, max_chars)
+        self.stall_timeout = stall_timeout
+        self._cond = threading.Condition()
+        self._parts = []
+        self._size = 0
+        self._full_since = None
+        self.closed = False
+        self.reason = None # Kapanma nedeni ("stop", "cancelled", "slow_client"...)
+        # İstatistikler
+        self.max_buffered = 0
+        self.blocked_seconds = 0.0
+
+    def put(self, text: str, block: bool = True, timeout: float = None) -> bool:
+        """
+        Metni kanala ekler. 'block' True ise kanal doluyken yer açılmasını
+        bekler. Kanal kapalıysa (istemci gitti) False döndürür; üretici durmalıdır.
+        """
+        with self._cond:
+            if block and self._size >= self.max_chars and not self.closed:
+                start = time.perf_counter()
+                deadline = None if timeout is None else start + timeout
+                while self._size >= self.max_chars and not self.closed:
+                    remaining = None if deadline is None else deadline - time.perf_counter()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self.blocked_seconds += time.perf_counter() - start
+            if self.closed:
+                return False
+            self._parts.append(text)
+            self._size += len(text)
+            self.max_buffered = max(self.max_buffered, self._size)
+            if self._size >= self.max_chars:
+                now = time.perf_counter()
+                self._full_since = self._full_since or now
+                if now - self._full_since > self.stall_timeout:
+                    self._close("slow_client")
+                    return False
+            self._cond.notify_all()
+            return True
+
+    def close(self, reason: str = "stop"):
+        """Üretimin bittiğini bildirir; okuyucu kalan metni aldıktan sonra durur."""
+        with self._cond:
+            self._close(reason)
+
+    def _close(self, reason: str):
+        if not self.closed:
+            self.closed = True
+            self.reason = reason
+        self._cond.notify_all()
+
+    @property
+    def stalled(self) -> bool:
+        return self.reason == "slow_client"
+
+    def get(self, timeout: float = None, flush_interval: float = 0.0, frame_chars: int = None):
+        """
+        Biriken metni döndürür. İlk metin gelene kadar en fazla 'timeout' bekler
+        (süre dolarsa ""), ardından 'frame_chars' karaktere ulaşana ya da
+        'flush_interval' dolana kadar biriktirmeye devam eder. Kanal kapanmış ve
+        boşsa None döndürür.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._parts or self.closed, timeout):
+                return ""
+            if flush_interval > 0 and not self.closed:
+                limit = frame_chars or self.max_chars
+                self._cond.wait_for(lambda: self._size >= limit or self.closed, flush_interval)
+            if not self._parts:
+                return None
+            text = "".join(self._parts)
+            self._parts, self._size, self._full_since = [], 0, None
+            self._cond.notify_all() # Bekleyen üreticiye yer açıldı.
+            return text
+
+    def __iter__(self):
+        while True:
+            text = self.get()
+            if text is None:
+                return
+            yield text
+
+
+def sse_events(handle, flush_interval: float = DEFAULT_FLUSH_INTERVAL, frame_chars: int = DEFAULT_FRAME_CHARS,
+               heartbeat: float = DEFAULT_HEARTBEAT, stats: dict = None):
+    """
+    Bir üretim isteğinin ('stream' kanalı ve 'cancel()' metodu olan) metnini SSE
+    olayları olarak verir. Bitişte 'done' olayı gönderilir. İstemci bağlantıyı
+    kapatırsa (WSGI sunucusu üreteci kapatır) istek iptal edilir.
+    """
+    channel = handle.stream
+    stats = stats if stats is not None else {}
+    stats.setdefault("frames", 0)
+    stats.setdefault("heartbeats", 0)
+    stats.setdefault("bytes", 0)
+    try:
+        while True:
+            text = channel.get(timeout=heartbeat, flush_interval=flush_interval, frame_chars=frame_chars)
+            if text is None:
+                break
+            # Boşta kalınca gönderilen yorum satırı, kopan bağlantının üretim
+            # sürerken de fark edilmesini sağlar (yazma hata verir).
+            frame = encode_sse(text) if text else ": keep-alive\n\n"
+            stats["frames" if text else "heartbeats"] += 1
+            stats["bytes"] += len(frame.encode("utf-8"))
+            yield frame
+        reason = getattr(handle, "finish_reason", None) or channel.reason
+        yield encode_sse(reason or "stop", event="error" if reason in ("error", "slow_client") else "done")
+    finally:
+        # Normal bitişte etkisizdir; bağlantı koptuysa üretimi durdurur.
+        handle.cancel()
@@ -0,0 +1,408 @@
+# token_store.py
+# Eğitim verisinin bir kez token'lanıp diskte bellek eşlemeli (memory-mapped)
+# olarak saklanması; paketleme (packing) ve uzunluğa göre gruplama (bucketing).
+#
+# ModelEgitimDeepSeek.ipynb her çalıştırmada tüm veri setini
+# formatting_prompts_func + dataset.map ile yeniden biçimlendirip token'lıyor,
+# sonucu da elle save_to_disk ile kaydediyordu. Kısa (yorum, cümle) ve çok uzun
+# (Wikipedia) örnekler karışık olduğu için toplu işlerdeki dolgu (padding)
+# payı da hiç ölçülmüyordu. Bu modülde:
+#   - TokenStore: Alpaca kayıtlarını eğitimdeki şablonla biçimlendirip bir kez
+#     token'lar. Token'lar uint32 olarak ham dosyaya, uzunluklar .npy'ye yazılır
+#     ve np.memmap ile okunur; veri RAM'e yüklenmez.
+#   - Depo klasörü tokenizer'ın ve şablonun hash'iyle adlandırılır: tokenizer ya
+#     da şablon değişince yeni bir depo oluşur, değişmezse mevcut olan kullanılır.
+#   - Her kaynak dosya, yolu ve içeriğinin sha256 özetiyle ayrı bir bölüm
+#     (segment) olarak saklanır; yeni parça eklendiğinde sadece o parça
+#     token'lanır, yarıda kalan bir çalışma kaldığı yerden devam eder. İçeriği
+#     değişen dosyanın eski bölümü silinir; build(paths) yalnızca verilen
+#     dosyaların bölümlerini gösterir.
+#   - pack_sequences: Örnekleri bölmeden, en iyi uyum (best-fit decreasing) ile
+#     max_seq_length'lik dizilere yerleştirir.
+#   - bucket_batches: Paketleme istenmezse benzer uzunluktaki örnekleri aynı
+#     toplu işe koyar.
+#   - padding_report: Her yöntem için gerçek token / (token + dolgu) oranı.
+#   - PackedCollator: Paketlenmiş dizileri position_ids'i koruyarak dolgusuz
+#     birleştirir ve her örneğin ilk token'ını etiketten çıkarır.
+#
+# Kullanım:
+#     python3 token_store.py --tokenizer ./deepseek-14B --data "veri/part-*.jsonl" --cache token_cache
+import argparse
+import bisect
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from dataset_builder import iter_record_batches
+
+# ModelEgitimDeepSeek.ipynb'deki şablon.
+ALPACA_PROMPT = """Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
+
+### Instruction:
+{}
+
+### Input:
+{}
+
+### Response:
+{}"""
+
+# Eğitimdeki en uzun dizi.
+MAX_SEQ_LENGTH = 2048
+# Token kimlikleri (Qwen sözlüğü 65535'ten büyük olduğu için 32 bit).
+TOKEN_DTYPE = np.uint32
+# Tokenizer'a tek seferde verilen örnek sayısı.
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """Tokenizer'ın sözlüğünü ve özel token'larını kapsayan kısa hash."""
+    digest = hashlib.sha256()
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        digest.update(backend.to_str().encode("utf-8"))
+    else:
+        digest.update(json.dumps(sorted(tokenizer.get_vocab().items()), ensure_ascii=False).encode("utf-8"))
+    digest.update(repr((type(tokenizer).__name__, tokenizer.bos_token, tokenizer.eos_token)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class TokenStore:
+    """
+    Token'lanmış eğitim verisinin disk deposu.
+
+    Args:
+        cache_dir (str): Depoların tutulduğu klasör.
+        tokenizer: Hugging Face tokenizer'ı.
+        template (str): Üç yer tutuculu (instruction, input, output) şablon.
+        add_eos (bool): Her örneğin sonuna EOS eklenir (eğitimdeki EOS_TOKEN).
+        batch_size (int): Tokenizer'a tek seferde verilen örnek sayısı.
+    """
+
+    def __init__(self, cache_dir: str, tokenizer, template: str = ALPACA_PROMPT, add_eos: bool = True,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.tokenizer = tokenizer
+        self.template = template
+        self.suffix = tokenizer.eos_token if add_eos else ""
+        self.batch_size = batch_size
+        template_hash = hashlib.sha256((template + "\x00" + self.suffix).encode("utf-8")).hexdigest()[:16]
+        self.key = f"{tokenizer_fingerprint(tokenizer)}-{template_hash}"
+        self.path = os.path.join(cache_dir, self.key)
+        os.makedirs(self.path, exist_ok=True)
+        self._index_path = os.path.join(self.path, "store.json")
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {"key": self.key, "template": template, "eos": self.suffix, "segments": []}
+        # build() çağrılana kadar tüm bölümler gösterilir.
+        self._active = None
+        self._views = None
+
+    # --- Yazma ---
+
+    def _save_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self._index_path)
+
+    def format(self, record: dict) -> str:
+        return self.template.format(record.get("instruction", ""), record.get("input", ""),
+                                    record.get("output", "")) + self.suffix
+
+    def add(self, path: str) -> bool:
+        """
+        Dosyayı depoya ekler. Aynı yol aynı içerikle daha önce eklenmişse hiçbir
+        şey yapmaz; aynı içerik başka bir bölümde varsa token'ları yeniden
+        kullanır. Aynı yolun eski içerikli bölümü kaldırılır. Dosya token'landıysa
+        True döndürür.
+        """
+        source = os.path.abspath(path)
+        digest = _sha256_file(path)
+        segments = self.index["segments"]
+        if any(s.get("source_path") == source and s["source_sha256"] == digest for s in segments):
+            return False
+        same_content = next((s for s in segments if s["source_sha256"] == digest), None)
+        if same_content is not None:
+            name, rows, tokens = same_content["file"], same_content["rows"], same_content["tokens"]
+        else:
+            name = f"seg-{digest[:16]}"
+            tokens_path = os.path.join(self.path, name + ".bin")
+            lengths = []
+            with open(tokens_path + ".tmp", "wb") as out:
+                for records in iter_record_batches(path, self.batch_size):
+                    if not records:
+                        continue
+                    encoded = self.tokenizer([self.format(r) for r in records])["input_ids"]
+                    for ids in encoded:
+                        out.write(np.asarray(ids, dtype=TOKEN_DTYPE).tobytes())
+                        lengths.append(len(ids))
+            np.save(os.path.join(self.path, name + ".len.npy"), np.asarray(lengths, dtype=np.int32))
+            os.replace(tokens_path + ".tmp", tokens_path)
+            rows, tokens = len(lengths), int(sum(lengths))
+        # Aynı yolun eski bölümleri ile yol bilgisi olmayan (eski sürüm) ve aynı
+        # ada ya da içeriğe sahip bölümler bunun yerini aldığı için kaldırılır.
+        stale = [s for s in segments
+                 if s.get("source_path") == source
+                 or ("source_path" not in s and (s["source"] == os.path.basename(path) or s["source_sha256"] == digest))]
+        kept = [s for s in segments if s not in stale]
+        kept.append({
+            "source": os.path.basename(path),
+            "source_path": source,
+            "source_sha256": digest,
+            "file": name,
+            "rows": rows,
+            "tokens": tokens,
+        })
+        self.index["segments"] = kept
+        self._save_index()
+        self._remove_unused(stale)
+        self._views = None
+        return same_content is None
+
+    def _remove_unused(self, segments: list):
+        """Artık hiçbir bölümün kullanmadığı token dosyalarını siler."""
+        used = {segment["file"] for segment in self.index["segments"]}
+        for name in {segment["file"] for segment in segments} - used:
+            for suffix in (".bin", ".len.npy"):
+                try:
+                    os.remove(os.path.join(self.path, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def build(self, paths: list) -> dict:
+        """
+        Dosyaları sırayla ekler; kaçının token'landığını ve kaçının hazır
+        bulunduğunu döndürür. Bundan sonra depo yalnızca bu dosyaların
+        örneklerini, 'paths' sırasıyla gösterir.
+        """
+        start = time.perf_counter()
+        added = sum(self.add(path) for path in paths)
+        self._active = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+        self._views = None
+        return {"tokenized": added, "reused": len(paths) - added, "seconds": round(time.perf_counter() - start, 3),
+                "rows": len(self), "tokens": int(self.lengths.sum())}
+
+    # --- Okuma ---
+
+    def _load(self):
+        if self._views is not None:
+            return self._views
+        segments = self.index["segments"]
+        if self._active is not None:
+            by_source = {segment.get("source_path"): segment for segment in segments}
+            segments = [by_source[source] for source in self._active if source in by_source]
+        tokens, lengths, offsets = [], [], []
+        for segment in segments:
+            base = os.path.join(self.path, segment["file"])
+            segment_lengths = np.load(base + ".len.npy")
+            # Boş dosyalar memmap'lenemez.
+            tokens.append(np.memmap(base + ".bin", dtype=TOKEN_DTYPE, mode="r") if segment["tokens"] else None)
+            lengths.append(segment_lengths)
+            offsets.append(np.concatenate([[0], np.cumsum(segment_lengths, dtype=np.int64)]))
+        all_lengths = np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int32)
+        starts = np.cumsum([0] + [len(l) for l in lengths])
+        self._views = (tokens, offsets, all_lengths, starts)
+        return self._views
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self._load()[2]
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        tokens, offsets, _, starts = self._load()
+        if index < 0:
+            index += len(self)
+        segment = int(np.searchsorted(starts, index, side="right")) - 1
+        row = index - starts[segment]
+        return tokens[segment][offsets[segment][row]:offsets[segment][row + 1]]
+
+
+# --- Paketleme ve gruplama ---
+
+def pack_sequences(lengths: np.ndarray, max_length: int = MAX_SEQ_LENGTH) -> list:
+    """
+    Örnekleri, her biri en fazla 'max_length' token olan dizilere yerleştirir.
+    Uzundan kısaya sırayla her örnek, sığdığı en dolu diziye (best-fit) konur.
+    'max_length'ten uzun örnekler kesilmiş sayılır. Dizi başına örnek
+    indekslerinin listesini döndürür.
+    """
+    clipped = np.minimum(lengths, max_length)
+    bins = []
+    capacities = []   # Boş yeri olan dizilerin (sıralı, tekil) kalan kapasiteleri
+    by_capacity = {}  # kalan kapasite -> dizi numaraları
+    for index in np.argsort(-clipped, kind="stable").tolist():
+        length = int(clipped[index])
+        position = bisect.bisect_left(capacities, length)
+        if position < len(capacities):
+            capacity = capacities[position]
+            ids = by_capacity[capacity]
+            target = ids.pop()
+            if not ids:
+                del by_capacity[capacity]
+                capacities.pop(position)
+        else:
+            target, capacity = len(bins), max_length
+            bins.append([])
+        bins[target].append(index)
+        remaining = capacity - length
+        if remaining > 0:
+            if remaining not in by_capacity:
+                bisect.insort(capacities, remaining)
+                by_capacity[remaining] = []
+            by_capacity[remaining].append(target)
+    return bins
+
+
+def bucket_batches(lengths: np.ndarray, batch_size: int, megabatch: int = 64, seed: int = 0) -> list:
+    """
+    Örnekleri karıştırıp 'batch_size * megabatch'lik gruplara böler, her grubu
+    uzunluğa göre sıralayıp toplu işlere ayırır ve toplu işlerin sırasını
+    karıştırır. Toplu iş başına örnek indekslerini döndürür.
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(lengths))
+    group = batch_size * megabatch
+    batches = []
+    for start in range(0, len(order), group):
+        chunk = order[start:start + group]
+        chunk = chunk[np.argsort(lengths[chunk], kind="stable")]
+        batches.extend(chunk[i:i + batch_size] for i in range(0, len(chunk), batch_size))
+    return [batches[i] for i in rng.permutation(len(batches))]
+
+
+def _batch_efficiency(lengths: np.ndarray, batches: list) -> float:
+    real = padded = 0
+    for batch in batches:
+        batch_lengths = lengths[batch]
+        real += int(batch_lengths.sum())
+        padded += int(batch_lengths.max()) * len(batch)
+    return real / padded if padded else 1.0
+
+
+def padding_report(lengths: np.ndarray, max_length: int = MAX_SEQ_LENGTH, batch_size: int = 8, seed: int = 0) -> dict:
+    """
+    Farklı toplu iş kurma yöntemlerinde gerçek token'ların toplam yuvalara
+    (token + dolgu) oranı. 1.0 hiç dolgu olmadığı anlamına gelir.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    clipped = np.minimum(lengths, max_length)
+    tokens = int(clipped.sum())
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(clipped))
+    random_batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+    start = time.perf_counter()
+    bins = pack_sequences(clipped, max_length)
+    pack_seconds = time.perf_counter() - start
+    return {
+        "examples": int(len(lengths)),
+        "tokens": tokens,
+        "truncated_tokens": int((lengths - clipped).sum()),
+        "truncated_examples": int((lengths > max_length).sum()),
+        "length_percentiles": {p: int(np.percentile(lengths, p)) for p in (50, 90, 99)} if len(lengths) else {},
+        "efficiency": {
+            "pad_to_max_length": round(tokens / (len(clipped) * max_length), 4) if len(clipped) else 1.0,
+            "random_batches": round(_batch_efficiency(clipped, random_batches), 4),
+            "bucketed": round(_batch_efficiency(clipped, bucket_batches(clipped, batch_size, seed=seed)), 4),
+            "packed": round(tokens / (len(bins) * max_length), 4) if bins else 1.0,
+        },
+        "packed_sequences": len(bins),
+        "pack_seconds": round(pack_seconds, 3),
+    }
+
+
+def packed_examples(store: TokenStore, bins: list, max_length: int = MAX_SEQ_LENGTH):
+    """
+    Paketlenmiş dizileri eğitim örnekleri olarak verir. position_ids her
+    örneğin başında sıfırlanır; PackedCollator bunları korur ve örnek
+    sınırlarını buradan bulur. (DataCollatorWithFlattening position_ids'i her
+    özellik için yeniden 0'dan başlattığı için bu dizilerle kullanılamaz.)
+    """
+    for bin_indices in bins:
+        input_ids, position_ids = [], []
+        for index in bin_indices:
+            ids = store[index][:max_length].tolist()
+            input_ids.extend(ids)
+            position_ids.extend(range(len(ids)))
+        yield {"input_ids": input_ids, "position_ids": position_ids}
+
+
+class PackedCollator:
+    """
+    packed_examples çıktısını dolgusuz tek bir [1, toplam] satırda birleştirir.
+
+    Verilen position_ids olduğu gibi korunur; model örnek sınırlarını buradan
+    bulur (flash attention; sdpa/eager'da ise önbellek kapalıyken, yani
+    eğitimde, transformers blok köşegen maske kurar).
+    position_ids'in 0 olduğu her token'ın etiketi -100 yapılır; böylece bir
+    örneğin ilk token'ı önceki örneğin son token'ından tahmin edilmez.
+
+    Args:
+        return_flash_attn_kwargs (bool): cu_seq_lens_q/k ve max_length_q/k da
+            döndürülür (DataCollatorWithFlattening ile aynı adlar).
+    """
+
+    def __init__(self, return_flash_attn_kwargs: bool = False):
+        self.return_flash_attn_kwargs = return_flash_attn_kwargs
+
+    def __call__(self, features: list, return_tensors=None) -> dict:
+        import torch
+
+        input_ids = np.concatenate([np.asarray(f["input_ids"], dtype=np.int64) for f in features])
+        position_ids = np.concatenate([np.asarray(f["position_ids"], dtype=np.int64) for f in features])
+        labels = input_ids.copy()
+        labels[position_ids == 0] = -100
+        batch = {
+            "input_ids": torch.from_numpy(input_ids)[None],
+            "labels": torch.from_numpy(labels)[None],
+            "position_ids": torch.from_numpy(position_ids)[None],
+        }
+        if self.return_flash_attn_kwargs:
+            cu_seq_lens = np.append(np.flatnonzero(position_ids == 0), len(position_ids)).astype(np.int32)
+            max_length = int(np.diff(cu_seq_lens).max()) if len(cu_seq_lens) > 1 else 0
+            batch["cu_seq_lens_q"] = batch["cu_seq_lens_k"] = torch.from_numpy(cu_seq_lens)
+            batch["max_length_q"] = batch["max_length_k"] = max_length
+        return batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eğitim verisini token'layıp diskte saklar ve dolgu oranını raporlar")
+    parser.add_argument("--tokenizer", required=True, help="Tokenizer yolu ya da Hugging Face adı")
+    parser.add_argument("--data", required=True, action="append", help="Alpaca JSONL/CSV dosyaları (glob, tekrarlanabilir)")
+    parser.add_argument("--cache", default="token_cache", help="Depo klasörü")
+    parser.add_argument("--max-seq-length", type=int, default=MAX_SEQ_LENGTH)
+    parser.add_argument("--batch-size", type=int, default=8, help="Dolgu raporu için eğitim toplu iş boyutu")
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+
+    paths = sorted({path for pattern in args.data for path in glob.glob(pattern)})
+    if not paths:
+        parser.error("Veri dosyası bulunamadı.")
+    store = TokenStore(args.cache, AutoTokenizer.from_pretrained(args.tokenizer))
+    build = store.build(paths)
+    print(f"{build['tokenized']} dosya token'landı, {build['reused']} dosya depodan kullanıldı ({store.path})",
+          file=sys.stderr)
+    report = padding_report(store.lengths, args.max_seq_length, args.batch_size)
+    print(json.dumps({"store": store.path, "build": build, "padding": report}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()